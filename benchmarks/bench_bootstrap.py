@@ -0,0 +1,72 @@
+"""Compares follower bootstrap by database file copy and by pickled rows.
+
+Fills the leader's SQLite file with users and messages before starting it,
+then starts one follower per bootstrap mode and reports how long it took
+until the follower served clients and how many messages it holds.
+
+Usage:
+    python benchmarks/bench_bootstrap.py --messages 100000
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+from cluster import start_follower, start_leader, stop_cluster  # puts src/ on the path
+
+from models import MessageModel, UserModel, get_session_factory, init_db
+
+MODES = ('file', 'pickle')
+
+
+def fill_database(path, users, messages):
+    """Creates ``users`` users and ``messages`` messages between them."""
+    engine = init_db(f'sqlite:///{path}')
+    session = get_session_factory(engine)()
+    session.bulk_insert_mappings(UserModel, [
+        {'id': i + 1, 'username': f'user{i}', 'password': 'x'} for i in range(users)])
+    now = datetime.utcnow()
+    session.bulk_insert_mappings(MessageModel, [
+        {'sender_id': i % users + 1, 'receiver_id': (i + 1) % users + 1,
+         'content': f'message number {i} with some chat text', 'time_stamp': now}
+        for i in range(messages)])
+    session.commit()
+    session.close()
+    engine.dispose()
+
+
+def count_messages(path):
+    """Returns the number of messages stored in a SQLite file."""
+    with sqlite3.connect(path) as connection:
+        return connection.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark follower bootstrap modes.")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--timeout", type=float, default=300,
+                        help="Seconds a follower may take to bootstrap.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        fill_database(os.path.join(workdir, 'chat_1.db'), args.users, args.messages)
+        leader, _, leader_internal = start_leader(workdir)
+        processes = [leader]
+        try:
+            for server_id, mode in enumerate(MODES, start=2):
+                started = time.perf_counter()
+                process, _ = start_follower(workdir, server_id, leader_internal, [f'--bootstrap={mode}'],
+                                            timeout=args.timeout)
+                elapsed = time.perf_counter() - started
+                processes.append(process)
+                copied = count_messages(os.path.join(workdir, f'chat_{server_id}.db'))
+                print(f"{mode:>6}: serving after {elapsed:6.2f} s, {copied}/{args.messages} messages")
+        finally:
+            stop_cluster(processes)
+
+
+if __name__ == '__main__':
+    main()
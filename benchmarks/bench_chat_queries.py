@@ -0,0 +1,136 @@
+"""Counts the SQL queries and time of GetChat and GetMessages.
+
+For every size, fills a SQLite file with a chat of that many messages
+between two users, and an inbox of that many unread messages from
+``--senders`` users. Each reply is then built twice on a fresh copy: by the
+server, which queries plain rows, and by the way replies were built before,
+loading ORM objects and reading ``message.sender.username`` per message.
+Read state is left out of the previous builds, as the per-message flags
+they set have since been replaced by read marks.
+
+Usage:
+    python benchmarks/bench_chat_queries.py --messages 10 1000 100000 --senders 100
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import cluster  # noqa: F401  puts src/ on the path
+
+from sqlalchemy import and_, event, or_
+from sqlalchemy.orm import scoped_session
+
+import spec_pb2
+from leader_server import MAX_PAGE_SIZE, ClientService
+from models import MessageModel, UserModel, get_session_factory, init_db
+from replication import ReplicationLog
+
+
+def fill_database(path, messages, senders):
+    """Creates the chat between ``a`` and ``b`` and the inbox of ``c``."""
+    engine = init_db(f'sqlite:///{path}')
+    session = get_session_factory(engine)()
+    session.bulk_insert_mappings(UserModel, [
+        {'id': i + 1, 'username': name, 'password': 'x', 'session_id': f's{name}', 'logged_in': True}
+        for i, name in enumerate(['a', 'b', 'c'] + [f'user{i}' for i in range(senders)])])
+    start = datetime(2026, 1, 1)
+    session.bulk_insert_mappings(MessageModel, [
+        {'sender_id': 1 + i % 2, 'receiver_id': 2 - i % 2, 'content': f'chat message {i}',
+         'time_stamp': start + timedelta(seconds=i)} for i in range(messages)])
+    session.bulk_insert_mappings(MessageModel, [
+        {'sender_id': 4 + i % senders, 'receiver_id': 3, 'content': f'inbox message {i}',
+         'time_stamp': start + timedelta(seconds=i)} for i in range(messages)])
+    session.commit()
+    session.close()
+    engine.dispose()
+
+
+def previous_chat(factory, username, peer):
+    """Builds a chat the way GetChat did with ORM objects and per-message senders."""
+    session = scoped_session(factory)
+    user = session.query(UserModel).filter_by(username=username).first()
+    receiver = session.query(UserModel).filter_by(username=peer).first()
+    msgs = spec_pb2.Messages()
+    for message in session.query(MessageModel).filter(or_(
+            and_(MessageModel.sender_id == user.id, MessageModel.receiver_id == receiver.id),
+            and_(MessageModel.sender_id == receiver.id, MessageModel.receiver_id == user.id))
+    ).order_by(MessageModel.time_stamp).all():
+        msg = msgs.message.add(from_=message.sender.username, message=message.content, message_id=message.id)
+        msg.time_stamp.FromDatetime(message.time_stamp)
+    session.remove()
+    return msgs
+
+
+def previous_inbox(factory, username):
+    """Builds an inbox the way GetMessages did, all messages at once."""
+    session = scoped_session(factory)
+    user = session.query(UserModel).filter_by(username=username).first()
+    msgs = spec_pb2.Messages()
+    for message in session.query(MessageModel).filter(MessageModel.receiver_id == user.id).all():
+        msgs.message.add(from_=message.sender.username, message=message.content, message_id=message.id)
+    session.remove()
+    return msgs
+
+
+def current_chat(service):
+    return service.GetChat(spec_pb2.ChatRequest(session_id='sa', username='b'), MagicMock())
+
+
+def current_inbox(service):
+    """Reads every page of the inbox."""
+    cursor, received = "", 0
+    while True:
+        page = service.GetMessages(spec_pb2.ReceiveRequest(
+            session_id='sc', limit=MAX_PAGE_SIZE, cursor=cursor), MagicMock())
+        received += len(page.message)
+        if not page.cursor:
+            return received
+        cursor = page.cursor
+
+
+def measure(template, workdir, run):
+    """Runs ``run`` on a fresh copy of the database, returning seconds and queries."""
+    path = os.path.join(workdir, 'run.db')
+    shutil.copyfile(template, path)
+    engine = init_db(f'sqlite:///{path}')
+    queries = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: queries.append(1))
+    factory = get_session_factory(engine)
+    started = time.perf_counter()
+    run(factory)
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+    return elapsed, len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the queries behind chat replies.")
+    parser.add_argument("--messages", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--senders", type=int, default=100,
+                        help="Users the inbox messages come from.")
+    args = parser.parse_args()
+
+    cases = {
+        ('GetChat', 'previous'): lambda factory: previous_chat(factory, 'a', 'b'),
+        ('GetChat', 'rows'): lambda factory: current_chat(
+            ClientService(db_session=factory, update_queue=ReplicationLog())),
+        ('GetMessages', 'previous'): lambda factory: previous_inbox(factory, 'c'),
+        ('GetMessages', 'rows'): lambda factory: current_inbox(
+            ClientService(db_session=factory, update_queue=ReplicationLog())),
+    }
+    print(f"{'messages':>9} {'call':>12} {'build':>9} {'queries':>8} {'ms':>10}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for count in args.messages:
+            template = os.path.join(workdir, f'chat_{count}.db')
+            fill_database(template, count, args.senders)
+            for (call, build), run in cases.items():
+                seconds, queries = measure(template, workdir, run)
+                print(f"{count:>9} {call:>12} {build:>9} {queries:>8} {seconds * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Times chat refreshes in the GUI's view model, without a display.
+
+For each chat length, a refresh with one new message, one with a deleted
+message and one with no change are compared with the displayed chat. The
+report shows the time per refresh and how many rows each one touched. A
+full redraw touches every row of the chat.
+
+Usage:
+    python benchmarks/bench_chat_view.py --messages 100 1000 10000 50000
+"""
+import argparse
+import time
+
+import cluster  # noqa: F401  puts src/ on the path
+
+from chat_view import ChatViewModel
+
+
+def make_messages(count, start=0):
+    """Returns ``count`` message dicts as the GUI builds them."""
+    return [{"id": i, "from": f"user{i % 2}", "timestamp": 1700000000 + i,
+             "content": f"message number {i} with some chat text"}
+            for i in range(start, start + count)]
+
+
+def time_refresh(messages, refreshed, repeat):
+    """Returns the mean seconds of a refresh and the rows it touched."""
+    elapsed = 0.0
+    for _ in range(repeat):
+        model = ChatViewModel()
+        model.update(messages)
+        started = time.perf_counter()
+        diff = model.update(refreshed)
+        elapsed += time.perf_counter() - started
+    return elapsed / repeat, len(diff.removed) + len(diff.added)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental chat refreshes.")
+    parser.add_argument("--messages", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'messages':>9} {'refresh':>9} {'ms':>9} {'touched':>8}")
+    for count in args.messages:
+        messages = make_messages(count)
+        cases = {
+            "append": messages + make_messages(1, start=count),
+            "delete": messages[:count // 2] + messages[count // 2 + 1:],
+            "same": list(messages),
+        }
+        for name, refreshed in cases.items():
+            seconds, touched = time_refresh(messages, refreshed, args.repeat)
+            print(f"{count:>9} {name:>9} {seconds * 1000:>9.3f} {touched:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Measures bytes saved against CPU cost of replication payload compression.
+
+Builds pickled ``('messages', 'add', MessageModel)`` updates like the ones the
+leader replicates, groups them into batches of several sizes and reports for
+every codec the compression ratio and the time spent compressing and
+decompressing. A batch of one is what ``AcceptUpdates`` ships today, larger
+batches approximate catch-up updates and snapshots.
+
+Usage:
+    python benchmarks/bench_compression.py --batch_sizes 1 10 100 1000
+"""
+import argparse
+import pickle
+import random
+import time
+from datetime import datetime
+
+from cluster import SRC  # noqa: F401, puts src/ on the path
+
+import compression
+from compression import ZLIB, ZSTD, compress, decompress
+from models import MessageModel
+
+WORDS = ("hey", "are", "you", "coming", "to", "the", "meeting", "tomorrow", "lunch",
+         "sounds", "good", "see", "you", "later", "thanks", "for", "the", "update")
+
+
+def make_update(message_id, rng):
+    """Returns one pickled message update with a few words of chat text."""
+    message = MessageModel(
+        id=message_id, sender_id=rng.randint(1, 50), receiver_id=rng.randint(1, 50),
+        content=" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 30))),
+        time_stamp=datetime.utcnow())
+    return pickle.dumps(('messages', 'add', message))
+
+
+def measure(payload, codec, repeats):
+    """Returns ``(compressed_size, compress_us, decompress_us)`` averaged over repeats."""
+    started = time.perf_counter()
+    for _ in range(repeats):
+        compressed, used = compress(payload, codec)
+    compress_time = (time.perf_counter() - started) / repeats
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        decompress(compressed, used)
+    decompress_time = (time.perf_counter() - started) / repeats
+    return len(compressed), compress_time * 1e6, decompress_time * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark replication payload compression.")
+    parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    updates = [make_update(i, rng) for i in range(max(args.batch_sizes))]
+    codecs = [ZLIB] + ([ZSTD] if compression.zstandard is not None else [])
+    if ZSTD not in codecs:
+        print("zstandard not installed, only zlib is measured")
+
+    print(f"{'batch':>6} {'codec':>5} {'raw B':>9} {'sent B':>9} {'ratio':>6} "
+          f"{'comp us':>9} {'decomp us':>9}")
+    for batch_size in args.batch_sizes:
+        payload = pickle.dumps(updates[:batch_size])
+        for codec in codecs:
+            size, compress_us, decompress_us = measure(payload, codec, args.repeats)
+            print(f"{batch_size:>6} {codec:>5} {len(payload):>9} {size:>9} "
+                  f"{len(payload) / size:>6.2f} {compress_us:>9.1f} {decompress_us:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
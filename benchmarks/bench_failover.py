@@ -0,0 +1,96 @@
+"""Measures leader failover latency on a local cluster.
+
+Starts one leader and several followers with ``src/server.py``, kills the
+leader and records the time until one of the followers accepts client writes.
+Each run uses a fresh temporary directory for the SQLite files.
+
+Usage:
+    python benchmarks/bench_failover.py --followers 2 --runs 3 --heartbeat_interval 0.2
+"""
+import argparse
+import signal
+import statistics
+import tempfile
+import time
+
+from cluster import call, start_cluster, stop_cluster  # puts src/ on the path
+
+import grpc
+import spec_pb2
+
+
+def accepts_writes(address, probe):
+    """Checks whether the server at ``address`` acts as leader."""
+    try:
+        call(address, 'CreateAccount',
+             spec_pb2.CreateAccountRequest(username=probe, password="x"), 0.2)
+        return True
+    except grpc.RpcError:
+        return False
+
+
+def run_once(args, workdir):
+    """Runs a single failover.
+
+    Returns:
+        tuple: Latency in seconds, or None if no follower took over, and the
+        number of nodes accepting writes once the cluster has settled.
+    """
+    processes, _, follower_clients = start_cluster(workdir, args.followers, follower_args=[
+        f'--heartbeat_interval={args.heartbeat_interval}',
+        f'--phi_threshold={args.phi_threshold}',
+        f'--election_timeout={args.election_timeout}'])
+
+    # let registration and membership propagation settle
+    time.sleep(args.settle)
+
+    try:
+        processes[0].send_signal(signal.SIGKILL)
+        killed_at = time.time()
+        probe = 0
+        while time.time() - killed_at < args.timeout:
+            for address in follower_clients:
+                probe += 1
+                if accepts_writes(address, f"probe{probe}"):
+                    latency = time.time() - killed_at
+                    # more than one node accepting writes would be split brain
+                    time.sleep(args.settle)
+                    leaders = sum(accepts_writes(a, f"check{i}{a}")
+                                  for i, a in enumerate(follower_clients))
+                    return latency, leaders
+            time.sleep(0.01)
+        return None, 0
+    finally:
+        stop_cluster(processes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark leader failover latency.")
+    parser.add_argument("--followers", type=int, default=2)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--heartbeat_interval", type=float, default=0.2)
+    parser.add_argument("--phi_threshold", type=float, default=8.0)
+    parser.add_argument("--election_timeout", type=float, default=0.5)
+    parser.add_argument("--settle", type=float, default=2.0,
+                        help="Seconds to wait after startup before killing the leader.")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    latencies = []
+    for run in range(args.runs):
+        with tempfile.TemporaryDirectory() as workdir:
+            latency, leaders = run_once(args, workdir)
+        if latency is None:
+            print(f"run {run + 1}: no new leader within {args.timeout:.0f}s")
+        else:
+            print(f"run {run + 1}: failover in {latency:.3f}s, {leaders} leader(s) after settling")
+            latencies.append(latency)
+
+    if latencies:
+        print(f"followers={args.followers} heartbeat_interval={args.heartbeat_interval}s "
+              f"phi_threshold={args.phi_threshold} election_timeout={args.election_timeout}s: "
+              f"median {statistics.median(latencies):.3f}s, max {max(latencies):.3f}s")
+
+
+if __name__ == '__main__':
+    main()
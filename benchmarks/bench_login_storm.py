@@ -0,0 +1,130 @@
+"""Measures login throughput on a freshly promoted leader.
+
+Starts a cluster, creates accounts, kills the leader and, once a follower
+has taken over, fires thousands of concurrent logins at it, the reconnect
+storm that follows a failover. The storm runs twice: the first round pays
+for one scrypt verification per account on the new leader, the second is
+mostly answered from its verified-login cache. Compare the password hashing
+process pool with hashing on the request threads by passing
+``--kdf_workers 0``.
+
+Usage:
+    python benchmarks/bench_login_storm.py --users 200 --logins 2000 --concurrency 64
+"""
+import argparse
+import signal
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cluster import call, start_cluster, stop_cluster  # puts src/ on the path
+from bench_failover import accepts_writes
+
+import grpc
+import spec_pb2
+import spec_pb2_grpc
+
+
+def create_accounts(address, users, concurrency):
+    """Creates ``users`` accounts named ``user{i}`` with password ``pw{i}``."""
+    def create(i):
+        call(address, 'CreateAccount',
+             spec_pb2.CreateAccountRequest(username=f"user{i}", password=f"pw{i}"), 30)
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(create, range(users)))
+
+
+def wait_for_leader(addresses, timeout):
+    """Returns the first address that accepts writes, or None after ``timeout`` seconds."""
+    deadline = time.time() + timeout
+    probe = 0
+    while time.time() < deadline:
+        for address in addresses:
+            probe += 1
+            if accepts_writes(address, f"probe{probe}"):
+                return address
+        time.sleep(0.01)
+    return None
+
+
+def storm(address, users, logins, concurrency):
+    """Runs ``logins`` logins spread over the accounts on ``concurrency`` threads.
+
+    Returns:
+        tuple: Wall time in seconds, per-login latencies and the failure count.
+    """
+    local = threading.local()
+
+    def login(i):
+        if not hasattr(local, 'stub'):
+            local.stub = spec_pb2_grpc.ClientAccountStub(grpc.insecure_channel(address))
+        user = i % users
+        started = time.perf_counter()
+        try:
+            response = local.stub.Login(
+                spec_pb2.LoginRequest(username=f"user{user}", password=f"pw{user}"), timeout=60)
+            # a handler that raised after setting OK comes back without a message
+            ok = response is not None and response.error_code == 0
+        except grpc.RpcError:
+            ok = False
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(login, range(logins)))
+    wall = time.perf_counter() - started
+    return wall, [latency for latency, ok in results if ok], sum(not ok for _, ok in results)
+
+
+def report(name, wall, latencies, failures):
+    """Prints throughput and latency percentiles of one storm."""
+    if not latencies:
+        print(f"{name}: all {failures} logins failed")
+        return
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{name}: {len(latencies) / wall:8.1f} logins/s, p50 {statistics.median(latencies) * 1000:7.1f} ms, "
+          f"p99 {p99 * 1000:7.1f} ms, {failures} failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark a login storm after failover.")
+    parser.add_argument("--followers", type=int, default=2)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--logins", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--kdf_workers", type=int, default=None,
+                        help="Password hashing processes per server, the server default if unset.")
+    parser.add_argument("--settle", type=float, default=2.0,
+                        help="Seconds to let the followers replicate the accounts before the failover.")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    server_args = [] if args.kdf_workers is None else [f'--kdf_workers={args.kdf_workers}']
+    with tempfile.TemporaryDirectory() as workdir:
+        processes, leader_client, follower_clients = start_cluster(
+            workdir, args.followers, leader_args=server_args, follower_args=server_args)
+        try:
+            create_accounts(leader_client, args.users, args.concurrency)
+            time.sleep(args.settle)
+
+            processes[0].send_signal(signal.SIGKILL)
+            killed_at = time.time()
+            leader = wait_for_leader(follower_clients, args.timeout)
+            if leader is None:
+                print(f"no new leader within {args.timeout:.0f}s")
+                return
+            print(f"failover in {time.time() - killed_at:.3f}s, "
+                  f"{args.logins} logins for {args.users} users on {args.concurrency} threads")
+
+            report("cold", *storm(leader, args.users, args.logins, args.concurrency))
+            report("warm", *storm(leader, args.users, args.logins, args.concurrency))
+        finally:
+            stop_cluster(processes)
+
+
+if __name__ == '__main__':
+    main()
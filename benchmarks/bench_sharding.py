@@ -0,0 +1,126 @@
+"""Measures message throughput as users are spread over more shards.
+
+For every shard count, starts that many independent leader groups, each
+with its own SQLite files, and a router in front of them. Accounts are
+created and logged in through the router, then concurrent clients send
+messages to random receivers. With more shards a message to a user of
+another shard is stored on both shards, so the workload holds both
+single-shard and cross-shard sends. Pass ``--local`` to only send to users
+of the sender's shard.
+
+Shards only add write throughput when they run on separate cores or
+machines. On a single core all of them share one CPU.
+
+Usage:
+    python benchmarks/bench_sharding.py --shards 1 2 4 --users 64 --messages 4000 --concurrency 32
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cluster import call, free_address, start_follower, start_leader, start_router, stop_cluster
+
+import grpc
+import spec_pb2
+import spec_pb2_grpc
+from sharding import shard_for
+
+
+def start_shards(workdir, shards, followers):
+    """Starts ``shards`` leader groups that know each other, and a router.
+
+    Returns:
+        tuple: The processes and the router's address.
+    """
+    clients = [free_address() for _ in range(shards)]
+    internals = [free_address() for _ in range(shards)]
+    peers = ';'.join(internals)
+    processes, shard_clients = [], []
+    for index in range(shards):
+        shard_dir = os.path.join(workdir, f"shard{index}")
+        os.makedirs(shard_dir)
+        shard_args = [f'--shard_index={index}', f'--shard_peers={peers}']
+        leader, _, _ = start_leader(shard_dir, shard_args, clients[index], internals[index])
+        processes.append(leader)
+        group = [clients[index]]
+        for i in range(followers):
+            process, client = start_follower(shard_dir, i + 2, internals[index], shard_args)
+            processes.append(process)
+            group.append(client)
+        shard_clients.append(group)
+    router, address = start_router(shard_clients)
+    return processes + [router], address
+
+
+def log_in(address, users, concurrency):
+    """Creates and logs in ``users`` accounts, returns their session IDs."""
+    def create(i):
+        call(address, 'CreateAccount', spec_pb2.CreateAccountRequest(username=f"user{i}", password="pw"), 30)
+        return call(address, 'Login', spec_pb2.LoginRequest(username=f"user{i}", password="pw"), 30).session_id
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        return list(pool.map(create, range(users)))
+
+
+def send_storm(address, sessions, shards, messages, concurrency, local):
+    """Sends ``messages`` messages from random users to random receivers.
+
+    Returns:
+        tuple: Wall time in seconds, successful sends and cross-shard sends.
+    """
+    names = [f"user{i}" for i in range(len(sessions))]
+    thread_local = threading.local()
+
+    def send(i):
+        if not hasattr(thread_local, 'stub'):
+            thread_local.stub = spec_pb2_grpc.ClientAccountStub(grpc.insecure_channel(address))
+        rng = random.Random(i)
+        sender = rng.randrange(len(names))
+        candidates = [name for name in names if shard_for(name, shards) == shard_for(names[sender], shards)] \
+            if local else names
+        receiver = rng.choice(candidates)
+        try:
+            response = thread_local.stub.Send(spec_pb2.SendRequest(
+                session_id=sessions[sender], to=receiver, message=f"message {i}"), timeout=60)
+            ok = response is not None and response.error_code == 0
+        except grpc.RpcError:
+            ok = False
+        return ok, shard_for(receiver, shards) != shard_for(names[sender], shards)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(send, range(messages)))
+    return time.perf_counter() - started, sum(ok for ok, _ in results), sum(cross for _, cross in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark write throughput across shard counts.")
+    parser.add_argument("--shards", type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument("--followers", type=int, default=0, help="Followers per shard.")
+    parser.add_argument("--users", type=int, default=64)
+    parser.add_argument("--messages", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--local", action="store_true", help="Only send to users of the sender's shard.")
+    args = parser.parse_args()
+
+    print(f"{args.messages} sends from {args.users} users on {args.concurrency} threads, "
+          f"{args.followers} followers per shard")
+    for shards in args.shards:
+        with tempfile.TemporaryDirectory() as workdir:
+            processes, router = start_shards(workdir, shards, args.followers)
+            try:
+                sessions = log_in(router, args.users, args.concurrency)
+                wall, sent, cross = send_storm(router, sessions, shards, args.messages,
+                                               args.concurrency, args.local)
+                print(f"{shards} shard(s): {sent / wall:8.1f} messages/s, "
+                      f"{cross} cross-shard, {args.messages - sent} failed")
+            finally:
+                stop_cluster(processes)
+
+
+if __name__ == '__main__':
+    main()
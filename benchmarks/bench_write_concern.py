@@ -0,0 +1,70 @@
+"""Measures Send latency for every write concern on a local cluster.
+
+Starts one leader and several followers with ``src/server.py``, logs in two
+users and sends messages with ``leader``, ``one`` and ``majority`` write
+concerns, reporting latency percentiles for each.
+
+Usage:
+    python benchmarks/bench_write_concern.py --followers 2 --messages 200
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+from cluster import start_cluster, stop_cluster  # puts src/ on the path
+
+import grpc
+import spec_pb2
+import spec_pb2_grpc
+
+CONCERNS = [
+    ('leader', spec_pb2.WRITE_CONCERN_LEADER),
+    ('one', spec_pb2.WRITE_CONCERN_ONE),
+    ('majority', spec_pb2.WRITE_CONCERN_MAJORITY),
+]
+
+
+def percentile(values, fraction):
+    """Returns the value below which ``fraction`` of ``values`` fall."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Send latency per write concern.")
+    parser.add_argument("--followers", type=int, default=2)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--settle", type=float, default=2.0,
+                        help="Seconds to wait after startup for followers to register.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        processes, leader_client, _ = start_cluster(workdir, args.followers)
+        try:
+            time.sleep(args.settle)
+            with grpc.insecure_channel(leader_client) as channel:
+                stub = spec_pb2_grpc.ClientAccountStub(channel)
+                for username in ("alice", "bob"):
+                    stub.CreateAccount(spec_pb2.CreateAccountRequest(username=username, password="x"))
+                session_id = stub.Login(
+                    spec_pb2.LoginRequest(username="alice", password="x")).session_id
+
+                for name, concern in CONCERNS:
+                    latencies, timeouts = [], 0
+                    for i in range(args.messages):
+                        started = time.perf_counter()
+                        response = stub.Send(spec_pb2.SendRequest(
+                            session_id=session_id, to="bob", message=f"{name} {i}",
+                            write_concern=concern))
+                        latencies.append((time.perf_counter() - started) * 1000)
+                        timeouts += response.error_code != 0
+                    print(f"{name:>8}: p50 {statistics.median(latencies):6.2f} ms  "
+                          f"p99 {percentile(latencies, 0.99):6.2f} ms  "
+                          f"errors {timeouts}/{args.messages}")
+        finally:
+            stop_cluster(processes)
+
+
+if __name__ == '__main__':
+    main()
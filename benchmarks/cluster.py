@@ -0,0 +1,138 @@
+"""Helpers for running a local chat cluster in benchmarks.
+
+Servers are started with ``src/server.py`` as subprocesses inside a working
+directory that holds their SQLite files.
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC)
+
+import grpc
+import spec_pb2
+import spec_pb2_grpc
+
+
+def call(address, method, request, timeout):
+    """Issues one RPC on a fresh channel.
+
+    A new channel per attempt keeps reconnect backoff on a dead or not yet
+    listening address from inflating the measurement.
+    """
+    with grpc.insecure_channel(address) as channel:
+        stub = spec_pb2_grpc.ClientAccountStub(channel)
+        return getattr(stub, method)(request, timeout=timeout)
+
+
+def free_address():
+    """Returns a localhost address with a currently unused port."""
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        return f"localhost:{sock.getsockname()[1]}"
+
+
+def wait_until_serving(address, timeout=20):
+    """Waits until a client service answers at ``address``, leader or not."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            call(address, 'ListUsers', spec_pb2.ListUsersRequest(wildcard="*"), 0.5)
+            return
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.FAILED_PRECONDITION:
+                return
+        time.sleep(0.05)
+    raise RuntimeError(f"{address} did not come up")
+
+
+def start_leader(workdir, leader_args=(), client=None, internal=None):
+    """Starts a leader with ID 1 and waits until it serves.
+
+    Args:
+        workdir (str): Directory for the SQLite files.
+        leader_args (Iterable[str]): Extra command line flags.
+        client (str, optional): Client address, a free one if unset.
+        internal (str, optional): Internal address, a free one if unset.
+
+    Returns:
+        tuple: The process, its client address and its internal address.
+    """
+    client, internal = client or free_address(), internal or free_address()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(SRC, 'server.py'), '1', 'leader', client, internal, *leader_args],
+        cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_until_serving(client)
+    return process, client, internal
+
+
+def start_follower(workdir, server_id, leader_internal, follower_args=(), timeout=20):
+    """Starts a follower and waits until it has synced and serves.
+
+    Args:
+        workdir (str): Directory for the SQLite files.
+        server_id (str): ID of the follower.
+        leader_internal (str): Internal address of the leader.
+        follower_args (Iterable[str]): Extra command line flags.
+        timeout (float): Seconds to wait for the follower to serve.
+
+    Returns:
+        tuple: The process and its client address.
+    """
+    client, internal = free_address(), free_address()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(SRC, 'server.py'), str(server_id), 'follower', client, internal,
+         f'--leader_address={leader_internal}', *follower_args],
+        cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_until_serving(client, timeout)
+    return process, client
+
+
+def start_cluster(workdir, followers, leader_args=(), follower_args=()):
+    """Starts a leader and ``followers`` followers and waits until all serve.
+
+    Args:
+        workdir (str): Directory for the SQLite files.
+        followers (int): Number of followers.
+        leader_args (Iterable[str]): Extra command line flags for the leader.
+        follower_args (Iterable[str]): Extra command line flags for every follower.
+
+    Returns:
+        tuple: The processes, leader first, the leader's client address and
+        the followers' client addresses.
+    """
+    leader, leader_client, leader_internal = start_leader(workdir, leader_args)
+    processes, follower_clients = [leader], []
+    for i in range(followers):
+        process, client = start_follower(workdir, i + 2, leader_internal, follower_args)
+        processes.append(process)
+        follower_clients.append(client)
+    return processes, leader_client, follower_clients
+
+
+def start_router(shard_clients):
+    """Starts a router in front of several shards and waits until it serves.
+
+    Args:
+        shard_clients (list): Client addresses of the servers of every shard.
+
+    Returns:
+        tuple: The process and its address.
+    """
+    address = free_address()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(SRC, 'sharding.py'), address,
+         '--shards', ';'.join(','.join(clients) for clients in shard_clients)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_until_serving(address)
+    return process, address
+
+
+def stop_cluster(processes):
+    """Kills every server process of a cluster."""
+    for process in processes:
+        process.kill()
+        process.wait()
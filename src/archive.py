@@ -0,0 +1,185 @@
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect, or_
+from sqlalchemy.orm import scoped_session
+
+from models import DeletedMessageModel
+from partitions import archive_partitions
+from message_store import message_store
+
+# Days deleted messages stay in the database before they are archived,
+# 0 keeps them forever
+DEFAULT_RETENTION_DAYS = 30.0
+# Seconds between compaction runs
+DEFAULT_COMPACTION_INTERVAL = 3600.0
+# Rows written to one archive segment at most
+SEGMENT_SIZE = 5000
+
+SEGMENT_PATTERN = re.compile(r"deleted-(\d{8})\.jsonl\.gz$")
+
+
+def segment_paths(archive_dir):
+    """Returns the archive segments in the order they were written.
+
+    Args:
+        archive_dir (str): Directory holding the segments.
+
+    Returns:
+        list: Paths of the segment files.
+    """
+    if not os.path.isdir(archive_dir):
+        return []
+    names = sorted(name for name in os.listdir(archive_dir) if SEGMENT_PATTERN.match(name))
+    return [os.path.join(archive_dir, name) for name in names]
+
+
+def row_as_dict(row):
+    """Converts a deleted message to a JSON-serializable dictionary."""
+    record = {}
+    for column in inspect(row).mapper.column_attrs:
+        value = getattr(row, column.key)
+        record[column.key] = value.isoformat() if isinstance(value, datetime) else value
+    return record
+
+
+def write_segment(archive_dir, records):
+    """Writes records to a new gzip-compressed JSON lines segment.
+
+    Segments are never modified once written. The file is completed under a
+    temporary name and renamed, so a crash never leaves a partial segment.
+
+    Args:
+        archive_dir (str): Directory holding the segments.
+        records (list): Dictionaries to archive.
+
+    Returns:
+        str: Path of the new segment.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    existing = segment_paths(archive_dir)
+    sequence = int(SEGMENT_PATTERN.search(existing[-1]).group(1)) + 1 if existing else 1
+    path = os.path.join(archive_dir, f"deleted-{sequence:08d}.jsonl.gz")
+    with gzip.open(path + '.tmp', 'wt', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    with open(path + '.tmp', 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def read_segments(archive_dir):
+    """Yields every archived record, oldest segment first.
+
+    Args:
+        archive_dir (str): Directory holding the segments.
+
+    Yields:
+        dict: Archived deleted message.
+    """
+    for path in segment_paths(archive_dir):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+
+def compact(db_session, archive_dir, retention, now=None, segment_size=SEGMENT_SIZE):
+    """Moves expired deleted messages to archive segments and reclaims their space.
+
+    A segment is written before its rows are deleted. If the process dies in
+    between, the next run finds the rows of the last segment still in the
+    database and only deletes them.
+
+    Args:
+        db_session (SessionFactory): SQLAlchemy session factory.
+        archive_dir (str): Directory holding the segments.
+        retention (float): Seconds a deleted message is kept in the database.
+            Rows from before deletion times were recorded count as expired.
+        now (datetime, optional): Current UTC time.
+        segment_size (int): Rows per segment at most.
+
+    Returns:
+        int: Number of rows archived.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=retention)
+    session = scoped_session(db_session)
+    archived = 0
+    try:
+        existing = segment_paths(archive_dir)
+        if existing:
+            with gzip.open(existing[-1], 'rt', encoding='utf-8') as f:
+                ids = [json.loads(line)['id'] for line in f]
+            session.query(DeletedMessageModel).filter(
+                DeletedMessageModel.id.in_(ids)).delete(synchronize_session=False)
+            session.commit()
+
+        while True:
+            rows = session.query(DeletedMessageModel).filter(or_(
+                DeletedMessageModel.deleted_at < cutoff, DeletedMessageModel.deleted_at.is_(None))
+            ).order_by(DeletedMessageModel.id).limit(segment_size).all()
+            if not rows:
+                break
+            write_segment(archive_dir, [row_as_dict(row) for row in rows])
+            session.query(DeletedMessageModel).filter(
+                DeletedMessageModel.id.in_([row.id for row in rows])).delete(synchronize_session=False)
+            session.commit()
+            archived += len(rows)
+
+        if archived:
+            # deleted rows only free pages, VACUUM gives them back to the file system
+            engine = session.get_bind()
+            session.remove()
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                connection.exec_driver_sql("VACUUM")
+    finally:
+        session.remove()
+    return archived
+
+
+def start_compactor(state, retention, interval=DEFAULT_COMPACTION_INTERVAL, partition_months=0):
+    """Runs ``compact`` and ``archive_partitions`` periodically on a daemon thread.
+
+    The session factory is read from the state on every run, since a
+    follower replaces it when it reloads a snapshot. With several message
+    files, the partitions of file ``k`` go to ``archive_dir/messages{k}``.
+
+    Args:
+        state (dict): Shared leader or follower state with ``db_session`` and
+            ``archive_dir``.
+        retention (float): Seconds a deleted message is kept in the database,
+            0 keeps them.
+        interval (float): Seconds between runs.
+        partition_months (int): Months of message partitions kept in the
+            database, 0 keeps all of them.
+
+    Returns:
+        threading.Thread: The compactor thread.
+    """
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                if retention:
+                    archived = compact(state['db_session'], state['archive_dir'], retention)
+                    if archived:
+                        print(f"[INFO] Archived {archived} deleted messages to {state['archive_dir']}")
+                if partition_months:
+                    store = message_store(state)
+                    for index in range(store.count):
+                        archive_dir = state['archive_dir'] if store.shared else \
+                            os.path.join(state['archive_dir'], f"messages{index}")
+                        with store.session(index) as session:
+                            for key in archive_partitions(session, archive_dir, partition_months):
+                                print(f"[INFO] Archived message partition {key} to {archive_dir}")
+            except Exception as e:
+                print(f"[WARN] Compaction failed: {e}")
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
@@ -5,6 +5,7 @@ import spec_pb2_grpc
 import spec_pb2
 import functools
 from utils import StatusCode
+from chat_cache import ChatCache, cache_path
 
 
 class reconnect_on_error:
@@ -62,13 +63,19 @@ class reconnect_on_error:
 
 
 class ChatClientBase:
-    def __init__(self, addresses, max_retries=2, retry_interval=1):
+    def __init__(self, addresses, max_retries=2, retry_interval=1, read_addresses=None, cache_dir=None):
         """Initializes the base client and attempts to connect to a server.
 
         Args:
             addresses (List[str]): List of server addresses to try.
             max_retries (int): Number of retry attempts for server connection.
             retry_interval (int): Delay between retry attempts in seconds.
+            read_addresses (List[str], optional): Follower client addresses that
+                may serve reads from their replicas. Reads rotate across them and
+                fall back to the leader when a follower is too far behind.
+            cache_dir (str, optional): Directory for a local cache of each
+                user's chats and user directory. Chats are then only
+                downloaded once and synced with the messages added since.
         """
         self.user_session_id = ""
         self.addresses = addresses
@@ -77,6 +84,17 @@ class ChatClientBase:
         self.channel = None
         self.stub = None
         self.lock = threading.Lock()
+        self.read_addresses = read_addresses or []
+        self.read_channels = []
+        self.read_stubs = []
+        self.next_read_stub = 0
+        self.last_position = 0
+        self.cache_dir = cache_dir
+        self.cache = None
+        # versions of the user list, unread counts and chat from the last SyncState
+        self.sync_versions = {}
+        # newest message acknowledged per chat partner, see ``mark_chat_read``
+        self.read_acked = {}
         self.connect()
 
     def exit_(self):
@@ -223,13 +241,18 @@ class ChatClientBase:
                     stub = spec_pb2_grpc.ClientAccountStub(channel)
                     response = stub.ListUsers(spec_pb2.ListUsersRequest(wildcard="*"))
 
+                    if self.channel is not None:
+                        # the previous server, e.g. a leader that failed
+                        self.channel.close()
                     self.channel = channel
                     self.stub = stub
+                    self.open_read_channels()
 
                     if port not in check_ports:
                         print(f"Connected to the server at {current_address}")
                     return
                 except grpc.RpcError as e:
+                    channel.close()
                     if e.code() == grpc.StatusCode.FAILED_PRECONDITION:
                         if port not in check_ports:
                             print(f"{current_address} is a follower, skipping.")
@@ -243,6 +266,24 @@ class ChatClientBase:
             print("Failed to establish connection after trying all available servers.")
 
 
+    def open_read_channels(self):
+        """Opens new channels to the follower replicas, closing the previous ones."""
+        for channel in self.read_channels:
+            channel.close()
+        self.read_channels = [grpc.insecure_channel(address) for address in self.read_addresses]
+        self.read_stubs = [spec_pb2_grpc.ClientAccountStub(channel) for channel in self.read_channels]
+
+    def close(self):
+        """Closes the channels to the leader and the replicas, and the cache."""
+        for channel in [self.channel, *self.read_channels]:
+            if channel is not None:
+                channel.close()
+        self.channel, self.stub = None, None
+        self.read_channels, self.read_stubs = [], []
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+
     def reconnect_with_session(self):
         """Attempts to reconnect while maintaining the same session.
 
@@ -270,6 +311,42 @@ class ChatClientBase:
         except grpc.RpcError:
             return False
 
+    def read_from_replica(self, method, request):
+        """Sends a read to the next follower replica, falling back to the leader.
+
+        Args:
+            method (str): Name of the read RPC, e.g. ``"GetChat"``.
+            request: Request message with ``allow_follower`` and ``min_position`` fields.
+
+        Returns:
+            The RPC response from a follower or from the leader.
+        """
+        if self.read_stubs:
+            stub = self.read_stubs[self.next_read_stub % len(self.read_stubs)]
+            self.next_read_stub += 1
+            request.allow_follower = True
+            # a follower only answers once it has applied our own last write
+            request.min_position = self.last_position
+            try:
+                return getattr(stub, method)(request)
+            except grpc.RpcError as e:
+                # follower is too stale or down, the leader always answers
+                if e.code() not in (grpc.StatusCode.FAILED_PRECONDITION, grpc.StatusCode.UNAVAILABLE):
+                    raise
+        return getattr(self.stub, method)(request)
+
+    def track_position(self, response):
+        """Remembers the replication position of a write made by this client.
+
+        Args:
+            response (ServerResponse): Response of a mutating RPC.
+
+        Returns:
+            ServerResponse: The same response, for chaining.
+        """
+        self.last_position = max(self.last_position, response.position)
+        return response
+
     @reconnect_on_error
     def list_users(self, wildcard="*"):
         """Fetches a list of users matching the given wildcard.
@@ -281,7 +358,9 @@ class ChatClientBase:
             List[User]: A list of user objects.
         """
         request = spec_pb2.ListUsersRequest(wildcard=wildcard)
-        response = self.stub.ListUsers(request)
+        response = self.read_from_replica("ListUsers", request)
+        if self.cache is not None and wildcard == "*":
+            self.cache.store_users(response.user)
         return response.user
 
 
@@ -298,7 +377,7 @@ class ChatClientBase:
         """
         response = self.stub.CreateAccount(
             spec_pb2.CreateAccountRequest(username=username, password=password))
-        return response
+        return self.track_position(response)
 
     @reconnect_on_error
     def login(self, username, password):
@@ -313,22 +392,32 @@ class ChatClientBase:
         """
         response = self.stub.Login(
             spec_pb2.LoginRequest(username=username, password=password))
-        return response
+        if response.error_code == 0:
+            self.sync_versions = {}
+            self.read_acked = {}
+        if response.error_code == 0 and self.cache_dir:
+            if self.cache is not None:
+                self.cache.close()
+            self.cache = ChatCache(cache_path(self.cache_dir, username))
+        return self.track_position(response)
 
     @reconnect_on_error
-    def send_message(self, to, message):
+    def send_message(self, to, message, write_concern=spec_pb2.WRITE_CONCERN_DEFAULT):
         """Sends a message to another user.
 
         Args:
             to (str): Recipient username.
             message (str): Message content.
+            write_concern (int): ``WriteConcern`` for this message, the
+                server's default if not given.
 
         Returns:
             ServerResponse: gRPC server response.
         """
         response = self.stub.Send(
-            spec_pb2.SendRequest(session_id=self.user_session_id, message=message, to=to))
-        return response
+            spec_pb2.SendRequest(session_id=self.user_session_id, message=message, to=to,
+                                 write_concern=write_concern))
+        return self.track_position(response)
 
     @reconnect_on_error
     def logout(self):
@@ -340,44 +429,115 @@ class ChatClientBase:
 
         response = self.stub.Logout(
             spec_pb2.DeleteAccountRequest(session_id=self.user_session_id))
-        return response
+        return self.track_position(response)
 
     @reconnect_on_error
-    def delete_account(self):
+    def delete_account(self, password=""):
         """Deletes the currently logged-in user's account.
 
+        Args:
+            password (str, optional): Password the server checks before
+                deleting the account.
+
         Returns:
             ServerResponse: gRPC server response.
         """
         response = self.stub.DeleteAccount(
-            spec_pb2.DeleteAccountRequest(session_id=self.user_session_id))
-        return response
+            spec_pb2.DeleteAccountRequest(session_id=self.user_session_id, password=password))
+        if response.error_code == 0 and self.cache is not None:
+            cache, self.cache = self.cache, None
+            cache.destroy()
+        return self.track_position(response)
 
     @reconnect_on_error
-    def receive_messages(self):
-        """Retrieves unread messages for the logged-in user.
+    def receive_messages(self, limit=0, cursor=""):
+        """Retrieves a page of unread messages for the logged-in user.
+
+        The messages stay unread until they are passed to
+        ``acknowledge_messages``.
+
+        Args:
+            limit (int, optional): Most messages to return, the server's
+                default page size if 0.
+            cursor (str, optional): ``cursor`` of the previous page.
 
         Returns:
-            Messages: A message list from the server.
+            Messages: A message list from the server, with the cursor of the
+            next page if more messages are unread.
         """
         msgs = self.stub.GetMessages(
-            spec_pb2.ReceiveRequest(session_id=self.user_session_id))
+            spec_pb2.ReceiveRequest(session_id=self.user_session_id, limit=limit, cursor=cursor))
         return msgs
 
+    @reconnect_on_error
+    def acknowledge_messages(self, message_ids):
+        """Marks received messages as delivered.
+
+        Args:
+            message_ids (List[int]): IDs of the messages to mark.
+
+        Returns:
+            ServerResponse: gRPC server response.
+        """
+        response = self.stub.AcknowledgeReceivedMessages(
+            spec_pb2.AcknowledgeReceivedMessagesRequest(session_id=self.user_session_id, message_ids=message_ids))
+        return self.track_position(response)
+
     @reconnect_on_error
     def get_chat(self, recipient):
         """Retrieves full chat history with a specific user.
 
+        With a cache, only the messages added since the last call are
+        downloaded and the history is read from the cache.
+
         Args:
             recipient (str): Username of the chat partner.
 
         Returns:
             Messages: A list of all messages between the two users.
         """
-        msgs = self.stub.GetChat(
-            spec_pb2.ChatRequest(session_id=self.user_session_id, username=recipient))
-        return msgs
+        cache = self.cache
+        since = cache.cursor(recipient) if cache is not None else ""
+        msgs = self.read_from_replica("GetChat", spec_pb2.ChatRequest(
+            session_id=self.user_session_id, username=recipient, cursor=since,
+            known_count=cache.message_count(recipient) if since else 0))
+        self.mark_chat_read(recipient, msgs)
+        if cache is None or msgs.error_code not in (StatusCode.SUCCESS, StatusCode.NO_MESSAGES):
+            return msgs
+
+        if not cache.apply(recipient, msgs, since):
+            # the server has messages older than the cursor that were never
+            # cached, e.g. after a restore from backup
+            msgs = self.read_from_replica(
+                "GetChat", spec_pb2.ChatRequest(session_id=self.user_session_id, username=recipient))
+            self.mark_chat_read(recipient, msgs)
+            if msgs.error_code not in (StatusCode.SUCCESS, StatusCode.NO_MESSAGES):
+                return msgs
+            cache.apply(recipient, msgs)
+        return cache.chat(recipient)
     
+    def mark_chat_read(self, peer, msgs):
+        """Marks a chat read on the leader after a replica may have served it.
+
+        Only the leader marks the messages of a chat as read when it sends
+        them, a replica cannot write. Acknowledging the newest message from
+        the peer marks the earlier ones too, and is a no-op if the leader
+        served the chat. Only messages newer than the last one acknowledged
+        are sent, so polling a chat that did not change stays off the leader.
+
+        Args:
+            peer (str): Name of the chat partner.
+            msgs (Messages): Response of ``GetChat``.
+        """
+        if not self.read_stubs:
+            return
+        received = [message.message_id for message in msgs.message if message.from_ == peer]
+        if not received or max(received) <= self.read_acked.get(peer, 0):
+            return
+        response = self.acknowledge_messages([max(received)])
+        if response.error_code == StatusCode.SUCCESS:
+            self.read_acked[peer] = max(received)
+
     @reconnect_on_error
     def delete_messages(self, message_ids):
         """Deletes specific messages by ID.
@@ -393,12 +553,61 @@ class ChatClientBase:
             message_ids=message_ids
         )
         response = self.stub.DeleteMessages(request)
-        return response
+        return self.track_position(response)
     
+    @reconnect_on_error
+    def sync_state(self, chat_with=""):
+        """Fetches whatever changed in the user list, unread counts and a chat in one call.
+
+        The versions of the last call are sent along, and sections that did
+        not change are left out of the response. With a cache the chat is
+        synced like in ``get_chat`` and the response carries the whole
+        cached chat when it changed. Without one the chat has a version
+        like the other sections.
+
+        Args:
+            chat_with (str, optional): Username of the open chat.
+
+        Returns:
+            SyncStateResponse: The changed sections, with ``NOT_MODIFIED`` if
+            none changed.
+        """
+        cache = self.cache
+        since = cache.cursor(chat_with) if cache is not None and chat_with else ""
+        request = spec_pb2.SyncStateRequest(
+            session_id=self.user_session_id,
+            users_version=self.sync_versions.get("users", ""),
+            unread_version=self.sync_versions.get("unread", ""),
+            chat_with=chat_with,
+            chat_cursor=since,
+            chat_known_count=cache.message_count(chat_with) if since else 0,
+            # the version is of the chat it was sent with
+            chat_version=self.sync_versions.get("chat", "")
+            if self.sync_versions.get("chat_with") == chat_with else "")
+        response = self.read_from_replica("SyncState", request)
+        if response.error_code not in (StatusCode.SUCCESS, StatusCode.NOT_MODIFIED):
+            return response
+
+        self.sync_versions = {"users": response.users_version, "unread": response.unread_version,
+                              "chat": response.chat_version, "chat_with": chat_with}
+        if response.HasField("chat"):
+            self.mark_chat_read(chat_with, response.chat)
+        if cache is None:
+            return response
+        if response.HasField("users"):
+            cache.store_users(response.users.user)
+        if response.HasField("chat") and response.chat.error_code in (StatusCode.SUCCESS, StatusCode.NO_MESSAGES):
+            if cache.apply(chat_with, response.chat, since):
+                response.chat.CopyFrom(cache.chat(chat_with))
+            else:
+                # the cursor was dropped, so this downloads the whole chat
+                response.chat.CopyFrom(self.get_chat(chat_with))
+        return response
+
     @reconnect_on_error
     def get_unread_counts(self):
         """Fetches count of unread messages grouped by sender."""
-        response = self.stub.GetUnreadCounts(
-            spec_pb2.SessionRequest(session_id=self.user_session_id)
+        response = self.read_from_replica(
+            "GetUnreadCounts", spec_pb2.SessionRequest(session_id=self.user_session_id)
         )
         return response
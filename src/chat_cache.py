@@ -0,0 +1,177 @@
+import os
+import sqlite3
+import threading
+
+import spec_pb2
+from utils import StatusCode
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    peer TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    sender TEXT NOT NULL,
+    content TEXT NOT NULL,
+    time_stamp INTEGER NOT NULL,
+    PRIMARY KEY (peer, id)
+);
+CREATE TABLE IF NOT EXISTS conversations (
+    peer TEXT PRIMARY KEY,
+    cursor TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    status TEXT NOT NULL
+);
+"""
+
+
+def cache_path(cache_dir, username):
+    """Returns the cache file of a user.
+
+    Args:
+        cache_dir (str): Directory holding the cache files.
+        username (str): Name of the logged in user.
+
+    Returns:
+        str: Path of the user's SQLite file.
+    """
+    return os.path.join(cache_dir, f"{username}.db")
+
+
+class ChatCache:
+    """Conversations and the user directory of one user, in a local SQLite file.
+
+    Each conversation keeps the cursor the server returned with it, so that
+    the next ``GetChat`` only transfers messages added since. If the number
+    of cached messages no longer matches the server's, the server also lists
+    the IDs still in the chat, and cached messages missing from that list
+    were deleted.
+    """
+
+    def __init__(self, path):
+        """Opens or creates the cache file.
+
+        Args:
+            path (str): Path of the SQLite file.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        # the GUI reads chats from its polling threads and the Tk thread
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+        self.directory = None
+
+    def cursor(self, peer):
+        """Returns the cursor of the last sync with a user, empty if never synced."""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT cursor FROM conversations WHERE peer = ?", (peer,)).fetchone()
+        return row[0] if row else ""
+
+    def apply(self, peer, response, since=""):
+        """Merges a ``GetChat`` response into the cached conversation.
+
+        Args:
+            peer (str): Name of the chat partner.
+            response (Messages): Successful or ``NO_MESSAGES`` response.
+            since (str): Cursor the request carried, empty for a full download.
+
+        Returns:
+            bool: False if the server lists messages that are neither cached
+            nor in the response, in which case the cursor is dropped and the
+            next sync downloads the whole chat again.
+        """
+        rows = [(peer, message.message_id, message.from_, message.message,
+                 message.time_stamp.ToNanoseconds()) for message in response.message]
+        with self.lock, self.connection:
+            if not since or not response.cursor or response.error_code == StatusCode.NO_MESSAGES:
+                # full history, an empty chat or a server that does not know cursors
+                self.connection.execute("DELETE FROM messages WHERE peer = ?", (peer,))
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?)", rows)
+
+            if since and response.cursor and response.message_ids:
+                live = set(response.message_ids)
+                cached = {row[0] for row in self.connection.execute(
+                    "SELECT id FROM messages WHERE peer = ?", (peer,))}
+                self.connection.executemany(
+                    "DELETE FROM messages WHERE peer = ? AND id = ?",
+                    [(peer, message_id) for message_id in cached - live])
+                if live - cached:
+                    self.connection.execute("DELETE FROM conversations WHERE peer = ?", (peer,))
+                    return False
+
+            if response.cursor:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO conversations VALUES (?, ?)", (peer, response.cursor))
+            else:
+                self.connection.execute("DELETE FROM conversations WHERE peer = ?", (peer,))
+        return True
+
+    def message_count(self, peer):
+        """Returns the number of cached messages of a conversation."""
+        with self.lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM messages WHERE peer = ?", (peer,)).fetchone()[0]
+
+    def chat(self, peer):
+        """Returns the cached conversation with a user.
+
+        Args:
+            peer (str): Name of the chat partner.
+
+        Returns:
+            Messages: The messages oldest first, with ``NO_MESSAGES`` if
+            there are none.
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT id, sender, content, time_stamp FROM messages WHERE peer = ? "
+                "ORDER BY time_stamp, id", (peer,)).fetchall()
+        msgs = spec_pb2.Messages(error_code=StatusCode.SUCCESS if rows else StatusCode.NO_MESSAGES)
+        for message_id, sender, content, time_stamp in rows:
+            message = msgs.message.add(from_=sender, message=content, message_id=message_id)
+            message.time_stamp.FromNanoseconds(time_stamp)
+        return msgs
+
+    def store_users(self, users):
+        """Replaces the cached user directory.
+
+        The GUI lists users continuously, so the file is only written when
+        the directory changed.
+
+        Args:
+            users (Iterable[User]): Users as returned by ``ListUsers``.
+        """
+        directory = [(user.username, user.status) for user in users]
+        if directory == self.directory:
+            return
+        self.directory = directory
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM users")
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO users VALUES (?, ?)", directory)
+
+    def users(self):
+        """Returns the cached user directory.
+
+        Returns:
+            List[User]: Users by name.
+        """
+        with self.lock:
+            rows = self.connection.execute("SELECT username, status FROM users ORDER BY username").fetchall()
+        return [spec_pb2.User(username=username, status=status) for username, status in rows]
+
+    def close(self):
+        """Closes the cache file."""
+        with self.lock:
+            self.connection.close()
+
+    def destroy(self):
+        """Closes and deletes the cache file, e.g. after the account was deleted."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
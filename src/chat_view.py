@@ -0,0 +1,393 @@
+import bisect
+from collections import namedtuple
+from itertools import accumulate
+
+import tkinter as tk
+from tkinter import ttk
+
+from message_frame import MessageFrame
+
+# Height in pixels assumed for a message until its frame has been measured
+DEFAULT_ROW_HEIGHT = 64
+# Messages built above and below the visible ones, so that short scrolls
+# show frames that already exist
+DEFAULT_OVERSCAN = 5
+# Space around each message, as the packed frames had
+ROW_PADX = 5
+ROW_PADY = 2
+
+
+class RowLayout:
+    """Vertical positions of the messages of a chat.
+
+    Only the messages on screen have widgets, so the heights of the others
+    are estimated until they have been shown once. This class has no Tk
+    dependency and can be used without a display.
+    """
+
+    def __init__(self, estimate=DEFAULT_ROW_HEIGHT):
+        """Initializes an empty layout.
+
+        Args:
+            estimate (int): Height assumed for rows that were never measured.
+        """
+        self.estimate = estimate
+        self.keys = []
+        self.heights = {}
+        self.offsets = [0]
+
+    def set_rows(self, keys):
+        """Replaces the rows, keeping the heights measured for known keys.
+
+        Args:
+            keys (Iterable): Message IDs in display order.
+        """
+        self.keys = list(keys)
+        live = set(self.keys)
+        self.heights = {key: height for key, height in self.heights.items() if key in live}
+        self.reflow()
+
+    def reflow(self):
+        """Recomputes the top of every row."""
+        self.offsets = [0] + list(accumulate(self.heights.get(key, self.estimate) for key in self.keys))
+
+    def measure(self, heights):
+        """Records the real heights of rows that were shown.
+
+        Args:
+            heights (dict): Message ID to height in pixels.
+
+        Returns:
+            bool: True if a height changed, and rows below moved.
+        """
+        changed = {key: height for key, height in heights.items() if self.heights.get(key) != height}
+        if not changed:
+            return False
+        self.heights.update(changed)
+        self.reflow()
+        return True
+
+    @property
+    def total(self):
+        """Height of all rows together."""
+        return self.offsets[-1]
+
+    def top(self, index):
+        """Returns the y coordinate of a row."""
+        return self.offsets[index]
+
+    def visible(self, top, height, overscan=DEFAULT_OVERSCAN):
+        """Returns the rows intersecting a viewport, plus ``overscan`` on each side.
+
+        Args:
+            top (float): y coordinate of the top of the viewport.
+            height (float): Height of the viewport.
+            overscan (int): Extra rows on each side.
+
+        Returns:
+            range: Indexes of the rows to build.
+        """
+        if not self.keys:
+            return range(0)
+        first = max(bisect.bisect_right(self.offsets, top) - 1, 0)
+        last = bisect.bisect_left(self.offsets, top + height)
+        return range(max(first - overscan, 0), min(last + overscan, len(self.keys)))
+
+
+class ChatDiff(namedtuple('ChatDiff', ['removed', 'added', 'reordered'])):
+    """Difference between the displayed chat and a newer copy of it.
+
+    Attributes:
+        removed (list): IDs of messages no longer in the chat.
+        added (list): Message data of new messages, in display order.
+        reordered (bool): Whether messages kept their IDs but moved, e.g.
+            a message merged in between older ones.
+    """
+
+    def __bool__(self):
+        return bool(self.removed or self.added or self.reordered)
+
+
+class ChatViewModel:
+    """Messages of the displayed chat, without any widgets.
+
+    Refreshes are compared with what is displayed, so that the view only
+    builds frames for new messages and drops those of deleted ones. This
+    class has no Tk dependency and can be used without a display.
+    """
+
+    def __init__(self):
+        """Initializes an empty chat."""
+        self.order = []
+        self.messages = {}
+        self.positions = None
+
+    def __len__(self):
+        return len(self.order)
+
+    def update(self, messages):
+        """Replaces the chat with a newer copy and returns what changed.
+
+        Args:
+            messages (List[dict]): Message data, oldest first.
+
+        Returns:
+            ChatDiff: Removed IDs, added messages and whether the order of
+            the kept messages changed.
+        """
+        incoming = [message["id"] for message in messages]
+        if incoming == self.order:
+            return ChatDiff([], [], False)
+        live = set(incoming)
+        removed = [key for key in self.order if key not in live]
+        kept = [key for key in self.order if key in live]
+        added = [message for message in messages if message["id"] not in self.messages]
+        reordered = incoming[:len(kept)] != kept
+
+        self.order = incoming
+        self.messages = {message["id"]: self.messages.get(message["id"], message) for message in messages}
+        self.positions = None
+        return ChatDiff(removed, added, reordered)
+
+    def append(self, messages):
+        """Adds messages after the current ones.
+
+        Args:
+            messages (List[dict]): Message data, oldest first.
+
+        Returns:
+            ChatDiff: The added messages.
+        """
+        self.order = self.order + [message["id"] for message in messages]
+        self.messages.update((message["id"], message) for message in messages)
+        self.positions = None
+        return ChatDiff([], list(messages), False)
+
+    def position(self, key):
+        """Returns the index of a message in the chat, None if it is not in it."""
+        if self.positions is None:
+            self.positions = {key: index for index, key in enumerate(self.order)}
+        return self.positions.get(key)
+
+
+class VirtualChatView(ttk.Frame):
+    """Scrollable chat that only builds widgets for the messages on screen.
+
+    ``MessageFrame`` widgets are kept for the visible messages and a few
+    around them. Frames scrolled out of view are put aside and reused for
+    the next messages that come into view, so a chat of any length costs
+    about one screen of widgets. Which messages are ticked for deletion is
+    kept here rather than in the frames, since a frame shows different
+    messages over time.
+
+    Refreshes go through a ``ChatViewModel``. Frames of deleted messages are
+    removed in place and new messages are appended, while the view stays
+    on the messages it showed, or on the newest ones if it was at the end.
+    """
+
+    def __init__(self, parent, overscan=DEFAULT_OVERSCAN):
+        """Creates the canvas and scrollbar.
+
+        Args:
+            parent (tk.Widget): Parent widget.
+            overscan (int): Messages built beyond each edge of the view.
+        """
+        super().__init__(parent)
+        self.overscan = overscan
+        self.layout = RowLayout()
+        self.model = ChatViewModel()
+        self.selected = set()
+        self.shown = {}   # message ID -> (frame, canvas window)
+        self.spare = []   # frames out of view, ready for reuse
+        self.render_pending = False
+
+        self.canvas = tk.Canvas(self, takefocus=0)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.canvas.configure(yscrollcommand=self.on_scroll)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.bind("<Configure>", self.on_resize)
+
+    def set_messages(self, messages):
+        """Replaces the displayed chat, e.g. when another chat is opened.
+
+        Args:
+            messages (List[dict]): Message data as taken by ``MessageFrame``,
+                oldest first.
+        """
+        for key in list(self.shown):
+            self.hide(key)
+        self.model = ChatViewModel()
+        self.model.update(messages)
+        self.selected &= set(self.model.messages)
+        self.layout.set_rows(self.model.order)
+        self.update_scrollregion()
+        self.render()
+
+    def update_messages(self, messages):
+        """Shows a newer copy of the displayed chat, only touching what changed.
+
+        Args:
+            messages (List[dict]): Message data, oldest first.
+
+        Returns:
+            ChatDiff: What changed.
+        """
+        diff = self.model.update(messages)
+        self.apply(diff)
+        return diff
+
+    def append(self, messages):
+        """Adds messages below the current ones.
+
+        Args:
+            messages (List[dict]): Message data, oldest first.
+        """
+        self.apply(self.model.append(messages))
+
+    def apply(self, diff):
+        """Updates the frames after the model changed.
+
+        Args:
+            diff (ChatDiff): Change made to ``self.model``.
+        """
+        if not diff:
+            return
+        following = self.at_end()
+        anchor = self.anchor(set(diff.removed))
+        for key in diff.removed:
+            self.selected.discard(key)
+            if key in self.shown:
+                self.hide(key)
+
+        self.layout.set_rows(self.model.order)
+        self.reposition()
+        self.update_scrollregion()
+        if following:
+            self.canvas.yview_moveto(1.0 if self.overflows() else 0.0)
+        elif anchor is not None:
+            key, offset = anchor
+            self.canvas.yview_moveto((self.layout.top(self.model.position(key)) + offset) / max(self.layout.total, 1))
+        self.render()
+
+    def at_end(self):
+        """Checks whether the newest message is in view."""
+        return self.canvas.yview()[1] >= 1.0
+
+    def anchor(self, removed=()):
+        """Returns the first message in view that stays, and how far the view top is below it.
+
+        Args:
+            removed (set): IDs about to be removed.
+
+        Returns:
+            tuple: Message ID and offset in pixels, None for an empty view.
+        """
+        top = self.canvas.canvasy(0)
+        for index in self.layout.visible(top, self.canvas.winfo_height(), 0):
+            key = self.layout.keys[index]
+            if key not in removed:
+                return key, top - self.layout.top(index)
+        return None
+
+    def reposition(self):
+        """Moves the shown frames to the current tops of their messages."""
+        for key, (frame, window) in self.shown.items():
+            self.canvas.coords(window, ROW_PADX, self.layout.top(self.model.position(key)) + ROW_PADY)
+
+    def remove(self, message_ids):
+        """Removes messages in place, e.g. after they were deleted.
+
+        Args:
+            message_ids (Iterable[int]): IDs of the messages to remove.
+        """
+        drop = set(message_ids)
+        self.update_messages([self.model.messages[key] for key in self.model.order if key not in drop])
+
+    def clear(self):
+        """Removes every message."""
+        self.set_messages([])
+
+    def selected_ids(self):
+        """Returns the IDs of the ticked messages, in display order."""
+        return [key for key in self.layout.keys if key in self.selected]
+
+    def select(self, message_id, selected):
+        """Ticks or unticks a message, called by its frame."""
+        if selected:
+            self.selected.add(message_id)
+        else:
+            self.selected.discard(message_id)
+
+    def overflows(self):
+        """Checks whether the chat is taller than the view."""
+        return self.layout.total > self.canvas.winfo_height()
+
+    def scroll_to_end(self):
+        """Shows the newest messages if the chat is taller than the view, else the top."""
+        self.canvas.yview_moveto(1.0 if self.overflows() else 0.0)
+        self.render()
+
+    def yview(self, *args):
+        """Scrolls the canvas from the scrollbar and builds what came into view."""
+        self.canvas.yview(*args)
+        self.render()
+
+    def on_scroll(self, first, last):
+        """Moves the scrollbar and schedules a render when the view moved."""
+        self.scrollbar.set(first, last)
+        if not self.render_pending:
+            self.render_pending = True
+            self.after_idle(self.render)
+
+    def on_resize(self, event):
+        """Stretches the shown frames to the new width and fills new space."""
+        for frame, window in self.shown.values():
+            self.canvas.itemconfigure(window, width=self.row_width(event.width))
+        self.update_scrollregion()
+        self.render()
+
+    def row_width(self, width=None):
+        return max((width or self.canvas.winfo_width()) - 2 * ROW_PADX, 1)
+
+    def update_scrollregion(self):
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), self.layout.total))
+
+    def hide(self, key):
+        """Takes a message off the canvas and keeps its frame for reuse."""
+        frame, window = self.shown.pop(key)
+        self.canvas.delete(window)
+        self.spare.append(frame)
+
+    def show(self, index):
+        """Puts the message at ``index`` on the canvas, reusing a spare frame if any."""
+        key = self.layout.keys[index]
+        message = self.model.messages[key]
+        frame = self.spare.pop() if self.spare else MessageFrame(self.canvas, message, on_select=self.select)
+        frame.show(message, key in self.selected)
+        window = self.canvas.create_window(
+            ROW_PADX, self.layout.top(index) + ROW_PADY, window=frame, anchor="nw", width=self.row_width())
+        self.shown[key] = (frame, window)
+
+    def render(self):
+        """Builds the frames of the messages in view and recycles the others."""
+        self.render_pending = False
+        rows = self.layout.visible(self.canvas.canvasy(0), self.canvas.winfo_height(), self.overscan)
+        wanted = {self.layout.keys[index] for index in rows}
+        for key in [key for key in self.shown if key not in wanted]:
+            self.hide(key)
+        new = [index for index in rows if self.layout.keys[index] not in self.shown]
+        for index in new:
+            self.show(index)
+        if not new:
+            return
+
+        # estimated heights of the new rows are replaced by real ones
+        self.canvas.update_idletasks()
+        heights = {self.layout.keys[index]: self.shown[self.layout.keys[index]][0].winfo_reqheight() + 2 * ROW_PADY
+                   for index in new}
+        if self.layout.measure(heights):
+            for index in rows:
+                key = self.layout.keys[index]
+                self.canvas.coords(self.shown[key][1], ROW_PADX, self.layout.top(index) + ROW_PADY)
+            self.update_scrollregion()
@@ -0,0 +1,160 @@
+import queue
+import threading
+from concurrent import futures
+
+# Worker threads for commands outside a lane
+DEFAULT_WORKERS = 4
+# Milliseconds between two checks of the UI thread for finished commands
+POLL_MS = 16
+
+
+class Command:
+    """A call running on the worker pool, as returned by ``CommandRunner.submit``."""
+
+    def __init__(self, name, on_done=None, on_error=None, key=None):
+        """Initializes a command that has not started yet.
+
+        Args:
+            name (str): Description shown while the command runs.
+            on_done (Callable, optional): Called with the result.
+            on_error (Callable, optional): Called with the exception.
+            key (str, optional): Commands with the same key replace each other.
+        """
+        self.name = name
+        self.on_done = on_done
+        self.on_error = on_error
+        self.key = key
+        self.future = None
+        self.cancelled = False
+
+    def cancel(self):
+        """Drops the command's result, and keeps it from starting if it has not yet.
+
+        A call that already started runs to its end on its worker, since a
+        gRPC call and its retries cannot be interrupted, but nothing is done
+        with its result.
+        """
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+
+class CommandRunner:
+    """Runs blocking calls of a GUI on worker threads and hands results back to the UI thread.
+
+    ``submit`` returns at once. The call runs on a pool of workers, or on
+    the single worker of its lane so that, for example, messages are sent
+    in the order they were typed. When it finishes, the worker puts it on a
+    queue, which the UI thread drains from a loop ``start`` begins, and
+    ``on_done`` or ``on_error`` is called there. Workers never touch Tk. A command
+    submitted with the key of a running one cancels the older one.
+    ``on_busy`` is told the names of the running commands whenever they
+    change, to show progress.
+    """
+
+    def __init__(self, schedule, workers=DEFAULT_WORKERS, on_busy=None):
+        """Initializes the runner and its worker pool.
+
+        Args:
+            schedule (Callable): Called on the UI thread with a delay in
+                milliseconds and a callback to run the callback later on the
+                UI thread, e.g. Tk's ``after``.
+            workers (int): Threads for commands outside a lane.
+            on_busy (Callable, optional): Called on the UI thread with the
+                names of the running commands.
+        """
+        self.schedule = schedule
+        self.on_busy = on_busy
+        self.pool = futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="command")
+        self.lanes = {}
+        self.active = []
+        self.finished = queue.Queue()
+        self.stopped = False
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Starts handing finished commands to their callbacks, on the UI thread."""
+        self.poll()
+
+    def poll(self):
+        """Resolves the finished commands and checks again later, on the UI thread."""
+        while True:
+            try:
+                command = self.finished.get_nowait()
+            except queue.Empty:
+                break
+            self.resolve(command)
+        if not self.stopped:
+            self.schedule(POLL_MS, self.poll)
+
+    def submit(self, name, call, on_done=None, on_error=None, key=None, lane=None):
+        """Starts a call on a worker.
+
+        Args:
+            name (str): Description shown while the command runs.
+            call (Callable): The blocking call, run without arguments.
+            on_done (Callable, optional): Called with the result on the UI thread.
+            on_error (Callable, optional): Called with the exception on the UI
+                thread, the exception is printed if not given.
+            key (str, optional): Running commands with this key are cancelled.
+            lane (str, optional): Commands of a lane run one at a time, in order.
+
+        Returns:
+            Command: Handle to cancel the command.
+        """
+        command = Command(name, on_done, on_error, key)
+        if key is not None:
+            for other in self.active:
+                if other.key == key:
+                    other.cancel()
+        self.active.append(command)
+        command.future = self.executor(lane).submit(call)
+        command.future.add_done_callback(lambda future: self.finished.put(command))
+        self.notify()
+        return command
+
+    def executor(self, lane):
+        """Returns the pool, or the single worker of a lane."""
+        if lane is None:
+            return self.pool
+        with self.lock:
+            if lane not in self.lanes:
+                self.lanes[lane] = futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"command-{lane}")
+            return self.lanes[lane]
+
+    def running(self):
+        """Returns the names of the commands that are neither finished nor cancelled."""
+        return [command.name for command in self.active if not command.cancelled]
+
+    def cancel_all(self):
+        """Cancels every running command."""
+        for command in self.active:
+            command.cancel()
+        self.notify()
+
+    def shutdown(self):
+        """Cancels the running commands and stops the workers without waiting for them."""
+        self.stopped = True
+        self.cancel_all()
+        for executor in [self.pool, *self.lanes.values()]:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def notify(self):
+        if self.on_busy is not None:
+            self.on_busy(self.running())
+
+    def resolve(self, command):
+        """Hands a finished command's result to its callbacks, on the UI thread."""
+        if command in self.active:
+            self.active.remove(command)
+        self.notify()
+        if command.cancelled or command.future.cancelled():
+            return
+        error = command.future.exception()
+        if error is None:
+            if command.on_done is not None:
+                command.on_done(command.future.result())
+        elif command.on_error is not None:
+            command.on_error(error)
+        else:
+            print(f"{command.name} failed: {error}")
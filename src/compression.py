@@ -0,0 +1,94 @@
+import zlib
+
+import grpc
+
+try:
+    import zstandard
+except ImportError:  # optional, zlib is always available
+    zstandard = None
+
+NONE = ""
+ZLIB = "zlib"
+ZSTD = "zstd"
+
+# zlib level 6 is the library default, zstd level 3 likewise
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Payloads smaller than this are sent as they are, the codec header would
+# eat most of the savings
+MIN_COMPRESS_SIZE = 128
+
+# Compression applied by the client-facing servers to their responses. Clients
+# advertise the algorithms they accept, so older clients keep working.
+CLIENT_COMPRESSION = grpc.Compression.Gzip
+
+
+def supported_codecs():
+    """Returns the codecs this node can decode, most preferred first.
+
+    Returns:
+        list: Codec names, zstd only if the ``zstandard`` package is installed.
+    """
+    codecs = [ZLIB]
+    if zstandard is not None:
+        codecs.insert(0, ZSTD)
+    return codecs
+
+
+def negotiate(offered):
+    """Picks the codec for a peer from the codecs it offered.
+
+    Args:
+        offered (Iterable[str]): Codecs the peer can decode.
+
+    Returns:
+        str: The most preferred codec both sides support, or ``NONE``.
+    """
+    for codec in supported_codecs():
+        if codec in offered:
+            return codec
+    return NONE
+
+
+def compress(data, codec):
+    """Compresses a payload.
+
+    Args:
+        data (bytes): Payload to compress.
+        codec (str): Negotiated codec.
+
+    Returns:
+        tuple: ``(payload, codec)`` where codec is ``NONE`` if the payload was
+        left uncompressed because it is small or did not shrink.
+    """
+    if codec == NONE or len(data) < MIN_COMPRESS_SIZE:
+        return data, NONE
+    if codec == ZLIB:
+        compressed = zlib.compress(data, ZLIB_LEVEL)
+    elif codec == ZSTD and zstandard is not None:
+        compressed = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    else:
+        raise ValueError(f"Unsupported compression codec: {codec}")
+    if len(compressed) >= len(data):
+        return data, NONE
+    return compressed, codec
+
+
+def decompress(data, codec):
+    """Restores a payload produced by ``compress``.
+
+    Args:
+        data (bytes): Possibly compressed payload.
+        codec (str): Codec reported alongside the payload.
+
+    Returns:
+        bytes: The original payload.
+    """
+    if codec == NONE:
+        return data
+    if codec == ZLIB:
+        return zlib.decompress(data)
+    if codec == ZSTD and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unsupported compression codec: {codec}")
@@ -0,0 +1,182 @@
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+# scrypt cost parameters for new hashes, about 16 MB and tens of
+# milliseconds per hash. Stored hashes record their own parameters.
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_SIZE = 16
+SCRYPT_PREFIX = "scrypt"
+
+# Processes hashing passwords, 0 hashes on the calling thread
+DEFAULT_KDF_WORKERS = os.cpu_count() or 1
+# Seconds a successful verification is remembered
+DEFAULT_VERIFY_CACHE_TTL = 60.0
+# Verifications remembered at most, the oldest are evicted first
+DEFAULT_VERIFY_CACHE_SIZE = 4096
+
+
+def _encode(data):
+    return base64.b64encode(data).decode()
+
+
+def hash_password(password, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+    """Hashes a password with scrypt and a random salt.
+
+    Args:
+        password (str): The plain text password.
+        n (int): CPU and memory cost.
+        r (int): Block size.
+        p (int): Parallelization.
+
+    Returns:
+        str: ``scrypt$n$r$p$salt$hash`` with base64 salt and hash.
+    """
+    salt = os.urandom(SALT_SIZE)
+    key = hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=0x7fffffff)
+    return f"{SCRYPT_PREFIX}${n}${r}${p}${_encode(salt)}${_encode(key)}"
+
+
+def verify_password(password, stored):
+    """Checks a password against a stored hash.
+
+    Args:
+        password (str): The plain text password.
+        stored (str): Hash from ``hash_password``, or an unsalted SHA-256
+            hex digest stored by earlier versions.
+
+    Returns:
+        bool: True if the password matches.
+    """
+    if not stored:
+        return False
+    if not stored.startswith(SCRYPT_PREFIX + "$"):
+        legacy = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(legacy, stored)
+    try:
+        _, n, r, p, salt, key = stored.split("$")
+        expected = base64.b64decode(key)
+        actual = hashlib.scrypt(password.encode(), salt=base64.b64decode(salt), n=int(n), r=int(r),
+                                p=int(p), maxmem=0x7fffffff, dklen=len(expected))
+    except ValueError:
+        return False
+    return hmac.compare_digest(actual, expected)
+
+
+def needs_rehash(stored):
+    """Checks whether a stored hash predates the current scrypt parameters.
+
+    Args:
+        stored (str): Stored password hash.
+
+    Returns:
+        bool: True if the hash should be replaced on the next login.
+    """
+    return not stored.startswith(f"{SCRYPT_PREFIX}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+
+
+def _warm_up(_):
+    """Runs in each pool process so that it is started before the first login."""
+    return os.getpid()
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords on a process pool.
+
+    The KDF is deliberately slow, so running it on the gRPC worker threads
+    would let a burst of logins serialize on the GIL. The pool spreads it
+    over all cores while the request thread only waits for the result.
+    Successful verifications are remembered for a short time, keyed by an
+    HMAC of the stored hash and the password under a per-process random key,
+    so retries and reconnect storms of the same client skip the KDF without
+    the cache holding anything usable as a password hash.
+    """
+
+    def __init__(self, workers=DEFAULT_KDF_WORKERS, cache_ttl=DEFAULT_VERIFY_CACHE_TTL,
+                 cache_size=DEFAULT_VERIFY_CACHE_SIZE):
+        """Initializes the hasher.
+
+        Args:
+            workers (int): Pool processes, 0 hashes on the calling thread.
+            cache_ttl (float): Seconds a successful verification is remembered,
+                0 disables the cache.
+            cache_size (int): Maximum remembered verifications.
+        """
+        self.workers = workers
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.cache_key = os.urandom(32)
+        self.cache = OrderedDict()  # HMAC digest -> expiry
+        self.lock = threading.Lock()
+        self.pool = None
+        self.hits = 0
+        self.misses = 0
+
+    def start(self):
+        """Starts the pool processes ahead of the first request."""
+        if self.workers and self.pool is None:
+            with self.lock:
+                if self.pool is None:
+                    # spawn, forking a process that runs gRPC threads is unsafe
+                    self.pool = ProcessPoolExecutor(
+                        self.workers, mp_context=multiprocessing.get_context('spawn'))
+            list(self.pool.map(_warm_up, range(self.workers)))
+
+    def shutdown(self):
+        """Stops the pool processes."""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def _run(self, function, *args):
+        if not self.workers:
+            return function(*args)
+        self.start()
+        return self.pool.submit(function, *args).result()
+
+    def hash(self, password):
+        """Hashes a new password.
+
+        Args:
+            password (str): The plain text password.
+
+        Returns:
+            str: The stored form of the password.
+        """
+        return self._run(hash_password, password)
+
+    def verify(self, password, stored):
+        """Checks a password, answering repeated successful checks from the cache.
+
+        Args:
+            password (str): The plain text password.
+            stored (str): Stored password hash.
+
+        Returns:
+            bool: True if the password matches.
+        """
+        key = hmac.new(self.cache_key, f"{stored}\0{password}".encode(), hashlib.sha256).digest()
+        now = time.monotonic()
+        with self.lock:
+            expiry = self.cache.get(key)
+            if expiry is not None and expiry > now:
+                self.hits += 1
+                return True
+            self.misses += 1
+
+        valid = self._run(verify_password, password, stored)
+        if valid and self.cache_ttl > 0:
+            with self.lock:
+                self.cache[key] = now + self.cache_ttl
+                self.cache.move_to_end(key)
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        return valid
@@ -0,0 +1,117 @@
+import threading
+import time
+
+
+class ElectionState:
+    """Term and vote bookkeeping for leader elections.
+
+    Every election runs in a new term and each node votes at most once per
+    term, so at most one candidate can collect a majority in any term. Terms
+    only move forward: seeing a higher term discards the vote cast in an older
+    one.
+    """
+
+    def __init__(self, term=0):
+        """Initializes the election state.
+
+        Args:
+            term (int): Latest term known to this node.
+        """
+        self.lock = threading.Lock()
+        self.term = term
+        self.voted_for = None
+        self.voted_at = None
+
+    def observe_term(self, term):
+        """Moves to a newer term learned from another node.
+
+        Args:
+            term (int): Term reported by a leader or voter.
+
+        Returns:
+            bool: True if the local term advanced.
+        """
+        with self.lock:
+            if term <= self.term:
+                return False
+            self.term = term
+            self.voted_for = None
+            return True
+
+    def start_election(self, candidate_id):
+        """Enters a new term and votes for this node.
+
+        Args:
+            candidate_id (str): ID of this node.
+
+        Returns:
+            int: The new term.
+        """
+        with self.lock:
+            self.term += 1
+            self.voted_for = candidate_id
+            self.voted_at = time.monotonic()
+            return self.term
+
+    def vote(self, term, candidate_id, pre_vote=False):
+        """Decides whether to vote for a candidate.
+
+        A pre-vote only asks whether the vote would be granted in ``term`` and
+        leaves the state untouched, so a candidate that cannot win does not
+        push everybody into a new term.
+
+        Args:
+            term (int): Term the candidate runs in.
+            candidate_id (str): ID of the candidate.
+            pre_vote (bool): Whether this is a pre-vote round.
+
+        Returns:
+            tuple: ``(granted, term)`` with the local term after the decision.
+        """
+        with self.lock:
+            if pre_vote:
+                return term > self.term, self.term
+            if term > self.term:
+                self.term = term
+                self.voted_for = None
+            if term == self.term and self.voted_for in (None, candidate_id):
+                self.voted_for = candidate_id
+                self.voted_at = time.monotonic()
+                return True, self.term
+            return False, self.term
+
+    def recently_voted(self, timeout):
+        """Checks whether a vote was cast within the last ``timeout`` seconds.
+
+        Args:
+            timeout (float): Election timeout in seconds.
+
+        Returns:
+            bool: True while the candidate voted for may still be taking over.
+        """
+        with self.lock:
+            return self.voted_at is not None and time.monotonic() - self.voted_at < timeout
+
+
+def election_state(state):
+    """Returns the election state of a node.
+
+    Args:
+        state (dict): Shared leader or follower state.
+
+    Returns:
+        ElectionState: State stored in the dictionary, created on first use.
+    """
+    return state.setdefault('election', ElectionState())
+
+
+def quorum(voters):
+    """Returns the number of votes needed to win an election.
+
+    Args:
+        voters (int): Number of voting nodes including the candidate.
+
+    Returns:
+        int: Size of a strict majority.
+    """
+    return voters // 2 + 1
@@ -0,0 +1,92 @@
+import math
+import threading
+import time
+from collections import deque
+
+
+class PhiAccrualFailureDetector:
+    """Adaptive failure detector based on heartbeat inter-arrival times.
+
+    Instead of a fixed timeout, the detector outputs a suspicion level ``phi``
+    derived from the distribution of recent heartbeat intervals. A phi of 1
+    means a 10% chance the peer is still alive, 2 means 1%, and so on. The peer
+    is suspected once phi exceeds ``threshold``, so detection time follows the
+    observed heartbeat rate and jitter rather than a hard-coded delay.
+    """
+
+    def __init__(self, heartbeat_interval, threshold=8.0, window_size=100,
+                 min_std_deviation=None, acceptable_pause=0.0):
+        """Initializes the detector.
+
+        Args:
+            heartbeat_interval (float): Expected seconds between heartbeats, used
+                until real intervals have been observed.
+            threshold (float): Phi value above which the peer is suspected.
+            window_size (int): Number of recent intervals kept.
+            min_std_deviation (float, optional): Lower bound on the standard
+                deviation, defaults to a quarter of the heartbeat interval.
+            acceptable_pause (float): Extra seconds of silence tolerated, e.g.
+                for garbage collection pauses.
+        """
+        self.threshold = threshold
+        self.min_std_deviation = (min_std_deviation if min_std_deviation is not None
+                                  else heartbeat_interval / 4)
+        self.acceptable_pause = acceptable_pause
+        self.intervals = deque(maxlen=window_size)
+        self.lock = threading.Lock()
+
+        # Seed with the expected rate so a peer that never answers is still
+        # suspected after a few missed intervals
+        self.intervals.append(heartbeat_interval)
+        self.last_heartbeat = time.monotonic()
+
+    def heartbeat(self, now=None):
+        """Records the arrival of a heartbeat.
+
+        Args:
+            now (float, optional): Arrival time from ``time.monotonic``.
+        """
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            self.intervals.append(now - self.last_heartbeat)
+            self.last_heartbeat = now
+
+    def phi(self, now=None):
+        """Computes the current suspicion level.
+
+        Args:
+            now (float, optional): Current time from ``time.monotonic``.
+
+        Returns:
+            float: Suspicion level, larger means more likely failed.
+        """
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            elapsed = now - self.last_heartbeat
+            mean = sum(self.intervals) / len(self.intervals)
+            variance = sum((i - mean) ** 2 for i in self.intervals) / len(self.intervals)
+
+        std_deviation = max(math.sqrt(variance), self.min_std_deviation)
+        mean += self.acceptable_pause
+
+        # Logistic approximation of the normal CDF
+        y = (elapsed - mean) / std_deviation
+        if y < -10:
+            return 0.0
+        e = math.exp(-y * (1.5976 + 0.070566 * y * y))
+        if elapsed > mean:
+            if e == 0.0:
+                return float('inf')
+            return -math.log10(e / (1.0 + e))
+        return -math.log10(1.0 - 1.0 / (1.0 + e))
+
+    def is_available(self, now=None):
+        """Checks whether the peer is still considered alive.
+
+        Args:
+            now (float, optional): Current time from ``time.monotonic``.
+
+        Returns:
+            bool: False once phi has crossed the threshold.
+        """
+        return self.phi(now) < self.threshold
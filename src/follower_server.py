@@ -9,7 +9,10 @@ import spec_pb2_grpc
 
 # from src.message_frame import StatusCode, StatusMessages
 
-from models import UserModel, MessageModel, DeletedMessageModel, init_db, get_session_factory
+from models import (UserModel, MessageModel, MessagePartitionModel, DeletedMessageModel, RevokedTokenModel,
+                    ReadMarkModel, init_db, get_session_factory)
+from partitions import create_partition_table, model_for_id, models_for_ids
+from message_store import open_message_store
 from sqlalchemy.orm import scoped_session
 from sqlalchemy import inspect
 
@@ -18,14 +21,59 @@ import queue
 import time
 
 from utils import StatusCode, StatusMessages
+from replication import ReplicaProgress
+from election import election_state
+from compression import CLIENT_COMPRESSION, decompress, supported_codecs
+from snapshot import database_path, install_database
+from membership import membership
+
+# Seconds a follower may trail the leader and still answer reads
+DEFAULT_MAX_STALENESS = 10.0
+# Seconds a read waits for the replica to reach the client's last write
+DEFAULT_READ_WAIT = 0.5
+
+# How an empty follower gets the leader's data: a copy of the SQLite file or
+# pickled ORM objects
+BOOTSTRAP_FILE = "file"
+BOOTSTRAP_PICKLE = "pickle"
 
 table_class_mapping = {
     'users': UserModel,
     'messages': MessageModel,
-    'deleted_messages': DeletedMessageModel
+    'message_partitions': MessagePartitionModel,
+    'deleted_messages': DeletedMessageModel,
+    'revoked_tokens': RevokedTokenModel,
+    'read_marks': ReadMarkModel
 }
 
 
+def replica_progress(state):
+    """Returns the replication progress tracker of a follower.
+
+    Args:
+        state (dict): Shared follower state.
+
+    Returns:
+        ReplicaProgress: Tracker stored in the state, created on first use.
+    """
+    return state.setdefault('replica_progress', ReplicaProgress())
+
+
+def apply_membership(state, view):
+    """Applies a membership view pushed by the leader if it is newer.
+
+    Args:
+        state (dict): Shared follower state.
+        view (MembershipView): The leader's follower list.
+
+    Returns:
+        bool: True if the follower list was replaced.
+    """
+    follower_id = state.get('follower_id')
+    members = [(member.id, member.address) for member in view.members if member.id != follower_id]
+    return membership(state).apply(view.term, view.version, members)
+
+
 class FollowerService(spec_pb2_grpc.FollowerServiceServicer):
     def __init__(self, db_session, leader_address, state):
         """Initializes the follower's internal service.
@@ -43,32 +91,87 @@ class FollowerService(spec_pb2_grpc.FollowerServiceServicer):
         """Applies state updates from the leader.
 
         Args:
-            request (AcceptUpdatesRequest): Pickled update data.
+            request (AcceptUpdatesRequest): Pickled update data, compressed
+                with the codec named in ``compression``.
             context (grpc.ServicerContext): gRPC context.
 
+        Updates are applied strictly in position order. An update after a
+        gap is refused with ``FAILED_PRECONDITION`` and one that fails to
+        apply with ``ABORTED``. Neither is acknowledged, and both responses
+        carry the last position applied, also as ``applied-position``
+        trailing metadata, so the leader resends from there.
+
         Returns:
-            ServerResponse: Acknowledgment response.
+            ServerResponse: Acknowledgment carrying the highest position
+            applied without gaps.
         """
-        update_data = request.update_data
-        self.process_update_data(update_data)
+        progress = replica_progress(self.state)
+        if request.position and request.position <= progress.applied_position:
+            # already part of the snapshot or catch-up this replica started from
+            progress.observe_leader(request.leader_position)
+            return spec_pb2.ServerResponse(error_code=0, error_message="",
+                                           position=progress.applied_position)
+
+        if request.position and request.position != progress.applied_position + 1:
+            return self.refuse_update(context, grpc.StatusCode.FAILED_PRECONDITION,
+                                      f"expected position {progress.applied_position + 1}")
+
+        update_data = decompress(request.update_data, request.compression)
+        if not self.process_update_data(update_data):
+            return self.refuse_update(context, grpc.StatusCode.ABORTED,
+                                      f"update {request.position} could not be applied")
+        progress.applied(request.position, request.leader_position, update_data)
 
         response = spec_pb2.ServerResponse(
             error_code=0,
-            error_message=""
+            error_message="",
+            position=progress.applied_position
         )
         return response
 
+    def refuse_update(self, context, code, details):
+        """Answers an update that was not applied, without acknowledging it.
+
+        Args:
+            context (grpc.ServicerContext): gRPC context, None during catch-up.
+            code (grpc.StatusCode): Status telling the leader why.
+            details (str): Description of the problem.
+
+        Returns:
+            ServerResponse: Carries the last position applied.
+        """
+        position = replica_progress(self.state).applied_position
+        print(f"[WARN] Refusing update: {details}")
+        if context is not None:
+            context.set_code(code)
+            context.set_details(details)
+            context.set_trailing_metadata((('applied-position', str(position)),))
+        return spec_pb2.ServerResponse(error_code=StatusCode.UPDATE_NOT_APPLIED, error_message=details,
+                                       position=position)
+
     def process_update_data(self, update_data):
         """Deserializes and applies an update to the local database.
 
         Args:
-            update_data (bytes): Pickled (table, action, object) tuple.
+            update_data (bytes): Pickled (table, action, object) tuple. New
+                message partitions and read marks also carry the index of
+                their file.
+
+        Returns:
+            bool: True if the update was applied, or no longer applies here.
         """
         session = scoped_session(self.db_session)
 
         try:
             data = pickle.loads(update_data)
-            table, action, obj = data
+            table, action, obj = data[:3]
+
+            # Messages, their partitions and read marks may live in a separate file
+            store = self.state.get('message_store')
+            if table in ('messages', 'message_partitions', 'read_marks') and store is not None and not store.shared:
+                index = data[3] if len(data) > 3 else store.file_of(obj.receiver_id)
+                session.remove()
+                session = scoped_session(store.factories[index])
 
             # Copy attributes without accessing them through SQLAlchemy's descriptors
             # This avoids the detached instance error
@@ -85,15 +188,25 @@ class FollowerService(spec_pb2_grpc.FollowerServiceServicer):
                         # If attribute access fails, use a default value or skip
                         obj_dict[c.key] = None
 
+            # Messages go to the partition owning their ID
+            model = table_class_mapping[table]
+            if table == 'messages':
+                model = model_for_id(session, obj.id)
+                if model is None:
+                    return True  # partition already archived here
+
             # Recreate the object from the data
-            new_obj = table_class_mapping[table]()
+            new_obj = model()
             for key, value in obj_dict.items():
                 setattr(new_obj, key, value)
 
             if action == 'add':
                 session.add(new_obj)
+                if table == 'message_partitions':
+                    create_partition_table(session, new_obj)
             elif action == 'delete':
-                existing = session.query(table_class_mapping[table]).get(new_obj.id)
+                # read marks are keyed by reader and peer, the other tables by ID
+                existing = session.get(model, tuple(inspect(model).primary_key_from_instance(new_obj)))
                 if existing:
                     session.delete(existing)
             elif action == 'update':
@@ -102,6 +215,11 @@ class FollowerService(spec_pb2_grpc.FollowerServiceServicer):
 
             session.commit()
 
+            tokens = self.state.get('session_tokens')
+            if table == 'revoked_tokens' and action == 'add' and tokens is not None:
+                tokens.revocations.add(new_obj.token_id, new_obj.user_id,
+                                       new_obj.revoked_at, new_obj.expires_at)
+
             # If this was a user update with session information, ensure we keep it
             if action == 'update' and table == 'users':
                 existing = session.query(table_class_mapping[table]).get(new_obj.id)
@@ -109,10 +227,12 @@ class FollowerService(spec_pb2_grpc.FollowerServiceServicer):
                     existing.session_id = new_obj.session_id
                     existing.logged_in = True
                     session.commit()
-        
+            return True
+
         except Exception as e:
             print(f"Error processing update: {e}")
             session.rollback()
+            return False
         finally:
             session.remove()
 
@@ -126,13 +246,23 @@ class FollowerService(spec_pb2_grpc.FollowerServiceServicer):
         Returns:
             Ack: Acknowledgment response.
         """
+        election = election_state(self.state)
+        if request.term < election.term:
+            # a leader from an older term lost its claim to a newer election
+            return spec_pb2.Ack(error_code=1, error_message="Stale leader term", term=election.term)
+        election.observe_term(request.term)
+
+        apply_membership(self.state, request.membership)
         leader_address, leader_id = request.new_leader_address, request.new_leader_id
         assign_new_leader(self.state, leader_address, leader_id)
-        return spec_pb2.Ack(error_code=0, error_message="")
+        return spec_pb2.Ack(error_code=0, error_message="", term=election.term)
 
     def UpdateFollowers(self, request, context):
         """Adds a new follower to the internal list.
 
+        Leaders push the whole list with ``UpdateMembership`` instead, this
+        is only kept for older leaders.
+
         Args:
             request (UpdateFollowersRequest): Pickled follower info.
             context (grpc.ServicerContext): gRPC context.
@@ -140,57 +270,218 @@ class FollowerService(spec_pb2_grpc.FollowerServiceServicer):
         Returns:
             Ack: Acknowledgment response.
         """
-        # print("Updating followers for follower")
         new_follower = pickle.loads(request.update_data)
-        # remove the current follower from the list
-        self.state['followers'].append(new_follower)
-        # print(new_follower, self.state['followers'])
+        if new_follower not in self.state['followers']:
+            self.state['followers'].append(new_follower)
         return spec_pb2.Ack(error_code=0, error_message="")
 
+    def UpdateMembership(self, request, context):
+        """Replaces the follower list with a newer view from the leader.
+
+        Args:
+            request (MembershipView): Versioned follower list.
+            context (grpc.ServicerContext): gRPC context.
+
+        Returns:
+            Ack: Acknowledgment response.
+        """
+        apply_membership(self.state, request)
+        return spec_pb2.Ack(error_code=0, error_message="", term=election_state(self.state).term)
+
+    def RequestVote(self, request, context):
+        """Votes in a leader election.
+
+        The vote is refused while this follower still receives heartbeats from
+        its leader, so a single node with a flaky link cannot depose a healthy
+        leader. It is also refused to candidates that applied fewer updates
+        than this follower, so the elected node needs the least catch-up.
+
+        Args:
+            request (VoteRequest): Candidate, term and whether it is a pre-vote.
+            context (grpc.ServicerContext): gRPC context.
+
+        Returns:
+            VoteResponse: Whether the vote was granted and the local term.
+        """
+        election = election_state(self.state)
+        position = replica_progress(self.state).applied_position
+        detector = self.state.get('leader_detector')
+        if (detector is not None and detector.is_available()) or request.last_position < position:
+            return spec_pb2.VoteResponse(term=election.term, vote_granted=False, last_position=position)
+
+        granted, term = election.vote(request.term, request.candidate_id, request.pre_vote)
+        return spec_pb2.VoteResponse(term=term, vote_granted=granted, last_position=position)
+
+
+def reset_database(state):
+    """Drops the local replica so that a snapshot can be loaded into it.
+
+    Args:
+        state (dict): Shared follower state.
+    """
+    # this is only required for windows that has file lockers
+    # print('db_eninge in ', 'db_engine' in state)
+    if 'db_engine' in state:
+        try:
+            state['db_engine'].dispose()
+        except Exception as e:
+            print('deleting engine', e)
+    database_engine = init_db(state['database_url'], drop_tables=True)
+    SessionFactory = get_session_factory(database_engine)
+    state['database_engine'] = database_engine
+    state['db_session'] = SessionFactory
+    store = state.get('message_store')
+    if store is not None and not store.shared:
+        store.dispose()
+        state['message_store'] = open_message_store(state['database_url'], store.count, drop_tables=True)
+
+
+def load_revocations(state):
+    """Rebuilds the in-memory token revocation list from the database.
+
+    Args:
+        state (dict): Shared leader or follower state.
+    """
+    tokens = state.get('session_tokens')
+    if tokens is None or state.get('db_session') is None:
+        return
+    session = scoped_session(state['db_session'])
+    try:
+        tokens.revocations.load(session.query(RevokedTokenModel).all())
+    finally:
+        session.remove()
+
+
+def load_snapshot(db_session, pickled_db, store=None):
+    """Inserts every record of a leader snapshot into the local database.
+
+    Args:
+        db_session (SessionFactory): SQLAlchemy session factory.
+        pickled_db (bytes): Pickled mapping of table names to ORM objects.
+        store (MessageStore, optional): Local message files, if the
+            snapshot has messages of several files.
+    """
+    leader_db = pickle.loads(pickled_db)
+    message_files = leader_db.pop('message_files', [])
+
+    def object_as_dict(obj_):
+        return {c.key: obj_.__dict__.get(c.key) for c in inspect(obj_).mapper.column_attrs}
+
+    def load(factory, tables):
+        session = scoped_session(factory)
+        try:
+            for table_name, records in tables.items():
+                if table_name == 'messages':
+                    # the partition catalog precedes the messages in the snapshot
+                    by_id = {record.id: record for record in records}
+                    for model, ids in models_for_ids(session, by_id).items():
+                        session.add_all(model(**object_as_dict(by_id[i])) for i in ids)
+                    continue
+                for record in records:
+                    new_record = table_class_mapping[table_name](**object_as_dict(record))
+                    session.add(new_record)
+                    if table_name == 'message_partitions':
+                        create_partition_table(session, new_record)
+            session.commit()
+        except Exception as e:
+            print("Error occurred while syncing DB:", e)
+            session.rollback()
+        finally:
+            session.remove()
+
+    load(db_session, leader_db)
+    for index, tables in enumerate(message_files):
+        load(store.factories[index], tables)
+
+
+def download_snapshot(stub, follower_state):
+    """Replaces the local database with a copy of the leader's file.
+
+    The file is streamed in chunks and renamed over ``chat_{server_id}.db``
+    once complete. Pooled connections to the old file are dropped, so the
+    existing engine and session factories open the new one.
+
+    Args:
+        stub (LeaderServiceStub): Stub connected to the leader.
+        follower_state (dict): Shared follower state.
+    """
+    chunks = stub.StreamSnapshot(spec_pb2.SnapshotRequest(
+        follower_id=follower_state['follower_id'], compression=supported_codecs()))
+    snapshot = {}
+
+    def file_data():
+        for chunk in chunks:
+            snapshot.update(position=chunk.position, term=chunk.term, log_id=chunk.log_id)
+            yield decompress(chunk.data, chunk.compression)
+
+    engine = follower_state.get('db_engine')
+    if engine is not None:
+        engine.dispose()
+    size = install_database(file_data(), database_path(follower_state['database_url']))
+    if engine is not None:
+        # connections opened during the transfer still point at the old file
+        engine.dispose()
+
+    follower_state['replica_progress'] = ReplicaProgress(snapshot.get('position', 0))
+    follower_state['log_id'] = snapshot.get('log_id', "")
+    election_state(follower_state).observe_term(snapshot.get('term', 0))
+    print(f"[INFO] Installed {size} byte database file at position {snapshot.get('position', 0)}")
+
 
 def request_update(follower_state):
     """Registers this follower with the leader and syncs local DB.
 
+    A follower that already applied a prefix of the leader's log only replays
+    the updates it is missing. Otherwise its database is replaced by a
+    snapshot of the leader's: in file bootstrap mode a copy of the leader's
+    database file, after which it registers again to catch up from the
+    position of the copy.
+
     Retries indefinitely until it successfully contacts the leader.
     """
-    import pickle
-    from sqlalchemy import inspect
-
     leader_address = follower_state['leader_address']
     server_id = follower_state['follower_id']
     internal_address = follower_state['follower_address']
-    db_session = follower_state['db_session']
 
     while True:
         try:
             with grpc.insecure_channel(leader_address) as channel:
                 stub = spec_pb2_grpc.LeaderServiceStub(channel)
+                progress = replica_progress(follower_state)
                 request = spec_pb2.RegisterFollowerRequest(
                     follower_id=server_id,
-                    follower_address=internal_address
+                    follower_address=internal_address,
+                    applied_position=progress.applied_position,
+                    compression=supported_codecs(),
+                    snapshot_file=follower_state.get('bootstrap', BOOTSTRAP_FILE) == BOOTSTRAP_FILE,
+                    log_id=follower_state.get('log_id', "")
                 )
                 response = stub.RegisterFollower(request)
 
-                leader_db = pickle.loads(response.pickled_db)
+                if request.snapshot_file and response.snapshot_file:
+                    download_snapshot(stub, follower_state)
+                    continue  # register again from the copied position
 
-                session = scoped_session(db_session)
-                try:
-                    for table_name, records in leader_db.items():
-                        for record in records:
-                            def object_as_dict(obj_):
-                                return {c.key: obj_.__dict__.get(c.key) for c in inspect(obj_).mapper.column_attrs}
-                            new_record = table_class_mapping[table_name](**object_as_dict(record))
-                            session.add(new_record)
-                    session.commit()
-                except Exception as e:
-                    print("Error occurred while syncing DB:", e)
-                    session.rollback()
-                finally:
-                    session.remove()
-
-                follower_state['followers'] = list(
-                    set([tuple(f.split('-')) for f in response.other_followers])
-                )
+                if response.incremental:
+                    service = FollowerService(follower_state['db_session'], leader_address, follower_state)
+                    for update in response.updates:
+                        service.AcceptUpdates(update, None)
+                    print(f"[INFO] Caught up with {len(response.updates)} updates")
+                else:
+                    if progress.synced_at is not None:
+                        # the replica already holds data from an earlier sync
+                        reset_database(follower_state)
+                    load_snapshot(follower_state['db_session'],
+                                  decompress(response.pickled_db, response.compression),
+                                  follower_state.get('message_store'))
+                    progress = ReplicaProgress(response.position)
+                    follower_state['replica_progress'] = progress
+
+                apply_membership(follower_state, response.membership)
+                load_revocations(follower_state)
+                progress.observe_leader(response.position)
+                follower_state['log_id'] = response.log_id
+                election_state(follower_state).observe_term(response.term)
                 print(f"[INFO] Successfully registered with leader at {leader_address}")
                 return  # ✅ success
 
@@ -203,7 +494,7 @@ def request_update(follower_state):
 
 
 def assign_new_leader(state, leader_address, leader_id):
-    """Accepts a new leader and resets local state.
+    """Accepts a new leader and syncs the local replica with it.
 
     Args:
         state (dict): Shared follower state.
@@ -212,27 +503,17 @@ def assign_new_leader(state, leader_address, leader_id):
     """
     print("Accepting new leader")
     state['leader_address'] = leader_address
-    # this is only required for windows that has file lockers
-    # print('db_eninge in ', 'db_engine' in state)
-    if 'db_engine' in state:
-        try:
-            state['db_engine'].dispose()
-        except Exception as e:
-            print('deleting engine', e)
-    database_engine = init_db(state['database_url'], drop_tables=True)
-    SessionFactory = get_session_factory(database_engine)
-    state['database_engine'] = database_engine
-    state['db_session'] = SessionFactory
+
+    # send message to the leaders registe method
+    request_update(state)
 
     follower_server = server_follower_leader(state)
 
     state['follower_leader_server'] = follower_server
-    # send message to the leaders registe method
-    request_update(state)
 
     # remove leader from the list of followers
     try:
-        state['followers'].remove((leader_address, leader_id))
+        state['followers'].remove((leader_id, leader_address))
     except:
         pass
 
@@ -240,13 +521,27 @@ def assign_new_leader(state, leader_address, leader_id):
 
 
 class ClientServiceFollower(spec_pb2_grpc.ClientAccountServicer):
-    def __init__(self, leader_address):
-        """Initializes the follower-side client service stub that forwards to leader.
+    def __init__(self, leader_address, state=None, max_staleness=DEFAULT_MAX_STALENESS,
+                 read_wait=DEFAULT_READ_WAIT):
+        """Initializes the follower-side client service.
+
+        Reads that opt in with ``allow_follower`` are answered from the local
+        replica while it trails the leader by at most ``max_staleness``
+        seconds. A read carrying ``min_position`` additionally waits up to
+        ``read_wait`` seconds for the replica to apply that position, which
+        gives clients read-your-writes consistency. Everything else is
+        redirected to the leader.
 
         Args:
             leader_address (str): Address of the current leader server.
+            state (dict, optional): Shared follower state holding the replica.
+            max_staleness (float): Replication lag bound for local reads in seconds.
+            read_wait (float): Seconds to wait for a requested position.
         """
         self.leader_address = leader_address
+        self.state = state
+        self.max_staleness = max_staleness
+        self.read_wait = read_wait
 
     def __getattr__(self, name):
         """Overrides attribute access to raise unimplemented error for all RPC methods.
@@ -262,10 +557,104 @@ class ClientServiceFollower(spec_pb2_grpc.ClientAccountServicer):
             raise grpc.RpcError(grpc.StatusCode.UNIMPLEMENTED, "This method is not available on follower.")
         return method
     
-    def ListUsers(self, request, context):
+    def can_serve_locally(self, request):
+        """Checks whether a read may be answered from the local replica.
+
+        Args:
+            request: A read request carrying ``allow_follower`` and ``min_position``.
+
+        Returns:
+            bool: True if the client allows it, the replica is fresh enough and
+            it has applied the client's last write.
+        """
+        if self.state is None or not request.allow_follower:
+            return False
+        progress = replica_progress(self.state)
+        if not progress.wait_for(request.min_position, self.read_wait):
+            return False
+        return progress.staleness() <= self.max_staleness
+
+    def redirect_to_leader(self, context):
+        """Rejects a request so that the client retries it on the leader.
+
+        Args:
+            context (grpc.ServicerContext): gRPC context.
+        """
         context.set_code(grpc.StatusCode.FAILED_PRECONDITION)
-        context.set_details("NOT LEADER: CONNECT TO LEADER SERVER")
-        return spec_pb2.Users()
+        context.set_details(StatusMessages.get_error_message(StatusCode.NOT_LEADER))
+
+    def local_reader(self):
+        """Builds a read-only client service over the local replica.
+
+        Returns:
+            ClientService: Service bound to the follower's current database.
+        """
+        from leader_server import ClientService
+        return ClientService(self.state['db_session'], update_queue=None, read_only=True,
+                             tokens=self.state.get('session_tokens'), shards=self.state.get('shards'),
+                             store=self.state.get('message_store'))
+
+    def ListUsers(self, request, context):
+        """Lists users from the replica, or redirects to the leader.
+
+        Args:
+            request (ListUsersRequest): Request with optional wildcard filter.
+            context (grpc.ServicerContext): gRPC context.
+
+        Returns:
+            Users: Matching users, empty when redirected.
+        """
+        if not self.can_serve_locally(request):
+            self.redirect_to_leader(context)
+            return spec_pb2.Users()
+        return self.local_reader().ListUsers(request, context)
+
+    def GetChat(self, request, context):
+        """Returns chat history from the replica, or redirects to the leader.
+
+        Messages are not marked as received since the replica is read-only.
+
+        Args:
+            request (ChatRequest): Includes session ID and target username.
+            context (grpc.ServicerContext): gRPC context.
+
+        Returns:
+            Messages: Chat history, empty when redirected.
+        """
+        if not self.can_serve_locally(request):
+            self.redirect_to_leader(context)
+            return spec_pb2.Messages()
+        return self.local_reader().GetChat(request, context)
+
+    def GetUnreadCounts(self, request, context):
+        """Returns unread counts from the replica, or redirects to the leader.
+
+        Args:
+            request (SessionRequest): Request with session ID.
+            context (grpc.ServicerContext): gRPC context.
+
+        Returns:
+            UnreadSummary: Unread counts, empty when redirected.
+        """
+        if not self.can_serve_locally(request):
+            self.redirect_to_leader(context)
+            return spec_pb2.UnreadSummary()
+        return self.local_reader().GetUnreadCounts(request, context)
+
+    def SyncState(self, request, context):
+        """Returns the changed client state from the replica, or redirects to the leader.
+
+        Args:
+            request (SyncStateRequest): Session ID and the versions of the last sync.
+            context (grpc.ServicerContext): gRPC context.
+
+        Returns:
+            SyncStateResponse: The changed sections, empty when redirected.
+        """
+        if not self.can_serve_locally(request):
+            self.redirect_to_leader(context)
+            return spec_pb2.SyncStateResponse()
+        return self.local_reader().SyncState(request, context)
 
 
 
@@ -281,9 +670,12 @@ def serve_follower_client(follower_state):
     db_session, address, leader_address, client_address = follower_state['db_session'], follower_state[
         'follower_address'], follower_state['leader_address'], follower_state['client_address']
 
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10), compression=CLIENT_COMPRESSION)
+    max_staleness = follower_state.get('max_staleness', DEFAULT_MAX_STALENESS)
+    read_wait = follower_state.get('read_wait', DEFAULT_READ_WAIT)
     spec_pb2_grpc.add_ClientAccountServicer_to_server(
-        ClientServiceFollower(leader_address=leader_address), server)
+        ClientServiceFollower(leader_address=leader_address, state=follower_state,
+                              max_staleness=max_staleness, read_wait=read_wait), server)
     server.add_insecure_port(client_address)
     server.start()
     print("Client server started, listening on ", client_address)
@@ -1,5 +1,4 @@
 import tkinter as tk
-import threading
 import time
 from tkinter import ttk, scrolledtext, simpledialog
 from base_client import ChatClientBase
@@ -7,9 +6,31 @@ import tkinter.messagebox as messagebox
 from ttkthemes import ThemedStyle
 import signal
 import argparse
-import spec_pb2
+from utils import StatusCode
 
-from message_frame import MessageFrame
+from chat_view import VirtualChatView
+from command_runner import CommandRunner
+from sync_scheduler import SyncScheduler
+
+# Seconds between syncs while the user is active
+SYNC_INTERVAL = 1
+
+
+def message_data(message):
+    """Converts a ``Message`` into the dictionary a ``MessageFrame`` shows.
+
+    Args:
+        message (Message): Message from ``GetChat``.
+
+    Returns:
+        dict: ID, sender, content and UNIX timestamp of the message.
+    """
+    return {
+        "id": message.message_id,
+        "from": message.from_,
+        "content": message.message,
+        "timestamp": message.time_stamp.seconds
+    }
 
 
 class ChatClientGUI(tk.Tk, ChatClientBase):
@@ -25,23 +46,29 @@ class ChatClientGUI(tk.Tk, ChatClientBase):
         user_session_id (str): Session token assigned by the server upon login.
         is_search_active (bool): Tracks whether the user search box is actively being used.
     """
-    def __init__(self, addresses):
+    def __init__(self, addresses, read_addresses=None, cache_dir=None):
         """
         Initializes the GUI chat client and sets up the interface and background threads.
 
         This constructor initializes both the Tkinter GUI and the base gRPC chat client.
         It establishes a connection to one of the provided server addresses, sets up the
-        main window layout, and starts background threads for periodically updating the
+        main window layout, and starts a ``SyncScheduler`` that periodically updates the
         user list, chat window, and unread message notifications.
 
         Args:
             addresses (List[str]): List of gRPC server addresses, with the leader expected
                                    to be the first address in the list.
+            read_addresses (List[str], optional): Follower client addresses used to
+                                   spread chat and user list reads.
+            cache_dir (str, optional): Directory for the local chat cache of
+                                   each user, chats are downloaded in full if unset.
         """
         tk.Tk.__init__(self)
-        ChatClientBase.__init__(self, addresses)
+        ChatClientBase.__init__(self, addresses, read_addresses=read_addresses, cache_dir=cache_dir)
 
         self.is_search_active = False
+        # IDs of messages shown before the server confirmed them
+        self.pending_id = 0
 
         self.title("Chat App")
         self.geometry("1000x800")
@@ -49,20 +76,23 @@ class ChatClientGUI(tk.Tk, ChatClientBase):
         self.create_widgets()
         self.unread_popup_shown = False  # Flag to show unread popup once per login
 
-        user_list_update_thread = threading.Thread(
-            target=self.update_user_list)
-        user_list_update_thread.daemon = True
-        user_list_update_thread.start()
+        # calls made for the user run on workers, so the window never blocks
+        self.commands = CommandRunner(self.after, on_busy=self.show_busy)
+        self.commands.start()
 
-        chat_update_thread = threading.Thread(
-            target=self.update_chat)
-        chat_update_thread.daemon = True
-        chat_update_thread.start()
+        # copy of the recipient that the sync thread can read without Tk
+        self.chat_peer = ""
+        self.recipient_var.trace_add("write", self.on_recipient_change)
 
-        notification_update_thread = threading.Thread(
-            target=self.update_notification)
-        notification_update_thread.daemon = True
-        notification_update_thread.start()
+        # server calls run on one thread and their results are shown from the Tk loop
+        self.sync = SyncScheduler(self.after)
+        self.sync.add("state", self.fetch_state, self.show_state, SYNC_INTERVAL,
+                      when=lambda: self.user_session_id)
+        for sequence in ("<Any-KeyPress>", "<Any-ButtonPress>", "<MouseWheel>", "<Motion>"):
+            self.bind_all(sequence, self.on_activity, add="+")
+        self.bind("<Map>", self.on_map)
+        self.bind("<Unmap>", self.on_map)
+        self.sync.start()
 
         self.protocol("WM_DELETE_WINDOW", self.exit_)
 
@@ -70,10 +100,14 @@ class ChatClientGUI(tk.Tk, ChatClientBase):
 
     def exit_(self, *args, **kwargs):
         """Logs out the user and closes the application window."""
+        self.sync.stop()
+        self.commands.shutdown()
         try:
-            self.logout()
+            # the window closes anyway, so there is nothing to wait for
+            ChatClientBase.logout(self)
         except Exception as e:
             print("Error logging out:", e)
+        self.close()
         self.destroy()
 
     def search_users(self):
@@ -87,15 +121,12 @@ class ChatClientGUI(tk.Tk, ChatClientBase):
             if not pattern.endswith("*"):
                 pattern += "*"
 
-        try:
-            request = spec_pb2.ListUsersRequest(wildcard=pattern)
-            response = self.stub.ListUsers(request)
-
+        def done(users):
             self.user_listbox.delete(0, tk.END)
             total = 0
             online = 0
 
-            for user in response.user:
+            for user in users:
                 total += 1
                 if user.status.lower() == "online":
                     online += 1
@@ -103,8 +134,10 @@ class ChatClientGUI(tk.Tk, ChatClientBase):
 
             self.user_stats_label.config(text=f"Users found: {total} | Online Users: {online}")
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Search failed: {e}")
+        # a newer search replaces this one
+        self.commands.submit("Searching", lambda: ChatClientBase.list_users(self, pattern), on_done=done,
+                             on_error=lambda e: messagebox.showerror("Error", f"Search failed: {e}"),
+                             key="search")
 
     def select_user_from_list(self, event):
         """Callback when a user is selected from the listbox. Loads chat history.
@@ -114,35 +147,31 @@ class ChatClientGUI(tk.Tk, ChatClientBase):
         """
         try:
             selection = self.user_listbox.get(self.user_listbox.curselection())
-            username = selection.split(' [')[0]
-            self.recipient_var.set(username)
-            self.clear_chat()
-            self.load_chat_history(username)
         except Exception:
-            pass  # ignore if no selection
+            return  # ignore if no selection
+        username = selection.split(' [')[0]
+        self.recipient_var.set(username)
+        self.clear_chat()
+        self.load_chat_history(username)
 
     def delete_selected_messages(self):
         """Deletes messages selected via checkboxes in the chat frame."""
-        message_ids = []
-        for widget in self.chat_frame_inner.winfo_children():
-            if isinstance(widget, MessageFrame) and widget.select_var.get():
-                message_ids.append(widget.message_id)
+        message_ids = self.chat_view.selected_ids()
 
         if not message_ids:
             messagebox.showinfo("Info", "No messages selected for deletion.")
             return
 
-        try:
-            response = self.delete_messages(message_ids)
+        def done(response):
             if response and response.error_code == 0:
                 messagebox.showinfo("Deleted", response.error_message)
-                self.clear_chat()
-                self.load_chat_history(self.recipient_var.get())
+                self.chat_view.remove(message_ids)
             else:
                 error_message = response.error_message if response else "Failed to delete messages. Server error."
                 messagebox.showerror("Error", error_message)
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+
+        self.commands.submit("Deleting messages", lambda: self.delete_messages(message_ids),
+                             on_done=done, on_error=self.show_command_error)
 
 
     def create_widgets(self):
@@ -242,28 +271,9 @@ class ChatClientGUI(tk.Tk, ChatClientBase):
         separator = ttk.Separator(chat_frame, orient="horizontal")
         separator.pack(side=tk.TOP, padx=5, pady=5, fill=tk.X)
 
-        self.chat_canvas = tk.Canvas(chat_frame)
-        self.chat_scrollbar = ttk.Scrollbar(chat_frame, orient="vertical", command=self.chat_canvas.yview)
-        self.chat_frame_inner = ttk.Frame(self.chat_canvas)
-
-        # Add content window to canvas
-        self.chat_window = self.chat_canvas.create_window((0, 0), window=self.chat_frame_inner, anchor="nw", tags="inner")
-
-        # Resize inner frame when canvas resizes
-        def resize_inner(event):
-            self.chat_canvas.itemconfig("inner", width=event.width)
-
-        self.chat_canvas.bind("<Configure>", resize_inner)
-
-        # Update scrollregion when content changes
-        self.chat_frame_inner.bind(
-            "<Configure>",
-            lambda e: self.chat_canvas.configure(scrollregion=self.chat_canvas.bbox("all"))
-        )
-
-        self.chat_canvas.configure(yscrollcommand=self.chat_scrollbar.set, takefocus=0)
-        self.chat_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.chat_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # only the messages in view have widgets
+        self.chat_view = VirtualChatView(chat_frame)
+        self.chat_view.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
 
         # Create message input field and send button
         self.message_entry = ttk.Entry(message_frame)
@@ -280,6 +290,15 @@ class ChatClientGUI(tk.Tk, ChatClientBase):
         delete_button = ttk.Button(chat_frame, text="Delete Selected", command=self.delete_selected_messages)
         delete_button.pack(side=tk.BOTTOM, pady=5)
 
+        # shown while calls made for the user are running
+        self.status_frame = ttk.Frame(self)
+        self.status_label = ttk.Label(self.status_frame)
+        self.status_label.pack(side=tk.LEFT, padx=5)
+        self.progress = ttk.Progressbar(self.status_frame, mode='indeterminate', length=120)
+        self.progress.pack(side=tk.LEFT, padx=5)
+        self.cancel_button = ttk.Button(self.status_frame, text="Cancel", command=self.cancel_commands)
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+
 
         ttk.Label(recipient_frame, text="To:").pack(side=tk.LEFT, padx=(5, 2))
 
@@ -304,22 +323,58 @@ class ChatClientGUI(tk.Tk, ChatClientBase):
         self.notification_text.configure(state='disabled')
         self.notification_text.see(tk.END)
 
+    def show_busy(self, names):
+        """Shows which calls are running, with a progress bar and a cancel button.
+
+        Args:
+            names (List[str]): Descriptions of the running calls.
+        """
+        if names:
+            self.status_label.config(text=", ".join(names) + "...")
+            if not self.status_frame.winfo_ismapped():
+                self.status_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=(0, 5))
+                self.progress.start(10)
+        elif self.status_frame.winfo_ismapped():
+            self.progress.stop()
+            self.status_frame.pack_forget()
+
+    def cancel_commands(self):
+        """Stops waiting for the running calls, e.g. while the servers fail over."""
+        self.commands.cancel_all()
+
+    def show_command_error(self, error):
+        """Reports a call that raised, e.g. when no server could be reached."""
+        messagebox.showerror("Error", f"An error occurred: {error}")
+
     def signup(self):
         """Handles account signup and auto-login if successful."""
         username = self.username_entry.get()
         password = self.password_entry.get()
-        response = ChatClientBase.create_account(self, username, password)
-        if response.error_code != 0:
-            messagebox.showerror("Error", response.error_message)
-            return
-        self.login()
+
+        def done(response):
+            if response.error_code != 0:
+                messagebox.showerror("Error", response.error_message)
+                return
+            self.login()
+
+        self.commands.submit("Creating account", lambda: ChatClientBase.create_account(self, username, password),
+                             on_done=done, on_error=self.show_command_error, key="login")
 
     def login(self):
-        """Handles user login and updates the GUI state."""
+        """Logs in on a worker and updates the GUI state once the server answered."""
         username = self.username_entry.get()
         password = self.password_entry.get()
-        response = ChatClientBase.login(self, username, password)
+        self.commands.submit("Logging in", lambda: ChatClientBase.login(self, username, password),
+                             on_done=lambda response: self.show_login(username, response),
+                             on_error=self.show_command_error, key="login")
+
+    def show_login(self, username, response):
+        """Updates the GUI state after a login.
 
+        Args:
+            username (str): Name the user logged in with.
+            response (ServerResponse): Response of ``Login``.
+        """
         if response.error_code == 0:
             self.unread_popup_shown = False  # Reset flag on login
 
@@ -339,9 +394,12 @@ class ChatClientGUI(tk.Tk, ChatClientBase):
             self.delete_button.pack(side="right", padx=5)
             self.user_listbox.config(state='normal')
             self.is_search_active = False
+            if self.cache is not None:
+                # show the last known directory until the first refresh
+                for user in self.cache.users():
+                    self.user_listbox.insert(tk.END, f"{user.username} [{user.status}]")
 
-            self.notification_thread = threading.Thread(target=self.update_notification, daemon=True)
-            self.notification_thread.start()        
+            self.sync.trigger()
         else:
             messagebox.showerror("Error", response.error_message)
 
@@ -368,16 +426,20 @@ class ChatClientGUI(tk.Tk, ChatClientBase):
             self.signup_button.pack(side="left")
             self.user_listbox.config(state='normal')
             self.is_search_active = False
-
-            self.notification_thread = threading.Thread(target=self.update_notification, daemon=True)
-            self.notification_thread.start()
         except Exception as e:
             print(e)
 
     def logout(self):
-        """Logs the user out and resets GUI to login view."""
-        response = ChatClientBase.logout(self)
+        """Logs the user out on a worker and resets GUI to login view once the server answered."""
+        self.commands.submit("Logging out", lambda: ChatClientBase.logout(self),
+                             on_done=self.show_logout, on_error=self.show_command_error, key="login")
 
+    def show_logout(self, response):
+        """Resets the GUI to the login view after a logout.
+
+        Args:
+            response (ServerResponse): Response of ``Logout``.
+        """
         if response.error_code == 0:
             self.logged_in_label.pack_forget()
             self.logout_button.pack_forget()
@@ -427,44 +489,57 @@ class ChatClientGUI(tk.Tk, ChatClientBase):
         message = self.message_entry.get()
 
         if to and message:
-            response = ChatClientBase.send_message(self, to, message)
-            if response.error_code == 0:
-                self.message_entry.delete(0, tk.END)
-
-                # Create and display only the new message frame
-                current_user = self.logged_in_label.cget("text").replace("Logged in as: ", "")
-                message_data = {
-                    "id": -1,  # dummy ID since server doesn't send it back
-                    "from": "You",
-                    "content": message,
-                    "timestamp": int(time.time())
-                }
-                msg_frame = MessageFrame(self.chat_frame_inner, message_data)
-                msg_frame.pack(fill='x', pady=2, padx=5, anchor='e')
-                self.chat_canvas.update_idletasks()
-                self.chat_canvas.yview_moveto(1.0)
+            self.message_entry.delete(0, tk.END)
 
-            else:
-                messagebox.showerror("Error", response.error_message)
+            # Display the new message until the next refresh brings it
+            self.pending_id -= 1
+            pending_id = self.pending_id
+            message_data = {
+                "id": pending_id,  # dummy ID since server doesn't send it back
+                "from": "You",
+                "content": message,
+                "timestamp": int(time.time())
+            }
+            self.chat_view.append([message_data])
+            self.chat_view.scroll_to_end()
+
+            def failed(error_message):
+                self.chat_view.remove([pending_id])
+                if not self.message_entry.get():
+                    self.message_entry.insert(0, message)  # let the user send it again
+                messagebox.showerror("Error", error_message)
+
+            def done(response):
+                if response.error_code == 0:
+                    self.sync.trigger("state")
+                else:
+                    failed(response.error_message)
+
+            # one lane keeps the messages in the order they were typed
+            self.commands.submit("Sending", lambda: ChatClientBase.send_message(self, to, message),
+                                 on_done=done, on_error=lambda error: failed(f"An error occurred: {error}"),
+                                 lane="send")
         else:
             messagebox.showerror(
                 "Error", "Please select a recipient and enter a message.")
 
 
     def retry_connection(self):
-        """Attempts to reconnect to a server and restore GUI functionality."""
-        self.connect()
-        if self.stub:
-            messagebox.showinfo("Success", "Connection re-established.")
-            self.retry_button.pack_forget()
-        else:
-            messagebox.showerror(
-                "Error", "Failed to establish connection. Try again.")
+        """Attempts to reconnect to a server on a worker and restores GUI functionality."""
+        def done(_):
+            if self.stub:
+                messagebox.showinfo("Success", "Connection re-established.")
+                self.retry_button.pack_forget()
+            else:
+                messagebox.showerror(
+                    "Error", "Failed to establish connection. Try again.")
+
+        self.commands.submit("Connecting", self.connect, on_done=done,
+                             on_error=self.show_command_error, key="connect")
 
     def clear_chat(self):
         """Clears the chat message display area."""
-        for widget in self.chat_frame_inner.winfo_children():
-            widget.destroy()
+        self.chat_view.clear()
 
     def change_recipient(self, event):
         """Handles recipient switching via event.
@@ -481,168 +556,124 @@ class ChatClientGUI(tk.Tk, ChatClientBase):
         if not self.user_session_id or not recipient:
             return
 
-        response = ChatClientBase.get_chat(self, recipient)
-        if not response or response.error_code != 0:
-            return
+        def done(response):
+            if not response or response.error_code != 0 or recipient != self.chat_peer:
+                return
 
-        self.clear_chat()
-        current_user = self.logged_in_label.cget("text").replace("Logged in as: ", "")
+            self.chat_view.set_messages([message_data(message) for message in response.message])
 
-        self.chat_canvas.configure(state='disabled')
-        self.chat_canvas.update_idletasks()
+            # Smart scroll if overflow, otherwise scroll to top
+            self.chat_view.scroll_to_end()
 
-        # Temporarily suppress scrolling
-        frames = []
+        # a chat opened later replaces this one
+        self.commands.submit("Loading chat", lambda: ChatClientBase.get_chat(self, recipient),
+                             on_done=done, on_error=self.show_command_error, key="chat")
 
-        for message in response.message:
-            is_self = message.from_ == current_user
-            message_data = {
-                "id": message.message_id,
-                "from": message.from_,
-                "content": message.message,
-                "timestamp": message.time_stamp.seconds
-            }
-
-            msg_frame = MessageFrame(self.chat_frame_inner, message_data)
-            frames.append((msg_frame, is_self))
-
-        for msg_frame, is_self in frames:
-            msg_frame.pack(fill='x', pady=2, padx=5, anchor='e' if is_self else 'w')
-
-        self.chat_canvas.configure(state='normal')
-        self.chat_canvas.update_idletasks()
+    def on_recipient_change(self, *args):
+        """Keeps ``chat_peer`` equal to the recipient field."""
+        self.chat_peer = self.recipient_var.get()
 
-        # Smart scroll if overflow, otherwise scroll to top
-        chat_bbox = self.chat_canvas.bbox("all")
-        view_height = self.chat_canvas.winfo_height()
-        if chat_bbox and chat_bbox[3] > view_height:
-            self.chat_canvas.yview_moveto(1.0)
-        else:
-            self.chat_canvas.yview_moveto(0.0)
-
-    def update_notification(self):
-        """Periodically fetches and updates unread message counts."""
-        popup_shown = False
-
-        while True:
-            try:
-                response = ChatClientBase.get_unread_counts(self)
-                if not response or response.error_code != 0:
-                    time.sleep(3)
-                    continue
-
-                total_unread = sum(count.count for count in response.counts)
-
-                if not self.unread_popup_shown and not popup_shown:
-                    self.after(0, lambda: messagebox.showinfo(
-                        "Unread Messages", f"You have {total_unread} unread messages."))
-                    self.unread_popup_shown = True
-                    popup_shown = True
-
-                self.notification_text.config(state='normal')
-                self.notification_text.delete(1.0, tk.END)
-                self.notification_text.insert(tk.END, "Unread messages:\n")
-                if response.counts:
-                    current_chat_user = self.recipient_var.get().strip()
-                    for item in response.counts:
-                        sender = getattr(item, "from")
-                        if sender == current_chat_user:
-                            continue  # Skip notifications from the current open chat
-                        self.notification_text.insert(tk.END, f"- {sender} ({item.count})\n")
-
-                    # for item in response.counts:
-                    #     self.notification_text.insert(
-                    #         tk.END, f"- {getattr(item, 'from')} ({item.count})\n")
-                else:
-                    self.notification_text.insert(tk.END, "No unread messages\n")
-                self.notification_text.config(state='disabled')
-                self.notification_text.see(tk.END)
+    def on_activity(self, event):
+        """Tells the sync scheduler that the user is active."""
+        self.sync.touch()
 
-            except Exception as e:
-                print("Notification error:", e)
+    def on_map(self, event):
+        """Slows down syncing while the window is minimized."""
+        if event.widget is self:
+            self.sync.set_visible(event.type == tk.EventType.Map)
 
-            time.sleep(3)
+    def fetch_state(self):
+        """Fetches what changed on the server with one ``SyncState`` call, on the sync thread.
 
-    def refresh_chat(self, response):
-        """Updates the chat display with new messages from server response."""
-        self.clear_chat()
-        current_user = self.logged_in_label.cget("text").replace("Logged in as: ", "")
-        for message in response.message:
-            is_self = message.from_ == current_user
-            message_data = {
-                "id": message.message_id,
-                "from": message.from_,
-                "content": message.message,
-                "timestamp": message.time_stamp.seconds
-            }
+        Returns:
+            tuple: Name of the open chat and the response, None if the
+            call failed.
+        """
+        peer = self.chat_peer
+        response = ChatClientBase.sync_state(self, peer)
+        if not response or response.error_code not in (StatusCode.SUCCESS, StatusCode.NOT_MODIFIED):
+            return None
+        return peer, response
 
-            msg_frame = MessageFrame(self.chat_frame_inner, message_data)
-            msg_frame.pack(fill='x', pady=2, padx=5, anchor='e' if is_self else 'w')
+    def show_state(self, result):
+        """Shows the sections of a ``SyncState`` response that changed.
 
-        self.chat_canvas.update_idletasks()
-        chat_bbox = self.chat_canvas.bbox("all")
-        view_height = self.chat_canvas.winfo_height()
-        if chat_bbox and chat_bbox[3] > view_height:
-            self.chat_canvas.yview_moveto(1.0)
+        Args:
+            result (tuple): Chat partner and response, as returned by ``fetch_state``.
+        """
+        if result is None:
+            return
+        peer, response = result
+        if response.HasField("users"):
+            self.show_users(response.users.user)
+        if response.HasField("unread"):
+            self.show_unread_counts(response.unread)
+        if response.HasField("chat"):
+            self.refresh_chat(peer, response.chat)
+
+    def show_unread_counts(self, response):
+        """Shows unread message counts in the notification panel."""
+        if not self.unread_popup_shown:
+            total_unread = sum(count.count for count in response.counts)
+            self.unread_popup_shown = True
+            messagebox.showinfo("Unread Messages", f"You have {total_unread} unread messages.")
+
+        self.notification_text.config(state='normal')
+        self.notification_text.delete(1.0, tk.END)
+        self.notification_text.insert(tk.END, "Unread messages:\n")
+        if response.counts:
+            current_chat_user = self.chat_peer.strip()
+            for item in response.counts:
+                sender = getattr(item, "from")
+                if sender == current_chat_user:
+                    continue  # Skip notifications from the current open chat
+                self.notification_text.insert(tk.END, f"- {sender} ({item.count})\n")
         else:
-            self.chat_canvas.yview_moveto(0.0)
-
-
-    def update_chat(self):
-        """Continuously checks and updates current chat window if new messages arrive."""
-        last_seen_message_ids = set()
-
-        while True:
-            recipient = self.recipient_var.get()
-            if self.user_session_id and recipient:
-                try:
-                    response = ChatClientBase.get_chat(self, recipient)
-
-                    if response and response.error_code == 0:
-                        current_ids = {msg.message_id for msg in response.message}
-                        if current_ids != last_seen_message_ids:
-                            self.after(0, lambda: self.refresh_chat(response))
-                            last_seen_message_ids = current_ids
+            self.notification_text.insert(tk.END, "No unread messages\n")
+        self.notification_text.config(state='disabled')
+        self.notification_text.see(tk.END)
 
-                except Exception as e:
-                    print("Chat update error:", e)
+    def refresh_chat(self, peer, response):
+        """Updates the chat display with new messages from server response.
 
-            time.sleep(1)
+        Only new and deleted messages change on screen, and the view stays
+        where the user scrolled unless it was showing the newest messages.
 
+        Args:
+            peer (str): Chat partner the response is for.
+            response (Messages): The whole chat.
+        """
+        if peer != self.chat_peer or response.error_code not in (StatusCode.SUCCESS, StatusCode.NO_MESSAGES):
+            return  # another chat was opened meanwhile, or no such user
+        self.chat_view.update_messages([message_data(message) for message in response.message])
 
-    def update_user_list(self, interval=0):
-        """Background thread that periodically updates the user list.
+    def show_users(self, users):
+        """Updates the user list in place.
 
         Args:
-            interval (int): Sleep interval between updates (default: 0).
+            users (Iterable[User]): Users of every shard.
         """
-        while True:
-            if self.user_session_id and not self.is_search_active:
-                try:
-                    users = self.list_users("*")
-                    total = len(users)
-                    online = sum(1 for user in users if user.status == "online")
-                    self.user_stats_label.config(text=f"Users found: {total} | Online Users: {online}")
-
-                    current_items = self.user_listbox.get(0, tk.END)
-                    user_index_map = {item.split(' [')[0]: idx for idx, item in enumerate(current_items)}
-
-                    for user in users:
-                        name = user.username
-                        status = "online" if user.status == "online" else "offline"
-                        new_entry = f"{name} [{status}]"
-
-                        if name in user_index_map:
-                            idx = user_index_map[name]
-                            if current_items[idx] != new_entry:
-                                self.user_listbox.delete(idx)
-                                self.user_listbox.insert(idx, new_entry)
-                        else:
-                            self.user_listbox.insert(tk.END, new_entry)
-
-                except Exception:
-                    pass
-            time.sleep(interval)
+        if self.is_search_active or not self.user_session_id:
+            return
+        total = len(users)
+        online = sum(1 for user in users if user.status == "online")
+        self.user_stats_label.config(text=f"Users found: {total} | Online Users: {online}")
+
+        current_items = self.user_listbox.get(0, tk.END)
+        user_index_map = {item.split(' [')[0]: idx for idx, item in enumerate(current_items)}
+
+        for user in users:
+            name = user.username
+            status = "online" if user.status == "online" else "offline"
+            new_entry = f"{name} [{status}]"
+
+            if name in user_index_map:
+                idx = user_index_map[name]
+                if current_items[idx] != new_entry:
+                    self.user_listbox.delete(idx)
+                    self.user_listbox.insert(idx, new_entry)
+            else:
+                self.user_listbox.insert(tk.END, new_entry)
 
     def delete_account(self):
         """Handles secure deletion of a user account after confirming password."""
@@ -664,22 +695,23 @@ class ChatClientGUI(tk.Tk, ChatClientBase):
             messagebox.showwarning("Cancelled", "Account deletion cancelled.")
             return
 
-        # Try logging in again to verify password
-        username = self.username_entry.get()
-        login_response = ChatClientBase.login(self, username, password)
-
-        if login_response.error_code != 0:
-            messagebox.showerror("Error", "Password incorrect. Cannot delete account.")
-            return
+        # the server checks the password as part of the deletion
+        self.commands.submit("Deleting account", lambda: ChatClientBase.delete_account(self, password),
+                             on_done=self.show_account_deleted, on_error=self.show_command_error)
 
-        self.user_session_id = login_response.session_id
-        response = ChatClientBase.delete_account(self)
+    def show_account_deleted(self, response):
+        """Resets the GUI after the account was deleted, or reports why it was not.
 
+        Args:
+            response (ServerResponse): Response of ``DeleteAccount``.
+        """
         if not response:
             messagebox.showerror("Error", "No response from server.")
             return
 
-        if response.error_code == 0:
+        if response.error_code == StatusCode.INCORRECT_PASSWORD:
+            messagebox.showerror("Error", "Password incorrect. Cannot delete account.")
+        elif response.error_code == 0:
             messagebox.showinfo("Deleted", "Account deleted successfully.")
             self.user_session_id = ""
             self.reset_to_login_view()
@@ -694,13 +726,15 @@ class ChatClientGUI(tk.Tk, ChatClientBase):
             messagebox.showerror("Error", response.error_message)
 
     @classmethod
-    def run(cls, addresses):
+    def run(cls, addresses, read_addresses=None, cache_dir=None):
         """Runs the GUI client.
 
         Args:
             addresses (List[str]): List of server addresses to try.
+            read_addresses (List[str], optional): Follower addresses for reads.
+            cache_dir (str, optional): Directory for the local chat cache.
         """
-        app = cls(addresses)
+        app = cls(addresses, read_addresses=read_addresses, cache_dir=cache_dir)
         app.mainloop()
 
 
@@ -710,8 +744,13 @@ if __name__ == "__main__":
         description="Start a chat client.")
     parser.add_argument('--host', required=True, help='Hostname of the servers, e.g., localhost')
     parser.add_argument('--port', type=int, required=True, help='Port of the current leader')
+    parser.add_argument('--replicas', default="",
+                        help='Comma separated follower client addresses to read from')
+    parser.add_argument('--cache_dir', default=None,
+                        help='Directory to cache chats in, so that only new messages are downloaded')
 
     args = parser.parse_args()
     addresses = f"{args.host}:{args.port}"
+    read_addresses = [address for address in args.replicas.split(",") if address]
 
-    ChatClientGUI.run(addresses)
\ No newline at end of file
+    ChatClientGUI.run(addresses, read_addresses, args.cache_dir)
\ No newline at end of file
@@ -1,4 +1,5 @@
 from concurrent import futures
+from collections import deque
 import logging
 import uuid
 import queue
@@ -6,12 +7,13 @@ import queue
 import grpc
 import spec_pb2
 import spec_pb2_grpc
-from utils import StatusCode, StatusMessages
+from utils import StatusCode, StatusMessages, content_version
 
-from models import UserModel, MessageModel, DeletedMessageModel, init_db, get_session_factory
+from models import (UserModel, MessageModel, MessagePartitionModel, DeletedMessageModel, RevokedTokenModel,
+                    ReadMarkModel, init_db, get_session_factory)
 from sqlalchemy.orm import scoped_session
 from sqlalchemy import or_, and_
-from google.protobuf.timestamp_pb2 import Timestamp
+from sqlalchemy.exc import IntegrityError
 
 import pickle
 from sqlalchemy.orm import sessionmaker
@@ -20,20 +22,64 @@ import threading
 import time
 import queue
 from follower_server import *
+from election import election_state
+from replication import ReplicationTracker
+from compression import CLIENT_COMPRESSION, NONE, compress, negotiate
+from snapshot import backup_database, read_chunks
+from membership import membership
+from tokens import TokenUser, is_token
+from credentials import PasswordHasher, hash_password, needs_rehash
+from partitions import as_message, current_partition, message_models, models_for_ids
+from message_store import MessageStore, format_cursor, parse_cursor
+from read_marks import forget_reader, is_read, mark_read, read_marks, unread
+import os
+import tempfile
 import fnmatch
 
-import hashlib
 
-def hash_password(password):
-    """Hashes the given password using SHA-256.
+# Seconds a Send waits for the followers required by its write concern
+DEFAULT_WRITE_TIMEOUT = 2.0
+# Seconds a majority of followers may lag before Send is slowed down
+DEFAULT_MAX_REPLICATION_LAG = 10.0
+# Consecutive UNAVAILABLE errors after which a follower is dropped
+FOLLOWER_RETRY_THRESHOLD = 3
+# Seconds before an update a follower did not apply is sent again
+FOLLOWER_RETRY_DELAY = 0.2
+# Unread messages returned by GetMessages when the request sets no limit,
+# and the most it returns however large the limit
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def usernames(session, user_ids):
+    """Looks up the names of several users with one query.
+
+    Args:
+        session (Session): Session on the main database.
+        user_ids (Iterable[int]): IDs of the users.
+
+    Returns:
+        dict: User ID to username, for the users that exist.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return {}
+    return dict(session.query(UserModel.id, UserModel.username).filter(UserModel.id.in_(user_ids)).all())
+
+
+def message_columns(model):
+    """Returns the columns replies are built from, to query rows instead of ORM objects.
+
+    Rows have the same attribute names as the model, without the cost of
+    creating and tracking an object per message.
 
     Args:
-        password (str): The plain text password.
+        model (type): ``MessageModel`` or a partition model.
 
     Returns:
-        str: The hashed password.
+        tuple: Column attributes to pass to ``Session.query``.
     """
-    return hashlib.sha256(password.encode()).hexdigest()
+    return (model.id, model.sender_id, model.receiver_id, model.content, model.time_stamp)
 
 
 def fully_load(obj):
@@ -44,16 +90,238 @@ def fully_load(obj):
 
 class ClientService(spec_pb2_grpc.ClientAccountServicer):
 
-    def __init__(self, db_session, update_queue):
+    def __init__(self, db_session, update_queue, read_only=False, replication=None,
+                 write_concern=spec_pb2.WRITE_CONCERN_LEADER, write_timeout=DEFAULT_WRITE_TIMEOUT,
+                 max_replication_lag=DEFAULT_MAX_REPLICATION_LAG, tokens=None, hasher=None, shards=None,
+                 store=None):
         """Initializes the ClientService.
 
         Args:
             db_session (SessionFactory): SQLAlchemy session factory.
             update_queue (Queue): Queue to send update events to followers.
+            read_only (bool): Serve reads without modifying the database, as
+                done when a follower answers from its replica.
+            replication (ReplicationTracker, optional): Follower acknowledgements,
+                required for write concerns other than the leader alone.
+            write_concern (int): Default ``WriteConcern`` for Send requests
+                that do not set one.
+            write_timeout (float): Seconds a Send waits for its write concern.
+            max_replication_lag (float): Seconds a majority of the followers
+                may fall behind before Send is delayed, 0 disables it.
+            tokens (SessionTokens, optional): Issues signed session tokens on
+                login and verifies them without a database lookup. Without it
+                session IDs are looked up in the users table.
+            hasher (PasswordHasher, optional): Hashes and verifies passwords,
+                by default on the request thread.
+            shards (ShardMap, optional): Users of this shard and the leaders
+                of the others, if users are partitioned across leader groups.
+            store (MessageStore, optional): Files holding the messages, by
+                default the main database.
         """
         super().__init__()
         self.db_session = db_session
         self.update_queue = update_queue
+        self.read_only = read_only
+        self.replication = replication
+        self.write_concern = write_concern
+        self.write_timeout = write_timeout
+        self.max_replication_lag = max_replication_lag
+        self.tokens = tokens
+        self.hasher = hasher if hasher is not None else PasswordHasher(workers=0)
+        self.shards = shards
+        self.store = store if store is not None else MessageStore([db_session])
+
+    def authenticate(self, session, session_id):
+        """Resolves the user a request's session ID belongs to.
+
+        Signed tokens are checked locally, so a node can authenticate a login
+        it has not replicated yet. A rejected token does not fall back to the
+        users table, otherwise a revoked token would still be accepted.
+
+        Args:
+            session (Session): Database session for the lookup.
+            session_id (str): Session ID or token sent by the client.
+
+        Returns:
+            UserModel or TokenUser: The user, or None if not logged in.
+        """
+        if self.tokens is not None and is_token(session_id):
+            return self.tokens.verify(session_id)
+        if not session_id:
+            return None
+        return session.query(UserModel).filter_by(session_id=session_id).first()
+
+    def revoke(self, session, token_id=None, user_id=None, expires_at=None):
+        """Revokes a token, or all tokens of a user, on every node.
+
+        The revocation is stored in the replicated ``revoked_tokens`` table,
+        from which followers and later leaders rebuild their lists.
+
+        Args:
+            session (Session): Database session to store the revocation.
+            token_id (str, optional): ID of the token to revoke.
+            user_id (int, optional): User whose tokens are revoked.
+            expires_at (float, optional): Expiry of the revoked tokens,
+                the longest possible one if unset.
+        """
+        now = time.time()
+        record = RevokedTokenModel(token_id=token_id, user_id=user_id, revoked_at=now,
+                                   expires_at=expires_at or now + self.tokens.ttl)
+        session.add(record)
+        session.commit()
+        self.tokens.revocations.add(token_id, user_id, record.revoked_at, record.expires_at)
+
+        fully_load(record)
+        self.update_queue.put(pickle.dumps(('revoked_tokens', 'add', record)))
+
+    def wait_for_replication(self, position, write_concern):
+        """Blocks until an update satisfies the write concern.
+
+        Args:
+            position (int): Replication position of the update.
+            write_concern (int): Requested ``WriteConcern``, the server default
+                if unset.
+
+        Returns:
+            StatusCode: ``SUCCESS`` once enough followers applied the update,
+            ``NO_FOLLOWERS`` at once if one follower is required and there
+            is none, ``REPLICATION_TIMEOUT`` if the write timeout expired first.
+        """
+        write_concern = write_concern or self.write_concern
+        if write_concern == spec_pb2.WRITE_CONCERN_LEADER or self.replication is None:
+            return StatusCode.SUCCESS
+        acks = 1 if write_concern == spec_pb2.WRITE_CONCERN_ONE else None
+        if acks and self.replication.followers() == 0:
+            return StatusCode.NO_FOLLOWERS
+        if not self.replication.wait_for(position, acks, self.write_timeout):
+            return StatusCode.REPLICATION_TIMEOUT
+        return StatusCode.SUCCESS
+
+    def throttle_writes(self):
+        """Delays a write while a majority of the followers lags too far behind.
+
+        The delay is bounded by the write timeout, after which the write
+        proceeds, so a stalled follower slows clients down without blocking them.
+        """
+        if self.replication is None or not self.max_replication_lag:
+            return
+        if not self.replication.wait_for_lag(self.max_replication_lag, self.write_timeout):
+            print(f"[WARN] Followers lag more than {self.max_replication_lag}s behind")
+
+    def foreign(self, username):
+        """Checks whether a user belongs to another shard."""
+        return self.shards is not None and not self.shards.owns(username)
+
+    def shadow_user(self, session, username):
+        """Returns the local stand-in of a user of another shard, creating it if needed.
+
+        Messages exchanged with users of other shards refer to these rows.
+        Their password is empty, which never verifies.
+
+        Args:
+            session (Session): Database session.
+            username (str): Name of the user of another shard.
+
+        Returns:
+            UserModel: The stand-in.
+        """
+        user = session.query(UserModel).filter_by(username=username).first()
+        if user is None:
+            user = UserModel(username=username, password="")
+            session.add(user)
+            try:
+                session.commit()
+            except IntegrityError:
+                # created by a concurrent delivery
+                session.rollback()
+                return session.query(UserModel).filter_by(username=username).first()
+            fully_load(user)
+            self.update_queue.put(pickle.dumps(('users', 'add', user)))
+        return user
+
+    def store_message(self, session, sender_id, receiver_id, content, write_concern):
+        """Stores a message, replicates it and waits for the write concern.
+
+        Args:
+            session (Session): Session on the main database.
+            sender_id (int): Local ID of the sender.
+            receiver_id (int): Local ID of the receiver.
+            content (str): Text of the message.
+            write_concern (int): Requested ``WriteConcern``.
+
+        Returns:
+            tuple: Status code, status message and replication position.
+        """
+        index = self.store.file_of(receiver_id)
+        with self.store.session(index, session) as messages:
+            partition, created = current_partition(messages)
+            if created is not None:
+                # followers create the partition before its first message arrives
+                fully_load(created)
+                self.update_queue.put(pickle.dumps(('message_partitions', 'add', created, index)))
+
+            msg = partition(
+                sender_id=sender_id,
+                receiver_id=receiver_id,
+                content=content
+            )
+            messages.add(msg)
+            messages.commit()
+
+            # get added message
+            msg2 = messages.query(partition).filter_by(
+                id=msg.id).first()
+
+            fully_load(msg2)
+            update_info = pickle.dumps(('messages', "add", as_message(msg2)))
+
+        status_code = StatusCode.SUCCESS
+        status_message = "Message sent successfully!!"
+        position = 0
+        try:
+            position = self.update_queue.put(update_info)
+        except Exception as e:
+            print(e)
+
+        if position:
+            replicated = self.wait_for_replication(position, write_concern)
+            if replicated != StatusCode.SUCCESS:
+                status_code = replicated
+                status_message = StatusMessages.get_error_message(status_code)
+        return status_code, status_message, position
+
+    def send_to_shard(self, session, user, request):
+        """Sends a message to a user of another shard.
+
+        The receiver's shard stores the message first. Only then is the
+        sender's copy stored here, so that the sender's chat history holds
+        both directions.
+
+        Args:
+            session (Session): Database session.
+            user (UserModel or TokenUser): The sender.
+            request (SendRequest): The message.
+
+        Returns:
+            tuple: Status code, status message and replication position.
+        """
+        try:
+            response = self.shards.deliver(user.username, request.to, request.message, request.write_concern)
+        except grpc.RpcError as e:
+            print(f"[WARN] Delivery to the shard of {request.to} failed: {e.code()}")
+            status_code = StatusCode.SHARD_UNAVAILABLE
+            return status_code, StatusMessages.get_error_message(status_code), 0
+        # the receiver's shard stored the message even if it could not replicate it
+        if response.error_code not in (StatusCode.SUCCESS, StatusCode.REPLICATION_TIMEOUT,
+                                       StatusCode.NO_FOLLOWERS):
+            return response.error_code, response.error_message, 0
+
+        receiver = self.shadow_user(session, request.to)
+        status_code, status_message, position = self.store_message(
+            session, user.id, receiver.id, request.message, request.write_concern)
+        if response.error_code != StatusCode.SUCCESS:
+            return response.error_code, response.error_message, position
+        return status_code, status_message, position
 
     def CreateAccount(self, request, context):
         """Handles user account creation.
@@ -67,15 +335,19 @@ class ClientService(spec_pb2_grpc.ClientAccountServicer):
         """
         session = scoped_session(self.db_session)
         context.set_code(grpc.StatusCode.OK)
+        position = 0
 
         user_exists = session.query(UserModel).filter_by(
             username=request.username).scalar()
-        if user_exists:
+        if self.foreign(request.username):
+            status_code = StatusCode.WRONG_SHARD
+            status_message = StatusMessages.get_error_message(status_code)
+        elif user_exists:
             status_code = StatusCode.USER_NAME_EXISTS
             status_message = StatusMessages.get_error_message(status_code)
         else:
             # create a new user
-            hashed_password = hash_password(request.password)
+            hashed_password = self.hasher.hash(request.password)
             new_user = UserModel(username=request.username, password=hashed_password)
 
             session.add(new_user)
@@ -90,10 +362,10 @@ class ClientService(spec_pb2_grpc.ClientAccountServicer):
             fully_load(added_user)
             update_info = pickle.dumps(('users', 'add', added_user))
 
-            self.update_queue.put(update_info)
+            position = self.update_queue.put(update_info)
 
         session.remove()
-        return spec_pb2.ServerResponse(error_code=status_code, error_message=status_message)
+        return spec_pb2.ServerResponse(error_code=status_code, error_message=status_message, position=position)
 
     def Login(self, request, context):
         """Handles user login and session ID generation.
@@ -111,33 +383,49 @@ class ClientService(spec_pb2_grpc.ClientAccountServicer):
             username=request.username).first()
 
         session_id = None
-        if user is None:
+        position = 0
+        if self.foreign(request.username):
+            status_code = StatusCode.WRONG_SHARD
+            status_message = StatusMessages.get_error_message(status_code)
+        elif user is None:
             status_code = StatusCode.USER_DOESNT_EXIST
             status_message = StatusMessages.get_error_message(status_code)
         else:
-            if user.password != hash_password(request.password):
+            if not self.hasher.verify(request.password, user.password):
                 status_code = StatusCode.INCORRECT_PASSWORD
                 status_message = StatusMessages.get_error_message(status_code)
             else:
-                session_id = self.GenerateSessionID()
+                if needs_rehash(user.password):
+                    # replicated with the login below
+                    user.password = self.hasher.hash(request.password)
+                if self.tokens is not None:
+                    session_id = self.tokens.issue(user.id, user.username)
+                else:
+                    session_id = self.GenerateSessionID()
                 user.logged_in = True
                 user.session_id = session_id
                 session.commit()
 
                 fully_load(user)
                 update_info = pickle.dumps(('users', 'update', user))
-                self.update_queue.put(update_info)
+                position = self.update_queue.put(update_info)
 
 
                 status_code = StatusCode.SUCCESS
                 status_message = "Login successful!!"
                 session_id = session_id
 
-        return spec_pb2.ServerResponse(error_code=status_code, error_message=status_message, session_id=session_id)
+        session.remove()
+        return spec_pb2.ServerResponse(error_code=status_code, error_message=status_message,
+                                       session_id=session_id, position=position)
 
     def Send(self, request, context):
         """Handles sending a message from one user to another.
 
+        With a write concern other than the leader alone the response is held
+        back until enough followers acknowledged the message. Sends are also
+        slowed down while the followers lag too far behind.
+
         Args:
             request (SendRequest): gRPC request with message details.
             context (grpc.ServicerContext): gRPC context object.
@@ -146,15 +434,17 @@ class ClientService(spec_pb2_grpc.ClientAccountServicer):
             ServerResponse: Indicates whether the message was sent successfully.
         """
         context.set_code(grpc.StatusCode.OK)
+        position = 0
+        self.throttle_writes()
 
-        session_id = request.session_id
         session = scoped_session(self.db_session)
-        user = session.query(UserModel).filter_by(
-            session_id=session_id).first()
+        user = self.authenticate(session, request.session_id)
 
         if user is None:
             status_code = StatusCode.USER_NOT_LOGGED_IN
             status_message = StatusMessages.get_error_message(status_code)
+        elif self.foreign(request.to):
+            status_code, status_message, position = self.send_to_shard(session, user, request)
         else:
             receiver = session.query(UserModel).filter_by(
                 username=request.to).first()
@@ -163,31 +453,45 @@ class ClientService(spec_pb2_grpc.ClientAccountServicer):
                 status_code = StatusCode.RECEIVER_DOESNT_EXIST
                 status_message = StatusMessages.get_error_message(status_code)
             else:
-                msg = MessageModel(
-                    sender_id=user.id,
-                    receiver_id=receiver.id,
-                    content=request.message
-                )
-                session.add(msg)
-                session.commit()
-
-                status_code = StatusCode.SUCCESS
-                status_message = "Message sent successfully!!"
-                # breakpoint()
-                # get added message
-                msg2 = session.query(MessageModel).filter_by(
-                    id=msg.id).first()
-
-                fully_load(msg2)
-                update_info = pickle.dumps(('messages', "add", msg2))
-                try:
-                    self.update_queue.put(update_info)
-                except Exception as e:
-                    print(e)
+                status_code, status_message, position = self.store_message(
+                    session, user.id, receiver.id, request.message, request.write_concern)
         # Remove any remaining session
         session.remove()
-        return spec_pb2.ServerResponse(error_code=status_code, error_message=status_message)
+        return spec_pb2.ServerResponse(error_code=status_code, error_message=status_message, position=position)
+
+    def Deliver(self, request, context):
+        """Stores a message a user of another shard sent to a user of this one.
+
+        Called through ``LeaderService.Deliver`` by the sender's shard.
 
+        Args:
+            request (DeliverRequest): Sender, receiver and message.
+            context (grpc.ServicerContext): gRPC context object.
+
+        Returns:
+            ServerResponse: Indicates whether the message was stored.
+        """
+        context.set_code(grpc.StatusCode.OK)
+        position = 0
+        self.throttle_writes()
+
+        session = scoped_session(self.db_session)
+        receiver = session.query(UserModel).filter_by(
+            username=request.receiver).first()
+
+        if self.foreign(request.receiver):
+            status_code = StatusCode.WRONG_SHARD
+            status_message = StatusMessages.get_error_message(status_code)
+        elif receiver is None:
+            status_code = StatusCode.RECEIVER_DOESNT_EXIST
+            status_message = StatusMessages.get_error_message(status_code)
+        else:
+            sender = self.shadow_user(session, request.sender)
+            status_code, status_message, position = self.store_message(
+                session, sender.id, receiver.id, request.message, request.write_concern)
+
+        session.remove()
+        return spec_pb2.ServerResponse(error_code=status_code, error_message=status_message, position=position)
 
     def ListUsers(self, request, context):
         """Returns a list of users matching the optional wildcard.
@@ -200,19 +504,31 @@ class ClientService(spec_pb2_grpc.ClientAccountServicer):
             Users: A list of users and their online statuses.
         """
         context.set_code(grpc.StatusCode.OK)
-        users = spec_pb2.Users()
         pattern = request.wildcard if request.wildcard else "*"
 
         session = scoped_session(self.db_session)
-        all_users = session.query(UserModel).all()
+        users = self.list_users(session, pattern)
+        session.remove()
+        return users
 
-        for user in all_users:
+    def list_users(self, session, pattern="*"):
+        """Lists the users of this shard whose names match a wildcard.
+
+        Args:
+            session (Session): Session of the main database.
+            pattern (str): Case-insensitive ``fnmatch`` pattern.
+
+        Returns:
+            Users: The users and their online statuses.
+        """
+        users = spec_pb2.Users()
+        for user in session.query(UserModel).all():
+            if self.foreign(user.username):
+                continue  # stand-in, listed by its own shard
             if fnmatch.fnmatch(user.username.lower(), pattern.lower()):
                 user_ = users.user.add()
                 user_.username = user.username
                 user_.status = "online" if user.logged_in else "offline"
-
-        session.remove()
         return users
     
     
@@ -227,40 +543,52 @@ class ClientService(spec_pb2_grpc.ClientAccountServicer):
             ServerResponse: Indicates success or failure.
         """
         session = scoped_session(self.db_session)
-        user = session.query(UserModel).filter_by(session_id=request.session_id).first()
+        user = self.authenticate(session, request.session_id)
+        position = 0
 
         if not user:
             status_code = StatusCode.USER_NOT_LOGGED_IN
             status_message = StatusMessages.get_error_message(status_code)
         else:
             try:
-                messages_to_delete = session.query(MessageModel).filter(
-                    MessageModel.id.in_(request.message_ids),
-                    or_(
-                        MessageModel.sender_id == user.id,
-                        MessageModel.receiver_id == user.id
-                    )
-                ).all()
-
-                for message in messages_to_delete:
-                    # move to deleted messages table
-                    deleted = DeletedMessageModel(
-                        sender_id=message.sender_id,
-                        receiver_id=message.receiver_id,
-                        content=message.content,
-                        is_received=message.is_received,
-                        original_message_id=message.id
-                    )
-                    session.add(deleted)
-                    session.delete(message)
+                deleted_count = 0
+                for index, local_ids in self.store.group_ids(request.message_ids).items():
+                    with self.store.session(index, session) as messages:
+                        messages_to_delete = []
+                        for partition, message_ids in models_for_ids(messages, local_ids).items():
+                            messages_to_delete += messages.query(partition).filter(
+                                partition.id.in_(message_ids),
+                                or_(
+                                    partition.sender_id == user.id,
+                                    partition.receiver_id == user.id
+                                )
+                            ).all()
+
+                        marks = read_marks(messages, [message.receiver_id for message in messages_to_delete])
+                        for message in messages_to_delete:
+                            # move to deleted messages table
+                            deleted = DeletedMessageModel(
+                                sender_id=message.sender_id,
+                                receiver_id=message.receiver_id,
+                                content=message.content,
+                                is_received=is_read(marks, message),
+                                original_message_id=self.store.global_id(index, message.id)
+                            )
+                            session.add(deleted)
+                            messages.delete(message)
+
+                            # propagate deletion to followers
+                            update_info = pickle.dumps(('messages', 'delete', as_message(message)))
+                            position = self.update_queue.put(update_info)
+
+                        # the archived copy is committed first, a failure in
+                        # between leaves the message in place
+                        session.commit()
+                        messages.commit()
+                        deleted_count += len(messages_to_delete)
 
-                    # propagate deletion to followers
-                    update_info = pickle.dumps(('messages', 'delete', message))
-                    self.update_queue.put(update_info)
-
-                session.commit()
                 status_code = StatusCode.SUCCESS
-                status_message = f"{len(messages_to_delete)} message(s) deleted successfully."
+                status_message = f"{deleted_count} message(s) deleted successfully."
 
             except Exception as e:
                 session.rollback()
@@ -268,26 +596,32 @@ class ClientService(spec_pb2_grpc.ClientAccountServicer):
                 status_message = str(e)
 
         session.remove()
-        return spec_pb2.ServerResponse(error_code=status_code, error_message=status_message)
+        return spec_pb2.ServerResponse(error_code=status_code, error_message=status_message, position=position)
 
 
     def GetMessages(self, request, context):
-        """Fetches unread messages for the logged-in user.
+        """Fetches a page of unread messages for the logged-in user.
+
+        Messages come oldest first, at most ``request.limit`` of them. If
+        more are unread, the response carries a cursor that continues after
+        this page. Messages stay unread until the client passes their IDs
+        to ``AcknowledgeReceivedMessages``, so a page lost on the way is
+        sent again.
 
         Args:
-            request (ReceiveRequest): Request with session ID.
+            request (ReceiveRequest): Request with session ID, page size and
+                the cursor of the previous page.
             context (grpc.ServicerContext): gRPC context object.
 
         Returns:
-            Messages: List of unread messages.
+            Messages: A page of unread messages and the cursor of the next.
         """
         context.set_code(grpc.StatusCode.OK)
 
         msgs = spec_pb2.Messages()
 
         session = scoped_session(self.db_session)
-        user = session.query(UserModel).filter_by(
-            session_id=request.session_id).first()
+        user = self.authenticate(session, request.session_id)
 
         if not user:
             msgs.error_code = StatusCode.USER_NOT_LOGGED_IN
@@ -295,25 +629,39 @@ class ClientService(spec_pb2_grpc.ClientAccountServicer):
                 msgs.error_code)
         else:
 
-            messages = session.query(MessageModel).filter(
-                and_(MessageModel.receiver_id == user.id, MessageModel.is_received == False)).all()
-
-            if len(messages) == 0:
-                msgs.error_code = StatusCode.NO_MESSAGES
-                msgs.error_message = StatusMessages.get_error_message(
-                    msgs.error_code)
-            else:
-                for message in messages:
-                    # print(message.is_received)
-                    msg = msgs.message.add()
-                    msg.from_ = message.sender.username
-                    msg.message = message.content
-                    msg.message_id = message.id
-                    message.is_received = True
-
-                session.commit()
-                msgs.error_code = StatusCode.SUCCESS
-                msgs.error_message = "Messages received successfully!!"
+            # a user's messages are all in one file
+            index = self.store.file_of(user.id)
+            limit = min(request.limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+            after = parse_cursor(request.cursor).get(index, 0) if request.cursor else 0
+            with self.store.session(index, session) as messages_session:
+                # partitions hold increasing ID ranges, so this is ID order;
+                # one message more than the page tells whether another follows
+                messages = []
+                for partition in message_models(messages_session):
+                    query = unread(messages_session.query(*message_columns(partition)), partition, user.id)
+                    messages += query.filter(
+                        partition.id > after
+                    ).order_by(partition.id).limit(limit + 1 - len(messages)).all()
+                    if len(messages) > limit:
+                        break
+
+                if len(messages) == 0:
+                    msgs.error_code = StatusCode.NO_MESSAGES
+                    msgs.error_message = StatusMessages.get_error_message(
+                        msgs.error_code)
+                else:
+                    if len(messages) > limit:
+                        messages = messages[:limit]
+                        msgs.cursor = format_cursor({index: messages[-1].id})
+                    names = usernames(session, [message.sender_id for message in messages])
+                    for message in messages:
+                        msg = msgs.message.add()
+                        msg.from_ = names[message.sender_id]
+                        msg.message = message.content
+                        msg.message_id = self.store.global_id(index, message.id)
+
+                    msgs.error_code = StatusCode.SUCCESS
+                    msgs.error_message = "Messages received successfully!!"
 
         session.remove()
 
@@ -322,6 +670,10 @@ class ClientService(spec_pb2_grpc.ClientAccountServicer):
     def AcknowledgeReceivedMessages(self, request, context):
         """Marks messages as received by their IDs.
 
+        Read state is a mark per sender, so acknowledging a message also
+        marks the earlier messages from its sender as received. Pages of
+        ``GetMessages`` come oldest first, so those were delivered before.
+
         Args:
             request (AcknowledgeReceivedMessagesRequest): Message IDs to mark.
             context (grpc.ServicerContext): gRPC context object.
@@ -329,29 +681,42 @@ class ClientService(spec_pb2_grpc.ClientAccountServicer):
         Returns:
             ServerResponse: Acknowledgement result.
         """
+        from sqlalchemy import func
+
         session = scoped_session(self.db_session)
-        user = session.query(UserModel).filter_by(
-            session_id=request.session_id).first()
+        user = self.authenticate(session, request.session_id)
+        position = 0
 
         if user is None:
             status_code = StatusCode.USER_NOT_LOGGED_IN
             status_message = StatusMessages.get_error_message(status_code)
         else:
-            messages = session.query(MessageModel).filter(
-                MessageModel.id.in_(request.message_ids),
-                MessageModel.receiver_id == user.id
-            ).all()
-
-            for message in messages:
-                message.is_received = True
-
-            session.commit()
+            index = self.store.file_of(user.id)
+            local_ids = self.store.group_ids(request.message_ids).get(index, [])
+            with self.store.session(index, session) as messages_session:
+                # the newest acknowledged message from each sender
+                latest = {}
+                for partition, message_ids in models_for_ids(messages_session, local_ids).items():
+                    for sender_id, message_id in messages_session.query(
+                        partition.sender_id, func.max(partition.id)
+                    ).filter(
+                        partition.id.in_(message_ids),
+                        partition.receiver_id == user.id
+                    ).group_by(partition.sender_id).all():
+                        latest[sender_id] = max(latest.get(sender_id, 0), message_id)
+
+                marks = [mark_read(messages_session, user.id, sender_id, message_id)
+                         for sender_id, message_id in latest.items()]
+                messages_session.commit()
+            for mark in marks:
+                if mark is not None:
+                    position = self.update_queue.put(pickle.dumps(('read_marks', 'update', mark, index)))
             status_code = StatusCode.SUCCESS
             status_message = "Messages acknowledged successfully!!"
 
         session.remove()
 
-        return spec_pb2.ServerResponse(error_code=status_code, error_message=status_message)
+        return spec_pb2.ServerResponse(error_code=status_code, error_message=status_message, position=position)
 
     def Logout(self, request, context):
         """Logs out the current user.
@@ -364,40 +729,53 @@ class ClientService(spec_pb2_grpc.ClientAccountServicer):
             ServerResponse: Logout result.
         """
         session = scoped_session(self.db_session)
-        user = session.query(UserModel).filter_by(
-            session_id=request.session_id).first()
+        user = self.authenticate(session, request.session_id)
 
+        position = 0
         if user is None:
             status = StatusCode.USER_NOT_LOGGED_IN
             status_message = StatusMessages.get_error_message(status)
         else:
+            if isinstance(user, TokenUser):
+                self.revoke(session, token_id=user.token_id, expires_at=user.expires_at)
+                user = session.get(UserModel, user.id)
             user.session_id = None
             user.logged_in = False
             session.commit()
+
+            # followers authenticate reads, so they must drop the session too
+            fully_load(user)
+            update_info = pickle.dumps(('users', 'update', user))
+            position = self.update_queue.put(update_info)
+
             status = StatusCode.SUCCESS
             status_message = "Logout successful!!"
 
         session.remove()
 
-        return spec_pb2.ServerResponse(error_code=status, error_message=status_message)
+        return spec_pb2.ServerResponse(error_code=status, error_message=status_message, position=position)
 
     def GetChat(self, request, context):
         """Returns full chat history between current user and another user.
 
+        With a cursor from an earlier call only the messages added since are
+        returned, together with the IDs of every message still in the chat
+        so that the client can drop deleted ones.
+
         Args:
-            request (ChatRequest): Includes session ID and target username.
+            request (ChatRequest): Includes session ID, target username and
+                optionally the cursor of the last sync.
             context (grpc.ServicerContext): gRPC context object.
 
         Returns:
-            Messages: List of messages with timestamps.
+            Messages: List of messages with timestamps and the new cursor.
         """
         context.set_code(grpc.StatusCode.OK)
 
         msgs = spec_pb2.Messages()
 
         session = scoped_session(self.db_session)
-        user = session.query(UserModel).filter_by(
-            session_id=request.session_id).first()
+        user = self.authenticate(session, request.session_id)
 
         if user is None:
             msgs.error_code = StatusCode.USER_NOT_LOGGED_IN
@@ -406,130 +784,303 @@ class ClientService(spec_pb2_grpc.ClientAccountServicer):
             session.remove()
             return msgs
 
+        msgs = self.chat(session, user, request.username, request.cursor, request.known_count)
+        session.remove()
+        return msgs
+
+    def chat(self, session, user, username, cursor="", known_count=0):
+        """Reads the chat between a user and another user.
+
+        With a cursor, the server counts its messages up to the cursor. Only
+        if that differs from ``known_count`` were messages deleted, and only
+        then are the IDs of the whole chat listed.
+
+        Args:
+            session (Session): Session of the main database.
+            user (UserModel): The calling user.
+            username (str): Name of the chat partner.
+            cursor (str): Cursor of the last sync, empty for the whole chat.
+            known_count (int): Number of messages the client holds, with ``cursor``.
+
+        Returns:
+            Messages: The messages, or only those added since ``cursor``
+            together with the IDs of every message in the chat if some of
+            the older ones were deleted.
+        """
+        from sqlalchemy import func
+        msgs = spec_pb2.Messages()
         receiver = session.query(UserModel).filter_by(
-            username=request.username).first()
+            username=username).first()
 
         if receiver is None:
-            msgs.error_code = StatusCode.USER_DOESNT_EXIST
+            # users of other shards only have a stand-in here once they
+            # exchanged messages with a user of this shard
+            msgs.error_code = StatusCode.NO_MESSAGES if self.foreign(username) \
+                else StatusCode.USER_DOESNT_EXIST
             msgs.error_message = StatusMessages.get_error_message(
                 msgs.error_code)
-            session.remove()
             return msgs
 
-        messages = session.query(MessageModel).filter(
-            or_(
-                and_(MessageModel.sender_id == user.id,
-                    MessageModel.receiver_id == receiver.id),
-                and_(MessageModel.sender_id == receiver.id,
-                    MessageModel.receiver_id == user.id)
+        def in_chat(partition):
+            return or_(
+                and_(partition.sender_id == user.id,
+                    partition.receiver_id == receiver.id),
+                and_(partition.sender_id == receiver.id,
+                    partition.receiver_id == user.id)
             )
-        ).order_by(MessageModel.time_stamp).all()
 
-        if len(messages) == 0:
+        # each direction is stored in the receiver's file
+        indexes = sorted({self.store.file_of(user.id), self.store.file_of(receiver.id)})
+        names = {user.id: user.username, receiver.id: receiver.username}
+        marks = parse_cursor(cursor) if cursor else {}
+        held = 0
+        for index in indexes:
+            mark, latest = marks.get(index, 0), 0
+            with self.store.session(index, session) as messages_session:
+                # partitions are in time order, so the concatenation is too;
+                # plain rows, as ORM objects would cost more than the query
+                messages = []
+                for partition in message_models(messages_session):
+                    messages += messages_session.query(*message_columns(partition)).filter(
+                        in_chat(partition), partition.id > mark
+                    ).order_by(partition.time_stamp).all()
+                    if cursor:
+                        # one row per partition instead of every ID in the chat
+                        count, highest = messages_session.query(
+                            func.count(partition.id), func.max(partition.id)
+                        ).filter(in_chat(partition), partition.id <= mark).one()
+                        held += count
+                        latest = max(latest, highest or 0)
+
+                for message in messages:
+                    latest = max(latest, message.id)
+                    msg = msgs.message.add()
+                    msg.from_ = names[message.sender_id]
+                    msg.message = message.content
+                    msg.message_id = self.store.global_id(index, message.id)
+                    msg.time_stamp.FromDatetime(message.time_stamp)
+
+                # the user's file holds the messages the user received, which
+                # are now read up to the newest message of the chat
+                read = None
+                if not self.read_only and latest and index == self.store.file_of(user.id):
+                    read = mark_read(messages_session, user.id, receiver.id, latest)
+                messages_session.commit()
+            if read is not None:
+                self.update_queue.put(pickle.dumps(('read_marks', 'update', read, index)))
+            # what this server holds, a replica behind the cursor hands out
+            # an older one and the client fetches the difference later
+            marks[index] = latest
+
+        if cursor and held != known_count:
+            # messages up to the cursor were deleted, the client drops the
+            # cached ones missing from the list
+            for index in indexes:
+                with self.store.session(index, session) as messages_session:
+                    for partition in message_models(messages_session):
+                        for message_id, in messages_session.query(partition.id).filter(in_chat(partition)).all():
+                            msgs.message_ids.append(self.store.global_id(index, message_id))
+
+        msgs.cursor = format_cursor({index: marks[index] for index in indexes})
+        if len(indexes) > 1:
+            # merge both directions, the sort is stable for equal times
+            merged = sorted(msgs.message, key=lambda m: m.time_stamp.ToNanoseconds())
+            del msgs.message[:]
+            msgs.message.extend(merged)
+
+        if len(msgs.message) == 0 and len(msgs.message_ids) == 0 and held == 0:
             msgs.error_code = StatusCode.NO_MESSAGES
             msgs.error_message = StatusMessages.get_error_message(
                 msgs.error_code)
         else:
-            for message in messages:
-                msg = msgs.message.add()
-                msg.from_ = message.sender.username
-                msg.message = message.content
-                msg.message_id = message.id
-                timestamp_proto = Timestamp()
-                timestamp_proto.FromDatetime(message.time_stamp)
-                msg.time_stamp.CopyFrom(timestamp_proto)
-
-                # Mark as received if the current user is the recipient
-                if message.receiver_id == user.id:
-                    message.is_received = True
-
-            session.commit()
             msgs.error_code = StatusCode.SUCCESS
             msgs.error_message = "Messages received successfully!!"
-
-        session.remove()
         return msgs
     
 
     def GetUnreadCounts(self, request, context):
         """Returns unread message count per sender without marking them as read."""
-        from spec_pb2 import UnreadSummary, UnreadCount
-
-        summary = UnreadSummary()
         session = scoped_session(self.db_session)
 
-        user = session.query(UserModel).filter_by(session_id=request.session_id).first()
+        user = self.authenticate(session, request.session_id)
         if not user:
+            summary = spec_pb2.UnreadSummary()
             summary.error_code = StatusCode.USER_NOT_LOGGED_IN
             summary.error_message = StatusMessages.get_error_message(summary.error_code)
             session.remove()
             return summary
 
-        from sqlalchemy import func
-        results = session.query(
-            UserModel.username,
-            func.count(MessageModel.id)
-        ).join(UserModel, UserModel.id == MessageModel.sender_id
-        ).filter(
-            MessageModel.receiver_id == user.id,
-            MessageModel.sender_id != user.id,  # exclude self-messages
-            MessageModel.is_received == False
-        ).group_by(UserModel.username).all()
+        summary = self.unread_counts(session, user)
+        session.remove()
+        return summary
 
+    def unread_counts(self, session, user):
+        """Counts the unread messages of a user per sender.
 
-        for sender, count in results:
-            summary.counts.append(UnreadCount(**{"from": sender, "count": count}))
+        Args:
+            session (Session): Session of the main database.
+            user (UserModel): The receiving user.
+
+        Returns:
+            UnreadSummary: Counts by sender name, in name order.
+        """
+        from spec_pb2 import UnreadSummary, UnreadCount
+        from sqlalchemy import func
+
+        summary = UnreadSummary()
+        totals = {}
+        with self.store.session(self.store.file_of(user.id), session) as messages_session:
+            for partition in message_models(messages_session):
+                # a range count above the mark of each sender
+                results = unread(messages_session.query(
+                    partition.sender_id,
+                    func.count(partition.id)
+                ), partition, user.id).filter(
+                    partition.sender_id != user.id  # exclude self-messages
+                ).group_by(partition.sender_id).all()
+                for sender_id, count in results:
+                    totals[sender_id] = totals.get(sender_id, 0) + count
+
+        # the users are in the main database, which may be another file
+        names = usernames(session, totals)
+        # sorted, so that unchanged counts give the same SyncState version
+        for sender_id, count in sorted(totals.items(), key=lambda item: names.get(item[0], "")):
+            if sender_id in names:
+                summary.counts.append(UnreadCount(**{"from": names[sender_id], "count": count}))
 
         summary.error_code = StatusCode.SUCCESS
         summary.error_message = "Unread counts fetched."
-        session.remove()
         return summary
 
+    def SyncState(self, request, context):
+        """Returns the user list, unread counts and open chat, each only if it changed.
+
+        The user list and unread counts come with a version, a digest of
+        their content, and are left out if the client sent the same
+        version. The chat is synced with ``GetChat``'s cursor and left out
+        if no message was added and the IDs of the chat have the version
+        the client sent. One authentication serves all three.
+
+        Args:
+            request (SyncStateRequest): Session ID and the versions of the last sync.
+            context (grpc.ServicerContext): gRPC context object.
+
+        Returns:
+            SyncStateResponse: The changed sections, with ``NOT_MODIFIED`` if
+            none changed.
+        """
+        context.set_code(grpc.StatusCode.OK)
+        response = spec_pb2.SyncStateResponse()
+
+        session = scoped_session(self.db_session)
+        user = self.authenticate(session, request.session_id)
+        if user is None:
+            response.error_code = StatusCode.USER_NOT_LOGGED_IN
+            response.error_message = StatusMessages.get_error_message(response.error_code)
+            session.remove()
+            return response
+
+        if not request.skip_users:
+            users = self.list_users(session)
+            response.users_version = content_version(users.SerializeToString(deterministic=True))
+            if response.users_version != request.users_version:
+                response.users.CopyFrom(users)
+
+        # before the counts, which drop the messages the chat marked as read
+        if request.chat_with:
+            chat = self.chat(session, user, request.chat_with, request.chat_cursor,
+                             request.chat_known_count)
+            if request.chat_cursor:
+                # without IDs the client's messages up to the cursor are current
+                unchanged = not chat.message and not chat.message_ids \
+                    and (chat.error_code == StatusCode.SUCCESS
+                         or chat.error_code == StatusCode.NO_MESSAGES and request.chat_known_count == 0)
+            else:
+                # a client without a cache gets the whole chat, but only when it changed
+                response.chat_version = content_version(chat.SerializeToString(deterministic=True))
+                unchanged = response.chat_version == request.chat_version
+            if not unchanged:
+                response.chat.CopyFrom(chat)
+
+        unread = self.unread_counts(session, user)
+        response.unread_version = content_version(unread.SerializeToString(deterministic=True))
+        if response.unread_version != request.unread_version:
+            response.unread.CopyFrom(unread)
+        session.remove()
+
+        modified = response.HasField("users") or response.HasField("unread") or response.HasField("chat")
+        response.error_code = StatusCode.SUCCESS if modified else StatusCode.NOT_MODIFIED
+        response.error_message = StatusMessages.get_error_message(response.error_code)
+        return response
+
 
     def DeleteAccount(self, request, context):
         """Deletes the current user's account and related messages.
 
         Args:
-            request (DeleteAccountRequest): Request with session ID.
+            request (DeleteAccountRequest): Request with session ID and,
+                optionally, the password to confirm.
             context (grpc.ServicerContext): gRPC context object.
 
         Returns:
             ServerResponse: Result of the deletion.
         """
         session = scoped_session(self.db_session)
-        user = session.query(UserModel).filter_by(
-            session_id=request.session_id).first()
+        user = self.authenticate(session, request.session_id)
+        if isinstance(user, TokenUser):
+            user = session.get(UserModel, user.id)
+        position = 0
 
         if user is None:
             status_code = StatusCode.USER_NOT_LOGGED_IN
             status_message = StatusMessages.get_error_message(status_code)
+        elif request.password and not self.hasher.verify(request.password, user.password):
+            status_code = StatusCode.INCORRECT_PASSWORD
+            status_message = StatusMessages.get_error_message(status_code)
         else:
-            # Move user's messages to deleted_messages table
-            messages_to_delete = session.query(MessageModel).filter(
-                MessageModel.receiver_id == user.id
-            ).all()
-
-            for message in messages_to_delete:
-                deleted_message = DeletedMessageModel(
-                    sender_id=message.sender_id,
-                    receiver_id=message.receiver_id,
-                    content=message.content,
-                    is_received=message.is_received,
-                    original_message_id=message.id,
-                )
-                session.add(deleted_message)
-                session.delete(message)
+            if self.tokens is not None:
+                # tokens issued to the account stay valid until they expire
+                self.revoke(session, user_id=user.id)
 
-            # Delete user
-            session.delete(user)
-            session.commit()
+            # Move user's messages to deleted_messages table
+            index = self.store.file_of(user.id)
+            with self.store.session(index, session) as messages_session:
+                messages_to_delete = []
+                for partition in message_models(messages_session):
+                    messages_to_delete += messages_session.query(partition).filter(
+                        partition.receiver_id == user.id
+                    ).all()
+
+                marks = read_marks(messages_session, [user.id])
+                for message in messages_to_delete:
+                    deleted_message = DeletedMessageModel(
+                        sender_id=message.sender_id,
+                        receiver_id=message.receiver_id,
+                        content=message.content,
+                        is_received=is_read(marks, message),
+                        original_message_id=self.store.global_id(index, message.id),
+                    )
+                    session.add(deleted_message)
+                    messages_session.delete(message)
+                    self.update_queue.put(pickle.dumps(('messages', 'delete', as_message(message))))
+                for mark in forget_reader(messages_session, user.id):
+                    fully_load(mark)
+                    self.update_queue.put(pickle.dumps(('read_marks', 'delete', mark, index)))
+
+                # Delete user
+                fully_load(user)
+                update_info = pickle.dumps(('users', 'delete', user))
+                session.delete(user)
+                session.commit()
+                messages_session.commit()
+            position = self.update_queue.put(update_info)
 
             status_code = StatusCode.SUCCESS
             status_message = "Account deleted successfully!!"
 
         session.remove()
 
-        return spec_pb2.ServerResponse(error_code=status_code, error_message=status_message)
+        return spec_pb2.ServerResponse(error_code=status_code, error_message=status_message, position=position)
 
     @staticmethod
     def GenerateSessionID():
@@ -542,14 +1093,17 @@ class ClientService(spec_pb2_grpc.ClientAccountServicer):
         return str(uuid.uuid4())
 
 
-def fetch_all_data_from_orm(connection):
+def fetch_all_data_from_orm(connection, store=None):
     """Fetches all ORM table data into a dictionary.
 
     Args:
         connection (sqlalchemy.engine.Connection): Database connection.
+        store (MessageStore, optional): Message files, if the messages are
+            not kept in the main database.
 
     Returns:
-        dict: A mapping of table names to ORM objects.
+        dict: A mapping of table names to ORM objects. With several message
+        files, ``message_files`` holds the partitions and messages of each.
     """
     data = {}
     Session = sessionmaker(bind=connection)
@@ -557,17 +1111,82 @@ def fetch_all_data_from_orm(connection):
 
     # Get the list of classes defined in your ORM
     # Replace with your actual ORM classes
-    orm_classes = [UserModel, MessageModel, DeletedMessageModel]
+    orm_classes = [UserModel, MessagePartitionModel, DeletedMessageModel, RevokedTokenModel, ReadMarkModel]
 
     for orm_class in orm_classes:
         table_name = orm_class.__tablename__
         table_data = session.query(orm_class).all()
         data[table_name] = table_data
 
+    # every partition is shipped as plain messages, routed by ID on load
+    data['messages'] = [as_message(row) for partition in message_models(session)
+                        for row in session.query(partition).all()]
+
+    if store is not None and not store.shared:
+        data['message_files'] = []
+        for index in range(store.count):
+            with store.session(index) as messages:
+                data['message_files'].append({
+                    'message_partitions': messages.query(MessagePartitionModel).all(),
+                    'messages': [as_message(row) for partition in message_models(messages)
+                                 for row in messages.query(partition).all()],
+                    'read_marks': messages.query(ReadMarkModel).all()
+                })
+
     session.close()
     return data
 
 
+def current_position(state):
+    """Returns the latest replication position assigned by a leader.
+
+    Args:
+        state (dict): Leader state dictionary.
+
+    Returns:
+        int: Position of the most recent update, 0 if none were made.
+    """
+    return getattr(state.get('update_queue'), 'position', 0)
+
+
+def replication_tracker(state):
+    """Returns the follower acknowledgement tracker of a leader.
+
+    Args:
+        state (dict): Leader state dictionary.
+
+    Returns:
+        ReplicationTracker: Tracker stored in the state, created on first use.
+    """
+    return state.setdefault('replication_tracker', ReplicationTracker())
+
+
+def membership_view(state):
+    """Returns the leader's follower list as a message.
+
+    Args:
+        state (dict): Leader state dictionary.
+
+    Returns:
+        MembershipView: Current versioned follower list.
+    """
+    term, version, members = membership(state).view()
+    return spec_pb2.MembershipView(term=term, version=version, members=[
+        spec_pb2.Member(id=follower_id, address=address) for follower_id, address in members])
+
+
+def follower_codecs(state):
+    """Returns the compression codec negotiated with each follower.
+
+    Args:
+        state (dict): Leader state dictionary.
+
+    Returns:
+        dict: Follower ID to codec name, filled in on registration.
+    """
+    return state.setdefault('follower_codecs', {})
+
+
 class LeaderService(spec_pb2_grpc.LeaderServiceServicer):
     def __init__(self, states, db_engine):
         """Initializes the leader service with server state and DB engine.
@@ -583,41 +1202,88 @@ class LeaderService(spec_pb2_grpc.LeaderServiceServicer):
     def RegisterFollower(self, request, context):
         """Registers a follower and returns the current database snapshot.
 
+        A follower asking for ``snapshot_file`` that cannot catch up
+        incrementally is not registered yet. It is told to fetch
+        ``StreamSnapshot`` and to register again from the copied position.
+
         Args:
             request (RegisterFollowerRequest): Follower ID and address.
             context (grpc.ServicerContext): gRPC context.
 
         Returns:
-            RegisterFollowerResponse: Serialized DB and known followers.
+            RegisterFollowerResponse: Serialized DB, or the missing updates
+            if the follower can catch up incrementally, and known followers.
         """
         follower_id = request.follower_id
         follower_address = request.follower_address
-        if (follower_id, follower_address) not in self.states['followers']:
-            self.states['followers'].append((follower_id, follower_address))
-
-        # Fetch and pickle the data from ORM objects
-        with self.db_engine.begin() as connection:
-            # Implement this function to fetch data from ORM objects
-            data = fetch_all_data_from_orm(connection)
-            pickled_data = pickle.dumps(data)
+        update_queue = self.states.get('update_queue')
+        entries_since = getattr(update_queue, 'entries_since', None)
+        log_id = getattr(update_queue, 'log_id', "")
+
+        def missing_entries():
+            if entries_since is None:
+                return None
+            return entries_since(request.applied_position, request.log_id)
+
+        # the file copy only covers the main database, not separate message files
+        store = self.states.get('message_store')
+        file_copy = request.snapshot_file and (store is None or store.shared)
+        if file_copy and missing_entries() is None:
+            # The follower installs a copy of our database file before it is
+            # listed, so no update reaches the database it is about to replace
+            return spec_pb2.RegisterFollowerResponse(
+                error_code=0, error_message="", snapshot_file=True, log_id=log_id,
+                position=current_position(self.states), term=election_state(self.states).term)
+
+        # chosen before the follower is listed so its sender already uses it
+        codec = negotiate(request.compression)
+        follower_codecs(self.states)[follower_id] = codec
+        # the other followers learn about it from their senders' next push
+        membership(self.states).add((follower_id, follower_address), election_state(self.states).term)
+
+        # Read the position first: updates racing with the snapshot are
+        # re-sent to the new follower rather than lost
+        position = current_position(self.states)
+
+        # A follower that already holds a prefix of our log only needs the
+        # updates it is missing, e.g. after a failover
+        entries = missing_entries()
+        if entries is not None:
+            pickled_data = b""
+            updates = []
+            for update_position, update_data in entries:
+                update_data, update_codec = compress(update_data, codec)
+                updates.append(spec_pb2.AcceptUpdatesRequest(
+                    update_data=update_data, position=update_position, leader_position=position,
+                    compression=update_codec))
+            print(f"[INFO] Catching up follower {follower_id} with {len(updates)} updates")
+        else:
+            updates = []
+            # Fetch and pickle the data from ORM objects
+            with self.db_engine.begin() as connection:
+                # Implement this function to fetch data from ORM objects
+                data = fetch_all_data_from_orm(connection, self.states.get('message_store'))
+                pickled_data = pickle.dumps(data)
+            raw_size = len(pickled_data)
+            pickled_data, codec = compress(pickled_data, codec)
+            print(f"[INFO] Sending snapshot of {len(pickled_data)} bytes ({raw_size} uncompressed) "
+                  f"to follower {follower_id}")
 
         other_followers = [
             f"{follower[0]}-{follower[1]}" for follower in self.states['followers'] if follower[0] != follower_id]
-        # inform other followers about this new follower
-        for follower in other_followers:
-            saddress = follower.split("-")[1]
-            with grpc.insecure_channel(saddress) as channel:
-                stub = spec_pb2_grpc.FollowerServiceStub(channel)
-                # print(channel, stub)
-                stub.UpdateFollowers(spec_pb2.UpdateFollowersRequest(
-                    update_data=pickle.dumps((follower_id, follower_address))
-                ))
 
         response = spec_pb2.RegisterFollowerResponse(
             error_code=0,
             error_message="",
             pickled_db=pickled_data,
-            other_followers=other_followers
+            other_followers=other_followers,
+            position=position,
+            term=election_state(self.states).term,
+            incremental=entries is not None,
+            updates=updates,
+            compression=codec,
+            log_id=log_id,
+            membership=membership_view(self.states)
         )
         return response
 
@@ -629,9 +1295,30 @@ class LeaderService(spec_pb2_grpc.LeaderServiceServicer):
             context (grpc.ServicerContext): gRPC context.
 
         Returns:
-            Ack: Acknowledgment response.
+            Ack: Acknowledgment carrying the leader's latest position and term.
         """
-        return spec_pb2.Ack(error_code=0, error_message="")
+        return spec_pb2.Ack(error_code=0, error_message="", position=current_position(self.states),
+                            term=election_state(self.states).term)
+
+    def HeartBeatStream(self, request_iterator, context):
+        """Answers every ping of a follower's long-lived heartbeat stream.
+
+        The applied position carried by every ping is recorded in the
+        follower's replication progress.
+
+        Args:
+            request_iterator (Iterator[HeartbeatPing]): Pings sent by the follower.
+            context (grpc.ServicerContext): gRPC context.
+
+        Yields:
+            Ack: One acknowledgment per ping carrying the leader's latest position and term.
+        """
+        election = election_state(self.states)
+        tracker = replication_tracker(self.states)
+        for ping in request_iterator:
+            tracker.ack(ping.follower_id, ping.applied_position)
+            yield spec_pb2.Ack(error_code=0, error_message="", position=current_position(self.states),
+                               term=election.term)
 
     def CheckLeader(self, request, context):
         """Confirms that this node is the current leader.
@@ -645,14 +1332,96 @@ class LeaderService(spec_pb2_grpc.LeaderServiceServicer):
         """
         return spec_pb2.Ack(error_code=0, error_message="")
 
+    def StreamSnapshot(self, request, context):
+        """Streams a consistent copy of the leader's SQLite database file.
+
+        The copy is taken with SQLite's online backup API, which is much
+        cheaper than materializing and pickling every row. Updates committed
+        while the copy is taken may be contained in it and are replayed by
+        the follower's catch-up, which is harmless.
+
+        Args:
+            request (SnapshotRequest): Follower ID and supported codecs.
+            context (grpc.ServicerContext): gRPC context.
+
+        Yields:
+            SnapshotChunk: Consecutive pieces of the database file.
+        """
+        codec = negotiate(request.compression)
+        # read before the copy so that no update after it is missing from the file
+        position = current_position(self.states)
+        log_id = getattr(self.states.get('update_queue'), 'log_id', "")
+        term = election_state(self.states).term
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'snapshot.db')
+            backup_database(self.db_engine, path)
+            print(f"[INFO] Streaming {os.path.getsize(path)} byte database file "
+                  f"to follower {request.follower_id}")
+            for chunk in read_chunks(path):
+                data, chunk_codec = compress(chunk, codec)
+                yield spec_pb2.SnapshotChunk(data=data, compression=chunk_codec, position=position,
+                                             term=term, log_id=log_id)
+
+    def GetReplicationStatus(self, request, context):
+        """Reports the replication progress of every follower.
+
+        Args:
+            request (Empty): Empty message.
+            context (grpc.ServicerContext): gRPC context.
+
+        Returns:
+            ReplicationStatus: Leader position and per-follower lag.
+        """
+        return spec_pb2.ReplicationStatus(
+            leader_position=current_position(self.states),
+            followers=[spec_pb2.FollowerStatus(**row)
+                       for row in replication_tracker(self.states).progress()])
+
+    def Deliver(self, request, context):
+        """Stores a message a user of another shard sent to a user of this one.
+
+        Args:
+            request (DeliverRequest): Sender, receiver and message.
+            context (grpc.ServicerContext): gRPC context.
+
+        Returns:
+            ServerResponse: Indicates whether the message was stored.
+        """
+        return client_service(self.states).Deliver(request, context)
+
 
 table_class_mapping = {
     'users': UserModel,
     'messages': MessageModel,
-    'deleted_messages': DeletedMessageModel
+    'message_partitions': MessagePartitionModel,
+    'deleted_messages': DeletedMessageModel,
+    'revoked_tokens': RevokedTokenModel,
+    'read_marks': ReadMarkModel
 }
 
 
+def client_service(leader_state):
+    """Builds the client service of a leader.
+
+    Args:
+        leader_state (dict): Dictionary containing leader server state.
+
+    Returns:
+        ClientService: Service writing to the leader's database.
+    """
+    return ClientService(db_session=leader_state['db_session'], update_queue=leader_state['update_queue'],
+                         replication=replication_tracker(leader_state),
+                         write_concern=leader_state.get('write_concern', spec_pb2.WRITE_CONCERN_LEADER),
+                         write_timeout=leader_state.get('write_timeout', DEFAULT_WRITE_TIMEOUT),
+                         max_replication_lag=leader_state.get(
+                             'max_replication_lag', DEFAULT_MAX_REPLICATION_LAG),
+                         tokens=leader_state.get('session_tokens'),
+                         hasher=leader_state.get('password_hasher'),
+                         shards=leader_state.get('shards'),
+                         store=leader_state.get('message_store'))
+
+
 def serve_leader_client(leader_state):
     """Starts the gRPC server for handling client requests.
 
@@ -662,11 +1431,9 @@ def serve_leader_client(leader_state):
     Returns:
         grpc.Server: The gRPC server object.
     """
-    db_session, address, update_queue, client_address = leader_state['db_session'], leader_state[
-        'leader_address'], leader_state['update_queue'], leader_state['client_address']
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    spec_pb2_grpc.add_ClientAccountServicer_to_server(
-        ClientService(db_session=db_session, update_queue=update_queue), server)
+    client_address = leader_state['client_address']
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10), compression=CLIENT_COMPRESSION)
+    spec_pb2_grpc.add_ClientAccountServicer_to_server(client_service(leader_state), server)
     server.add_insecure_port(client_address)
     server.start()
     print("Client server started, listening on " + client_address)
@@ -693,56 +1460,189 @@ def serve_leader_follower(leader_state):
     return server
 
 
-def get_update_data(update_queue):
+def get_update_data(update_queue, timeout=None):
     """Fetches the next item from the update queue, if available.
 
     Args:
         update_queue (queue.Queue): The update queue.
+        timeout (float, optional): Seconds to wait for an item, returns at
+            once if not given.
 
     Returns:
-        Any: The next update item or None if the queue is empty.
+        tuple: The next ``(position, update_data)`` entry or None if the queue is empty.
     """
     try:
-        data = update_queue.get(block=False)
+        data = update_queue.get(block=timeout is not None, timeout=timeout)
         return data
     except queue.Empty:
         return None
 
 
-def update_followers(leader_state):
-    """Continuously sends updates from the queue to all followers.
+def push_membership(stub, leader_state, pushed):
+    """Sends the follower list to a follower if it changed since the last push.
+
+    Args:
+        stub (FollowerServiceStub): Stub connected to the follower.
+        leader_state (dict): Dictionary containing leader server state.
+        pushed (tuple): ``(term, version)`` of the view the follower last got.
+
+    Returns:
+        tuple: ``(term, version)`` of the view the follower holds now.
+    """
+    view = membership_view(leader_state)
+    if (view.term, view.version) == pushed:
+        return pushed
+    try:
+        stub.UpdateMembership(view, timeout=5)
+        return view.term, view.version
+    except grpc.RpcError:
+        # retried on the next round, losing the follower is up to AcceptUpdates
+        return pushed
+
+
+def applied_position(error):
+    """Reads the position a follower reported when it refused an update.
+
+    Args:
+        error (grpc.RpcError): Error raised by ``AcceptUpdates``.
+
+    Returns:
+        int: Last position the follower applied, or None if not reported.
+    """
+    metadata = error.trailing_metadata() if hasattr(error, 'trailing_metadata') else None
+    for key, value in metadata or ():
+        if key == 'applied-position' and value.isdigit():
+            return int(value)
+    return None
+
+
+def resend_from(leader_state, pending, position):
+    """Restarts a follower's pending updates after the last position it applied.
+
+    Args:
+        leader_state (dict): Dictionary containing leader server state.
+        pending (deque): ``(position, update_data)`` entries not yet acknowledged.
+        position (int): Last position the follower applied.
+    """
+    while pending and pending[0][0] <= position:
+        pending.popleft()
+    if pending and pending[0][0] == position + 1:
+        return
+    update_queue = leader_state['update_queue']
+    entries = update_queue.entries_since(position, update_queue.log_id)
+    if entries is None:
+        print(f"[WARN] Updates after position {position} are no longer retained, "
+              f"the follower has to register again")
+        return
+    later = [entry for entry in pending if entry[0] > entries[-1][0]] if entries else list(pending)
+    pending.clear()
+    pending.extend(entries + later)
+
+
+def send_updates(leader_state, follower, backlog, stop_event):
+    """Streams queued updates and membership changes to a single follower.
+
+    Every follower has its own sender, so a slow or unreachable follower does
+    not hold back replication to the others. Membership views are pushed as
+    one message per follower whenever their version changes.
+
+    Updates are sent one at a time in position order. One that fails stays
+    at the head and is sent again, so the follower never skips a position.
+    If the follower reports it is missing earlier updates, they are sent
+    again from the leader's log. Only the position the follower applied
+    without gaps is acknowledged.
 
     Args:
         leader_state (dict): Dictionary containing leader server state.
+        follower (tuple): ``(follower_id, follower_address)`` of the follower.
+        backlog (queue.Queue): Updates still to be sent to this follower.
+        stop_event (threading.Event): Stops the sender when set.
     """
-    time.sleep(5)  # Give followers time to come online first
+    follower_id, follower_address = follower
+    tracker = replication_tracker(leader_state)
+    failures = 0  # consecutive UNAVAILABLE errors
+    pushed = None  # membership view the follower has
+    pending = deque()  # sent in order, the head until the follower applies it
+
+    with grpc.insecure_channel(follower_address) as channel:
+        stub = spec_pb2_grpc.FollowerServiceStub(channel)
+        while not stop_event.is_set():
+            pushed = push_membership(stub, leader_state, pushed)
+            entry = get_update_data(backlog, timeout=None if pending else 0.1)
+            while entry is not None:
+                if not pending or entry[0] > pending[-1][0]:
+                    pending.append(entry)
+                entry = get_update_data(backlog)
+            if not pending:
+                continue
+
+            position, update_data = pending[0]
+            update_data, codec = compress(
+                update_data, follower_codecs(leader_state).get(follower_id, NONE))
+            try:
+                request = spec_pb2.AcceptUpdatesRequest(
+                    update_data=update_data,
+                    position=position,
+                    leader_position=current_position(leader_state),
+                    compression=codec
+                )
+                response = stub.AcceptUpdates(request, timeout=5)
+                # the last position the follower applied without gaps, which
+                # the replication status and lag are computed from
+                tracker.ack(follower_id, response.position)
+                pending.popleft()
+                failures = 0  # Reset on success
+            except grpc.RpcError as e:
+                print(f"[WARN] Failed to send update to follower {follower_address}: {e.code()}")
+
+                if e.code() == grpc.StatusCode.FAILED_PRECONDITION:
+                    follower_position = applied_position(e)
+                    if follower_position is not None:
+                        resend_from(leader_state, pending, follower_position)
+                        continue
+                elif e.code() == grpc.StatusCode.UNAVAILABLE:
+                    failures += 1
+                    if failures >= FOLLOWER_RETRY_THRESHOLD:
+                        print(f"[INFO] Removing unreachable follower: {follower_address}")
+                        membership(leader_state).remove(follower, election_state(leader_state).term)
+                        return
+                elif e.code() != grpc.StatusCode.ABORTED:
+                    print(f"[ERROR] Unexpected gRPC error: {e}")
+                stop_event.wait(FOLLOWER_RETRY_DELAY)
+
+
+def update_followers(leader_state):
+    """Continuously fans updates from the queue out to all followers.
 
-    retry_threshold = 3
-    retry_tracker = {}  # Track how many times a follower failed
+    Each known follower gets a sender thread with its own backlog, started
+    when the follower shows up in ``leader_state['followers']`` and stopped
+    when it disappears from it.
+
+    Args:
+        leader_state (dict): Dictionary containing leader server state.
+    """
+    tracker = replication_tracker(leader_state)
+    senders = {}  # follower -> (backlog, stop_event)
 
     while True:
-        follower_addresses = list(leader_state['followers'])  # Create a copy to modify safely
-        update_queue = leader_state['update_queue']
-
-        update_data = get_update_data(update_queue)
-
-        if update_data is not None:
-            for follower_id, follower_address in follower_addresses:
-                try:
-                    with grpc.insecure_channel(follower_address) as channel:
-                        stub = spec_pb2_grpc.FollowerServiceStub(channel)
-                        request = spec_pb2.AcceptUpdatesRequest(update_data=update_data)
-                        stub.AcceptUpdates(request)
-                        retry_tracker[follower_address] = 0  # Reset on success
-                except grpc.RpcError as e:
-                    print(f"[WARN] Failed to send update to follower {follower_address}: {e.code()}")
-
-                    if e.code() == grpc.StatusCode.UNAVAILABLE:
-                        retry_tracker[follower_address] = retry_tracker.get(follower_address, 0) + 1
-                        if retry_tracker[follower_address] >= retry_threshold:
-                            print(f"[INFO] Removing unreachable follower: {follower_address}")
-                            leader_state['followers'].remove((follower_id, follower_address))
-                            retry_tracker.pop(follower_address, None)
-                    else:
-                        print(f"[ERROR] Unexpected gRPC error: {e}")
-        time.sleep(2)
+        entry = get_update_data(leader_state['update_queue'], timeout=0.1)
+        followers = list(leader_state['followers'])  # Create a copy to modify safely
+
+        for follower in followers:
+            if follower not in senders:
+                backlog, stop_event = queue.Queue(), threading.Event()
+                senders[follower] = (backlog, stop_event)
+                tracker.add(follower[0])
+                threading.Thread(
+                    target=send_updates, args=(leader_state, follower, backlog, stop_event),
+                    daemon=True).start()
+
+        for follower in list(senders):
+            if follower not in followers:
+                senders.pop(follower)[1].set()
+                tracker.remove(follower[0])
+
+        if entry is not None:
+            tracker.appended(entry[0], len(entry[1]))
+            for backlog, _ in senders.values():
+                backlog.put(entry)
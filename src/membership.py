@@ -0,0 +1,120 @@
+import threading
+
+
+class Membership:
+    """Versioned list of the followers in the cluster.
+
+    The leader bumps the version on every change and pushes the whole view to
+    each follower, which only applies views newer than the one it holds.
+    Views are ordered by ``(term, version)``, so a new leader's first view
+    replaces everything its predecessors sent. Applying the same view twice
+    is harmless, unlike appending single followers.
+    """
+
+    def __init__(self, members=None, term=0, version=0):
+        """Initializes the membership view.
+
+        Args:
+            members (list, optional): ``(follower_id, follower_address)``
+                tuples. The list is updated in place, so it can be shared
+                with code that reads it directly.
+            term (int): Term of the leader that produced the view.
+            version (int): Version of the view within ``term``.
+        """
+        self.lock = threading.Lock()
+        self.members = members if members is not None else []
+        self.term = term
+        self.version = version
+
+    def bump(self, term):
+        """Starts a new version of the view without changing its members.
+
+        A new leader does this so that its first view supersedes the ones
+        sent in earlier terms.
+
+        Args:
+            term (int): Term of the leader producing the view.
+        """
+        with self.lock:
+            self._next_version(term)
+
+    def _next_version(self, term):
+        """Advances ``(term, version)``. Caller holds the lock."""
+        if term > self.term:
+            self.term, self.version = term, 1
+        else:
+            self.version += 1
+
+    def add(self, member, term):
+        """Adds a follower if it is not a member yet.
+
+        Args:
+            member (tuple): ``(follower_id, follower_address)`` of the follower.
+            term (int): Term of the leader making the change.
+
+        Returns:
+            bool: True if the view changed.
+        """
+        with self.lock:
+            if member in self.members:
+                return False
+            self.members.append(member)
+            self._next_version(term)
+            return True
+
+    def remove(self, member, term):
+        """Removes a follower if it is a member.
+
+        Args:
+            member (tuple): ``(follower_id, follower_address)`` of the follower.
+            term (int): Term of the leader making the change.
+
+        Returns:
+            bool: True if the view changed.
+        """
+        with self.lock:
+            if member not in self.members:
+                return False
+            self.members.remove(member)
+            self._next_version(term)
+            return True
+
+    def apply(self, term, version, members):
+        """Replaces the view with a newer one pushed by the leader.
+
+        Args:
+            term (int): Term of the leader that produced the view.
+            version (int): Version of the view within ``term``.
+            members (list): ``(follower_id, follower_address)`` tuples.
+
+        Returns:
+            bool: True if the view was newer and has been applied.
+        """
+        with self.lock:
+            if (term, version) <= (self.term, self.version):
+                return False
+            self.members[:] = members
+            self.term, self.version = term, version
+            return True
+
+    def view(self):
+        """Returns a consistent copy of the view.
+
+        Returns:
+            tuple: ``(term, version, members)``.
+        """
+        with self.lock:
+            return self.term, self.version, list(self.members)
+
+
+def membership(state):
+    """Returns the membership view of a node.
+
+    Args:
+        state (dict): Shared leader or follower state.
+
+    Returns:
+        Membership: View stored in the dictionary, created on first use
+        around ``state['followers']``.
+    """
+    return state.setdefault('membership', Membership(state.setdefault('followers', [])))
@@ -13,33 +13,44 @@ class MessageFrame(ttk.Frame):
         Args:
             parent (tk.Widget): Parent widget.
             message_data (dict): Dictionary containing message details.
-            on_select (function, optional): Callback function when the message is selected.
+            on_select (function, optional): Callback function when the message is selected,
+                called with the message ID and whether it is selected now.
         """
         super().__init__(parent)
-        
+
         self.configure(relief='raised', borderwidth=1, padding=5)
-        self.message_id = message_data["id"]
-        
+        self.on_select = on_select
+
         header_frame = ttk.Frame(self)
         header_frame.pack(fill='x', expand=True)
-        self.pack(fill='x', expand=True)
-        
+
         self.select_var = tk.BooleanVar()
-        select_cb = ttk.Checkbutton(header_frame, variable=self.select_var)
+        select_cb = ttk.Checkbutton(header_frame, variable=self.select_var, command=self.toggle)
         select_cb.pack(side='left', padx=(0, 5))
-        
-        time_str = time.strftime('%Y-%m-%d %H:%M:%S', 
+
+        self.sender_label = ttk.Label(header_frame, style='Bold.TLabel')
+        self.sender_label.pack(side='left')
+
+        self.content_label = ttk.Label(self, wraplength=400)
+        self.content_label.pack(fill='x', pady=(5, 0))
+
+        self.show(message_data)
+
+    def show(self, message_data, selected=False):
+        """Displays another message in this frame, so that frames can be reused.
+
+        Args:
+            message_data (dict): Dictionary containing message details.
+            selected (bool): Whether the message's checkbox is ticked.
+        """
+        self.message_id = message_data["id"]
+        time_str = time.strftime('%Y-%m-%d %H:%M:%S',
                                time.localtime(message_data["timestamp"]))
-        sender_label = ttk.Label(
-            header_frame, 
-            text=f"From: {message_data['from']} at {time_str}",
-            style='Bold.TLabel'
-        )
-        sender_label.pack(side='left')
-    
-        content = ttk.Label(
-            self,
-            text=message_data["content"],
-            wraplength=400
-        )
-        content.pack(fill='x', pady=(5, 0))
\ No newline at end of file
+        self.sender_label.configure(text=f"From: {message_data['from']} at {time_str}")
+        self.content_label.configure(text=message_data["content"])
+        self.select_var.set(selected)
+
+    def toggle(self):
+        """Reports a click on the checkbox to ``on_select``."""
+        if self.on_select is not None:
+            self.on_select(self.message_id, self.select_var.get())
@@ -0,0 +1,174 @@
+import os
+from contextlib import contextmanager
+
+from sqlalchemy.orm import scoped_session
+
+from models import init_db, get_session_factory
+
+# Message files per server, 1 keeps messages in the main database file
+DEFAULT_MESSAGE_FILES = 1
+
+
+def message_file_url(database_url, index):
+    """Returns the URL of a message file next to the main database.
+
+    Args:
+        database_url (str): URL of the main database, e.g. ``sqlite:///chat_1.db``.
+        index (int): Index of the message file.
+
+    Returns:
+        str: URL such as ``sqlite:///chat_1.messages0.db``.
+    """
+    root, ext = os.path.splitext(database_url)
+    return f"{root}.messages{index}{ext or '.db'}"
+
+
+class MessageStore:
+    """Messages spread over SQLite files by receiver.
+
+    SQLite lets one writer at a time into a file. With ``K`` files, messages
+    to different receivers usually land in different files and commit in
+    parallel. Each file has its own engine, session factory, monthly
+    partitions and ID sequence. Users, deleted messages and revoked tokens
+    stay in the main database.
+
+    Message IDs shown to clients are ``local_id * K + file``, so they stay
+    unique across files and map back to their file without a lookup. With
+    one file the IDs are unchanged.
+    """
+
+    def __init__(self, factories, engines=(), urls=()):
+        """Initializes the store.
+
+        Args:
+            factories (list): Session factory of every message file.
+            engines (list): Engines of the files, empty if the single file
+                is the main database.
+            urls (list): URLs of the files, empty if the single file is the
+                main database.
+        """
+        self.factories = list(factories)
+        self.engines = list(engines)
+        self.urls = list(urls)
+
+    @property
+    def count(self):
+        return len(self.factories)
+
+    @property
+    def shared(self):
+        """True if the messages are kept in the main database."""
+        return not self.engines
+
+    def file_of(self, receiver_id):
+        """Returns the file holding the messages of a receiver."""
+        return receiver_id % self.count
+
+    def global_id(self, index, message_id):
+        """Returns the ID clients see for a message of a file."""
+        return message_id * self.count + index
+
+    def group_ids(self, message_ids):
+        """Groups client-facing message IDs by file.
+
+        Args:
+            message_ids (Iterable[int]): IDs as sent to clients.
+
+        Returns:
+            dict: File index to the local IDs in that file.
+        """
+        grouped = {}
+        for message_id in message_ids:
+            grouped.setdefault(message_id % self.count, []).append(message_id // self.count)
+        return grouped
+
+    @contextmanager
+    def session(self, index, main_session=None):
+        """Yields a session on a message file.
+
+        When the messages are kept in the main database, the caller's
+        session is reused, so a request holds a single connection.
+
+        Args:
+            index (int): Index of the file.
+            main_session (Session, optional): Session on the main database.
+
+        Yields:
+            Session: Session on the file.
+        """
+        if self.shared and main_session is not None:
+            yield main_session
+            return
+        session = scoped_session(self.factories[index])
+        try:
+            yield session
+        finally:
+            session.remove()
+
+    def dispose(self):
+        """Closes the pooled connections of every file."""
+        for engine in self.engines:
+            engine.dispose()
+
+
+def parse_cursor(cursor):
+    """Reads the highest local message ID per file from a chat cursor.
+
+    Args:
+        cursor (str): Cursor such as ``"0:12,1:7"``, empty for none.
+
+    Returns:
+        dict: File index to the highest local ID the client holds, empty
+        if the cursor is missing or malformed.
+    """
+    marks = {}
+    for part in cursor.split(","):
+        index, _, message_id = part.partition(":")
+        if not (index.isdigit() and message_id.isdigit()):
+            return {}
+        marks[int(index)] = int(message_id)
+    return marks
+
+
+def format_cursor(marks):
+    """Writes the highest local message ID per file as a chat cursor.
+
+    Local IDs only grow within one file, so a single highest ID would miss
+    messages added to the other file of a chat.
+
+    Args:
+        marks (dict): File index to highest local ID.
+
+    Returns:
+        str: The cursor.
+    """
+    return ",".join(f"{index}:{message_id}" for index, message_id in sorted(marks.items()))
+
+
+def open_message_store(database_url, files, drop_tables=False):
+    """Opens ``files`` message files next to the main database.
+
+    Args:
+        database_url (str): URL of the main database.
+        files (int): Number of message files, at least 2.
+        drop_tables (bool): Whether to start from empty files.
+
+    Returns:
+        MessageStore: The store.
+    """
+    urls = [message_file_url(database_url, index) for index in range(files)]
+    engines = [init_db(url, drop_tables=drop_tables) for url in urls]
+    return MessageStore([get_session_factory(engine) for engine in engines], engines, urls)
+
+
+def message_store(state):
+    """Returns the message store of a leader or follower.
+
+    Args:
+        state (dict): Shared leader or follower state.
+
+    Returns:
+        MessageStore: The configured store, or one keeping the messages in
+        the current main database.
+    """
+    return state.get('message_store') or MessageStore([state['db_session']])
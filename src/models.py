@@ -1,8 +1,10 @@
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, Boolean, DateTime, MetaData
+from sqlalchemy import create_engine, inspect, Column, Integer, String, ForeignKey, Boolean, DateTime, Float, MetaData
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import declared_attr, relationship
 from sqlalchemy_utils import database_exists, drop_database
 
+import re
+
 
 from datetime import datetime
 
@@ -28,27 +30,88 @@ class UserModel(Base):
     session_id = Column(String, unique=True, nullable=True)
 
 
-class MessageModel(Base):
-    """Represents a message exchange in the system between users."""
-    __tablename__ = 'messages'
+class MessageColumns:
+    """Columns of a message, shared by the ``messages`` table and its monthly
+    partitions (see ``partitions.message_model``)."""
 
     id = Column(Integer, primary_key=True)
-    sender_id = Column(Integer, ForeignKey('users.id'))
-    receiver_id = Column(Integer, ForeignKey('users.id'))
     content = Column(String, nullable=False)
-    is_received = Column(Boolean, default=False)
     time_stamp = Column(DateTime, nullable=False, default=datetime.utcnow)
-
-    sender = relationship("UserModel", foreign_keys=[sender_id])
-    receiver = relationship("UserModel", foreign_keys=[receiver_id])
-
     sender_deleted = Column(Boolean, default=False)
     receiver_deleted = Column(Boolean, default=False)
 
+    @declared_attr
+    def sender_id(cls):
+        return Column(Integer, ForeignKey('users.id'))
+
+    @declared_attr
+    def receiver_id(cls):
+        return Column(Integer, ForeignKey('users.id'))
+
+    @declared_attr
+    def sender(cls):
+        return relationship("UserModel", foreign_keys=lambda: [cls.sender_id])
+
+    @declared_attr
+    def receiver(cls):
+        return relationship("UserModel", foreign_keys=lambda: [cls.receiver_id])
+
+
+class MessageModel(MessageColumns, Base):
+    """Represents a message exchange in the system between users.
+
+    The ``messages`` table holds messages sent before time partitioning, new
+    ones go to monthly partitions. Replication and snapshots carry every
+    message as a ``MessageModel`` and the receiving node routes it by ID.
+    """
+    __tablename__ = 'messages'
+
+
+class MessagePartitionModel(Base):
+    """Catalog entry of a monthly message partition.
+
+    Attributes:
+        key (int): Month of the partition as ``YYYYMM``.
+        first_id (int): Messages with a greater ID, up to the next
+            partition's ``first_id``, are stored in this partition.
+        archived (bool): Whether the partition's table has been dropped.
+    """
+    __tablename__ = 'message_partitions'
+
+    key = Column(Integer, primary_key=True, autoincrement=False)
+    first_id = Column(Integer, nullable=False)
+    archived = Column(Boolean, default=False)
+
+
+class ReadMarkModel(Base):
+    """How far a user has read the messages from another user.
+
+    Messages from ``peer_id`` to ``reader_id`` with an ID up to
+    ``last_read_id`` are read, later ones are unread. The marks of a reader
+    are kept in the message file holding the reader's messages, so
+    ``last_read_id`` is a local ID of that file (see ``read_marks``).
+
+    Attributes:
+        reader_id (int): User who received the messages.
+        peer_id (int): User who sent them.
+        last_read_id (int): Highest local message ID read.
+    """
+    __tablename__ = 'read_marks'
+
+    reader_id = Column(Integer, primary_key=True, autoincrement=False)
+    peer_id = Column(Integer, primary_key=True, autoincrement=False)
+    last_read_id = Column(Integer, nullable=False, default=0)
+
 
 class DeletedMessageModel(Base):
-    """Represents a message exchange deleted in the system between users."""
+    """Represents a message exchange deleted in the system between users.
+
+    Rows are moved to archive segments once they are older than the
+    retention period, see ``archive.compact``.
+    """
     __tablename__ = 'deleted_messages'
+    # IDs are never reused, so archived rows cannot collide with new ones
+    __table_args__ = {'sqlite_autoincrement': True}
 
     id = Column(Integer, primary_key=True)
     sender_id = Column(Integer, ForeignKey('users.id'))
@@ -56,11 +119,33 @@ class DeletedMessageModel(Base):
     content = Column(String, nullable=False)
     is_received = Column(Boolean, default=False)
     original_message_id = Column(Integer, nullable=True)
+    deleted_at = Column(DateTime, nullable=True, default=datetime.utcnow, index=True)
 
     sender = relationship("UserModel", foreign_keys=[sender_id])
     receiver = relationship("UserModel", foreign_keys=[receiver_id])
 
 
+class RevokedTokenModel(Base):
+    """Represents a revoked session token, replicated like any other row.
+
+    Attributes:
+        id (int): Primary key.
+        token_id (str): ID of a single revoked token, set on logout.
+        user_id (int): User whose tokens issued until ``revoked_at`` are
+            revoked, set when the account is deleted.
+        revoked_at (float): UNIX time of the revocation.
+        expires_at (float): UNIX time after which the revoked tokens have
+            expired anyway.
+    """
+    __tablename__ = 'revoked_tokens'
+
+    id = Column(Integer, primary_key=True)
+    token_id = Column(String, nullable=True)
+    user_id = Column(Integer, nullable=True)
+    revoked_at = Column(Float, nullable=False)
+    expires_at = Column(Float, nullable=False)
+
+
 def init_db(database_url, drop_tables=False):
     """Initializes the database and optionally drops existing tables.
 
@@ -74,10 +159,62 @@ def init_db(database_url, drop_tables=False):
     if database_exists(database_url) and drop_tables:
         drop_database(database_url)
     engine = create_engine(database_url)
+    created = set(Base.metadata.tables) - set(inspect(engine).get_table_names())
     Base.metadata.create_all(engine)
+    upgrade_schema(engine)
+    if ReadMarkModel.__tablename__ in created:
+        backfill_read_marks(engine)
     return engine
 
 
+def upgrade_schema(engine):
+    """Adds nullable columns introduced after a database file was created.
+
+    ``create_all`` only creates missing tables, so a database kept across
+    upgrades would lack newer columns.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): SQLAlchemy engine.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    connection.exec_driver_sql(
+                        f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}')
+
+
+def backfill_read_marks(engine):
+    """Seeds the read marks of a database that tracked read state per message.
+
+    Runs once, when ``read_marks`` was just added to an older database.
+    Each conversation is marked read up to its newest message flagged
+    ``is_received``, in ``messages`` and in each monthly partition, so
+    received messages are not delivered again. Databases created with
+    read marks have no ``is_received`` column and are left alone.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): SQLAlchemy engine.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in inspector.get_table_names():
+            if not re.fullmatch(r'messages(_\d{6})?', table):
+                continue
+            if 'is_received' not in {column['name'] for column in inspector.get_columns(table)}:
+                continue
+            # a mark covers the earlier messages of the conversation too
+            connection.exec_driver_sql(
+                f'INSERT INTO read_marks (reader_id, peer_id, last_read_id) '
+                f'SELECT receiver_id, sender_id, MAX(id) FROM {table} WHERE is_received '
+                f'GROUP BY receiver_id, sender_id '
+                f'ON CONFLICT (reader_id, peer_id) DO UPDATE '
+                f'SET last_read_id = MAX(last_read_id, excluded.last_read_id)')
+
+
 def get_session_factory(engine):
     """Creates a session factory bound to the given engine.
 
@@ -0,0 +1,214 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from sqlalchemy import func, inspect, text
+
+from models import Base, MessageColumns, MessageModel, MessagePartitionModel
+
+# IDs left unused between partitions. A Send that picked the previous
+# partition just before the new one was created still gets an ID below the
+# new partition's range.
+PARTITION_ID_GAP = 10000
+# Months of partitions kept in the database, 0 keeps all of them
+DEFAULT_PARTITION_MONTHS = 0
+
+_models = {}
+_models_lock = threading.Lock()
+_create_lock = threading.Lock()
+
+
+def partition_key(when):
+    """Returns the partition of a point in time.
+
+    Args:
+        when (datetime): UTC time.
+
+    Returns:
+        int: Month as ``YYYYMM``.
+    """
+    return when.year * 100 + when.month
+
+
+def partition_table(key):
+    """Returns the table name of a monthly partition."""
+    return f"messages_{key}"
+
+
+def message_model(key):
+    """Returns the mapped class of a monthly partition, created on first use.
+
+    Args:
+        key (int): Month as ``YYYYMM``.
+
+    Returns:
+        type: ORM class with the columns of ``MessageModel``.
+    """
+    with _models_lock:
+        if key not in _models:
+            _models[key] = type(f"MessageModel{key}", (MessageColumns, Base), {
+                '__tablename__': partition_table(key),
+                # IDs keep increasing after the newest rows are deleted
+                '__table_args__': {'sqlite_autoincrement': True},
+            })
+        return _models[key]
+
+
+def catalog(session):
+    """Returns the catalog of monthly partitions, oldest first."""
+    return list(session.query(MessagePartitionModel).order_by(MessagePartitionModel.key).all())
+
+
+def message_models(session):
+    """Returns the classes of every partition still stored, oldest first.
+
+    Partitions cover consecutive months, so concatenating per-partition
+    results ordered by time gives a result ordered by time.
+
+    Args:
+        session (Session): Database session.
+
+    Returns:
+        list: ``MessageModel`` for the messages from before partitioning,
+        followed by the monthly partitions.
+    """
+    return [MessageModel] + [message_model(entry.key) for entry in catalog(session) if not entry.archived]
+
+
+def models_for_ids(session, message_ids):
+    """Groups message IDs by the partition storing them.
+
+    Args:
+        session (Session): Database session.
+        message_ids (Iterable[int]): Message IDs.
+
+    Returns:
+        dict: Partition class to the list of its IDs. IDs of archived
+        partitions are left out.
+    """
+    entries = catalog(session)
+    grouped = {}
+    for message_id in message_ids:
+        owner = None
+        for entry in entries:
+            if entry.first_id < message_id:
+                owner = entry
+        if owner is None:
+            grouped.setdefault(MessageModel, []).append(message_id)
+        elif not owner.archived:
+            grouped.setdefault(message_model(owner.key), []).append(message_id)
+    return grouped
+
+
+def model_for_id(session, message_id):
+    """Returns the partition class storing a message, or None if it was archived."""
+    return next(iter(models_for_ids(session, [message_id])), None)
+
+
+def create_partition_table(session, entry):
+    """Creates the table of a catalog entry and starts its IDs after ``first_id``.
+
+    Runs in the session's transaction, so the table and its catalog entry
+    are committed together.
+
+    Args:
+        session (Session): Database session.
+        entry (MessagePartitionModel): Catalog entry of the partition.
+    """
+    table = message_model(entry.key).__table__
+    table.create(bind=session.connection(), checkfirst=True)
+    session.execute(text(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT :name, :seq "
+        "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = :name)"),
+        {'name': table.name, 'seq': entry.first_id})
+
+
+def current_partition(session, now=None):
+    """Returns the partition new messages go to, creating it in a new month.
+
+    Args:
+        session (Session): Database session.
+        now (datetime, optional): Current UTC time.
+
+    Returns:
+        tuple: The partition class and the new catalog entry, or None if the
+        partition already existed. New entries have to be replicated.
+    """
+    key = partition_key(now or datetime.utcnow())
+    entries = catalog(session)
+    if entries and entries[-1].key >= key:
+        return message_model(entries[-1].key), None
+
+    with _create_lock:
+        entries = catalog(session)
+        if entries and entries[-1].key >= key:
+            return message_model(entries[-1].key), None
+        newest = message_model(entries[-1].key) if entries else MessageModel
+        last_id = session.query(func.max(newest.id)).scalar() or 0
+        floor = entries[-1].first_id if entries else 0
+        entry = MessagePartitionModel(key=key, first_id=max(last_id, floor) + PARTITION_ID_GAP)
+        session.add(entry)
+        create_partition_table(session, entry)
+        session.commit()
+        print(f"[INFO] Created message partition {partition_table(key)} after ID {entry.first_id}")
+        return message_model(key), entry
+
+
+def archive_partitions(session, archive_dir, keep_months, now=None):
+    """Moves monthly partitions older than ``keep_months`` out of the database.
+
+    Each partition is copied to ``{archive_dir}/messages_{key}.db`` and its
+    table dropped, which frees its pages at once instead of deleting rows
+    one by one. The catalog entry stays, marked archived, so IDs of the
+    partition keep resolving to it.
+
+    Args:
+        session (Session): Database session.
+        archive_dir (str): Directory for the archived partitions.
+        keep_months (int): Number of most recent months kept, the current
+            one included.
+        now (datetime, optional): Current UTC time.
+
+    Returns:
+        list: Keys of the archived partitions.
+    """
+    now = now or datetime.utcnow()
+    months = now.year * 12 + now.month - keep_months
+    oldest_kept = (months // 12) * 100 + months % 12 + 1
+    archived = []
+    for entry in catalog(session):
+        if entry.archived or entry.key >= oldest_kept:
+            continue
+        os.makedirs(archive_dir, exist_ok=True)
+        path = os.path.join(archive_dir, f"{partition_table(entry.key)}.db")
+        table = partition_table(entry.key)
+        connection = session.connection().connection.driver_connection
+        schema = connection.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()[0]
+        with sqlite3.connect(path) as target:
+            target.execute(schema.replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1))
+            rows = connection.execute(f"SELECT * FROM {table}")
+            target.executemany(
+                f"INSERT OR IGNORE INTO {table} VALUES ({', '.join('?' * len(rows.description))})", rows)
+        session.execute(text(f"DROP TABLE {table}"))
+        entry.archived = True
+        session.commit()
+        archived.append(entry.key)
+    return archived
+
+
+def as_message(row):
+    """Copies a partition row into a detached ``MessageModel``.
+
+    Dynamically created partition classes cannot be pickled, so messages are
+    replicated and snapshotted in this form.
+
+    Args:
+        row (MessageColumns): Message of any partition.
+
+    Returns:
+        MessageModel: Message with the same column values.
+    """
+    return MessageModel(**{column.key: getattr(row, column.key)
+                           for column in inspect(MessageModel).column_attrs})
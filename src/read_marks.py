@@ -0,0 +1,90 @@
+from sqlalchemy import and_, func
+from sqlalchemy.dialects.sqlite import insert
+
+from models import ReadMarkModel
+
+
+def unread(query, model, reader_id):
+    """Restricts a query on messages to those a reader has not read.
+
+    Each message is joined to the mark of its conversation, so the unread
+    messages from a sender are the range of IDs above the sender's mark.
+
+    Args:
+        query (Query): Query selecting from ``model``.
+        model (type): ``MessageModel`` or a partition model.
+        reader_id (int): The receiving user.
+
+    Returns:
+        Query: The query limited to the reader's unread messages.
+    """
+    return query.outerjoin(ReadMarkModel, and_(
+        ReadMarkModel.reader_id == model.receiver_id,
+        ReadMarkModel.peer_id == model.sender_id
+    )).filter(
+        model.receiver_id == reader_id,
+        model.id > func.coalesce(ReadMarkModel.last_read_id, 0)
+    )
+
+
+def mark_read(session, reader_id, peer_id, message_id):
+    """Marks the messages from a peer up to an ID as read, with one upsert.
+
+    Marks only move forward, a mark already past ``message_id`` is kept.
+    The caller commits.
+
+    Args:
+        session (Session): Session on the reader's message file.
+        reader_id (int): The receiving user.
+        peer_id (int): The sending user.
+        message_id (int): Highest local ID read.
+
+    Returns:
+        ReadMarkModel: The new mark to replicate, or None if it did not move.
+    """
+    statement = insert(ReadMarkModel).values(reader_id=reader_id, peer_id=peer_id, last_read_id=message_id)
+    statement = statement.on_conflict_do_update(
+        index_elements=[ReadMarkModel.reader_id, ReadMarkModel.peer_id],
+        set_={'last_read_id': statement.excluded.last_read_id},
+        where=ReadMarkModel.last_read_id < statement.excluded.last_read_id)
+    if session.execute(statement).rowcount == 0:
+        return None
+    return ReadMarkModel(reader_id=reader_id, peer_id=peer_id, last_read_id=message_id)
+
+
+def read_marks(session, reader_ids):
+    """Looks up the marks of several readers with one query.
+
+    Args:
+        session (Session): Session on the readers' message file.
+        reader_ids (Iterable[int]): The receiving users.
+
+    Returns:
+        dict: ``(reader_id, peer_id)`` to the highest local ID read.
+    """
+    reader_ids = set(reader_ids)
+    if not reader_ids:
+        return {}
+    rows = session.query(ReadMarkModel).filter(ReadMarkModel.reader_id.in_(reader_ids)).all()
+    return {(row.reader_id, row.peer_id): row.last_read_id for row in rows}
+
+
+def is_read(marks, message):
+    """Tells whether a message is read, given the marks of its receiver."""
+    return message.id <= marks.get((message.receiver_id, message.sender_id), 0)
+
+
+def forget_reader(session, reader_id):
+    """Deletes the marks of a reader, e.g. with the account. The caller commits.
+
+    Args:
+        session (Session): Session on the reader's message file.
+        reader_id (int): The receiving user.
+
+    Returns:
+        list: The deleted marks, to replicate.
+    """
+    marks = session.query(ReadMarkModel).filter(ReadMarkModel.reader_id == reader_id).all()
+    for mark in marks:
+        session.delete(mark)
+    return marks
@@ -0,0 +1,337 @@
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+
+# Number of recent updates kept for catching up followers after a failover
+DEFAULT_HISTORY_SIZE = 10000
+
+
+class ReplicationLog(queue.Queue):
+    """Update queue that stamps every entry with a replication position.
+
+    Positions increase by one per update and continue from ``start``, so a
+    promoted follower keeps numbering where the previous leader stopped.
+    Consumers receive ``(position, update_data)`` tuples. The most recent
+    entries are also retained so that followers which were slightly behind
+    can catch up without a full snapshot. ``log_id`` is unique per log, so a
+    follower can prove its positions were numbered by this leader.
+    """
+
+    def __init__(self, start=0, history=(), history_size=DEFAULT_HISTORY_SIZE):
+        """Initializes an empty log.
+
+        Args:
+            start (int): Position of the last update already applied locally.
+            history (Iterable[tuple]): ``(position, update_data)`` entries
+                applied before ``start``, e.g. by a promoted follower.
+            history_size (int): Maximum number of retained entries.
+        """
+        super().__init__()
+        self.position = start
+        self.start = start
+        self.history = deque(history, maxlen=history_size)
+        self.log_id = uuid.uuid4().hex
+
+    def put(self, item, block=True, timeout=None):
+        """Appends an update and assigns it the next position.
+
+        Args:
+            item (bytes): Pickled update data.
+            block (bool): Unused, the log is unbounded.
+            timeout (float, optional): Unused, the log is unbounded.
+
+        Returns:
+            int: Position assigned to the update.
+        """
+        with self.not_full:
+            self.position += 1
+            position = self.position
+            self._put((position, item))
+            self.history.append((position, item))
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+        return position
+
+    def entries_since(self, position, log_id=None):
+        """Returns the retained updates a follower is missing.
+
+        Only followers that applied a prefix of this log can catch up
+        incrementally. Positions after ``start`` were numbered by this leader,
+        so a follower reporting one of them applied updates this leader never
+        saw and needs a snapshot instead, unless it got them from this log.
+
+        Args:
+            position (int): Last position applied by the follower.
+            log_id (str, optional): Log the follower's positions come from.
+
+        Returns:
+            list: ``(position, update_data)`` entries after ``position``, or
+            None if the history does not cover the gap.
+        """
+        with self.mutex:
+            if log_id == self.log_id:
+                # e.g. a copy of the leader's database, possibly taken at position 0
+                if not 0 <= position <= self.position:
+                    return None
+            elif not 0 < position <= self.start:
+                return None
+            first = self.history[0][0] if self.history else self.position + 1
+            if position + 1 < first:
+                return None
+            return [entry for entry in self.history if entry[0] > position]
+
+
+class ReplicaProgress:
+    """Tracks how far a follower's local database trails the leader.
+
+    The follower is considered in sync whenever it has applied everything up to
+    the latest leader position it knows about. Staleness is the time elapsed
+    since it was last known to be in sync.
+    """
+
+    def __init__(self, position=0, history_size=DEFAULT_HISTORY_SIZE):
+        """Initializes progress tracking.
+
+        Args:
+            position (int): Position already applied locally.
+            history_size (int): Number of recently applied updates retained
+                for the log of this replica should it become leader.
+        """
+        self.history = deque(maxlen=history_size)
+        self.lock = threading.Lock()
+        self.advanced = threading.Condition(self.lock)
+        self.applied_position = position
+        self.leader_position = position
+        self.synced_at = None
+
+    def observe_leader(self, leader_position):
+        """Records the leader's latest position, e.g. from a heartbeat.
+
+        Args:
+            leader_position (int): Latest position reported by the leader.
+        """
+        with self.lock:
+            self.leader_position = max(self.leader_position, leader_position)
+            if self.applied_position >= leader_position:
+                self.synced_at = time.time()
+
+    def applied(self, position, leader_position=0, update_data=None):
+        """Records that an update has been applied locally.
+
+        Only the update right after ``applied_position`` advances it, so the
+        position stays the end of a gap-free prefix of the leader's log and
+        is safe to acknowledge.
+
+        Args:
+            position (int): Position of the applied update.
+            leader_position (int): Leader's latest position when it was sent.
+            update_data (bytes, optional): The update itself, retained in
+                ``history``.
+
+        Returns:
+            bool: True if the position advanced.
+        """
+        with self.lock:
+            advanced = position == self.applied_position + 1
+            if advanced:
+                if update_data is not None:
+                    self.history.append((position, update_data))
+                self.applied_position = position
+                self.advanced.notify_all()
+        self.observe_leader(max(self.applied_position, leader_position))
+        return advanced
+
+    def wait_for(self, position, timeout):
+        """Blocks until the replica has applied ``position`` or the timeout expires.
+
+        Args:
+            position (int): Position the caller needs to observe.
+            timeout (float): Maximum seconds to wait.
+
+        Returns:
+            bool: True if the position has been applied.
+        """
+        with self.lock:
+            return self.advanced.wait_for(
+                lambda: self.applied_position >= position, timeout)
+
+    def staleness(self):
+        """Returns how many seconds the local replica may be behind the leader.
+
+        Returns:
+            float: Seconds since the replica was last in sync, or infinity if
+            it has never been.
+        """
+        with self.lock:
+            if self.synced_at is None:
+                return float('inf')
+            return time.time() - self.synced_at
+
+
+class ReplicationTracker:
+    """Leader-side progress table of every follower.
+
+    For each follower it records the highest position acknowledged and when
+    the follower was last heard from. Together with the size and append time
+    of recent updates this gives how far each follower is behind in
+    updates, bytes and seconds. Client RPCs that must not return before their
+    update reached enough followers wait on the tracker and are woken as
+    acknowledgements arrive.
+    """
+
+    def __init__(self, history_size=DEFAULT_HISTORY_SIZE):
+        """Initializes a tracker without followers.
+
+        Args:
+            history_size (int): Maximum number of unacknowledged updates whose
+                size and append time are kept for lag estimates.
+        """
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.acked = {}
+        self.contacted = {}
+        self.position = 0
+        # (position, size, appended_at) of updates not yet applied everywhere
+        self.pending = deque(maxlen=history_size)
+
+    def add(self, follower_id):
+        """Starts tracking a follower.
+
+        Args:
+            follower_id (str): ID of the follower.
+        """
+        with self.lock:
+            self.acked.setdefault(follower_id, 0)
+            self.contacted.setdefault(follower_id, time.time())
+            self.changed.notify_all()
+
+    def remove(self, follower_id):
+        """Stops tracking a follower that left or became unreachable.
+
+        Args:
+            follower_id (str): ID of the follower.
+        """
+        with self.lock:
+            self.acked.pop(follower_id, None)
+            self.contacted.pop(follower_id, None)
+            self._prune()
+            self.changed.notify_all()
+
+    def appended(self, position, size):
+        """Records an update being sent out to the followers.
+
+        Args:
+            position (int): Position of the update.
+            size (int): Size of the pickled update in bytes.
+        """
+        with self.lock:
+            self.position = max(self.position, position)
+            self.pending.append((position, size, time.time()))
+            self._prune()
+
+    def ack(self, follower_id, position):
+        """Records that a follower applied everything up to ``position``.
+
+        Args:
+            follower_id (str): ID of the follower.
+            position (int): Last position the follower applied without gaps.
+        """
+        with self.lock:
+            if follower_id in self.acked:
+                self.acked[follower_id] = max(self.acked[follower_id], position)
+                self.contacted[follower_id] = time.time()
+                self._prune()
+                self.changed.notify_all()
+
+    def _prune(self):
+        """Forgets updates every follower has applied. Caller holds the lock."""
+        floor = min(self.acked.values(), default=self.position)
+        while self.pending and self.pending[0][0] <= floor:
+            self.pending.popleft()
+
+    def followers(self):
+        """Returns the number of followers tracked."""
+        with self.lock:
+            return len(self.acked)
+
+    def wait_for(self, position, acks=None, timeout=None):
+        """Blocks until enough followers acknowledged ``position``.
+
+        Args:
+            position (int): Position that has to be replicated.
+            acks (int, optional): Number of followers required, defaults to
+                the followers that make a majority of the cluster together
+                with the leader, counting the followers tracked at the time
+                of each check. Without followers the leader alone is one.
+            timeout (float, optional): Maximum seconds to wait.
+
+        Returns:
+            bool: True if the position reached the required followers.
+        """
+        def replicated():
+            # the leader holds the update, so it counts towards the majority
+            required = (len(self.acked) + 1) // 2 if acks is None else acks
+            return sum(acked >= position for acked in self.acked.values()) >= required
+
+        with self.lock:
+            return self.changed.wait_for(replicated, timeout)
+
+    def _seconds_behind(self, applied, now):
+        """Age of the oldest update a follower is missing. Caller holds the lock."""
+        for position, _, appended_at in self.pending:
+            if position > applied:
+                return now - appended_at
+        return 0.0
+
+    def majority_lag(self):
+        """Returns how many seconds a majority of the followers is behind.
+
+        Returns:
+            float: Lag of the follower at the majority boundary, 0 without
+            followers.
+        """
+        with self.lock:
+            now = time.time()
+            lags = sorted(self._seconds_behind(applied, now) for applied in self.acked.values())
+        return lags[len(lags) // 2] if lags else 0.0
+
+    def wait_for_lag(self, max_lag, timeout):
+        """Blocks while a majority of the followers lags more than ``max_lag`` seconds.
+
+        Args:
+            max_lag (float): Tolerated replication lag in seconds.
+            timeout (float): Maximum seconds to wait.
+
+        Returns:
+            bool: True if the lag is within bounds.
+        """
+        deadline = time.time() + timeout
+        while self.majority_lag() > max_lag:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            with self.lock:
+                # woken early by acknowledgements
+                self.changed.wait(min(remaining, 0.1))
+        return True
+
+    def progress(self):
+        """Returns a snapshot of the progress table.
+
+        Returns:
+            list: One dict per follower with ``follower_id``,
+            ``applied_position``, ``positions_behind``, ``bytes_behind``,
+            ``seconds_behind`` and ``last_contact`` (a UNIX timestamp).
+        """
+        with self.lock:
+            now = time.time()
+            return [{
+                'follower_id': follower_id,
+                'applied_position': applied,
+                'positions_behind': max(0, self.position - applied),
+                'bytes_behind': sum(size for position, size, _ in self.pending if position > applied),
+                'seconds_behind': self._seconds_behind(applied, now),
+                'last_contact': self.contacted[follower_id],
+            } for follower_id, applied in sorted(self.acked.items())]
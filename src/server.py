@@ -10,47 +10,62 @@ from models import init_db, get_session_factory
 import threading
 import time
 import queue
+import random
+from concurrent.futures import ThreadPoolExecutor
 from follower_server import *
 from leader_server import *
+from replication import ReplicationLog
+from failure_detector import PhiAccrualFailureDetector
+from election import ElectionState, election_state, quorum
+from membership import membership
+from tokens import DEFAULT_TOKEN_TTL, SessionTokens
+from credentials import DEFAULT_KDF_WORKERS, PasswordHasher
+from archive import DEFAULT_COMPACTION_INTERVAL, DEFAULT_RETENTION_DAYS, start_compactor
+from partitions import DEFAULT_PARTITION_MONTHS
+from sharding import ShardMap, parse_groups
+from message_store import DEFAULT_MESSAGE_FILES, open_message_store
+import os
 import socket
 
+# Seconds between heartbeat pings sent to the leader
+DEFAULT_HEARTBEAT_INTERVAL = 0.2
+# Suspicion level at which the leader is declared dead, see PhiAccrualFailureDetector
+DEFAULT_PHI_THRESHOLD = 8.0
+# Upper bound of the random delay before a candidacy, also the vote RPC timeout
+DEFAULT_ELECTION_TIMEOUT = 0.5
+
 def claim_leadery(leader_state):
     """
-    Informs all the followers that this server has become the new leader
-    and synchronizes the updated follower list with each of them.
+    Informs all the followers that this server has become the new leader.
+
+    Each follower gets a single UpdateLeader message carrying the new
+    leader's membership view, versioned in the new term so that it replaces
+    whatever the previous leader sent.
 
     Args:
         leader_state (dict): State dictionary containing follower addresses and leader info.
     """
-    import pickle
-
     leader_id = leader_state['leader_id']
     leader_address = leader_state['leader_address']
-    followers = leader_state['followers']
+    term = election_state(leader_state).term
+    membership(leader_state).bump(term)
+
+    update_leader_request = spec_pb2.NewLeaderRequest(
+        new_leader_address=leader_address,
+        new_leader_id=leader_id,
+        term=term,
+        membership=membership_view(leader_state)
+    )
 
-    for _, follower_address in followers:
+    for _, follower_address in list(leader_state['followers']):
         with grpc.insecure_channel(follower_address) as channel:
             stub = spec_pb2_grpc.FollowerServiceStub(channel)
-
-            update_leader_request = spec_pb2.NewLeaderRequest(
-                new_leader_address=leader_address,
-                new_leader_id=leader_id
-            )
-
             try:
-                # Step 1: Inform follower about new leader
-                stub.UpdateLeader(update_leader_request, timeout=5)
+                response = stub.UpdateLeader(update_leader_request, timeout=5)
+                if response.error_code != 0:
+                    print(f"[WARN] Follower {follower_address} rejected leadership: {response.error_message}")
+                    continue
                 print(f"[INFO] Informed follower {follower_address} of new leader.")
-
-                # Step 2: After success, send follower list updates
-                for fid, faddr in followers:
-                    if faddr != follower_address:  # No need to send self
-                        try:
-                            update_data = pickle.dumps((fid, faddr))
-                            stub.UpdateFollowers(spec_pb2.UpdateFollowersRequest(update_data=update_data))
-                        except grpc.RpcError as e:
-                            print(f"[WARN] Failed to send follower info to {follower_address}: {e.code()}")
-
             except grpc.RpcError as e:
                 print(f"[WARN] Failed to inform {follower_address} about new leader: {e.code()}")
 
@@ -64,7 +79,11 @@ def upgrade_follower(old_state):
     leader_state = old_state
     leader_state['leader_address'] = old_state['follower_address']
     leader_state['leader_id'] = old_state['follower_id']
-    leader_state['update_queue'] = queue.Queue()
+    # keep numbering positions from where this replica stopped and keep the
+    # updates it applied so that followers can catch up incrementally
+    progress = replica_progress(old_state)
+    leader_state['update_queue'] = ReplicationLog(
+        start=progress.applied_position, history=progress.history)
 
     leader_state['follower_leader_server'].stop(None)
     leader_state['follower_leader_server'].wait_for_termination()
@@ -80,7 +99,7 @@ def upgrade_follower(old_state):
 
     # create updater thread
     update_thread = threading.Thread(
-        target=update_followers, args=(leader_state,))
+        target=update_followers, args=(leader_state,), daemon=True)
     update_thread.start()
 
     # start a new client service
@@ -116,91 +135,196 @@ def upgrade_follower(old_state):
     leader_client_server.wait_for_termination()
 
 
-def check_new_leader(min_follower, follower_state):
-    """Checks if the new leader is alive and updates follower state accordingly.
+def heartbeat_pings(follower_state, stop_event, interval):
+    """Generates the follower side of the heartbeat stream.
 
     Args:
-        min_follower (tuple): (ID, address) of the assumed new leader.
         follower_state (dict): The current follower state dictionary.
+        stop_event (threading.Event): Ends the stream when set.
+        interval (float): Seconds between pings.
+
+    Yields:
+        HeartbeatPing: A ping carrying this follower's applied position.
     """
-    with grpc.insecure_channel(min_follower[1]) as channel:
-        num_tries = 2
-        stub = spec_pb2_grpc.LeaderServiceStub(channel)
-        success = False
-        for _ in range(num_tries):
-            try:
-                response = stub.CheckLeader(spec_pb2.Empty())
-                if (response.error_code == 0):
-                    print('New leader is alive')
-                    follower_state['leader_address'] = min_follower[1]
-                    follower_state['leader_id'] = min_follower[0]
-                    success = True
-                else:
-                    # remove the min follower from the list
-                    follower_state['followers'].remove(min_follower)
-            except:
-                pass
-        if not success:
-            print('New leader is dead')
-            try:
-                follower_state['followers'].remove(min_follower)
-            except:
-                print('Error removing the follower')
-                pass
+    while not stop_event.is_set():
+        yield spec_pb2.HeartbeatPing(
+            follower_id=str(follower_state['follower_id']),
+            applied_position=replica_progress(follower_state).applied_position)
+        stop_event.wait(interval)
+
+
+def stream_heartbeats(follower_state, channel, detector, stop_event, interval):
+    """Feeds leader heartbeats into the failure detector until stopped.
+
+    The stream is reopened on the same channel whenever it breaks. Missing
+    heartbeats are not acted upon here, the failure detector decides.
+
+    Args:
+        follower_state (dict): The current follower state dictionary.
+        channel (grpc.Channel): Persistent channel to the leader.
+        detector (PhiAccrualFailureDetector): Detector receiving heartbeats.
+        stop_event (threading.Event): Stops the stream when set.
+        interval (float): Seconds between pings.
+    """
+    stub = spec_pb2_grpc.LeaderServiceStub(channel)
+    while not stop_event.is_set():
+        try:
+            pings = heartbeat_pings(follower_state, stop_event, interval)
+            for ack in stub.HeartBeatStream(pings):
+                detector.heartbeat()
+                replica_progress(follower_state).observe_leader(ack.position)
+                election_state(follower_state).observe_term(ack.term)
+        except grpc.RpcError:
+            pass
+        stop_event.wait(interval)
+
+
+def request_votes(follower_state, term, pre_vote, timeout):
+    """Asks every known follower for its vote in ``term``.
+
+    Args:
+        follower_state (dict): The current follower state dictionary.
+        term (int): Term the candidate runs in.
+        pre_vote (bool): Whether this is a pre-vote round.
+        timeout (float): Seconds to wait for each voter.
+
+    Returns:
+        list: VoteResponse of every voter that answered.
+    """
+    election = election_state(follower_state)
+    request = spec_pb2.VoteRequest(
+        term=term, candidate_id=str(follower_state['follower_id']), pre_vote=pre_vote,
+        last_position=replica_progress(follower_state).applied_position)
+
+    def ask(address):
+        try:
+            with grpc.insecure_channel(address) as channel:
+                stub = spec_pb2_grpc.FollowerServiceStub(channel)
+                response = stub.RequestVote(request, timeout=timeout)
+        except grpc.RpcError:
+            return None
+        election.observe_term(response.term)
+        return response
+
+    voters = [address for _, address in follower_state['followers']]
+    if not voters:
+        return []
+    with ThreadPoolExecutor(max_workers=len(voters)) as pool:
+        return [response for response in pool.map(ask, voters) if response is not None]
+
+
+def run_election(follower_state, timeout):
+    """Runs one election among the known followers.
+
+    A pre-vote round first checks that a majority would support the
+    candidate and that no reachable follower applied more updates, only then
+    the term is incremented and real votes are requested. The most
+    up-to-date follower therefore wins and the others need the least
+    catch-up. Voters are this node and every follower it knows about.
+
+    Args:
+        follower_state (dict): The current follower state dictionary.
+        timeout (float): Seconds to wait for each voter.
+
+    Returns:
+        bool: True if this node won the election.
+    """
+    election = election_state(follower_state)
+    position = replica_progress(follower_state).applied_position
+    needed = quorum(len(follower_state['followers']) + 1)
+
+    responses = request_votes(follower_state, election.term + 1, True, timeout)
+    if any(response.last_position > position for response in responses):
+        print("Pre-vote failed, another follower is more up to date")
+        return False
+    if sum(response.vote_granted for response in responses) + 1 < needed:
+        print("Pre-vote failed")
+        return False
+
+    term = election.start_election(str(follower_state['follower_id']))
+    responses = request_votes(follower_state, term, False, timeout)
+    votes = sum(response.vote_granted for response in responses) + 1
+    # a voter may have reported a newer term while we were collecting votes
+    won = votes >= needed and election.term == term
+    print(f"Election for term {term}: {votes} of {needed} votes needed, {'won' if won else 'lost'}")
+    return won
+
+
+def elect_leader(follower_state):
+    """Runs elections until this node wins or a new leader announces itself.
+
+    Each attempt is preceded by a random delay so that candidates rarely split
+    the vote. After voting for somebody else a node gives that candidate a few
+    election timeouts to announce itself before running on its own.
+
+    Args:
+        follower_state (dict): The current follower state dictionary.
+
+    Returns:
+        bool: True if this node should become the leader.
+    """
+    leader_address = follower_state['leader_address']
+    timeout = follower_state.get('election_timeout', DEFAULT_ELECTION_TIMEOUT)
+    election = election_state(follower_state)
+
+    while True:
+        time.sleep(random.uniform(0, timeout))
+        if follower_state['leader_address'] != leader_address:
+            return False
+        if not election.recently_voted(4 * timeout) and run_election(follower_state, timeout):
+            return True
 
 
 def follower_heart_beat_checker(follower_state):
-    """Periodically checks if the leader is alive and initiates election if not.
+    """Monitors the leader over a heartbeat stream and initiates election if it fails.
+
+    Heartbeats flow over one persistent channel per leader and are judged by a
+    phi accrual failure detector, so detection time follows the configured
+    ``heartbeat_interval`` and ``phi_threshold`` instead of fixed sleeps. Once
+    the leader is suspected a term-based election with pre-vote picks its
+    successor among the known followers.
 
     Args:
         follower_state (dict): The current follower state dictionary.
     """
+    interval = follower_state.get('heartbeat_interval', DEFAULT_HEARTBEAT_INTERVAL)
+    threshold = follower_state.get('phi_threshold', DEFAULT_PHI_THRESHOLD)
+
     while True:
         leader_address = follower_state['leader_address']
         print("Heartbeat check", leader_address)
 
-        # Check if the leader is alive
-        # If not start the election process
-        with grpc.insecure_channel(leader_address) as channel:
-            num_tries = 2
-            success = False
-            for i in range(num_tries):
-                try:
-                    stub = spec_pb2_grpc.LeaderServiceStub(channel)
-                    heartbeat_request = spec_pb2.Empty()
-                    response = stub.HeartBeat(heartbeat_request)
-                    # print(response, "Leader is alive")
-                    success = True
-                    break
-                except Exception as e:
-                    if i == num_tries - 1:
-                        print("Leader is not alive, starting election process.")
-                        # Start the election process
-            if not success:
-                followers = follower_state['followers']
-                min_follower = None if len(followers) == 0 else min(
-                    followers, key=lambda x: int(x[0]))
-                # election policy
-                # if you are smallest id become the leader
-                # if not wait for a new leader and then try again
-                if min_follower == None or int(server_id) < int(min_follower[0]):
-                    # become the new leader
-                    return upgrade_follower(follower_state)
-
-                else:
-                    # check if the new follower becomes the leader if they can't be
-                    # delete them and assign yourself
-                    print('Waiting for a new leader!')
-                    time.sleep(10)
-                    # check if the new leader is alive
-                    # otherwise assume that leader is dead and remove it from your list
-                    check_new_leader(min_follower, follower_state)
-
-        time.sleep(5)
+        detector = PhiAccrualFailureDetector(interval, threshold)
+        follower_state['leader_detector'] = detector
+        stop_event = threading.Event()
+        channel = grpc.insecure_channel(leader_address)
+        threading.Thread(
+            target=stream_heartbeats,
+            args=(follower_state, channel, detector, stop_event, interval),
+            daemon=True).start()
+
+        while detector.is_available() and follower_state['leader_address'] == leader_address:
+            time.sleep(interval / 2)
+
+        stop_event.set()
+        channel.close()
+
+        if follower_state['leader_address'] != leader_address:
+            # a new leader announced itself, watch that one instead
+            continue
+
+        print("Leader is not alive, starting election process.")
+        if elect_leader(follower_state):
+            return upgrade_follower(follower_state)
 
 
 def leader_routine(
-    server_id, internal_address, client_address, leader_address=None
+    server_id, internal_address, client_address, leader_address=None,
+    write_concern=spec_pb2.WRITE_CONCERN_LEADER, write_timeout=DEFAULT_WRITE_TIMEOUT,
+    max_replication_lag=DEFAULT_MAX_REPLICATION_LAG, token_secret=None, token_ttl=DEFAULT_TOKEN_TTL,
+    kdf_workers=DEFAULT_KDF_WORKERS, retention_days=DEFAULT_RETENTION_DAYS,
+    compaction_interval=DEFAULT_COMPACTION_INTERVAL, partition_months=DEFAULT_PARTITION_MONTHS,
+    shards=None, message_files=DEFAULT_MESSAGE_FILES
 ):
     """Bootstraps the leader server and its components.
 
@@ -209,6 +333,22 @@ def leader_routine(
         internal_address (str): gRPC address for internal leader-follower communication.
         client_address (str): gRPC address for client-leader communication.
         leader_address (str, optional): Address of current leader (unused for leaders).
+        write_concern (int): Default ``WriteConcern`` for sent messages.
+        write_timeout (float): Seconds a Send waits for its write concern.
+        max_replication_lag (float): Seconds a majority of followers may lag before Send is slowed down.
+        token_secret (str, optional): Key shared by all servers to sign session
+            tokens, session IDs are stored in the database if unset.
+        token_ttl (float): Seconds a session token stays valid.
+        kdf_workers (int): Processes hashing passwords, 0 hashes on the request threads.
+        retention_days (float): Days deleted messages stay in the database
+            before they are archived, 0 keeps them.
+        compaction_interval (float): Seconds between archiving runs.
+        partition_months (int): Months of message partitions kept in the
+            database before they are archived, 0 keeps them.
+        shards (ShardMap, optional): Shard of this leader group and the
+            leaders of the others, if users are partitioned across groups.
+        message_files (int): SQLite files the messages are spread over by
+            receiver, 1 keeps them in the main database.
     """
     database_url = f'sqlite:///chat_{server_id}.db'
     database_engine = init_db(database_url)
@@ -221,16 +361,29 @@ def leader_routine(
         'followers': [],
         'db_engine': database_engine,
         'db_session': SessionFactory,
-        'update_queue': queue.Queue(),
-        'client_address': client_address
+        'update_queue': ReplicationLog(),
+        'client_address': client_address,
+        'election': ElectionState(term=1),
+        'write_concern': write_concern,
+        'write_timeout': write_timeout,
+        'max_replication_lag': max_replication_lag,
+        'session_tokens': SessionTokens(token_secret, token_ttl) if token_secret else None,
+        'password_hasher': PasswordHasher(kdf_workers),
+        'archive_dir': f'archive_{server_id}',
+        'shards': shards,
+        'message_store': open_message_store(database_url, message_files) if message_files > 1 else None
     }
+    leader_state['password_hasher'].start()
+    if retention_days or partition_months:
+        start_compactor(leader_state, retention_days * 86400, compaction_interval, partition_months)
+    load_revocations(leader_state)
 
     # follower communication
     leader_server = serve_leader_follower(leader_state)
 
     # Start a separate thread to send updates to followers
     update_thread = threading.Thread(
-        target=update_followers, args=(leader_state,))
+        target=update_followers, args=(leader_state,), daemon=True)
     update_thread.start()
 
     # start client server
@@ -241,7 +394,23 @@ def leader_routine(
     clinet_server.wait_for_termination()
 
 
-def follower_routine(server_id, internal_address, client_address, leader_address=None):
+def follower_routine(server_id, internal_address, client_address, leader_address=None,
+                     max_staleness=DEFAULT_MAX_STALENESS,
+                     heartbeat_interval=DEFAULT_HEARTBEAT_INTERVAL,
+                     phi_threshold=DEFAULT_PHI_THRESHOLD,
+                     election_timeout=DEFAULT_ELECTION_TIMEOUT,
+                     write_concern=spec_pb2.WRITE_CONCERN_LEADER,
+                     write_timeout=DEFAULT_WRITE_TIMEOUT,
+                     max_replication_lag=DEFAULT_MAX_REPLICATION_LAG,
+                     bootstrap=BOOTSTRAP_FILE,
+                     token_secret=None,
+                     token_ttl=DEFAULT_TOKEN_TTL,
+                     kdf_workers=DEFAULT_KDF_WORKERS,
+                     retention_days=DEFAULT_RETENTION_DAYS,
+                     compaction_interval=DEFAULT_COMPACTION_INTERVAL,
+                     partition_months=DEFAULT_PARTITION_MONTHS,
+                     shards=None,
+                     message_files=DEFAULT_MESSAGE_FILES):
     """Bootstraps the follower server, registers with leader, and starts heartbeat thread.
 
     Args:
@@ -249,6 +418,29 @@ def follower_routine(server_id, internal_address, client_address, leader_address
         internal_address (str): Address used for internal leader-follower communication.
         client_address (str): gRPC address for client-follower communication.
         leader_address (str): Address of the current leader.
+        max_staleness (float): Maximum replication lag in seconds for serving reads locally.
+        heartbeat_interval (float): Seconds between heartbeats sent to the leader.
+        phi_threshold (float): Failure detector suspicion level that triggers an election.
+        election_timeout (float): Upper bound in seconds of the random delay before a candidacy.
+        write_concern (int): Default ``WriteConcern`` once promoted to leader.
+        write_timeout (float): Seconds a Send waits for its write concern once promoted.
+        max_replication_lag (float): Follower lag in seconds that slows down Send once promoted.
+        bootstrap (str): ``BOOTSTRAP_FILE`` to copy the leader's database file,
+            ``BOOTSTRAP_PICKLE`` to load pickled rows.
+        token_secret (str, optional): Key shared by all servers to verify
+            session tokens without a database lookup.
+        token_ttl (float): Seconds a session token stays valid once promoted.
+        kdf_workers (int): Processes hashing passwords once promoted, started
+            up front so that the logins following a failover find them ready.
+        retention_days (float): Days deleted messages stay in the replica
+            before they are archived, 0 keeps them.
+        compaction_interval (float): Seconds between archiving runs.
+        partition_months (int): Months of message partitions kept in the
+            replica before they are archived, 0 keeps them.
+        shards (ShardMap, optional): Shard of this group and the leaders of
+            the others, used once promoted.
+        message_files (int): SQLite files the messages are spread over by
+            receiver, must match the leader.
     """
     database_url = f'sqlite:///chat_{server_id}.db'
     database_engine = init_db(database_url, drop_tables=True)
@@ -267,7 +459,24 @@ def follower_routine(server_id, internal_address, client_address, leader_address
         'db_engine': database_engine,
         'follower_client_server': None,
         'database_url': database_url,
+        'max_staleness': max_staleness,
+        'heartbeat_interval': heartbeat_interval,
+        'phi_threshold': phi_threshold,
+        'election_timeout': election_timeout,
+        'write_concern': write_concern,
+        'write_timeout': write_timeout,
+        'max_replication_lag': max_replication_lag,
+        'bootstrap': bootstrap,
+        'session_tokens': SessionTokens(token_secret, token_ttl) if token_secret else None,
+        'password_hasher': PasswordHasher(kdf_workers),
+        'archive_dir': f'archive_{server_id}',
+        'shards': shards,
+        'message_store': open_message_store(database_url, message_files, drop_tables=True)
+        if message_files > 1 else None,
     }
+    follower_state['password_hasher'].start()
+    if retention_days or partition_months:
+        start_compactor(follower_state, retention_days * 86400, compaction_interval, partition_months)
 
     # start internal server for follower
     follower_server = server_follower_leader(
@@ -306,6 +515,58 @@ if __name__ == '__main__':
     )
     parser.add_argument(
         "--leader_address", help="Leader server address (required for follower servers).")
+    parser.add_argument(
+        "--max_staleness", type=float, default=DEFAULT_MAX_STALENESS,
+        help="Seconds a follower may lag behind the leader and still serve reads.")
+    parser.add_argument(
+        "--heartbeat_interval", type=float, default=DEFAULT_HEARTBEAT_INTERVAL,
+        help="Seconds between heartbeats from a follower to the leader.")
+    parser.add_argument(
+        "--phi_threshold", type=float, default=DEFAULT_PHI_THRESHOLD,
+        help="Failure detector suspicion level at which the leader is declared dead.")
+    parser.add_argument(
+        "--election_timeout", type=float, default=DEFAULT_ELECTION_TIMEOUT,
+        help="Upper bound in seconds of the random delay before a follower runs for leader.")
+    parser.add_argument(
+        "--write_concern", choices=["leader", "one", "majority"], default="leader",
+        help="Followers that must apply a message before Send returns, unless the client asks otherwise.")
+    parser.add_argument(
+        "--write_timeout", type=float, default=DEFAULT_WRITE_TIMEOUT,
+        help="Seconds a Send waits for its write concern before reporting a replication timeout.")
+    parser.add_argument(
+        "--max_replication_lag", type=float, default=DEFAULT_MAX_REPLICATION_LAG,
+        help="Seconds a majority of followers may lag before Send is slowed down, 0 disables it.")
+    parser.add_argument(
+        "--bootstrap", choices=[BOOTSTRAP_FILE, BOOTSTRAP_PICKLE], default=BOOTSTRAP_FILE,
+        help="How a new follower copies the leader's data: the SQLite file or pickled rows.")
+    parser.add_argument(
+        "--token_secret", default=os.environ.get("CHAT_TOKEN_SECRET"),
+        help="Key shared by all servers to sign session tokens, defaults to $CHAT_TOKEN_SECRET.")
+    parser.add_argument(
+        "--token_ttl", type=float, default=DEFAULT_TOKEN_TTL,
+        help="Seconds a session token stays valid.")
+    parser.add_argument(
+        "--kdf_workers", type=int, default=DEFAULT_KDF_WORKERS,
+        help="Processes hashing passwords, 0 hashes on the request threads.")
+    parser.add_argument(
+        "--retention_days", type=float, default=DEFAULT_RETENTION_DAYS,
+        help="Days deleted messages are kept before they are archived, 0 keeps them in the database.")
+    parser.add_argument(
+        "--compaction_interval", type=float, default=DEFAULT_COMPACTION_INTERVAL,
+        help="Seconds between runs that archive expired deleted messages.")
+    parser.add_argument(
+        "--partition_months", type=int, default=DEFAULT_PARTITION_MONTHS,
+        help="Months of message partitions kept in the database, 0 keeps them all.")
+    parser.add_argument(
+        "--shard_peers",
+        help="Internal addresses of every shard's servers, shards separated by ';' and servers by ','. "
+             "Users are partitioned across the shards if set.")
+    parser.add_argument(
+        "--shard_index", type=int, default=0,
+        help="Position of this server's shard in --shard_peers.")
+    parser.add_argument(
+        "--message_files", type=int, default=DEFAULT_MESSAGE_FILES,
+        help="SQLite files messages are spread over by receiver, the same on every server of a group.")
 
     args = parser.parse_args()
 
@@ -318,11 +579,29 @@ if __name__ == '__main__':
     if server_type == "follower" and leader_address is None:
         parser.error("Follower servers require the --leader_address option.")
 
+    write_concern = spec_pb2.WriteConcern.Value(f"WRITE_CONCERN_{args.write_concern.upper()}")
+    shards = ShardMap(args.shard_index, parse_groups(args.shard_peers)) if args.shard_peers else None
+
     if server_type == 'leader':
-        leader_routine(server_id, internal_address, client_address)
+        leader_routine(server_id, internal_address, client_address,
+                       write_concern=write_concern, write_timeout=args.write_timeout,
+                       max_replication_lag=args.max_replication_lag,
+                       token_secret=args.token_secret, token_ttl=args.token_ttl,
+                       kdf_workers=args.kdf_workers, retention_days=args.retention_days,
+                       compaction_interval=args.compaction_interval,
+                       partition_months=args.partition_months, shards=shards,
+                       message_files=args.message_files)
     else:
         follower_routine(server_id, internal_address,
-                      client_address, leader_address)
+                      client_address, leader_address, args.max_staleness,
+                      args.heartbeat_interval, args.phi_threshold, args.election_timeout,
+                      write_concern=write_concern, write_timeout=args.write_timeout,
+                      max_replication_lag=args.max_replication_lag, bootstrap=args.bootstrap,
+                      token_secret=args.token_secret, token_ttl=args.token_ttl,
+                      kdf_workers=args.kdf_workers, retention_days=args.retention_days,
+                      compaction_interval=args.compaction_interval,
+                      partition_months=args.partition_months, shards=shards,
+                      message_files=args.message_files)
 
     # incase follower is upgraded to leader
     # keep the main thread alive
@@ -0,0 +1,303 @@
+import threading
+import zlib
+from concurrent import futures
+
+import grpc
+
+import spec_pb2
+import spec_pb2_grpc
+from compression import CLIENT_COMPRESSION
+from utils import StatusCode, StatusMessages, content_version
+
+# Seconds a call forwarded to another shard may take
+DEFAULT_SHARD_TIMEOUT = 10.0
+# Separates the shard index from the shard's own session ID in the session
+# IDs handed out by the router
+SESSION_SEPARATOR = ":"
+
+# Errors after which the next server of a shard is tried: down, a follower
+# redirecting to its leader, or a follower without the leader's internal service
+RETRY_CODES = (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.FAILED_PRECONDITION,
+               grpc.StatusCode.UNIMPLEMENTED)
+
+
+def shard_for(username, count):
+    """Returns the shard a user belongs to.
+
+    CRC-32 is used rather than ``hash`` because it is the same in every
+    process.
+
+    Args:
+        username (str): Name of the user.
+        count (int): Number of shards.
+
+    Returns:
+        int: Index of the shard.
+    """
+    return zlib.crc32(username.encode('utf-8')) % count
+
+
+def parse_groups(spec):
+    """Parses the server addresses of every shard.
+
+    Args:
+        spec (str): Shards separated by ``;``, the addresses of a shard by
+            ``,``, e.g. ``"localhost:50051,localhost:50052;localhost:50061"``.
+
+    Returns:
+        list: One list of addresses per shard, in shard order.
+    """
+    return [[address.strip() for address in group.split(',') if address.strip()]
+            for group in spec.split(';')]
+
+
+class ShardGroup:
+    """The servers of one shard, calls go to whichever of them is the leader.
+
+    The last server that answered is tried first, so after a failover the
+    group moves on to the new leader by itself.
+    """
+
+    def __init__(self, addresses, stub_class, timeout=DEFAULT_SHARD_TIMEOUT):
+        """Initializes the group.
+
+        Args:
+            addresses (list): Addresses of the shard's leader and followers.
+            stub_class (type): gRPC stub for the service called on them.
+            timeout (float): Seconds a call may take.
+
+        Raises:
+            ValueError: If the shard has no addresses.
+        """
+        if not addresses:
+            raise ValueError("A shard needs at least one server address, check for an empty group")
+        self.addresses = addresses
+        self.stub_class = stub_class
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.stubs = {}
+        self.leader = 0
+
+    def stub(self, address):
+        """Returns the stub of a server, reusing its channel."""
+        with self.lock:
+            if address not in self.stubs:
+                self.stubs[address] = self.stub_class(grpc.insecure_channel(address))
+            return self.stubs[address]
+
+    def call(self, method, request):
+        """Calls a method on the shard's leader.
+
+        Args:
+            method (str): Name of the RPC.
+            request: Request message.
+
+        Returns:
+            The response of the first server that accepted the call.
+
+        Raises:
+            grpc.RpcError: The error of the last server tried, if no server
+                of the shard accepted the call.
+        """
+        addresses = list(self.addresses)
+        start = self.leader % len(addresses)
+        for offset in range(len(addresses)):
+            index = (start + offset) % len(addresses)
+            try:
+                response = getattr(self.stub(addresses[index]), method)(request, timeout=self.timeout)
+            except grpc.RpcError as e:
+                if e.code() not in RETRY_CODES or offset == len(addresses) - 1:
+                    raise
+                continue
+            self.leader = index
+            return response
+
+
+class ShardMap:
+    """The shard a leader serves and the leaders of the other shards.
+
+    Users are hash-partitioned by name. A shard stores its users' accounts,
+    the messages they received and a copy of the messages they sent.
+    """
+
+    def __init__(self, index, groups, timeout=DEFAULT_SHARD_TIMEOUT):
+        """Initializes the map.
+
+        Args:
+            index (int): Shard served by this server.
+            groups (list): Internal addresses of the servers of every shard,
+                in shard order.
+            timeout (float): Seconds a delivery to another shard may take.
+        """
+        self.index = index
+        self.groups = [ShardGroup(addresses, spec_pb2_grpc.LeaderServiceStub, timeout) for addresses in groups]
+
+    @property
+    def count(self):
+        return len(self.groups)
+
+    def owns(self, username):
+        """Checks whether a user belongs to this shard."""
+        return shard_for(username, self.count) == self.index
+
+    def deliver(self, sender, receiver, message, write_concern=spec_pb2.WRITE_CONCERN_DEFAULT):
+        """Hands a message to the leader of the receiver's shard.
+
+        Args:
+            sender (str): Name of the sending user of this shard.
+            receiver (str): Name of the receiving user of another shard.
+            message (str): Content of the message.
+            write_concern (int): ``WriteConcern`` on the receiver's shard.
+
+        Returns:
+            ServerResponse: Result of storing the message there.
+
+        Raises:
+            grpc.RpcError: If no server of the receiver's shard accepted it.
+        """
+        request = spec_pb2.DeliverRequest(sender=sender, receiver=receiver, message=message,
+                                          write_concern=write_concern)
+        return self.groups[shard_for(receiver, self.count)].call('Deliver', request)
+
+
+class ShardRouter(spec_pb2_grpc.ClientAccountServicer):
+    """Client service that forwards every call to the shard it concerns.
+
+    Account creation and login go to the user's shard. Login prefixes the
+    returned session ID with the shard index, and every later call is
+    forwarded to that shard. ``Send`` also goes to the sender's shard, whose
+    leader hands the message to the receiver's shard. ``ListUsers`` asks
+    every shard. The router keeps no state, so any number of them can run.
+    """
+
+    def __init__(self, groups, timeout=DEFAULT_SHARD_TIMEOUT):
+        """Initializes the router.
+
+        Args:
+            groups (list): Client addresses of the servers of every shard,
+                in shard order.
+            timeout (float): Seconds a forwarded call may take.
+        """
+        self.groups = [ShardGroup(addresses, spec_pb2_grpc.ClientAccountStub, timeout) for addresses in groups]
+
+    def forward(self, shard, method, request, context):
+        """Calls a method on a shard's leader, failing the call if it cannot be reached."""
+        try:
+            return self.groups[shard].call(method, request)
+        except grpc.RpcError as e:
+            # UNAVAILABLE makes clients retry, the shard may be electing a leader
+            context.abort(grpc.StatusCode.UNAVAILABLE, f"Shard {shard} is unavailable: {e.code()}")
+
+    def forward_session(self, method, request, context, response_class):
+        """Forwards a call to the shard named in its session ID."""
+        shard, _, session_id = request.session_id.partition(SESSION_SEPARATOR)
+        if not shard.isdigit() or int(shard) >= len(self.groups):
+            code = StatusCode.USER_NOT_LOGGED_IN
+            return response_class(error_code=code, error_message=StatusMessages.get_error_message(code))
+        request.session_id = session_id
+        return self.forward(int(shard), method, request, context)
+
+    def CreateAccount(self, request, context):
+        """Creates the account on the user's shard."""
+        return self.forward(shard_for(request.username, len(self.groups)), 'CreateAccount', request, context)
+
+    def Login(self, request, context):
+        """Logs in on the user's shard and tags the session ID with the shard."""
+        shard = shard_for(request.username, len(self.groups))
+        response = self.forward(shard, 'Login', request, context)
+        if response.session_id:
+            response.session_id = f"{shard}{SESSION_SEPARATOR}{response.session_id}"
+        return response
+
+    def ListUsers(self, request, context):
+        """Lists the matching users of every shard."""
+        # leaders only list their own users, not those of other shards
+        # that sent messages to them
+        users = spec_pb2.Users()
+        for shard in range(len(self.groups)):
+            users.user.extend(self.forward(shard, 'ListUsers', spec_pb2.ListUsersRequest(
+                wildcard=request.wildcard), context).user)
+        return users
+
+    def Send(self, request, context):
+        """Sends through the sender's shard, which hands the message on to the receiver's."""
+        return self.forward_session('Send', request, context, spec_pb2.ServerResponse)
+
+    def GetMessages(self, request, context):
+        """Fetches unread messages from the user's shard."""
+        return self.forward_session('GetMessages', request, context, spec_pb2.Messages)
+
+    def GetChat(self, request, context):
+        """Returns the chat history from the user's shard, which holds both directions."""
+        return self.forward_session('GetChat', request, context, spec_pb2.Messages)
+
+    def AcknowledgeReceivedMessages(self, request, context):
+        """Marks messages as received on the user's shard."""
+        return self.forward_session('AcknowledgeReceivedMessages', request, context, spec_pb2.ServerResponse)
+
+    def DeleteAccount(self, request, context):
+        """Deletes the account on the user's shard."""
+        return self.forward_session('DeleteAccount', request, context, spec_pb2.ServerResponse)
+
+    def Logout(self, request, context):
+        """Logs out on the user's shard."""
+        return self.forward_session('Logout', request, context, spec_pb2.ServerResponse)
+
+    def DeleteMessages(self, request, context):
+        """Deletes messages from the user's shard."""
+        return self.forward_session('DeleteMessages', request, context, spec_pb2.ServerResponse)
+
+    def GetUnreadCounts(self, request, context):
+        """Returns unread counts from the user's shard."""
+        return self.forward_session('GetUnreadCounts', request, context, spec_pb2.UnreadSummary)
+
+    def SyncState(self, request, context):
+        """Syncs unread counts and the open chat on the user's shard, and lists the users of every shard."""
+        skip_users, users_version = request.skip_users, request.users_version
+        request.skip_users = True
+        response = self.forward_session('SyncState', request, context, spec_pb2.SyncStateResponse)
+        if skip_users or response.error_code not in (StatusCode.SUCCESS, StatusCode.NOT_MODIFIED):
+            return response
+
+        users = self.ListUsers(spec_pb2.ListUsersRequest(wildcard="*"), context)
+        response.users_version = content_version(users.SerializeToString(deterministic=True))
+        if response.users_version != users_version:
+            response.users.CopyFrom(users)
+            response.error_code = StatusCode.SUCCESS
+            response.error_message = StatusMessages.get_error_message(response.error_code)
+        return response
+
+
+def serve_router(address, groups, timeout=DEFAULT_SHARD_TIMEOUT):
+    """Starts a router for clients.
+
+    Args:
+        address (str): Address clients connect to.
+        groups (list): Client addresses of the servers of every shard.
+        timeout (float): Seconds a forwarded call may take.
+
+    Returns:
+        grpc.Server: The gRPC server object.
+    """
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=32), compression=CLIENT_COMPRESSION)
+    spec_pb2_grpc.add_ClientAccountServicer_to_server(ShardRouter(groups, timeout), server)
+    server.add_insecure_port(address)
+    server.start()
+    print(f"Router for {len(groups)} shards listening on {address}")
+    return server
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Start a router in front of several chat shards.")
+    parser.add_argument("address", help="Address clients connect to, in the format <host>:<port>.")
+    parser.add_argument(
+        "--shards", required=True,
+        help="Client addresses of every shard's servers, shards separated by ';' and servers by ','.")
+    parser.add_argument(
+        "--timeout", type=float, default=DEFAULT_SHARD_TIMEOUT,
+        help="Seconds a forwarded call may take.")
+    args = parser.parse_args()
+
+    serve_router(args.address, parse_groups(args.shards), args.timeout).wait_for_termination()
@@ -0,0 +1,90 @@
+import os
+import sqlite3
+
+from sqlalchemy.engine import make_url
+
+# Bytes per SnapshotChunk, well below gRPC's default 4 MB message limit
+SNAPSHOT_CHUNK_SIZE = 1024 * 1024
+
+
+def database_path(database_url):
+    """Returns the file behind a SQLite database URL.
+
+    Args:
+        database_url (str): SQLAlchemy URL such as ``sqlite:///chat_1.db``.
+
+    Returns:
+        str: Path of the database file.
+    """
+    return make_url(database_url).database
+
+
+def backup_database(engine, path):
+    """Writes a consistent copy of a live SQLite database to ``path``.
+
+    Uses SQLite's online backup API, which copies pages instead of rows and
+    does not block other readers while it runs.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Engine of the database to copy.
+        path (str): Destination file, overwritten if it exists.
+    """
+    source = engine.raw_connection()
+    target = sqlite3.connect(path)
+    try:
+        source.driver_connection.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def read_chunks(path, chunk_size=SNAPSHOT_CHUNK_SIZE):
+    """Yields the contents of a file in chunks.
+
+    Args:
+        path (str): File to read.
+        chunk_size (int): Maximum bytes per chunk.
+
+    Yields:
+        bytes: Consecutive pieces of the file.
+    """
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def install_database(chunks, path):
+    """Atomically replaces a database file with the streamed chunks.
+
+    The data is written to a temporary file next to ``path`` and renamed over
+    it once complete, so a failed transfer leaves the old file untouched.
+    Connections to the old file have to be closed by the caller first.
+
+    Args:
+        chunks (Iterable[bytes]): File contents in order.
+        path (str): Database file to replace.
+
+    Returns:
+        int: Number of bytes written.
+    """
+    download_path = path + '.download'
+    size = 0
+    try:
+        with open(download_path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        for suffix in ('-journal', '-wal', '-shm'):
+            # stale journals of the old file must not be replayed into the new one
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        os.replace(download_path, path)
+    finally:
+        if os.path.exists(download_path):
+            os.remove(download_path)
+    return size
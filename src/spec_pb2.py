@@ -25,65 +25,91 @@ _sym_db = _symbol_database.Default()
 from google.protobuf import timestamp_pb2 as google_dot_protobuf_dot_timestamp__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nspec.proto\x1a\x1fgoogle/protobuf/timestamp.proto\":\n\x14\x43reateAccountRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"O\n\x0eServerResponse\x12\x12\n\nerror_code\x18\x01 \x01(\x05\x12\x15\n\rerror_message\x18\x02 \x01(\t\x12\x12\n\nsession_id\x18\x03 \x01(\t\"M\n\"AcknowledgeReceivedMessagesRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x13\n\x0bmessage_ids\x18\x02 \x03(\x05\"2\n\x0cLoginRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\">\n\x0bSendRequest\x12\n\n\x02to\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x12\n\nsession_id\x18\x03 \x01(\t\"$\n\x10ListUsersRequest\x12\x10\n\x08wildcard\x18\x01 \x01(\t\"@\n\x15\x44\x65leteMessagesRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x13\n\x0bmessage_ids\x18\x02 \x03(\x05\"*\n\x0bUnreadCount\x12\x0c\n\x04\x66rom\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x05\"X\n\rUnreadSummary\x12\x1c\n\x06\x63ounts\x18\x01 \x03(\x0b\x32\x0c.UnreadCount\x12\x12\n\nerror_code\x18\x02 \x01(\x05\x12\x15\n\rerror_message\x18\x03 \x01(\t\"$\n\x0eSessionRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\"$\n\x0eReceiveRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\"3\n\x0b\x43hatRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x10\n\x08username\x18\x02 \x01(\t\"*\n\x14\x44\x65leteAccountRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\"m\n\x07Message\x12\r\n\x05\x66rom_\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x12\n\nmessage_id\x18\x03 \x01(\x05\x12.\n\ntime_stamp\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"P\n\x08Messages\x12\x12\n\nerror_code\x18\x01 \x01(\x05\x12\x15\n\rerror_message\x18\x02 \x01(\t\x12\x19\n\x07message\x18\x03 \x03(\x0b\x32\x08.Message\"\x07\n\x05\x45mpty\"(\n\x04User\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\"\x1c\n\x05Users\x12\x13\n\x04user\x18\x01 \x03(\x0b\x32\x05.User\"E\n\x10NewLeaderRequest\x12\x1a\n\x12new_leader_address\x18\x01 \x01(\t\x12\x15\n\rnew_leader_id\x18\x02 \x01(\t\"-\n\x16UpdateFollowersRequest\x12\x13\n\x0bupdate_data\x18\x01 \x01(\x0c\"H\n\x17RegisterFollowerRequest\x12\x13\n\x0b\x66ollower_id\x18\x01 \x01(\t\x12\x18\n\x10\x66ollower_address\x18\x02 \x01(\t\"r\n\x18RegisterFollowerResponse\x12\x12\n\nerror_code\x18\x01 \x01(\x05\x12\x15\n\rerror_message\x18\x02 \x01(\t\x12\x12\n\npickled_db\x18\x03 \x01(\x0c\x12\x17\n\x0fother_followers\x18\x04 \x03(\t\"+\n\x14\x41\x63\x63\x65ptUpdatesRequest\x12\x13\n\x0bupdate_data\x18\x01 \x01(\x0c\"0\n\x03\x41\x63k\x12\x12\n\nerror_code\x18\x01 \x01(\x05\x12\x15\n\rerror_message\x18\x02 \x01(\t2\xbe\x04\n\rClientAccount\x12\x37\n\rCreateAccount\x12\x15.CreateAccountRequest\x1a\x0f.ServerResponse\x12&\n\tListUsers\x12\x11.ListUsersRequest\x1a\x06.Users\x12\'\n\x05Login\x12\r.LoginRequest\x1a\x0f.ServerResponse\x12%\n\x04Send\x12\x0c.SendRequest\x1a\x0f.ServerResponse\x12)\n\x0bGetMessages\x12\x0f.ReceiveRequest\x1a\t.Messages\x12\"\n\x07GetChat\x12\x0c.ChatRequest\x1a\t.Messages\x12S\n\x1b\x41\x63knowledgeReceivedMessages\x12#.AcknowledgeReceivedMessagesRequest\x1a\x0f.ServerResponse\x12\x37\n\rDeleteAccount\x12\x15.DeleteAccountRequest\x1a\x0f.ServerResponse\x12\x30\n\x06Logout\x12\x15.DeleteAccountRequest\x1a\x0f.ServerResponse\x12\x39\n\x0e\x44\x65leteMessages\x12\x16.DeleteMessagesRequest\x1a\x0f.ServerResponse\x12\x32\n\x0fGetUnreadCounts\x12\x0f.SessionRequest\x1a\x0e.UnreadSummary2\x90\x01\n\rLeaderService\x12G\n\x10RegisterFollower\x12\x18.RegisterFollowerRequest\x1a\x19.RegisterFollowerResponse\x12\x19\n\tHeartBeat\x12\x06.Empty\x1a\x04.Ack\x12\x1b\n\x0b\x43heckLeader\x12\x06.Empty\x1a\x04.Ack2\xa5\x01\n\x0f\x46ollowerService\x12\x37\n\rAcceptUpdates\x12\x15.AcceptUpdatesRequest\x1a\x0f.ServerResponse\x12\'\n\x0cUpdateLeader\x12\x11.NewLeaderRequest\x1a\x04.Ack\x12\x30\n\x0fUpdateFollowers\x12\x17.UpdateFollowersRequest\x1a\x04.Ackb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nspec.proto\x1a\x1fgoogle/protobuf/timestamp.proto\":\n\x14\x43reateAccountRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"a\n\x0eServerResponse\x12\x12\n\nerror_code\x18\x01 \x01(\x05\x12\x15\n\rerror_message\x18\x02 \x01(\t\x12\x12\n\nsession_id\x18\x03 \x01(\t\x12\x10\n\x08position\x18\x04 \x01(\x04\"M\n\"AcknowledgeReceivedMessagesRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x13\n\x0bmessage_ids\x18\x02 \x03(\x05\"2\n\x0cLoginRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"d\n\x0bSendRequest\x12\n\n\x02to\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x12\n\nsession_id\x18\x03 \x01(\t\x12$\n\rwrite_concern\x18\x04 \x01(\x0e\x32\r.WriteConcern\"R\n\x10ListUsersRequest\x12\x10\n\x08wildcard\x18\x01 \x01(\t\x12\x16\n\x0e\x61llow_follower\x18\x02 \x01(\x08\x12\x14\n\x0cmin_position\x18\x03 \x01(\x04\"@\n\x15\x44\x65leteMessagesRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x13\n\x0bmessage_ids\x18\x02 \x03(\x05\"*\n\x0bUnreadCount\x12\x0c\n\x04\x66rom\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x05\"X\n\rUnreadSummary\x12\x1c\n\x06\x63ounts\x18\x01 \x03(\x0b\x32\x0c.UnreadCount\x12\x12\n\nerror_code\x18\x02 \x01(\x05\x12\x15\n\rerror_message\x18\x03 \x01(\t\"R\n\x0eSessionRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x16\n\x0e\x61llow_follower\x18\x02 \x01(\x08\x12\x14\n\x0cmin_position\x18\x03 \x01(\x04\"C\n\x0eReceiveRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\r\n\x05limit\x18\x02 \x01(\x05\x12\x0e\n\x06\x63ursor\x18\x03 \x01(\t\"\x86\x01\n\x0b\x43hatRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x10\n\x08username\x18\x02 \x01(\t\x12\x16\n\x0e\x61llow_follower\x18\x03 \x01(\x08\x12\x14\n\x0cmin_position\x18\x04 \x01(\x04\x12\x0e\n\x06\x63ursor\x18\x05 \x01(\t\x12\x13\n\x0bknown_count\x18\x06 \x01(\x05\"<\n\x14\x44\x65leteAccountRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"m\n\x07Message\x12\r\n\x05\x66rom_\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x12\n\nmessage_id\x18\x03 \x01(\x05\x12.\n\ntime_stamp\x18\x04 \x01(\x0b\x32\x1a.google.protobuf.Timestamp\"u\n\x08Messages\x12\x12\n\nerror_code\x18\x01 \x01(\x05\x12\x15\n\rerror_message\x18\x02 \x01(\t\x12\x19\n\x07message\x18\x03 \x03(\x0b\x32\x08.Message\x12\x0e\n\x06\x63ursor\x18\x04 \x01(\t\x12\x13\n\x0bmessage_ids\x18\x05 \x03(\x05\"\xf5\x01\n\x10SyncStateRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x16\n\x0e\x61llow_follower\x18\x02 \x01(\x08\x12\x14\n\x0cmin_position\x18\x03 \x01(\x04\x12\x15\n\rusers_version\x18\x04 \x01(\t\x12\x16\n\x0eunread_version\x18\x05 \x01(\t\x12\x11\n\tchat_with\x18\x06 \x01(\t\x12\x13\n\x0b\x63hat_cursor\x18\x07 \x01(\t\x12\x12\n\nskip_users\x18\t \x01(\x08\x12\x18\n\x10\x63hat_known_count\x18\n \x01(\x05\x12\x14\n\x0c\x63hat_version\x18\x0b \x01(\tJ\x04\x08\x08\x10\t\"\xd3\x01\n\x11SyncStateResponse\x12\x12\n\nerror_code\x18\x01 \x01(\x05\x12\x15\n\rerror_message\x18\x02 \x01(\t\x12\x15\n\x05users\x18\x03 \x01(\x0b\x32\x06.Users\x12\x15\n\rusers_version\x18\x04 \x01(\t\x12\x1e\n\x06unread\x18\x05 \x01(\x0b\x32\x0e.UnreadSummary\x12\x16\n\x0eunread_version\x18\x06 \x01(\t\x12\x17\n\x04\x63hat\x18\x07 \x01(\x0b\x32\t.Messages\x12\x14\n\x0c\x63hat_version\x18\x08 \x01(\t\"\x07\n\x05\x45mpty\"(\n\x04User\x12\x10\n\x08username\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\"\x1c\n\x05Users\x12\x13\n\x04user\x18\x01 \x03(\x0b\x32\x05.User\"i\n\x0e\x44\x65liverRequest\x12\x0e\n\x06sender\x18\x01 \x01(\t\x12\x10\n\x08receiver\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\x12$\n\rwrite_concern\x18\x04 \x01(\x0e\x32\r.WriteConcern\"\x9d\x01\n\x0e\x46ollowerStatus\x12\x13\n\x0b\x66ollower_id\x18\x01 \x01(\t\x12\x18\n\x10\x61pplied_position\x18\x02 \x01(\x04\x12\x18\n\x10positions_behind\x18\x03 \x01(\x04\x12\x14\n\x0c\x62ytes_behind\x18\x04 \x01(\x04\x12\x16\n\x0eseconds_behind\x18\x05 \x01(\x01\x12\x14\n\x0clast_contact\x18\x06 \x01(\x01\"P\n\x11ReplicationStatus\x12\x17\n\x0fleader_position\x18\x01 \x01(\x04\x12\"\n\tfollowers\x18\x02 \x03(\x0b\x32\x0f.FollowerStatus\">\n\rHeartbeatPing\x12\x13\n\x0b\x66ollower_id\x18\x01 \x01(\t\x12\x18\n\x10\x61pplied_position\x18\x02 \x01(\x04\"x\n\x10NewLeaderRequest\x12\x1a\n\x12new_leader_address\x18\x01 \x01(\t\x12\x15\n\rnew_leader_id\x18\x02 \x01(\t\x12\x0c\n\x04term\x18\x03 \x01(\x04\x12#\n\nmembership\x18\x04 \x01(\x0b\x32\x0f.MembershipView\"%\n\x06Member\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0f\n\x07\x61\x64\x64ress\x18\x02 \x01(\t\"I\n\x0eMembershipView\x12\x0c\n\x04term\x18\x01 \x01(\x04\x12\x0f\n\x07version\x18\x02 \x01(\x04\x12\x18\n\x07members\x18\x03 \x03(\x0b\x32\x07.Member\"Z\n\x0bVoteRequest\x12\x0c\n\x04term\x18\x01 \x01(\x04\x12\x14\n\x0c\x63\x61ndidate_id\x18\x02 \x01(\t\x12\x10\n\x08pre_vote\x18\x03 \x01(\x08\x12\x15\n\rlast_position\x18\x04 \x01(\x04\"I\n\x0cVoteResponse\x12\x0c\n\x04term\x18\x01 \x01(\x04\x12\x14\n\x0cvote_granted\x18\x02 \x01(\x08\x12\x15\n\rlast_position\x18\x03 \x01(\x04\"-\n\x16UpdateFollowersRequest\x12\x13\n\x0bupdate_data\x18\x01 \x01(\x0c\"\x9e\x01\n\x17RegisterFollowerRequest\x12\x13\n\x0b\x66ollower_id\x18\x01 \x01(\t\x12\x18\n\x10\x66ollower_address\x18\x02 \x01(\t\x12\x18\n\x10\x61pplied_position\x18\x03 \x01(\x04\x12\x13\n\x0b\x63ompression\x18\x04 \x03(\t\x12\x15\n\rsnapshot_file\x18\x05 \x01(\x08\x12\x0e\n\x06log_id\x18\x06 \x01(\t\"\xb0\x02\n\x18RegisterFollowerResponse\x12\x12\n\nerror_code\x18\x01 \x01(\x05\x12\x15\n\rerror_message\x18\x02 \x01(\t\x12\x12\n\npickled_db\x18\x03 \x01(\x0c\x12\x17\n\x0fother_followers\x18\x04 \x03(\t\x12\x10\n\x08position\x18\x05 \x01(\x04\x12\x0c\n\x04term\x18\x06 \x01(\x04\x12\x13\n\x0bincremental\x18\x07 \x01(\x08\x12&\n\x07updates\x18\x08 \x03(\x0b\x32\x15.AcceptUpdatesRequest\x12\x13\n\x0b\x63ompression\x18\t \x01(\t\x12\x15\n\rsnapshot_file\x18\n \x01(\x08\x12\x0e\n\x06log_id\x18\x0b \x01(\t\x12#\n\nmembership\x18\x0c \x01(\x0b\x32\x0f.MembershipView\";\n\x0fSnapshotRequest\x12\x13\n\x0b\x66ollower_id\x18\x01 \x01(\t\x12\x13\n\x0b\x63ompression\x18\x02 \x03(\t\"b\n\rSnapshotChunk\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x13\n\x0b\x63ompression\x18\x02 \x01(\t\x12\x10\n\x08position\x18\x03 \x01(\x04\x12\x0c\n\x04term\x18\x04 \x01(\x04\x12\x0e\n\x06log_id\x18\x05 \x01(\t\"k\n\x14\x41\x63\x63\x65ptUpdatesRequest\x12\x13\n\x0bupdate_data\x18\x01 \x01(\x0c\x12\x10\n\x08position\x18\x02 \x01(\x04\x12\x17\n\x0fleader_position\x18\x03 \x01(\x04\x12\x13\n\x0b\x63ompression\x18\x04 \x01(\t\"P\n\x03\x41\x63k\x12\x12\n\nerror_code\x18\x01 \x01(\x05\x12\x15\n\rerror_message\x18\x02 \x01(\t\x12\x10\n\x08position\x18\x03 \x01(\x04\x12\x0c\n\x04term\x18\x04 \x01(\x04*v\n\x0cWriteConcern\x12\x19\n\x15WRITE_CONCERN_DEFAULT\x10\x00\x12\x18\n\x14WRITE_CONCERN_LEADER\x10\x01\x12\x15\n\x11WRITE_CONCERN_ONE\x10\x02\x12\x1a\n\x16WRITE_CONCERN_MAJORITY\x10\x03\x32\xf2\x04\n\rClientAccount\x12\x37\n\rCreateAccount\x12\x15.CreateAccountRequest\x1a\x0f.ServerResponse\x12&\n\tListUsers\x12\x11.ListUsersRequest\x1a\x06.Users\x12\'\n\x05Login\x12\r.LoginRequest\x1a\x0f.ServerResponse\x12%\n\x04Send\x12\x0c.SendRequest\x1a\x0f.ServerResponse\x12)\n\x0bGetMessages\x12\x0f.ReceiveRequest\x1a\t.Messages\x12\"\n\x07GetChat\x12\x0c.ChatRequest\x1a\t.Messages\x12S\n\x1b\x41\x63knowledgeReceivedMessages\x12#.AcknowledgeReceivedMessagesRequest\x1a\x0f.ServerResponse\x12\x37\n\rDeleteAccount\x12\x15.DeleteAccountRequest\x1a\x0f.ServerResponse\x12\x30\n\x06Logout\x12\x15.DeleteAccountRequest\x1a\x0f.ServerResponse\x12\x39\n\x0e\x44\x65leteMessages\x12\x16.DeleteMessagesRequest\x1a\x0f.ServerResponse\x12\x32\n\x0fGetUnreadCounts\x12\x0f.SessionRequest\x1a\x0e.UnreadSummary\x12\x32\n\tSyncState\x12\x11.SyncStateRequest\x1a\x12.SyncStateResponse2\xd4\x02\n\rLeaderService\x12G\n\x10RegisterFollower\x12\x18.RegisterFollowerRequest\x1a\x19.RegisterFollowerResponse\x12\x19\n\tHeartBeat\x12\x06.Empty\x1a\x04.Ack\x12+\n\x0fHeartBeatStream\x12\x0e.HeartbeatPing\x1a\x04.Ack(\x01\x30\x01\x12\x1b\n\x0b\x43heckLeader\x12\x06.Empty\x1a\x04.Ack\x12\x32\n\x14GetReplicationStatus\x12\x06.Empty\x1a\x12.ReplicationStatus\x12\x34\n\x0eStreamSnapshot\x12\x10.SnapshotRequest\x1a\x0e.SnapshotChunk0\x01\x12+\n\x07\x44\x65liver\x12\x0f.DeliverRequest\x1a\x0f.ServerResponse2\xfc\x01\n\x0f\x46ollowerService\x12\x37\n\rAcceptUpdates\x12\x15.AcceptUpdatesRequest\x1a\x0f.ServerResponse\x12\'\n\x0cUpdateLeader\x12\x11.NewLeaderRequest\x1a\x04.Ack\x12\x30\n\x0fUpdateFollowers\x12\x17.UpdateFollowersRequest\x1a\x04.Ack\x12)\n\x10UpdateMembership\x12\x0f.MembershipView\x1a\x04.Ack\x12*\n\x0bRequestVote\x12\x0c.VoteRequest\x1a\r.VoteResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'spec_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
+  _globals['_WRITECONCERN']._serialized_start=3531
+  _globals['_WRITECONCERN']._serialized_end=3649
   _globals['_CREATEACCOUNTREQUEST']._serialized_start=47
   _globals['_CREATEACCOUNTREQUEST']._serialized_end=105
   _globals['_SERVERRESPONSE']._serialized_start=107
-  _globals['_SERVERRESPONSE']._serialized_end=186
-  _globals['_ACKNOWLEDGERECEIVEDMESSAGESREQUEST']._serialized_start=188
-  _globals['_ACKNOWLEDGERECEIVEDMESSAGESREQUEST']._serialized_end=265
-  _globals['_LOGINREQUEST']._serialized_start=267
-  _globals['_LOGINREQUEST']._serialized_end=317
-  _globals['_SENDREQUEST']._serialized_start=319
-  _globals['_SENDREQUEST']._serialized_end=381
-  _globals['_LISTUSERSREQUEST']._serialized_start=383
-  _globals['_LISTUSERSREQUEST']._serialized_end=419
-  _globals['_DELETEMESSAGESREQUEST']._serialized_start=421
-  _globals['_DELETEMESSAGESREQUEST']._serialized_end=485
-  _globals['_UNREADCOUNT']._serialized_start=487
-  _globals['_UNREADCOUNT']._serialized_end=529
-  _globals['_UNREADSUMMARY']._serialized_start=531
-  _globals['_UNREADSUMMARY']._serialized_end=619
-  _globals['_SESSIONREQUEST']._serialized_start=621
-  _globals['_SESSIONREQUEST']._serialized_end=657
-  _globals['_RECEIVEREQUEST']._serialized_start=659
-  _globals['_RECEIVEREQUEST']._serialized_end=695
-  _globals['_CHATREQUEST']._serialized_start=697
-  _globals['_CHATREQUEST']._serialized_end=748
-  _globals['_DELETEACCOUNTREQUEST']._serialized_start=750
-  _globals['_DELETEACCOUNTREQUEST']._serialized_end=792
-  _globals['_MESSAGE']._serialized_start=794
-  _globals['_MESSAGE']._serialized_end=903
-  _globals['_MESSAGES']._serialized_start=905
-  _globals['_MESSAGES']._serialized_end=985
-  _globals['_EMPTY']._serialized_start=987
-  _globals['_EMPTY']._serialized_end=994
-  _globals['_USER']._serialized_start=996
-  _globals['_USER']._serialized_end=1036
-  _globals['_USERS']._serialized_start=1038
-  _globals['_USERS']._serialized_end=1066
-  _globals['_NEWLEADERREQUEST']._serialized_start=1068
-  _globals['_NEWLEADERREQUEST']._serialized_end=1137
-  _globals['_UPDATEFOLLOWERSREQUEST']._serialized_start=1139
-  _globals['_UPDATEFOLLOWERSREQUEST']._serialized_end=1184
-  _globals['_REGISTERFOLLOWERREQUEST']._serialized_start=1186
-  _globals['_REGISTERFOLLOWERREQUEST']._serialized_end=1258
-  _globals['_REGISTERFOLLOWERRESPONSE']._serialized_start=1260
-  _globals['_REGISTERFOLLOWERRESPONSE']._serialized_end=1374
-  _globals['_ACCEPTUPDATESREQUEST']._serialized_start=1376
-  _globals['_ACCEPTUPDATESREQUEST']._serialized_end=1419
-  _globals['_ACK']._serialized_start=1421
-  _globals['_ACK']._serialized_end=1469
-  _globals['_CLIENTACCOUNT']._serialized_start=1472
-  _globals['_CLIENTACCOUNT']._serialized_end=2046
-  _globals['_LEADERSERVICE']._serialized_start=2049
-  _globals['_LEADERSERVICE']._serialized_end=2193
-  _globals['_FOLLOWERSERVICE']._serialized_start=2196
-  _globals['_FOLLOWERSERVICE']._serialized_end=2361
+  _globals['_SERVERRESPONSE']._serialized_end=204
+  _globals['_ACKNOWLEDGERECEIVEDMESSAGESREQUEST']._serialized_start=206
+  _globals['_ACKNOWLEDGERECEIVEDMESSAGESREQUEST']._serialized_end=283
+  _globals['_LOGINREQUEST']._serialized_start=285
+  _globals['_LOGINREQUEST']._serialized_end=335
+  _globals['_SENDREQUEST']._serialized_start=337
+  _globals['_SENDREQUEST']._serialized_end=437
+  _globals['_LISTUSERSREQUEST']._serialized_start=439
+  _globals['_LISTUSERSREQUEST']._serialized_end=521
+  _globals['_DELETEMESSAGESREQUEST']._serialized_start=523
+  _globals['_DELETEMESSAGESREQUEST']._serialized_end=587
+  _globals['_UNREADCOUNT']._serialized_start=589
+  _globals['_UNREADCOUNT']._serialized_end=631
+  _globals['_UNREADSUMMARY']._serialized_start=633
+  _globals['_UNREADSUMMARY']._serialized_end=721
+  _globals['_SESSIONREQUEST']._serialized_start=723
+  _globals['_SESSIONREQUEST']._serialized_end=805
+  _globals['_RECEIVEREQUEST']._serialized_start=807
+  _globals['_RECEIVEREQUEST']._serialized_end=874
+  _globals['_CHATREQUEST']._serialized_start=877
+  _globals['_CHATREQUEST']._serialized_end=1011
+  _globals['_DELETEACCOUNTREQUEST']._serialized_start=1013
+  _globals['_DELETEACCOUNTREQUEST']._serialized_end=1073
+  _globals['_MESSAGE']._serialized_start=1075
+  _globals['_MESSAGE']._serialized_end=1184
+  _globals['_MESSAGES']._serialized_start=1186
+  _globals['_MESSAGES']._serialized_end=1303
+  _globals['_SYNCSTATEREQUEST']._serialized_start=1306
+  _globals['_SYNCSTATEREQUEST']._serialized_end=1551
+  _globals['_SYNCSTATERESPONSE']._serialized_start=1554
+  _globals['_SYNCSTATERESPONSE']._serialized_end=1765
+  _globals['_EMPTY']._serialized_start=1767
+  _globals['_EMPTY']._serialized_end=1774
+  _globals['_USER']._serialized_start=1776
+  _globals['_USER']._serialized_end=1816
+  _globals['_USERS']._serialized_start=1818
+  _globals['_USERS']._serialized_end=1846
+  _globals['_DELIVERREQUEST']._serialized_start=1848
+  _globals['_DELIVERREQUEST']._serialized_end=1953
+  _globals['_FOLLOWERSTATUS']._serialized_start=1956
+  _globals['_FOLLOWERSTATUS']._serialized_end=2113
+  _globals['_REPLICATIONSTATUS']._serialized_start=2115
+  _globals['_REPLICATIONSTATUS']._serialized_end=2195
+  _globals['_HEARTBEATPING']._serialized_start=2197
+  _globals['_HEARTBEATPING']._serialized_end=2259
+  _globals['_NEWLEADERREQUEST']._serialized_start=2261
+  _globals['_NEWLEADERREQUEST']._serialized_end=2381
+  _globals['_MEMBER']._serialized_start=2383
+  _globals['_MEMBER']._serialized_end=2420
+  _globals['_MEMBERSHIPVIEW']._serialized_start=2422
+  _globals['_MEMBERSHIPVIEW']._serialized_end=2495
+  _globals['_VOTEREQUEST']._serialized_start=2497
+  _globals['_VOTEREQUEST']._serialized_end=2587
+  _globals['_VOTERESPONSE']._serialized_start=2589
+  _globals['_VOTERESPONSE']._serialized_end=2662
+  _globals['_UPDATEFOLLOWERSREQUEST']._serialized_start=2664
+  _globals['_UPDATEFOLLOWERSREQUEST']._serialized_end=2709
+  _globals['_REGISTERFOLLOWERREQUEST']._serialized_start=2712
+  _globals['_REGISTERFOLLOWERREQUEST']._serialized_end=2870
+  _globals['_REGISTERFOLLOWERRESPONSE']._serialized_start=2873
+  _globals['_REGISTERFOLLOWERRESPONSE']._serialized_end=3177
+  _globals['_SNAPSHOTREQUEST']._serialized_start=3179
+  _globals['_SNAPSHOTREQUEST']._serialized_end=3238
+  _globals['_SNAPSHOTCHUNK']._serialized_start=3240
+  _globals['_SNAPSHOTCHUNK']._serialized_end=3338
+  _globals['_ACCEPTUPDATESREQUEST']._serialized_start=3340
+  _globals['_ACCEPTUPDATESREQUEST']._serialized_end=3447
+  _globals['_ACK']._serialized_start=3449
+  _globals['_ACK']._serialized_end=3529
+  _globals['_CLIENTACCOUNT']._serialized_start=3652
+  _globals['_CLIENTACCOUNT']._serialized_end=4278
+  _globals['_LEADERSERVICE']._serialized_start=4281
+  _globals['_LEADERSERVICE']._serialized_end=4621
+  _globals['_FOLLOWERSERVICE']._serialized_start=4624
+  _globals['_FOLLOWERSERVICE']._serialized_end=4876
 # @@protoc_insertion_point(module_scope)
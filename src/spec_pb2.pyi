@@ -1,90 +1,426 @@
+from google.protobuf import timestamp_pb2 as _timestamp_pb2
 from google.protobuf.internal import containers as _containers
+from google.protobuf.internal import enum_type_wrapper as _enum_type_wrapper
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import message as _message
 from typing import ClassVar as _ClassVar, Iterable as _Iterable, Mapping as _Mapping, Optional as _Optional, Union as _Union
 
 DESCRIPTOR: _descriptor.FileDescriptor
 
+class WriteConcern(int, metaclass=_enum_type_wrapper.EnumTypeWrapper):
+    __slots__ = ()
+    WRITE_CONCERN_DEFAULT: _ClassVar[WriteConcern]
+    WRITE_CONCERN_LEADER: _ClassVar[WriteConcern]
+    WRITE_CONCERN_ONE: _ClassVar[WriteConcern]
+    WRITE_CONCERN_MAJORITY: _ClassVar[WriteConcern]
+WRITE_CONCERN_DEFAULT: WriteConcern
+WRITE_CONCERN_LEADER: WriteConcern
+WRITE_CONCERN_ONE: WriteConcern
+WRITE_CONCERN_MAJORITY: WriteConcern
+
 class CreateAccountRequest(_message.Message):
-    __slots__ = ["password", "username"]
-    PASSWORD_FIELD_NUMBER: _ClassVar[int]
+    __slots__ = ("username", "password")
     USERNAME_FIELD_NUMBER: _ClassVar[int]
-    password: str
+    PASSWORD_FIELD_NUMBER: _ClassVar[int]
     username: str
+    password: str
     def __init__(self, username: _Optional[str] = ..., password: _Optional[str] = ...) -> None: ...
 
-class DeleteAccountRequest(_message.Message):
-    __slots__ = ["session_id"]
+class ServerResponse(_message.Message):
+    __slots__ = ("error_code", "error_message", "session_id", "position")
+    ERROR_CODE_FIELD_NUMBER: _ClassVar[int]
+    ERROR_MESSAGE_FIELD_NUMBER: _ClassVar[int]
     SESSION_ID_FIELD_NUMBER: _ClassVar[int]
+    POSITION_FIELD_NUMBER: _ClassVar[int]
+    error_code: int
+    error_message: str
     session_id: str
-    def __init__(self, session_id: _Optional[str] = ...) -> None: ...
+    position: int
+    def __init__(self, error_code: _Optional[int] = ..., error_message: _Optional[str] = ..., session_id: _Optional[str] = ..., position: _Optional[int] = ...) -> None: ...
 
-class Empty(_message.Message):
-    __slots__ = []
-    def __init__(self) -> None: ...
+class AcknowledgeReceivedMessagesRequest(_message.Message):
+    __slots__ = ("session_id", "message_ids")
+    SESSION_ID_FIELD_NUMBER: _ClassVar[int]
+    MESSAGE_IDS_FIELD_NUMBER: _ClassVar[int]
+    session_id: str
+    message_ids: _containers.RepeatedScalarFieldContainer[int]
+    def __init__(self, session_id: _Optional[str] = ..., message_ids: _Optional[_Iterable[int]] = ...) -> None: ...
 
 class LoginRequest(_message.Message):
-    __slots__ = ["password", "username"]
-    PASSWORD_FIELD_NUMBER: _ClassVar[int]
+    __slots__ = ("username", "password")
     USERNAME_FIELD_NUMBER: _ClassVar[int]
-    password: str
+    PASSWORD_FIELD_NUMBER: _ClassVar[int]
     username: str
+    password: str
     def __init__(self, username: _Optional[str] = ..., password: _Optional[str] = ...) -> None: ...
 
+class SendRequest(_message.Message):
+    __slots__ = ("to", "message", "session_id", "write_concern")
+    TO_FIELD_NUMBER: _ClassVar[int]
+    MESSAGE_FIELD_NUMBER: _ClassVar[int]
+    SESSION_ID_FIELD_NUMBER: _ClassVar[int]
+    WRITE_CONCERN_FIELD_NUMBER: _ClassVar[int]
+    to: str
+    message: str
+    session_id: str
+    write_concern: WriteConcern
+    def __init__(self, to: _Optional[str] = ..., message: _Optional[str] = ..., session_id: _Optional[str] = ..., write_concern: _Optional[_Union[WriteConcern, str]] = ...) -> None: ...
+
+class ListUsersRequest(_message.Message):
+    __slots__ = ("wildcard", "allow_follower", "min_position")
+    WILDCARD_FIELD_NUMBER: _ClassVar[int]
+    ALLOW_FOLLOWER_FIELD_NUMBER: _ClassVar[int]
+    MIN_POSITION_FIELD_NUMBER: _ClassVar[int]
+    wildcard: str
+    allow_follower: bool
+    min_position: int
+    def __init__(self, wildcard: _Optional[str] = ..., allow_follower: bool = ..., min_position: _Optional[int] = ...) -> None: ...
+
+class DeleteMessagesRequest(_message.Message):
+    __slots__ = ("session_id", "message_ids")
+    SESSION_ID_FIELD_NUMBER: _ClassVar[int]
+    MESSAGE_IDS_FIELD_NUMBER: _ClassVar[int]
+    session_id: str
+    message_ids: _containers.RepeatedScalarFieldContainer[int]
+    def __init__(self, session_id: _Optional[str] = ..., message_ids: _Optional[_Iterable[int]] = ...) -> None: ...
+
+class UnreadCount(_message.Message):
+    __slots__ = ("count",)
+    FROM_FIELD_NUMBER: _ClassVar[int]
+    COUNT_FIELD_NUMBER: _ClassVar[int]
+    count: int
+    def __init__(self, count: _Optional[int] = ..., **kwargs) -> None: ...
+
+class UnreadSummary(_message.Message):
+    __slots__ = ("counts", "error_code", "error_message")
+    COUNTS_FIELD_NUMBER: _ClassVar[int]
+    ERROR_CODE_FIELD_NUMBER: _ClassVar[int]
+    ERROR_MESSAGE_FIELD_NUMBER: _ClassVar[int]
+    counts: _containers.RepeatedCompositeFieldContainer[UnreadCount]
+    error_code: int
+    error_message: str
+    def __init__(self, counts: _Optional[_Iterable[_Union[UnreadCount, _Mapping]]] = ..., error_code: _Optional[int] = ..., error_message: _Optional[str] = ...) -> None: ...
+
+class SessionRequest(_message.Message):
+    __slots__ = ("session_id", "allow_follower", "min_position")
+    SESSION_ID_FIELD_NUMBER: _ClassVar[int]
+    ALLOW_FOLLOWER_FIELD_NUMBER: _ClassVar[int]
+    MIN_POSITION_FIELD_NUMBER: _ClassVar[int]
+    session_id: str
+    allow_follower: bool
+    min_position: int
+    def __init__(self, session_id: _Optional[str] = ..., allow_follower: bool = ..., min_position: _Optional[int] = ...) -> None: ...
+
+class ReceiveRequest(_message.Message):
+    __slots__ = ("session_id", "limit", "cursor")
+    SESSION_ID_FIELD_NUMBER: _ClassVar[int]
+    LIMIT_FIELD_NUMBER: _ClassVar[int]
+    CURSOR_FIELD_NUMBER: _ClassVar[int]
+    session_id: str
+    limit: int
+    cursor: str
+    def __init__(self, session_id: _Optional[str] = ..., limit: _Optional[int] = ..., cursor: _Optional[str] = ...) -> None: ...
+
+class ChatRequest(_message.Message):
+    __slots__ = ("session_id", "username", "allow_follower", "min_position", "cursor", "known_count")
+    SESSION_ID_FIELD_NUMBER: _ClassVar[int]
+    USERNAME_FIELD_NUMBER: _ClassVar[int]
+    ALLOW_FOLLOWER_FIELD_NUMBER: _ClassVar[int]
+    MIN_POSITION_FIELD_NUMBER: _ClassVar[int]
+    CURSOR_FIELD_NUMBER: _ClassVar[int]
+    KNOWN_COUNT_FIELD_NUMBER: _ClassVar[int]
+    session_id: str
+    username: str
+    allow_follower: bool
+    min_position: int
+    cursor: str
+    known_count: int
+    def __init__(self, session_id: _Optional[str] = ..., username: _Optional[str] = ..., allow_follower: bool = ..., min_position: _Optional[int] = ..., cursor: _Optional[str] = ..., known_count: _Optional[int] = ...) -> None: ...
+
+class DeleteAccountRequest(_message.Message):
+    __slots__ = ("session_id", "password")
+    SESSION_ID_FIELD_NUMBER: _ClassVar[int]
+    PASSWORD_FIELD_NUMBER: _ClassVar[int]
+    session_id: str
+    password: str
+    def __init__(self, session_id: _Optional[str] = ..., password: _Optional[str] = ...) -> None: ...
+
 class Message(_message.Message):
-    __slots__ = ["from_", "message"]
+    __slots__ = ("from_", "message", "message_id", "time_stamp")
     FROM__FIELD_NUMBER: _ClassVar[int]
     MESSAGE_FIELD_NUMBER: _ClassVar[int]
+    MESSAGE_ID_FIELD_NUMBER: _ClassVar[int]
+    TIME_STAMP_FIELD_NUMBER: _ClassVar[int]
     from_: str
     message: str
-    def __init__(self, from_: _Optional[str] = ..., message: _Optional[str] = ...) -> None: ...
+    message_id: int
+    time_stamp: _timestamp_pb2.Timestamp
+    def __init__(self, from_: _Optional[str] = ..., message: _Optional[str] = ..., message_id: _Optional[int] = ..., time_stamp: _Optional[_Union[_timestamp_pb2.Timestamp, _Mapping]] = ...) -> None: ...
 
 class Messages(_message.Message):
-    __slots__ = ["error_code", "error_message", "message"]
+    __slots__ = ("error_code", "error_message", "message", "cursor", "message_ids")
     ERROR_CODE_FIELD_NUMBER: _ClassVar[int]
     ERROR_MESSAGE_FIELD_NUMBER: _ClassVar[int]
     MESSAGE_FIELD_NUMBER: _ClassVar[int]
+    CURSOR_FIELD_NUMBER: _ClassVar[int]
+    MESSAGE_IDS_FIELD_NUMBER: _ClassVar[int]
     error_code: int
     error_message: str
     message: _containers.RepeatedCompositeFieldContainer[Message]
-    def __init__(self, error_code: _Optional[int] = ..., error_message: _Optional[str] = ..., message: _Optional[_Iterable[_Union[Message, _Mapping]]] = ...) -> None: ...
+    cursor: str
+    message_ids: _containers.RepeatedScalarFieldContainer[int]
+    def __init__(self, error_code: _Optional[int] = ..., error_message: _Optional[str] = ..., message: _Optional[_Iterable[_Union[Message, _Mapping]]] = ..., cursor: _Optional[str] = ..., message_ids: _Optional[_Iterable[int]] = ...) -> None: ...
 
-class ReceiveRequest(_message.Message):
-    __slots__ = ["session_id"]
+class SyncStateRequest(_message.Message):
+    __slots__ = ("session_id", "allow_follower", "min_position", "users_version", "unread_version", "chat_with", "chat_cursor", "skip_users", "chat_known_count", "chat_version")
     SESSION_ID_FIELD_NUMBER: _ClassVar[int]
+    ALLOW_FOLLOWER_FIELD_NUMBER: _ClassVar[int]
+    MIN_POSITION_FIELD_NUMBER: _ClassVar[int]
+    USERS_VERSION_FIELD_NUMBER: _ClassVar[int]
+    UNREAD_VERSION_FIELD_NUMBER: _ClassVar[int]
+    CHAT_WITH_FIELD_NUMBER: _ClassVar[int]
+    CHAT_CURSOR_FIELD_NUMBER: _ClassVar[int]
+    SKIP_USERS_FIELD_NUMBER: _ClassVar[int]
+    CHAT_KNOWN_COUNT_FIELD_NUMBER: _ClassVar[int]
+    CHAT_VERSION_FIELD_NUMBER: _ClassVar[int]
     session_id: str
-    def __init__(self, session_id: _Optional[str] = ...) -> None: ...
+    allow_follower: bool
+    min_position: int
+    users_version: str
+    unread_version: str
+    chat_with: str
+    chat_cursor: str
+    skip_users: bool
+    chat_known_count: int
+    chat_version: str
+    def __init__(self, session_id: _Optional[str] = ..., allow_follower: bool = ..., min_position: _Optional[int] = ..., users_version: _Optional[str] = ..., unread_version: _Optional[str] = ..., chat_with: _Optional[str] = ..., chat_cursor: _Optional[str] = ..., skip_users: bool = ..., chat_known_count: _Optional[int] = ..., chat_version: _Optional[str] = ...) -> None: ...
 
-class SendRequest(_message.Message):
-    __slots__ = ["message", "session_id", "to"]
-    MESSAGE_FIELD_NUMBER: _ClassVar[int]
-    SESSION_ID_FIELD_NUMBER: _ClassVar[int]
-    TO_FIELD_NUMBER: _ClassVar[int]
-    message: str
-    session_id: str
-    to: str
-    def __init__(self, to: _Optional[str] = ..., message: _Optional[str] = ..., session_id: _Optional[str] = ...) -> None: ...
-
-class ServerResponse(_message.Message):
-    __slots__ = ["error_code", "error_message", "session_id"]
+class SyncStateResponse(_message.Message):
+    __slots__ = ("error_code", "error_message", "users", "users_version", "unread", "unread_version", "chat", "chat_version")
     ERROR_CODE_FIELD_NUMBER: _ClassVar[int]
     ERROR_MESSAGE_FIELD_NUMBER: _ClassVar[int]
-    SESSION_ID_FIELD_NUMBER: _ClassVar[int]
+    USERS_FIELD_NUMBER: _ClassVar[int]
+    USERS_VERSION_FIELD_NUMBER: _ClassVar[int]
+    UNREAD_FIELD_NUMBER: _ClassVar[int]
+    UNREAD_VERSION_FIELD_NUMBER: _ClassVar[int]
+    CHAT_FIELD_NUMBER: _ClassVar[int]
+    CHAT_VERSION_FIELD_NUMBER: _ClassVar[int]
     error_code: int
     error_message: str
-    session_id: str
-    def __init__(self, error_code: _Optional[int] = ..., error_message: _Optional[str] = ..., session_id: _Optional[str] = ...) -> None: ...
+    users: Users
+    users_version: str
+    unread: UnreadSummary
+    unread_version: str
+    chat: Messages
+    chat_version: str
+    def __init__(self, error_code: _Optional[int] = ..., error_message: _Optional[str] = ..., users: _Optional[_Union[Users, _Mapping]] = ..., users_version: _Optional[str] = ..., unread: _Optional[_Union[UnreadSummary, _Mapping]] = ..., unread_version: _Optional[str] = ..., chat: _Optional[_Union[Messages, _Mapping]] = ..., chat_version: _Optional[str] = ...) -> None: ...
+
+class Empty(_message.Message):
+    __slots__ = ()
+    def __init__(self) -> None: ...
 
 class User(_message.Message):
-    __slots__ = ["status", "username"]
-    STATUS_FIELD_NUMBER: _ClassVar[int]
+    __slots__ = ("username", "status")
     USERNAME_FIELD_NUMBER: _ClassVar[int]
-    status: str
+    STATUS_FIELD_NUMBER: _ClassVar[int]
     username: str
+    status: str
     def __init__(self, username: _Optional[str] = ..., status: _Optional[str] = ...) -> None: ...
 
 class Users(_message.Message):
-    __slots__ = ["user"]
+    __slots__ = ("user",)
     USER_FIELD_NUMBER: _ClassVar[int]
     user: _containers.RepeatedCompositeFieldContainer[User]
     def __init__(self, user: _Optional[_Iterable[_Union[User, _Mapping]]] = ...) -> None: ...
+
+class DeliverRequest(_message.Message):
+    __slots__ = ("sender", "receiver", "message", "write_concern")
+    SENDER_FIELD_NUMBER: _ClassVar[int]
+    RECEIVER_FIELD_NUMBER: _ClassVar[int]
+    MESSAGE_FIELD_NUMBER: _ClassVar[int]
+    WRITE_CONCERN_FIELD_NUMBER: _ClassVar[int]
+    sender: str
+    receiver: str
+    message: str
+    write_concern: WriteConcern
+    def __init__(self, sender: _Optional[str] = ..., receiver: _Optional[str] = ..., message: _Optional[str] = ..., write_concern: _Optional[_Union[WriteConcern, str]] = ...) -> None: ...
+
+class FollowerStatus(_message.Message):
+    __slots__ = ("follower_id", "applied_position", "positions_behind", "bytes_behind", "seconds_behind", "last_contact")
+    FOLLOWER_ID_FIELD_NUMBER: _ClassVar[int]
+    APPLIED_POSITION_FIELD_NUMBER: _ClassVar[int]
+    POSITIONS_BEHIND_FIELD_NUMBER: _ClassVar[int]
+    BYTES_BEHIND_FIELD_NUMBER: _ClassVar[int]
+    SECONDS_BEHIND_FIELD_NUMBER: _ClassVar[int]
+    LAST_CONTACT_FIELD_NUMBER: _ClassVar[int]
+    follower_id: str
+    applied_position: int
+    positions_behind: int
+    bytes_behind: int
+    seconds_behind: float
+    last_contact: float
+    def __init__(self, follower_id: _Optional[str] = ..., applied_position: _Optional[int] = ..., positions_behind: _Optional[int] = ..., bytes_behind: _Optional[int] = ..., seconds_behind: _Optional[float] = ..., last_contact: _Optional[float] = ...) -> None: ...
+
+class ReplicationStatus(_message.Message):
+    __slots__ = ("leader_position", "followers")
+    LEADER_POSITION_FIELD_NUMBER: _ClassVar[int]
+    FOLLOWERS_FIELD_NUMBER: _ClassVar[int]
+    leader_position: int
+    followers: _containers.RepeatedCompositeFieldContainer[FollowerStatus]
+    def __init__(self, leader_position: _Optional[int] = ..., followers: _Optional[_Iterable[_Union[FollowerStatus, _Mapping]]] = ...) -> None: ...
+
+class HeartbeatPing(_message.Message):
+    __slots__ = ("follower_id", "applied_position")
+    FOLLOWER_ID_FIELD_NUMBER: _ClassVar[int]
+    APPLIED_POSITION_FIELD_NUMBER: _ClassVar[int]
+    follower_id: str
+    applied_position: int
+    def __init__(self, follower_id: _Optional[str] = ..., applied_position: _Optional[int] = ...) -> None: ...
+
+class NewLeaderRequest(_message.Message):
+    __slots__ = ("new_leader_address", "new_leader_id", "term", "membership")
+    NEW_LEADER_ADDRESS_FIELD_NUMBER: _ClassVar[int]
+    NEW_LEADER_ID_FIELD_NUMBER: _ClassVar[int]
+    TERM_FIELD_NUMBER: _ClassVar[int]
+    MEMBERSHIP_FIELD_NUMBER: _ClassVar[int]
+    new_leader_address: str
+    new_leader_id: str
+    term: int
+    membership: MembershipView
+    def __init__(self, new_leader_address: _Optional[str] = ..., new_leader_id: _Optional[str] = ..., term: _Optional[int] = ..., membership: _Optional[_Union[MembershipView, _Mapping]] = ...) -> None: ...
+
+class Member(_message.Message):
+    __slots__ = ("id", "address")
+    ID_FIELD_NUMBER: _ClassVar[int]
+    ADDRESS_FIELD_NUMBER: _ClassVar[int]
+    id: str
+    address: str
+    def __init__(self, id: _Optional[str] = ..., address: _Optional[str] = ...) -> None: ...
+
+class MembershipView(_message.Message):
+    __slots__ = ("term", "version", "members")
+    TERM_FIELD_NUMBER: _ClassVar[int]
+    VERSION_FIELD_NUMBER: _ClassVar[int]
+    MEMBERS_FIELD_NUMBER: _ClassVar[int]
+    term: int
+    version: int
+    members: _containers.RepeatedCompositeFieldContainer[Member]
+    def __init__(self, term: _Optional[int] = ..., version: _Optional[int] = ..., members: _Optional[_Iterable[_Union[Member, _Mapping]]] = ...) -> None: ...
+
+class VoteRequest(_message.Message):
+    __slots__ = ("term", "candidate_id", "pre_vote", "last_position")
+    TERM_FIELD_NUMBER: _ClassVar[int]
+    CANDIDATE_ID_FIELD_NUMBER: _ClassVar[int]
+    PRE_VOTE_FIELD_NUMBER: _ClassVar[int]
+    LAST_POSITION_FIELD_NUMBER: _ClassVar[int]
+    term: int
+    candidate_id: str
+    pre_vote: bool
+    last_position: int
+    def __init__(self, term: _Optional[int] = ..., candidate_id: _Optional[str] = ..., pre_vote: bool = ..., last_position: _Optional[int] = ...) -> None: ...
+
+class VoteResponse(_message.Message):
+    __slots__ = ("term", "vote_granted", "last_position")
+    TERM_FIELD_NUMBER: _ClassVar[int]
+    VOTE_GRANTED_FIELD_NUMBER: _ClassVar[int]
+    LAST_POSITION_FIELD_NUMBER: _ClassVar[int]
+    term: int
+    vote_granted: bool
+    last_position: int
+    def __init__(self, term: _Optional[int] = ..., vote_granted: bool = ..., last_position: _Optional[int] = ...) -> None: ...
+
+class UpdateFollowersRequest(_message.Message):
+    __slots__ = ("update_data",)
+    UPDATE_DATA_FIELD_NUMBER: _ClassVar[int]
+    update_data: bytes
+    def __init__(self, update_data: _Optional[bytes] = ...) -> None: ...
+
+class RegisterFollowerRequest(_message.Message):
+    __slots__ = ("follower_id", "follower_address", "applied_position", "compression", "snapshot_file", "log_id")
+    FOLLOWER_ID_FIELD_NUMBER: _ClassVar[int]
+    FOLLOWER_ADDRESS_FIELD_NUMBER: _ClassVar[int]
+    APPLIED_POSITION_FIELD_NUMBER: _ClassVar[int]
+    COMPRESSION_FIELD_NUMBER: _ClassVar[int]
+    SNAPSHOT_FILE_FIELD_NUMBER: _ClassVar[int]
+    LOG_ID_FIELD_NUMBER: _ClassVar[int]
+    follower_id: str
+    follower_address: str
+    applied_position: int
+    compression: _containers.RepeatedScalarFieldContainer[str]
+    snapshot_file: bool
+    log_id: str
+    def __init__(self, follower_id: _Optional[str] = ..., follower_address: _Optional[str] = ..., applied_position: _Optional[int] = ..., compression: _Optional[_Iterable[str]] = ..., snapshot_file: bool = ..., log_id: _Optional[str] = ...) -> None: ...
+
+class RegisterFollowerResponse(_message.Message):
+    __slots__ = ("error_code", "error_message", "pickled_db", "other_followers", "position", "term", "incremental", "updates", "compression", "snapshot_file", "log_id", "membership")
+    ERROR_CODE_FIELD_NUMBER: _ClassVar[int]
+    ERROR_MESSAGE_FIELD_NUMBER: _ClassVar[int]
+    PICKLED_DB_FIELD_NUMBER: _ClassVar[int]
+    OTHER_FOLLOWERS_FIELD_NUMBER: _ClassVar[int]
+    POSITION_FIELD_NUMBER: _ClassVar[int]
+    TERM_FIELD_NUMBER: _ClassVar[int]
+    INCREMENTAL_FIELD_NUMBER: _ClassVar[int]
+    UPDATES_FIELD_NUMBER: _ClassVar[int]
+    COMPRESSION_FIELD_NUMBER: _ClassVar[int]
+    SNAPSHOT_FILE_FIELD_NUMBER: _ClassVar[int]
+    LOG_ID_FIELD_NUMBER: _ClassVar[int]
+    MEMBERSHIP_FIELD_NUMBER: _ClassVar[int]
+    error_code: int
+    error_message: str
+    pickled_db: bytes
+    other_followers: _containers.RepeatedScalarFieldContainer[str]
+    position: int
+    term: int
+    incremental: bool
+    updates: _containers.RepeatedCompositeFieldContainer[AcceptUpdatesRequest]
+    compression: str
+    snapshot_file: bool
+    log_id: str
+    membership: MembershipView
+    def __init__(self, error_code: _Optional[int] = ..., error_message: _Optional[str] = ..., pickled_db: _Optional[bytes] = ..., other_followers: _Optional[_Iterable[str]] = ..., position: _Optional[int] = ..., term: _Optional[int] = ..., incremental: bool = ..., updates: _Optional[_Iterable[_Union[AcceptUpdatesRequest, _Mapping]]] = ..., compression: _Optional[str] = ..., snapshot_file: bool = ..., log_id: _Optional[str] = ..., membership: _Optional[_Union[MembershipView, _Mapping]] = ...) -> None: ...
+
+class SnapshotRequest(_message.Message):
+    __slots__ = ("follower_id", "compression")
+    FOLLOWER_ID_FIELD_NUMBER: _ClassVar[int]
+    COMPRESSION_FIELD_NUMBER: _ClassVar[int]
+    follower_id: str
+    compression: _containers.RepeatedScalarFieldContainer[str]
+    def __init__(self, follower_id: _Optional[str] = ..., compression: _Optional[_Iterable[str]] = ...) -> None: ...
+
+class SnapshotChunk(_message.Message):
+    __slots__ = ("data", "compression", "position", "term", "log_id")
+    DATA_FIELD_NUMBER: _ClassVar[int]
+    COMPRESSION_FIELD_NUMBER: _ClassVar[int]
+    POSITION_FIELD_NUMBER: _ClassVar[int]
+    TERM_FIELD_NUMBER: _ClassVar[int]
+    LOG_ID_FIELD_NUMBER: _ClassVar[int]
+    data: bytes
+    compression: str
+    position: int
+    term: int
+    log_id: str
+    def __init__(self, data: _Optional[bytes] = ..., compression: _Optional[str] = ..., position: _Optional[int] = ..., term: _Optional[int] = ..., log_id: _Optional[str] = ...) -> None: ...
+
+class AcceptUpdatesRequest(_message.Message):
+    __slots__ = ("update_data", "position", "leader_position", "compression")
+    UPDATE_DATA_FIELD_NUMBER: _ClassVar[int]
+    POSITION_FIELD_NUMBER: _ClassVar[int]
+    LEADER_POSITION_FIELD_NUMBER: _ClassVar[int]
+    COMPRESSION_FIELD_NUMBER: _ClassVar[int]
+    update_data: bytes
+    position: int
+    leader_position: int
+    compression: str
+    def __init__(self, update_data: _Optional[bytes] = ..., position: _Optional[int] = ..., leader_position: _Optional[int] = ..., compression: _Optional[str] = ...) -> None: ...
+
+class Ack(_message.Message):
+    __slots__ = ("error_code", "error_message", "position", "term")
+    ERROR_CODE_FIELD_NUMBER: _ClassVar[int]
+    ERROR_MESSAGE_FIELD_NUMBER: _ClassVar[int]
+    POSITION_FIELD_NUMBER: _ClassVar[int]
+    TERM_FIELD_NUMBER: _ClassVar[int]
+    error_code: int
+    error_message: str
+    position: int
+    term: int
+    def __init__(self, error_code: _Optional[int] = ..., error_message: _Optional[str] = ..., position: _Optional[int] = ..., term: _Optional[int] = ...) -> None: ...
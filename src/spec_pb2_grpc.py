@@ -90,6 +90,11 @@ class ClientAccountStub(object):
                 request_serializer=spec__pb2.SessionRequest.SerializeToString,
                 response_deserializer=spec__pb2.UnreadSummary.FromString,
                 _registered_method=True)
+        self.SyncState = channel.unary_unary(
+                '/ClientAccount/SyncState',
+                request_serializer=spec__pb2.SyncStateRequest.SerializeToString,
+                response_deserializer=spec__pb2.SyncStateResponse.FromString,
+                _registered_method=True)
 
 
 class ClientAccountServicer(object):
@@ -175,6 +180,13 @@ class ClientAccountServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def SyncState(self, request, context):
+        """User list, unread counts and the open chat in one call, each only if it changed
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_ClientAccountServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -233,6 +245,11 @@ def add_ClientAccountServicer_to_server(servicer, server):
                     request_deserializer=spec__pb2.SessionRequest.FromString,
                     response_serializer=spec__pb2.UnreadSummary.SerializeToString,
             ),
+            'SyncState': grpc.unary_unary_rpc_method_handler(
+                    servicer.SyncState,
+                    request_deserializer=spec__pb2.SyncStateRequest.FromString,
+                    response_serializer=spec__pb2.SyncStateResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'ClientAccount', rpc_method_handlers)
@@ -542,6 +559,33 @@ class ClientAccount(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def SyncState(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ClientAccount/SyncState',
+            spec__pb2.SyncStateRequest.SerializeToString,
+            spec__pb2.SyncStateResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
 
 class LeaderServiceStub(object):
     """Define a gRPC service for leader server communication
@@ -563,11 +607,31 @@ class LeaderServiceStub(object):
                 request_serializer=spec__pb2.Empty.SerializeToString,
                 response_deserializer=spec__pb2.Ack.FromString,
                 _registered_method=True)
+        self.HeartBeatStream = channel.stream_stream(
+                '/LeaderService/HeartBeatStream',
+                request_serializer=spec__pb2.HeartbeatPing.SerializeToString,
+                response_deserializer=spec__pb2.Ack.FromString,
+                _registered_method=True)
         self.CheckLeader = channel.unary_unary(
                 '/LeaderService/CheckLeader',
                 request_serializer=spec__pb2.Empty.SerializeToString,
                 response_deserializer=spec__pb2.Ack.FromString,
                 _registered_method=True)
+        self.GetReplicationStatus = channel.unary_unary(
+                '/LeaderService/GetReplicationStatus',
+                request_serializer=spec__pb2.Empty.SerializeToString,
+                response_deserializer=spec__pb2.ReplicationStatus.FromString,
+                _registered_method=True)
+        self.StreamSnapshot = channel.unary_stream(
+                '/LeaderService/StreamSnapshot',
+                request_serializer=spec__pb2.SnapshotRequest.SerializeToString,
+                response_deserializer=spec__pb2.SnapshotChunk.FromString,
+                _registered_method=True)
+        self.Deliver = channel.unary_unary(
+                '/LeaderService/Deliver',
+                request_serializer=spec__pb2.DeliverRequest.SerializeToString,
+                response_deserializer=spec__pb2.ServerResponse.FromString,
+                _registered_method=True)
 
 
 class LeaderServiceServicer(object):
@@ -588,12 +652,40 @@ class LeaderServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def HeartBeatStream(self, request_iterator, context):
+        """long-lived heartbeat stream, the leader answers every ping with its position
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def CheckLeader(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetReplicationStatus(self, request, context):
+        """replication progress of every follower, for monitoring
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamSnapshot(self, request, context):
+        """consistent copy of the leader's SQLite file for bootstrapping a follower
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Deliver(self, request, context):
+        """store a message a user of another shard sent to a user of this shard
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_LeaderServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -607,11 +699,31 @@ def add_LeaderServiceServicer_to_server(servicer, server):
                     request_deserializer=spec__pb2.Empty.FromString,
                     response_serializer=spec__pb2.Ack.SerializeToString,
             ),
+            'HeartBeatStream': grpc.stream_stream_rpc_method_handler(
+                    servicer.HeartBeatStream,
+                    request_deserializer=spec__pb2.HeartbeatPing.FromString,
+                    response_serializer=spec__pb2.Ack.SerializeToString,
+            ),
             'CheckLeader': grpc.unary_unary_rpc_method_handler(
                     servicer.CheckLeader,
                     request_deserializer=spec__pb2.Empty.FromString,
                     response_serializer=spec__pb2.Ack.SerializeToString,
             ),
+            'GetReplicationStatus': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetReplicationStatus,
+                    request_deserializer=spec__pb2.Empty.FromString,
+                    response_serializer=spec__pb2.ReplicationStatus.SerializeToString,
+            ),
+            'StreamSnapshot': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamSnapshot,
+                    request_deserializer=spec__pb2.SnapshotRequest.FromString,
+                    response_serializer=spec__pb2.SnapshotChunk.SerializeToString,
+            ),
+            'Deliver': grpc.unary_unary_rpc_method_handler(
+                    servicer.Deliver,
+                    request_deserializer=spec__pb2.DeliverRequest.FromString,
+                    response_serializer=spec__pb2.ServerResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'LeaderService', rpc_method_handlers)
@@ -678,6 +790,33 @@ class LeaderService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def HeartBeatStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/LeaderService/HeartBeatStream',
+            spec__pb2.HeartbeatPing.SerializeToString,
+            spec__pb2.Ack.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def CheckLeader(request,
             target,
@@ -705,6 +844,87 @@ class LeaderService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def GetReplicationStatus(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/LeaderService/GetReplicationStatus',
+            spec__pb2.Empty.SerializeToString,
+            spec__pb2.ReplicationStatus.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamSnapshot(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/LeaderService/StreamSnapshot',
+            spec__pb2.SnapshotRequest.SerializeToString,
+            spec__pb2.SnapshotChunk.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def Deliver(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/LeaderService/Deliver',
+            spec__pb2.DeliverRequest.SerializeToString,
+            spec__pb2.ServerResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
 
 class FollowerServiceStub(object):
     """Define a gRPC service for follower server communication
@@ -731,6 +951,16 @@ class FollowerServiceStub(object):
                 request_serializer=spec__pb2.UpdateFollowersRequest.SerializeToString,
                 response_deserializer=spec__pb2.Ack.FromString,
                 _registered_method=True)
+        self.UpdateMembership = channel.unary_unary(
+                '/FollowerService/UpdateMembership',
+                request_serializer=spec__pb2.MembershipView.SerializeToString,
+                response_deserializer=spec__pb2.Ack.FromString,
+                _registered_method=True)
+        self.RequestVote = channel.unary_unary(
+                '/FollowerService/RequestVote',
+                request_serializer=spec__pb2.VoteRequest.SerializeToString,
+                response_deserializer=spec__pb2.VoteResponse.FromString,
+                _registered_method=True)
 
 
 class FollowerServiceServicer(object):
@@ -756,6 +986,20 @@ class FollowerServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def UpdateMembership(self, request, context):
+        """replace the follower list with a newer versioned view
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RequestVote(self, request, context):
+        """ask for a vote, or a pre-vote, in a leader election
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_FollowerServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -774,6 +1018,16 @@ def add_FollowerServiceServicer_to_server(servicer, server):
                     request_deserializer=spec__pb2.UpdateFollowersRequest.FromString,
                     response_serializer=spec__pb2.Ack.SerializeToString,
             ),
+            'UpdateMembership': grpc.unary_unary_rpc_method_handler(
+                    servicer.UpdateMembership,
+                    request_deserializer=spec__pb2.MembershipView.FromString,
+                    response_serializer=spec__pb2.Ack.SerializeToString,
+            ),
+            'RequestVote': grpc.unary_unary_rpc_method_handler(
+                    servicer.RequestVote,
+                    request_deserializer=spec__pb2.VoteRequest.FromString,
+                    response_serializer=spec__pb2.VoteResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'FollowerService', rpc_method_handlers)
@@ -866,3 +1120,57 @@ class FollowerService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def UpdateMembership(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/FollowerService/UpdateMembership',
+            spec__pb2.MembershipView.SerializeToString,
+            spec__pb2.Ack.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def RequestVote(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/FollowerService/RequestVote',
+            spec__pb2.VoteRequest.SerializeToString,
+            spec__pb2.VoteResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,185 @@
+import queue
+import threading
+import time
+
+# Milliseconds between two checks of the UI thread for new results, so
+# that results arriving within one frame are applied by one callback
+FRAME_MS = 16
+# Seconds without user input after which the GUI counts as idle
+DEFAULT_IDLE_AFTER = 60
+# Polling intervals are multiplied by these while idle or minimized
+DEFAULT_IDLE_FACTOR = 5
+DEFAULT_HIDDEN_FACTOR = 30
+
+
+class SyncScheduler:
+    """Runs the periodic server calls of a GUI on one background thread.
+
+    Each task has a ``fetch`` function, which makes the server call on the
+    background thread, and an ``apply`` function, which shows the result and
+    runs on the UI thread. Results that equal the previous result of their
+    task are dropped. The others are put on a queue, which the UI thread
+    drains once per frame, so widgets and Tk are only touched from the UI
+    thread.
+
+    Intervals grow when the user has not touched the window for a while,
+    and grow further while it is minimized. Input or showing the window
+    again wakes the thread, so it syncs at once.
+    """
+
+    def __init__(self, schedule, idle_after=DEFAULT_IDLE_AFTER, idle_factor=DEFAULT_IDLE_FACTOR,
+                 hidden_factor=DEFAULT_HIDDEN_FACTOR, clock=time.monotonic):
+        """Initializes a scheduler without tasks.
+
+        Args:
+            schedule (Callable): Called on the UI thread with a delay in
+                milliseconds and a callback to run the callback later on the
+                UI thread, e.g. Tk's ``after``. Never called by the background
+                thread, as Tk is not thread safe.
+            idle_after (float): Seconds without input after which the GUI is idle.
+            idle_factor (float): Interval multiplier while idle.
+            hidden_factor (float): Interval multiplier while minimized.
+            clock (Callable): Returns the current time in seconds.
+        """
+        self.schedule = schedule
+        self.idle_after = idle_after
+        self.idle_factor = idle_factor
+        self.hidden_factor = hidden_factor
+        self.clock = clock
+        self.tasks = {}
+        self.results = queue.Queue()
+        self.lock = threading.Lock()
+        self.visible = True
+        self.last_activity = clock()
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def add(self, name, fetch, apply, interval, when=None):
+        """Registers a periodic task.
+
+        Args:
+            name (str): Name of the task.
+            fetch (Callable): Makes the server call and returns its result,
+                runs on the background thread.
+            apply (Callable): Called with a new result on the UI thread.
+            interval (float): Seconds between calls while the user is active.
+            when (Callable, optional): Returns whether the task should run,
+                e.g. only while logged in. Runs on the background thread.
+        """
+        self.tasks[name] = {
+            'fetch': fetch,
+            'apply': apply,
+            'interval': interval,
+            'when': when,
+            'last_run': None,
+            'result': None,
+        }
+
+    def start(self):
+        """Starts the background thread and the UI loop showing its results, on the UI thread."""
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        self.poll()
+
+    def poll(self):
+        """Applies the queued results and checks again a frame later, on the UI thread."""
+        self.flush()
+        if not self.stopped.is_set():
+            self.schedule(FRAME_MS, self.poll)
+
+    def stop(self):
+        """Stops the background thread after its current call."""
+        self.stopped.set()
+        self.wake.set()
+
+    def run(self):
+        """Runs due tasks until stopped."""
+        while not self.stopped.is_set():
+            wait = self.run_due()
+            self.wake.wait(wait)
+            self.wake.clear()
+
+    def trigger(self, *names):
+        """Runs tasks as soon as possible, e.g. after the user opened another chat.
+
+        Args:
+            *names (str): Tasks to run, every task if none are given.
+        """
+        with self.lock:
+            for name in names or self.tasks:
+                self.tasks[name]['last_run'] = None
+                # the UI state the previous result was shown against may have changed
+                self.tasks[name]['result'] = None
+        self.wake.set()
+
+    def touch(self):
+        """Records user input, and wakes the thread if the GUI was idle."""
+        now = self.clock()
+        was_idle = now - self.last_activity > self.idle_after
+        self.last_activity = now
+        if was_idle:
+            self.wake.set()
+
+    def set_visible(self, visible):
+        """Records whether the window is shown, and wakes the thread when it is shown again."""
+        if visible and not self.visible:
+            self.wake.set()
+        self.visible = visible
+
+    def backoff(self, now=None):
+        """Returns the current interval multiplier."""
+        if not self.visible:
+            return self.hidden_factor
+        now = self.clock() if now is None else now
+        if now - self.last_activity > self.idle_after:
+            return self.idle_factor
+        return 1
+
+    def run_due(self):
+        """Calls ``fetch`` of the due tasks and queues new results for the UI.
+
+        Returns:
+            float: Seconds until the next task is due.
+        """
+        factor = self.backoff()
+        waits = []
+        for name, task in list(self.tasks.items()):
+            interval = task['interval'] * factor
+            last_run = task['last_run']
+            if last_run is not None and self.clock() - last_run < interval:
+                waits.append(last_run + interval - self.clock())
+                continue
+            task['last_run'] = self.clock()
+            waits.append(interval)
+            if task['when'] is not None and not task['when']():
+                task['result'] = None
+                continue
+            try:
+                result = task['fetch']()
+            except Exception as e:
+                print(f"Sync of {name} failed: {e}")
+                continue
+            with self.lock:
+                if task['last_run'] is None or result == task['result']:
+                    # triggered again while fetching, or nothing changed
+                    continue
+                task['result'] = result
+            self.results.put((name, result))
+        return max(min(waits, default=1), 0)
+
+    def flush(self):
+        """Applies the queued results, on the UI thread."""
+        results = {}
+        while True:
+            try:
+                name, result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            # only the newest result of a task is shown
+            results[name] = result
+        for name, result in results.items():
+            try:
+                self.tasks[name]['apply'](result)
+            except Exception as e:
+                print(f"Showing {name} failed: {e}")
@@ -176,6 +176,7 @@ class ChatClientTerminal(cmd.Cmd):
         """
         # Create a stream for receiving messages
         while True:
+            # unread messages come in pages, each stays unread until acknowledged
             msgs = self.stub.GetMessages(
                 spec_pb2.ReceiveRequest(session_id=self.user_session_id))
 
@@ -187,9 +188,9 @@ class ChatClientTerminal(cmd.Cmd):
                     print(f"{message.from_}: {message.message}")
 
                 # Send acknowledgment for the received messages
-                message_ids = [msg.id for msg in msgs.message]
+                message_ids = [msg.message_id for msg in msgs.message]
                 ack_response = self.stub.AcknowledgeReceivedMessages(
-                    spec_pb2.AcknowledgeRequest(session_id=self.user_session_id, message_ids=message_ids))
+                    spec_pb2.AcknowledgeReceivedMessagesRequest(session_id=self.user_session_id, message_ids=message_ids))
 
                 if ack_response.error_code != 0:
                     print(
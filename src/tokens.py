@@ -0,0 +1,183 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+# Prefix of signed session tokens, anything else is a session ID stored in
+# the users table
+TOKEN_PREFIX = "v1."
+# Seconds a session token stays valid
+DEFAULT_TOKEN_TTL = 12 * 3600
+
+# Identity carried by a verified token, usable wherever a UserModel's ``id``
+# and ``username`` are needed
+TokenUser = namedtuple('TokenUser', ['id', 'username', 'token_id', 'expires_at'])
+
+
+def _encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def is_token(session_id):
+    """Checks whether a session ID is a signed token.
+
+    Args:
+        session_id (str): Session ID sent by a client.
+
+    Returns:
+        bool: True if it has the token format.
+    """
+    return bool(session_id) and session_id.startswith(TOKEN_PREFIX)
+
+
+class RevocationList:
+    """Tokens that were invalidated before their expiry.
+
+    Single tokens are revoked on logout, all tokens of a user issued up to a
+    point in time when the account is deleted. Entries are dropped once the
+    tokens they cover have expired anyway, which keeps the list small.
+    """
+
+    def __init__(self):
+        """Initializes an empty list."""
+        self.lock = threading.Lock()
+        self.tokens = {}  # token_id -> expires_at
+        self.users = {}  # user_id -> (revoked_at, expires_at)
+
+    def add(self, token_id=None, user_id=None, revoked_at=0.0, expires_at=0.0):
+        """Revokes a single token, or every token of a user issued until ``revoked_at``.
+
+        Args:
+            token_id (str, optional): ID of the token to revoke.
+            user_id (int, optional): User whose tokens are revoked.
+            revoked_at (float): UNIX time of the revocation.
+            expires_at (float): UNIX time after which the entry can be dropped.
+        """
+        with self.lock:
+            if token_id:
+                self.tokens[token_id] = expires_at
+            elif user_id is not None:
+                previous = self.users.get(user_id, (0.0, 0.0))
+                self.users[user_id] = (max(previous[0], revoked_at), max(previous[1], expires_at))
+
+    def load(self, records, now=None):
+        """Adds persisted revocations, skipping expired ones.
+
+        Args:
+            records (Iterable): Objects with ``token_id``, ``user_id``,
+                ``revoked_at`` and ``expires_at`` attributes.
+            now (float, optional): Current UNIX time.
+        """
+        now = time.time() if now is None else now
+        for record in records:
+            if record.expires_at > now:
+                self.add(record.token_id, record.user_id, record.revoked_at, record.expires_at)
+
+    def is_revoked(self, claims):
+        """Checks whether a token has been revoked.
+
+        Args:
+            claims (dict): Verified token claims.
+
+        Returns:
+            bool: True if the token must be rejected.
+        """
+        with self.lock:
+            if claims['jti'] in self.tokens:
+                return True
+            revoked = self.users.get(claims['uid'])
+            return revoked is not None and claims['iat'] <= revoked[0]
+
+    def prune(self, now=None):
+        """Drops entries whose tokens have expired.
+
+        Args:
+            now (float, optional): Current UNIX time.
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            self.tokens = {k: v for k, v in self.tokens.items() if v > now}
+            self.users = {k: v for k, v in self.users.items() if v[1] > now}
+
+    def __len__(self):
+        with self.lock:
+            return len(self.tokens) + len(self.users)
+
+
+class SessionTokens:
+    """Issues and verifies HMAC-signed session tokens.
+
+    A token carries the user ID, username and expiry, so every node sharing
+    the secret can authenticate a request without a database lookup and
+    without waiting for the login to replicate.
+    """
+
+    def __init__(self, secret, ttl=DEFAULT_TOKEN_TTL, revocations=None):
+        """Initializes the token service.
+
+        Args:
+            secret (str): Key shared by all nodes of the cluster.
+            ttl (float): Seconds a token stays valid.
+            revocations (RevocationList, optional): Revoked tokens.
+        """
+        self.key = secret.encode() if isinstance(secret, str) else secret
+        self.ttl = ttl
+        self.revocations = revocations if revocations is not None else RevocationList()
+        self.verified = 0  # verifications since the last prune
+
+    def _sign(self, payload):
+        return _encode(hmac.new(self.key, (TOKEN_PREFIX + payload).encode(), hashlib.sha256).digest())
+
+    def issue(self, user_id, username, now=None):
+        """Creates a token for a user.
+
+        Args:
+            user_id (int): ID of the user.
+            username (str): Name of the user.
+            now (float, optional): Current UNIX time.
+
+        Returns:
+            str: The signed token.
+        """
+        now = time.time() if now is None else now
+        claims = {'uid': user_id, 'usr': username, 'iat': round(now, 3),
+                  'exp': round(now + self.ttl, 3), 'jti': _encode(os.urandom(9))}
+        payload = _encode(json.dumps(claims, separators=(',', ':')).encode())
+        return f"{TOKEN_PREFIX}{payload}.{self._sign(payload)}"
+
+    def verify(self, token, now=None):
+        """Checks a token's signature, expiry and revocation.
+
+        Args:
+            token (str): Token sent by the client.
+            now (float, optional): Current UNIX time.
+
+        Returns:
+            TokenUser: The authenticated user, or None if the token is invalid.
+        """
+        now = time.time() if now is None else now
+        if not is_token(token):
+            return None
+        try:
+            payload, signature = token[len(TOKEN_PREFIX):].split('.')
+            if not hmac.compare_digest(signature, self._sign(payload)):
+                return None
+            claims = json.loads(_decode(payload))
+        except (ValueError, TypeError):
+            return None
+        if claims['exp'] <= now or self.revocations.is_revoked(claims):
+            return None
+
+        self.verified += 1
+        if self.verified >= 1000:
+            self.verified = 0
+            self.revocations.prune(now)
+        return TokenUser(claims['uid'], claims['usr'], claims['jti'], claims['exp'])
@@ -1,4 +1,5 @@
 import enum
+import hashlib
 
 
 class StatusCode():
@@ -24,6 +25,15 @@ class StatusCode():
         MULTIPLE_USERS_ON_SAME_SOCKET (int): Multiple users trying to share a socket.
         NO_MESSAGES (int): No messages available for retrieval.
         NOT_LEADER (int): Request must be handled by the leader server.
+        REPLICATION_TIMEOUT (int): Write stored on the leader but not acknowledged
+            by the requested followers in time.
+        WRONG_SHARD (int): The user belongs to another shard.
+        SHARD_UNAVAILABLE (int): The shard of the other user could not be reached.
+        NOT_MODIFIED (int): Nothing changed since the versions the client sent.
+        UPDATE_NOT_APPLIED (int): A follower did not apply a replicated update,
+            because it arrived after a gap or failed.
+        NO_FOLLOWERS (int): Write stored on the leader, but there is no follower
+            to acknowledge it as the write concern requires.
     """
     SUCCESS = 0
     INVALID_FUNCTION = 1
@@ -44,6 +54,12 @@ class StatusCode():
     MULTIPLE_USERS_ON_SAME_SOCKET = 16
     NO_MESSAGES = 17
     NOT_LEADER = 18
+    REPLICATION_TIMEOUT = 19
+    WRONG_SHARD = 20
+    SHARD_UNAVAILABLE = 21
+    NOT_MODIFIED = 22
+    UPDATE_NOT_APPLIED = 23
+    NO_FOLLOWERS = 24
 
 
 class StatusMessages:
@@ -66,7 +82,13 @@ class StatusMessages:
         StatusCode.RECEIVER_DOESNT_EXIST: "RECEIVER DOESN'T EXIST",
         StatusCode.MULTIPLE_USERS_ON_SAME_SOCKET: "ONLY ONE USER PER SOCKET ALLOWED",
         StatusCode.NO_MESSAGES: "NO MESSAGES",
-        StatusCode.NOT_LEADER: "NOT LEADER: CONNECT TO LEADER SERVER"
+        StatusCode.NOT_LEADER: "NOT LEADER: CONNECT TO LEADER SERVER",
+        StatusCode.REPLICATION_TIMEOUT: "MESSAGE STORED ON LEADER BUT NOT YET REPLICATED",
+        StatusCode.WRONG_SHARD: "USER BELONGS TO ANOTHER SHARD: CONNECT THROUGH THE ROUTER",
+        StatusCode.SHARD_UNAVAILABLE: "THE RECEIVER'S SHARD IS UNAVAILABLE",
+        StatusCode.NOT_MODIFIED: "NOT MODIFIED",
+        StatusCode.UPDATE_NOT_APPLIED: "UPDATE NOT APPLIED BY FOLLOWER",
+        StatusCode.NO_FOLLOWERS: "MESSAGE STORED ON LEADER BUT NO FOLLOWER CAN REPLICATE IT"
     }
 
     @classmethod
@@ -74,6 +96,21 @@ class StatusMessages:
         return cls.error_dict[error_code]
 
 
+def content_version(data):
+    """Returns a short digest to compare client state with the server's.
+
+    Args:
+        data (bytes | Iterable[int]): A serialized message, or message IDs
+            in any order.
+
+    Returns:
+        str: 16 hex digits.
+    """
+    if not isinstance(data, bytes):
+        data = ",".join(str(message_id) for message_id in sorted(data)).encode()
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
 class HelpMessages:
     HELP_MSG = "Jarvis Is a socket based chat room. \n You can create an account, login, send messages, receive messages, and delete your account. \n To get more information on a specific command, type 'help <command>'. \n Commands: \n create \n list \n login \n send \n receive \n delete \n help \n exit \n"
     HELP_CREATE = "create <username> <password> \n \t Creates a new account with the given username and password. \n"
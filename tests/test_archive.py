@@ -0,0 +1,110 @@
+import gzip
+import os
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.orm import scoped_session
+from archive import compact, read_segments, segment_paths, write_segment
+from models import DeletedMessageModel, UserModel, init_db, get_session_factory
+
+NOW = datetime(2026, 1, 31)
+
+
+@pytest.fixture
+def db_session(tmp_path):
+    """Provides a session factory for a database with two users."""
+    engine = init_db(f"sqlite:///{tmp_path / 'chat.db'}")
+    factory = get_session_factory(engine)
+    session = scoped_session(factory)
+    session.add_all([UserModel(id=1, username="a", password="x"), UserModel(id=2, username="b", password="y")])
+    session.commit()
+    session.remove()
+    return factory
+
+
+def add_deleted(db_session, ages):
+    """Adds deleted messages deleted ``ages`` days before NOW, None for unknown."""
+    session = scoped_session(db_session)
+    for i, age in enumerate(ages):
+        session.add(DeletedMessageModel(
+            sender_id=1, receiver_id=2, content=f"m{i}", original_message_id=i,
+            deleted_at=NOW - timedelta(days=age or 0)))
+    session.commit()
+    # rows deleted before the column existed
+    unknown = [f"m{i}" for i, age in enumerate(ages) if age is None]
+    session.query(DeletedMessageModel).filter(DeletedMessageModel.content.in_(unknown)).update(
+        {DeletedMessageModel.deleted_at: None}, synchronize_session=False)
+    session.commit()
+    session.remove()
+
+
+def remaining(db_session):
+    session = scoped_session(db_session)
+    contents = sorted(row.content for row in session.query(DeletedMessageModel).all())
+    session.remove()
+    return contents
+
+
+def test_compact_archives_expired_rows(db_session, tmp_path):
+    """Tests that only rows past the retention period leave the database."""
+    add_deleted(db_session, [40, 31, 5, None])
+    archive_dir = str(tmp_path / "archive")
+
+    archived = compact(db_session, archive_dir, retention=30 * 86400, now=NOW, segment_size=2)
+
+    assert archived == 3
+    assert remaining(db_session) == ["m2"]
+    assert len(segment_paths(archive_dir)) == 2
+    assert sorted(record['content'] for record in read_segments(archive_dir)) == ["m0", "m1", "m3"]
+    assert compact(db_session, archive_dir, retention=30 * 86400, now=NOW) == 0
+
+
+def test_compact_reclaims_space(db_session, tmp_path):
+    """Tests that the database file shrinks after archiving."""
+    add_deleted(db_session, [40] * 2000)
+    path = str(tmp_path / "chat.db")
+    before = os.path.getsize(path)
+
+    compact(db_session, str(tmp_path / "archive"), retention=86400, now=NOW)
+
+    assert os.path.getsize(path) < before
+
+
+def test_compact_finishes_interrupted_run(db_session, tmp_path):
+    """Tests that rows already written to a segment are deleted, not archived twice."""
+    add_deleted(db_session, [40, 40])
+    archive_dir = str(tmp_path / "archive")
+    session = scoped_session(db_session)
+    first = session.query(DeletedMessageModel).order_by(DeletedMessageModel.id).first()
+    write_segment(archive_dir, [{'id': first.id, 'content': first.content}])
+    session.remove()
+
+    assert compact(db_session, archive_dir, retention=86400, now=NOW) == 1
+    assert [record['content'] for record in read_segments(archive_dir)] == ["m0", "m1"]
+    assert remaining(db_session) == []
+
+
+def test_segments_are_compressed_and_sequential(tmp_path):
+    """Tests that every write adds a new gzip segment."""
+    archive_dir = str(tmp_path / "archive")
+    write_segment(archive_dir, [{'id': 1}])
+    write_segment(archive_dir, [{'id': 2}])
+    paths = segment_paths(archive_dir)
+    assert [os.path.basename(p) for p in paths] == ["deleted-00000001.jsonl.gz", "deleted-00000002.jsonl.gz"]
+    with gzip.open(paths[0], 'rt') as f:
+        assert f.read().strip() == '{"id": 1}'
+
+
+def test_upgrade_schema_adds_deleted_at(tmp_path):
+    """Tests that a database from before deletion times were recorded gains the column."""
+    url = f"sqlite:///{tmp_path / 'old.db'}"
+    engine = init_db(url)
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_deleted_messages_deleted_at"))
+        connection.execute(text("ALTER TABLE deleted_messages DROP COLUMN deleted_at"))
+    engine.dispose()
+
+    engine = init_db(url)
+    with engine.connect() as connection:
+        columns = [row[1] for row in connection.execute(text("PRAGMA table_info(deleted_messages)"))]
+    assert "deleted_at" in columns
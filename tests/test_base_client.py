@@ -2,6 +2,7 @@ import pytest
 import grpc
 from unittest.mock import patch, MagicMock
 from base_client import ChatClientBase
+import spec_pb2
 from grpc import RpcError
 
 class FakeRpcError(RpcError):
@@ -18,14 +19,20 @@ def mock_stub():
     stub = MagicMock()
     stub.ListUsers.return_value.user = []
     stub.CreateAccount.return_value.error_code = 0
+    stub.CreateAccount.return_value.position = 0
     stub.Login.return_value.error_code = 0
+    stub.Login.return_value.position = 0
     stub.Send.return_value.error_code = 0
+    stub.Send.return_value.position = 0
     stub.Logout.return_value.error_code = 0
+    stub.Logout.return_value.position = 0
     stub.DeleteAccount.return_value.error_code = 0
+    stub.DeleteAccount.return_value.position = 0
     stub.GetMessages.return_value.message = []
     stub.AcknowledgeReceivedMessages.return_value.error_code = 0
     stub.GetChat.return_value.message = []
     stub.DeleteMessages.return_value.error_code = 0
+    stub.DeleteMessages.return_value.position = 0
     stub.GetUnreadCounts.return_value.counts = []
     return stub
 
@@ -72,6 +79,14 @@ def test_send_message(client):
     assert resp.error_code == 0
 
 
+def test_send_message_passes_write_concern(client):
+    """Tests that a per-message write concern reaches the server."""
+    client.user_session_id = "abc"
+    client.send_message("bob", "hi", write_concern=spec_pb2.WRITE_CONCERN_MAJORITY)
+    request = client.stub.Send.call_args.args[0]
+    assert request.write_concern == spec_pb2.WRITE_CONCERN_MAJORITY
+
+
 def test_logout(client):
     """Tests logging out succeeds."""
     client.user_session_id = "abc"
@@ -86,6 +101,14 @@ def test_delete_account(client):
     assert resp.error_code == 0
 
 
+def test_delete_account_sends_password(client, mock_stub):
+    """Tests that the confirmation password goes with the delete request."""
+    client.user_session_id = "abc"
+    client.delete_account("pw")
+    request = mock_stub.DeleteAccount.call_args[0][0]
+    assert (request.session_id, request.password) == ("abc", "pw")
+
+
 def test_receive_messages(client):
     """Tests receiving messages returns an empty list."""
     client.user_session_id = "abc"
@@ -93,6 +116,20 @@ def test_receive_messages(client):
     assert msgs.message == []
 
 
+def test_receive_messages_pages_and_acknowledges(client, mock_stub):
+    """Tests that the page size and cursor are sent and acknowledgements name the messages."""
+    client.user_session_id = "abc"
+    client.receive_messages(limit=50, cursor="0:9")
+    request = mock_stub.GetMessages.call_args[0][0]
+    assert (request.limit, request.cursor) == (50, "0:9")
+
+    mock_stub.AcknowledgeReceivedMessages.return_value = spec_pb2.ServerResponse(position=4)
+    client.acknowledge_messages([1, 2])
+    request = mock_stub.AcknowledgeReceivedMessages.call_args[0][0]
+    assert list(request.message_ids) == [1, 2]
+    assert client.last_position == 4
+
+
 def test_get_chat(client):
     """Tests getting chat history returns empty list."""
     client.user_session_id = "abc"
@@ -145,7 +182,7 @@ def test_delete_messages_calls_stub():
     """Covers delete_messages() happy path."""
     client = ChatClientBase(["localhost:5000"])
     client.user_session_id = "abc"
-    mock_response = MagicMock()
+    mock_response = MagicMock(position=0)
 
     with patch.object(client, "stub") as stub:
         stub.DeleteMessages.return_value = mock_response
@@ -175,7 +212,7 @@ def test_create_account_retry_on_error():
     with patch.object(client, "stub") as stub:
         stub.CreateAccount.side_effect = [
             FakeUnavailable(),
-            MagicMock()
+            MagicMock(position=0)
         ]
         client.create_account("test", "pass")
         assert stub.CreateAccount.call_count == 2
@@ -192,7 +229,7 @@ def test_logout_retry_on_unavailable():
     with patch.object(client, "stub") as stub:
         stub.Logout.side_effect = [
             FakeUnavailable(),
-            MagicMock()
+            MagicMock(position=0)
         ]
         client.logout()
         assert stub.Logout.call_count == 2
@@ -245,3 +282,109 @@ def test_connect_leader_failure(mock_channel, client):
     client.max_retries = 2
     client.addresses = ["localhost:50051", "localhost:50052"]
     client.connect()  # Attempt to connect, triggering fallback logic
+
+
+def test_reads_fall_back_to_leader_when_follower_is_stale(client):
+    """Tests that a stale follower read is retried on the leader."""
+    class FakeStale(grpc.RpcError):
+        def code(self): return grpc.StatusCode.FAILED_PRECONDITION
+
+    follower = MagicMock()
+    follower.GetChat.side_effect = FakeStale()
+    client.read_stubs = [follower]
+    client.user_session_id = "abc"
+
+    client.get_chat("bob")
+
+    sent = follower.GetChat.call_args[0][0]
+    assert sent.allow_follower is True
+    client.stub.GetChat.assert_called_once()
+
+
+def test_reads_rotate_across_followers(client):
+    """Tests that reads are spread over the follower replicas."""
+    followers = [MagicMock(), MagicMock()]
+    client.read_stubs = followers
+
+    client.list_users()
+    client.list_users()
+
+    followers[0].ListUsers.assert_called_once()
+    followers[1].ListUsers.assert_called_once()
+    client.stub.ListUsers.assert_not_called()
+
+
+def test_reads_carry_position_of_last_write(client):
+    """Tests that follower reads ask for the client's own last write."""
+    follower = MagicMock()
+    client.read_stubs = [follower]
+    client.user_session_id = "abc"
+    client.stub.Send.return_value.position = 12
+
+    client.send_message("bob", "hi")
+    client.get_unread_counts()
+
+    sent = follower.GetUnreadCounts.call_args[0][0]
+    assert sent.min_position == 12
+
+
+def test_replica_chat_is_marked_read_on_leader(client):
+    """Tests that a chat served by a replica acknowledges the peer's newest message on the leader."""
+    follower = MagicMock()
+    follower.GetChat.return_value = spec_pb2.Messages(message=[
+        spec_pb2.Message(from_="bob", message_id=4), spec_pb2.Message(from_="me", message_id=5),
+        spec_pb2.Message(from_="bob", message_id=9)])
+    client.read_stubs = [follower]
+    client.user_session_id = "abc"
+    client.stub.AcknowledgeReceivedMessages.return_value.position = 3
+
+    client.get_chat("bob")
+
+    assert client.last_position == 3
+    sent = client.stub.AcknowledgeReceivedMessages.call_args[0][0]
+    assert list(sent.message_ids) == [9]
+
+
+def test_repeated_replica_chat_stays_off_leader(client):
+    """Tests that polling a chat without new messages does not acknowledge them on the leader again."""
+    follower = MagicMock()
+    follower.GetChat.return_value = spec_pb2.Messages(message=[spec_pb2.Message(from_="bob", message_id=4)])
+    client.read_stubs = [follower]
+    client.user_session_id = "abc"
+    client.stub.AcknowledgeReceivedMessages.return_value.position = 0
+
+    client.get_chat("bob")
+    client.get_chat("bob")
+
+    client.stub.AcknowledgeReceivedMessages.assert_called_once()
+    client.stub.GetChat.assert_not_called()
+
+
+def test_reconnect_and_close_close_channels(mock_stub):
+    """Tests that reconnecting replaces the leader and replica channels and close closes them all."""
+    with patch("base_client.grpc.insecure_channel", side_effect=lambda address: MagicMock()):
+        client = ChatClientBase(["localhost:50051"], read_addresses=["localhost:50061"])
+        old = [client.channel, *client.read_channels]
+        client.connect()
+    new = [client.channel, *client.read_channels]
+
+    assert all(channel.close.called for channel in old)
+    assert not any(channel.close.called for channel in new)
+    client.close()
+    assert all(channel.close.called for channel in new)
+    assert client.read_stubs == []
+
+
+def test_login_opens_cache_and_delete_account_removes_it(mock_stub, tmp_path):
+    """Tests that a cache file is opened per user and removed with the account."""
+    with patch("base_client.grpc.insecure_channel"):
+        client = ChatClientBase(["localhost:50051"], cache_dir=str(tmp_path))
+    client.stub = mock_stub
+
+    client.login("alice", "pw")
+    assert client.cache.path == str(tmp_path / "alice.db")
+    assert (tmp_path / "alice.db").exists()
+
+    client.delete_account("pw")
+    assert client.cache is None
+    assert not (tmp_path / "alice.db").exists()
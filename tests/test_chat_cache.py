@@ -0,0 +1,169 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from sqlalchemy.orm import scoped_session
+import spec_pb2
+from base_client import ChatClientBase
+from chat_cache import ChatCache, cache_path
+from leader_server import ClientService
+from models import UserModel, init_db, get_session_factory
+from replication import ReplicationLog
+from utils import StatusCode
+
+
+class ServiceStub:
+    """Calls a client service in-process and records the chat requests and responses."""
+
+    def __init__(self, service):
+        self.service = service
+        self.chats = []
+        self.listed = []
+
+    def __getattr__(self, name):
+        return lambda request, **kwargs: getattr(self.service, name)(request, MagicMock())
+
+    def GetChat(self, request, **kwargs):
+        response = self.service.GetChat(request, MagicMock())
+        self.chats.append((request.cursor, [m.message for m in response.message]))
+        self.listed.append(len(response.message_ids))
+        return response
+
+
+@pytest.fixture
+def service(tmp_path):
+    factory = get_session_factory(init_db(f"sqlite:///{tmp_path / 'chat.db'}"))
+    session = scoped_session(factory)
+    session.add_all([UserModel(id=1, username="a", password="x", session_id="sa", logged_in=True),
+                     UserModel(id=2, username="b", password="x", session_id="sb", logged_in=True)])
+    session.commit()
+    session.remove()
+    return ClientService(db_session=factory, update_queue=ReplicationLog())
+
+
+@pytest.fixture
+def client(service, tmp_path):
+    with patch("base_client.grpc.insecure_channel"):
+        client = ChatClientBase(["localhost:50051"], cache_dir=str(tmp_path / "cache"))
+    client.stub = ServiceStub(service)
+    client.user_session_id = "sa"
+    client.cache = ChatCache(cache_path(client.cache_dir, "a"))
+    return client
+
+
+def send(service, session_id, to, message):
+    service.Send(spec_pb2.SendRequest(session_id=session_id, to=to, message=message), MagicMock())
+
+
+def test_chat_syncs_only_new_messages(client, service):
+    """Tests that the second sync downloads only the message added since the first."""
+    send(service, "sa", "b", "one")
+    send(service, "sb", "a", "two")
+    assert [m.message for m in client.get_chat("b").message] == ["one", "two"]
+
+    send(service, "sb", "a", "three")
+    chat = client.get_chat("b")
+
+    assert [m.message for m in chat.message] == ["one", "two", "three"]
+    cursor, downloaded = client.stub.chats[-1]
+    assert cursor and downloaded == ["three"]
+
+
+def test_chat_drops_deleted_messages(client, service):
+    """Tests that messages deleted on the server disappear from the cache."""
+    send(service, "sa", "b", "keep")
+    send(service, "sa", "b", "drop")
+    chat = client.get_chat("b")
+    service.DeleteMessages(spec_pb2.DeleteMessagesRequest(
+        session_id="sa", message_ids=[chat.message[1].message_id]), MagicMock())
+
+    assert [m.message for m in client.get_chat("b").message] == ["keep"]
+    assert client.stub.chats[-1][1] == []
+
+    service.DeleteMessages(spec_pb2.DeleteMessagesRequest(
+        session_id="sa", message_ids=[chat.message[0].message_id]), MagicMock())
+    assert client.get_chat("b").error_code == StatusCode.NO_MESSAGES
+
+
+def test_chat_lists_ids_only_after_deletions(client, service):
+    """Tests that the IDs of the chat are only sent when the server holds fewer messages than the cache."""
+    for message in ("one", "two", "three"):
+        send(service, "sa", "b", message)
+    chat = client.get_chat("b")
+    send(service, "sa", "b", "four")
+    client.get_chat("b")
+    assert client.stub.listed == [0, 0]
+
+    service.DeleteMessages(spec_pb2.DeleteMessagesRequest(
+        session_id="sa", message_ids=[chat.message[1].message_id]), MagicMock())
+    assert [m.message for m in client.get_chat("b").message] == ["one", "three", "four"]
+    assert client.stub.listed[-1] == 3
+    client.get_chat("b")
+    assert client.stub.listed[-1] == 0
+
+
+def test_unknown_messages_trigger_full_download(client, service):
+    """Tests that a cursor ahead of uncached messages falls back to a full download."""
+    send(service, "sa", "b", "one")
+    client.get_chat("b")
+    client.cache.connection.execute("DELETE FROM messages")
+
+    assert [m.message for m in client.get_chat("b").message] == ["one"]
+    assert client.stub.chats[-1] == ("", ["one"])
+
+
+def test_cache_survives_reopening(client, service):
+    """Tests that a new client starts from the cached chat and cursor."""
+    send(service, "sa", "b", "one")
+    client.get_chat("b")
+    client.cache.close()
+
+    cache = ChatCache(cache_path(client.cache_dir, "a"))
+    assert [m.message for m in cache.chat("b").message] == ["one"]
+    assert cache.cursor("b")
+
+
+def test_sync_state_returns_only_changes(client, service):
+    """Tests that SyncState sends each section once and then only what changed."""
+    send(service, "sb", "a", "one")
+    first = client.sync_state("b")
+    assert first.HasField("users") and first.HasField("unread")
+    assert [m.message for m in first.chat.message] == ["one"]
+    assert not first.unread.counts  # the chat marked the message as read
+
+    assert client.sync_state("b").error_code == StatusCode.NOT_MODIFIED
+
+    send(service, "sb", "a", "two")
+    send(service, "sb", "a", "three")
+    chat = client.get_chat("b")
+    service.DeleteMessages(spec_pb2.DeleteMessagesRequest(
+        session_id="sa", message_ids=[chat.message[0].message_id]), MagicMock())
+    changed = client.sync_state("b")
+    assert [m.message for m in changed.chat.message] == ["two", "three"]
+    assert not changed.HasField("users") and not changed.HasField("unread")
+
+
+def test_sync_state_without_cache_sends_chat_only_when_changed(client, service):
+    """Tests that a client without a cache gets the whole chat once and then NOT_MODIFIED."""
+    client.cache = None
+    send(service, "sb", "a", "one")
+    first = client.sync_state("b")
+    assert [m.message for m in first.chat.message] == ["one"]
+
+    assert client.sync_state("b").error_code == StatusCode.NOT_MODIFIED
+
+    send(service, "sb", "a", "two")
+    changed = client.sync_state("b")
+    assert [m.message for m in changed.chat.message] == ["one", "two"]
+    assert client.sync_state("b").error_code == StatusCode.NOT_MODIFIED
+
+
+def test_user_directory_is_cached(tmp_path):
+    """Tests that the user directory is stored and only rewritten when it changed."""
+    cache = ChatCache(str(tmp_path / "a.db"))
+    users = [spec_pb2.User(username="b", status="online"), spec_pb2.User(username="a", status="offline")]
+    cache.store_users(users)
+    cache.connection.execute("DELETE FROM users")
+    cache.store_users(users)
+
+    assert cache.users() == []
+    cache.store_users(users[:1])
+    assert [user.username for user in cache.users()] == ["b"]
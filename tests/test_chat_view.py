@@ -0,0 +1,71 @@
+from chat_view import ChatViewModel, RowLayout
+
+
+def test_rows_use_estimate_until_measured():
+    """Tests that unmeasured rows get the estimated height and measured ones move the rest."""
+    layout = RowLayout(estimate=10)
+    layout.set_rows([1, 2, 3])
+    assert (layout.top(2), layout.total) == (20, 30)
+
+    assert layout.measure({1: 25, 2: 10})
+    assert not layout.measure({1: 25})
+    assert (layout.top(1), layout.top(2), layout.total) == (25, 35, 45)
+
+
+def test_visible_rows_cover_viewport_and_overscan():
+    """Tests that only the rows in view and the overscan around them are built."""
+    layout = RowLayout(estimate=10)
+    layout.set_rows(range(10000))
+
+    assert layout.visible(top=0, height=35, overscan=0) == range(0, 4)
+    assert layout.visible(top=50000, height=30, overscan=2) == range(4998, 5005)
+    assert layout.visible(top=99990, height=100, overscan=5) == range(9994, 10000)
+    assert RowLayout().visible(0, 100) == range(0)
+
+
+def test_set_rows_keeps_known_heights():
+    """Tests that heights survive a refresh for messages still in the chat."""
+    layout = RowLayout(estimate=10)
+    layout.set_rows([1, 2])
+    layout.measure({1: 30, 2: 40})
+    layout.set_rows([2, 3])
+    assert layout.heights == {2: 40}
+    assert layout.total == 50
+
+
+def messages(*ids):
+    return [{"id": i, "from": "a", "timestamp": i, "content": str(i)} for i in ids]
+
+
+def test_model_diffs_refreshes():
+    """Tests that a refresh reports only the new and deleted messages."""
+    model = ChatViewModel()
+    model.update(messages(1, 2, 3))
+
+    diff = model.update(messages(1, 3, 4, 5))
+    assert diff.removed == [2]
+    assert [m["id"] for m in diff.added] == [4, 5]
+    assert not diff.reordered
+    assert model.order == [1, 3, 4, 5] and model.position(4) == 2
+
+    assert not model.update(messages(1, 3, 4, 5))
+
+
+def test_model_flags_messages_merged_in_between():
+    """Tests that a message placed before known ones is reported as a reorder."""
+    model = ChatViewModel()
+    model.update(messages(1, 3))
+    diff = model.update(messages(1, 2, 3))
+    assert diff.reordered and [m["id"] for m in diff.added] == [2]
+
+
+def test_model_replaces_pending_messages():
+    """Tests that optimistic messages with negative IDs give way to the stored ones."""
+    model = ChatViewModel()
+    model.update(messages(1))
+    model.append(messages(-1))
+
+    diff = model.update(messages(1, 2))
+    assert diff.removed == [-1]
+    assert [m["id"] for m in diff.added] == [2]
+    assert not diff.reordered
@@ -0,0 +1,97 @@
+import threading
+import time
+from unittest.mock import MagicMock
+import pytest
+from command_runner import POLL_MS, CommandRunner
+
+
+class UiLoop:
+    """Collects the callbacks a runner schedules, to run them like the Tk loop would."""
+
+    def __init__(self, runner=None):
+        self.runner = runner
+        self.callbacks = []
+        self.threads = set()
+
+    def __call__(self, delay, callback):
+        self.threads.add(threading.current_thread())
+        self.callbacks.append((delay, callback))
+
+    def run(self, count):
+        """Waits for ``count`` commands to finish, then runs the scheduled poll."""
+        deadline = time.monotonic() + 5
+        while self.runner.finished.qsize() < count:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        delay, callback = self.callbacks.pop()
+        assert delay == POLL_MS
+        callback()
+
+
+@pytest.fixture
+def loop():
+    return UiLoop()
+
+
+@pytest.fixture
+def runner(loop):
+    runner = CommandRunner(loop, on_busy=MagicMock())
+    loop.runner = runner
+    runner.start()
+    yield runner
+    runner.shutdown()
+
+
+def test_results_reach_the_ui_loop(runner, loop):
+    """Tests that results and errors are handed to the callbacks only on the UI loop."""
+    done, failed = MagicMock(), MagicMock()
+    runner.submit("ok", lambda: 42, on_done=done)
+    error = ValueError("down")
+    runner.submit("bad", lambda: (_ for _ in ()).throw(error), on_error=failed)
+    assert runner.running() == ["ok", "bad"]
+
+    done.assert_not_called()
+    loop.run(2)
+
+    done.assert_called_once_with(42)
+    failed.assert_called_once_with(error)
+    assert runner.running() == []
+    runner.on_busy.assert_called_with([])
+    # only the UI thread schedules
+    assert loop.threads == {threading.current_thread()}
+
+
+def test_poll_stops_after_shutdown(runner, loop):
+    """Tests that the UI loop keeps polling until the runner shuts down."""
+    loop.run(0)
+    assert len(loop.callbacks) == 1
+    runner.shutdown()
+    loop.callbacks.pop()[1]()
+    assert loop.callbacks == []
+
+
+def test_cancel_and_key_drop_results(runner, loop):
+    """Tests that cancelled commands and commands replaced by the same key are not delivered."""
+    release = threading.Event()
+    first, second, other = MagicMock(), MagicMock(), MagicMock()
+    old = runner.submit("chat a", lambda: release.wait(5) and "a", on_done=first, key="chat")
+    new = runner.submit("chat b", lambda: "b", on_done=second, key="chat")
+    slow = runner.submit("send", lambda: release.wait(5), on_done=other)
+    assert runner.running() == ["chat b", "send"]
+
+    slow.cancel()
+    release.set()
+    loop.run(3)
+
+    first.assert_not_called()
+    other.assert_not_called()
+    second.assert_called_once_with("b")
+
+
+def test_lane_keeps_order(runner, loop):
+    """Tests that the commands of a lane run one after another in submission order."""
+    order = []
+    for i in range(20):
+        runner.submit(f"send {i}", lambda i=i: order.append(i), lane="send")
+    runner.lanes["send"].submit(lambda: None).result()
+    assert order == list(range(20))
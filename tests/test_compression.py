@@ -0,0 +1,48 @@
+import pytest
+from unittest.mock import patch
+import compression
+from compression import NONE, ZLIB, ZSTD, compress, decompress, negotiate, supported_codecs
+
+
+def test_zlib_round_trip():
+    """Tests that compressible payloads shrink and decompress to the original."""
+    data = b"hello there, how are you? " * 50
+    payload, codec = compress(data, ZLIB)
+    assert codec == ZLIB
+    assert len(payload) < len(data)
+    assert decompress(payload, codec) == data
+
+
+def test_small_payload_left_uncompressed():
+    """Tests that payloads below the size threshold are sent as they are."""
+    assert compress(b"hi", ZLIB) == (b"hi", NONE)
+
+
+def test_incompressible_payload_left_uncompressed():
+    """Tests that a payload which does not shrink is not marked as compressed."""
+    data = bytes(range(256))
+    with patch("compression.zlib.compress", return_value=data + b"x"):
+        assert compress(data, ZLIB) == (data, NONE)
+
+
+def test_no_codec_passes_through():
+    """Tests that a follower without common codecs gets raw payloads."""
+    data = b"a" * 1000
+    assert compress(data, NONE) == (data, NONE)
+    assert decompress(data, NONE) == data
+
+
+def test_negotiate_prefers_common_codec():
+    """Tests that the most preferred codec both sides support is chosen."""
+    assert negotiate([ZLIB]) == ZLIB
+    assert negotiate(["brotli"]) == NONE
+    assert negotiate([]) == NONE
+
+
+def test_zstd_only_offered_when_installed():
+    """Tests that zstd is advertised only if the optional package is available."""
+    with patch.object(compression, "zstandard", None):
+        assert supported_codecs() == [ZLIB]
+        assert negotiate([ZSTD, ZLIB]) == ZLIB
+        with pytest.raises(ValueError):
+            decompress(b"data", ZSTD)
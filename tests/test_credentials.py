@@ -0,0 +1,74 @@
+import hashlib
+import pytest
+from unittest.mock import patch
+import credentials
+from credentials import PasswordHasher, hash_password, needs_rehash, verify_password
+
+# cheap scrypt cost, the parameters are stored with each hash
+FAST = dict(n=2, r=1, p=1)
+
+
+def test_hash_and_verify():
+    """Tests that a hash accepts its password only."""
+    stored = hash_password("secret", **FAST)
+    assert stored.startswith("scrypt$2$1$1$")
+    assert verify_password("secret", stored)
+    assert not verify_password("Secret", stored)
+
+
+def test_hashes_are_salted():
+    """Tests that equal passwords get different hashes."""
+    assert hash_password("secret", **FAST) != hash_password("secret", **FAST)
+
+
+def test_legacy_sha256_hashes_verify_and_need_rehash():
+    """Tests that hashes from before scrypt still work and are flagged for upgrade."""
+    legacy = hashlib.sha256(b"secret").hexdigest()
+    assert verify_password("secret", legacy)
+    assert not verify_password("other", legacy)
+    assert needs_rehash(legacy)
+    assert needs_rehash(hash_password("secret", **FAST))
+    assert not needs_rehash(hash_password("secret"))
+
+
+def test_malformed_hash_rejected():
+    """Tests that a corrupt stored hash fails verification instead of raising."""
+    assert not verify_password("secret", "scrypt$x$1$1$AAAA$AAAA")
+    assert not verify_password("secret", "")
+
+
+def test_hasher_caches_successful_verifications():
+    """Tests that a repeated successful check skips the KDF."""
+    hasher = PasswordHasher(workers=0)
+    stored = hash_password("secret", **FAST)
+    with patch("credentials.verify_password", wraps=credentials.verify_password) as kdf:
+        assert hasher.verify("secret", stored)
+        assert hasher.verify("secret", stored)
+        assert not hasher.verify("wrong", stored)
+        assert not hasher.verify("wrong", stored)
+    assert kdf.call_count == 3
+    assert (hasher.hits, hasher.misses) == (1, 3)
+
+
+def test_hasher_cache_bounded_and_expiring():
+    """Tests that the cache evicts the oldest entries and honours its TTL."""
+    hasher = PasswordHasher(workers=0, cache_size=2)
+    for password in ("a", "b", "c"):
+        hasher.verify(password, hash_password(password, **FAST))
+    assert len(hasher.cache) == 2
+
+    hasher = PasswordHasher(workers=0, cache_ttl=0)
+    stored = hash_password("a", **FAST)
+    hasher.verify("a", stored)
+    assert not hasher.cache
+
+
+def test_hasher_process_pool():
+    """Tests hashing and verification on pool processes."""
+    hasher = PasswordHasher(workers=1)
+    try:
+        stored = hasher.hash("secret")
+        assert hasher.verify("secret", stored)
+        assert not hasher.verify("wrong", stored)
+    finally:
+        hasher.shutdown()
@@ -0,0 +1,55 @@
+import pytest
+from election import ElectionState, election_state, quorum
+
+
+def test_vote_granted_once_per_term():
+    """Tests that only one candidate can get the vote in a term."""
+    election = ElectionState()
+    assert election.vote(1, "a") == (True, 1)
+    assert election.vote(1, "b") == (False, 1)
+    assert election.vote(1, "a") == (True, 1)
+
+
+def test_newer_term_resets_vote():
+    """Tests that a vote in an old term does not bind the next one."""
+    election = ElectionState()
+    election.vote(1, "a")
+    assert election.vote(2, "b") == (True, 2)
+
+
+def test_stale_term_rejected():
+    """Tests that candidates from older terms are refused."""
+    election = ElectionState(term=5)
+    assert election.vote(4, "a") == (False, 5)
+
+
+def test_pre_vote_does_not_change_state():
+    """Tests that pre-votes neither move the term nor record a vote."""
+    election = ElectionState(term=2)
+    assert election.vote(3, "a", pre_vote=True) == (True, 2)
+    assert election.vote(2, "a", pre_vote=True) == (False, 2)
+    assert election.term == 2
+    assert election.voted_for is None
+
+
+def test_start_election_votes_for_self():
+    """Tests that a candidate enters a new term and votes for itself."""
+    election = ElectionState(term=3)
+    assert election.start_election("me") == 4
+    assert election.vote(4, "other") == (False, 4)
+    assert election.recently_voted(10)
+
+
+def test_observe_term_only_moves_forward():
+    """Tests that terms learned from other nodes never go backwards."""
+    election = ElectionState(term=3)
+    assert not election.observe_term(2)
+    assert election.observe_term(6)
+    assert election.term == 6
+
+
+def test_quorum_and_accessor():
+    """Tests majority sizes and that the state is stored once per node."""
+    assert [quorum(n) for n in (1, 2, 3, 4, 5)] == [1, 2, 2, 3, 3]
+    state = {}
+    assert election_state(state) is election_state(state)
@@ -0,0 +1,52 @@
+import pytest
+from failure_detector import PhiAccrualFailureDetector
+
+
+def feed(detector, start, interval, count):
+    """Delivers ``count`` evenly spaced heartbeats and returns the last arrival time."""
+    now = start
+    for _ in range(count):
+        now += interval
+        detector.heartbeat(now)
+    return now
+
+
+def test_regular_heartbeats_keep_peer_available():
+    """Tests that a peer heartbeating on schedule is not suspected."""
+    detector = PhiAccrualFailureDetector(0.2, threshold=8.0)
+    last = feed(detector, detector.last_heartbeat, 0.2, 20)
+    assert detector.is_available(last + 0.2)
+
+
+def test_phi_grows_with_silence():
+    """Tests that suspicion increases monotonically while heartbeats are missing."""
+    detector = PhiAccrualFailureDetector(0.2)
+    last = feed(detector, detector.last_heartbeat, 0.2, 20)
+    values = [detector.phi(last + delay) for delay in (0.1, 0.3, 0.5, 1.0)]
+    assert values == sorted(values)
+    assert values[-1] == float('inf') or values[-1] > 8.0
+
+
+def test_detects_failure_within_a_second():
+    """Tests that a 0.2s heartbeat interval yields sub-second detection."""
+    detector = PhiAccrualFailureDetector(0.2, threshold=8.0)
+    last = feed(detector, detector.last_heartbeat, 0.2, 20)
+    assert detector.is_available(last + 0.25)
+    assert not detector.is_available(last + 1.0)
+
+
+def test_never_answering_peer_is_suspected():
+    """Tests that the seeded interval suspects a peer that never sends heartbeats."""
+    detector = PhiAccrualFailureDetector(0.2)
+    assert not detector.is_available(detector.last_heartbeat + 1.0)
+
+
+def test_acceptable_pause_delays_suspicion():
+    """Tests that acceptable_pause tolerates extra silence."""
+    strict = PhiAccrualFailureDetector(0.2)
+    lenient = PhiAccrualFailureDetector(0.2, acceptable_pause=1.0)
+    start = strict.last_heartbeat
+    feed(strict, start, 0.2, 20)
+    last = feed(lenient, lenient.last_heartbeat, 0.2, 20)
+    assert lenient.phi(last + 0.6) < strict.phi(strict.last_heartbeat + 0.6)
+    assert lenient.is_available(last + 0.6)
@@ -10,7 +10,14 @@ from follower_server import (
     server_follower_leader,
     serve_follower_client,
 )
-from models import UserModel
+from models import UserModel, RevokedTokenModel
+from replication import ReplicaProgress
+from election import election_state
+from compression import ZLIB, compress
+from tokens import SessionTokens
+from utils import StatusCode
+from spec_pb2 import VoteRequest
+import spec_pb2
 
 
 @pytest.fixture
@@ -61,7 +68,7 @@ def test_accept_updates_add(follower_service):
         attr.mapper.column_attrs = []
         mock_inspect.return_value = attr
 
-        response = follower_service.AcceptUpdates(MagicMock(update_data=b"pickle"), MagicMock())
+        response = follower_service.AcceptUpdates(MagicMock(update_data=b"pickle", position=0, leader_position=0, compression=""), MagicMock())
 
     assert response.error_code == 0
 
@@ -78,14 +85,15 @@ def test_accept_updates_delete(follower_service):
         session = follower_service.db_session.return_value
         session.query().get.return_value = user
 
-        response = follower_service.AcceptUpdates(MagicMock(update_data=b"pickle"), MagicMock())
+        response = follower_service.AcceptUpdates(MagicMock(update_data=b"pickle", position=0, leader_position=0, compression=""), MagicMock())
 
     assert response.error_code == 0
 
 
 def test_update_leader(follower_service):
     """Tests that leader address is updated in state."""
-    request = MagicMock(new_leader_address="localhost:6000", new_leader_id="1")
+    request = MagicMock(new_leader_address="localhost:6000", new_leader_id="1", term=1,
+                        membership=spec_pb2.MembershipView())
     context = MagicMock()
 
     with patch("follower_server.assign_new_leader") as mock_assign:
@@ -93,6 +101,44 @@ def test_update_leader(follower_service):
         mock_assign.assert_called_once_with(follower_service.state, "localhost:6000", "1")
 
     assert response.error_code == 0
+    assert election_state(follower_service.state).term == 1
+
+
+def test_update_leader_rejects_stale_term(follower_service):
+    """Tests that a leader from an older term is not accepted."""
+    election_state(follower_service.state).observe_term(5)
+    request = MagicMock(new_leader_address="localhost:6000", new_leader_id="1", term=4)
+
+    with patch("follower_server.assign_new_leader") as mock_assign:
+        response = follower_service.UpdateLeader(request, MagicMock())
+        mock_assign.assert_not_called()
+
+    assert response.error_code == 1
+    assert response.term == 5
+
+
+def test_request_vote_granted_once_per_term(follower_service):
+    """Tests that a follower votes for a single candidate per term."""
+    first = follower_service.RequestVote(VoteRequest(term=2, candidate_id="2"), MagicMock())
+    second = follower_service.RequestVote(VoteRequest(term=2, candidate_id="3"), MagicMock())
+    assert first.vote_granted
+    assert not second.vote_granted
+    assert second.term == 2
+
+
+def test_request_vote_refused_while_leader_alive(follower_service):
+    """Tests that votes are refused while the leader still sends heartbeats."""
+    follower_service.state['leader_detector'] = MagicMock(is_available=MagicMock(return_value=True))
+    response = follower_service.RequestVote(VoteRequest(term=2, candidate_id="2"), MagicMock())
+    assert not response.vote_granted
+
+
+def test_pre_vote_leaves_term_unchanged(follower_service):
+    """Tests that a pre-vote is answered without entering the new term."""
+    response = follower_service.RequestVote(
+        VoteRequest(term=3, candidate_id="2", pre_vote=True), MagicMock())
+    assert response.vote_granted
+    assert election_state(follower_service.state).term == 0
 
 
 def test_update_followers(follower_service):
@@ -108,6 +154,32 @@ def test_update_followers(follower_service):
     assert response.error_code == 0
 
 
+def test_update_followers_ignores_duplicates(follower_service):
+    """Tests that a follower announced twice is listed once."""
+    request = MagicMock(update_data=pickle.dumps(("2", "localhost:6002")))
+    follower_service.UpdateFollowers(request, MagicMock())
+    follower_service.UpdateFollowers(request, MagicMock())
+    assert follower_service.state['followers'].count(("2", "localhost:6002")) == 1
+
+
+def test_update_membership_applies_newer_views(follower_service):
+    """Tests that membership views are applied by version and exclude this follower."""
+    follower_service.state['follower_id'] = "2"
+
+    def view(version, *ids):
+        return spec_pb2.MembershipView(term=1, version=version, members=[
+            spec_pb2.Member(id=i, address=f"localhost:600{i}") for i in ids])
+
+    follower_service.UpdateMembership(view(2, "2", "3", "4"), MagicMock())
+    assert follower_service.state['followers'] == [("3", "localhost:6003"), ("4", "localhost:6004")]
+
+    follower_service.UpdateMembership(view(1, "2", "3"), MagicMock())  # delivered late
+    assert follower_service.state['followers'] == [("3", "localhost:6003"), ("4", "localhost:6004")]
+
+    follower_service.UpdateMembership(view(3, "2", "4"), MagicMock())
+    assert follower_service.state['followers'] == [("4", "localhost:6004")]
+
+
 def test_client_service_follower_unimplemented():
     """Tests that all methods in ClientServiceFollower raise UNIMPLEMENTED."""
     client_stub = ClientServiceFollower("localhost:50051")
@@ -127,7 +199,7 @@ def test_accept_updates_update_user(follower_service):
         session = follower_service.db_session.return_value
         session.query().get.return_value = user
 
-        response = follower_service.AcceptUpdates(MagicMock(update_data=b"pickle"), MagicMock())
+        response = follower_service.AcceptUpdates(MagicMock(update_data=b"pickle", position=0, leader_position=0, compression=""), MagicMock())
 
     assert response.error_code == 0
 
@@ -142,7 +214,7 @@ def test_accept_updates_merge_called_for_update(follower_service):
 
         mock_inspect.return_value.mapper.column_attrs = []
         session = follower_service.db_session.return_value
-        response = follower_service.AcceptUpdates(MagicMock(update_data=b"pickle"), MagicMock())
+        response = follower_service.AcceptUpdates(MagicMock(update_data=b"pickle", position=0, leader_position=0, compression=""), MagicMock())
 
         session.merge.assert_called_once()
         assert response.error_code == 0
@@ -154,10 +226,15 @@ def test_accept_updates_raises_and_rolls_back(follower_service):
          patch("follower_server.print") as mock_print:
 
         session = follower_service.db_session.return_value
-        response = follower_service.AcceptUpdates(MagicMock(update_data=b"bad"), MagicMock())
+        context = MagicMock()
+        response = follower_service.AcceptUpdates(MagicMock(update_data=b"bad", position=1, leader_position=1, compression=""), context)
         session.rollback.assert_called_once()
-        assert response.error_code == 0
         mock_print.assert_called()
+    # not acknowledged, so the leader sends it again
+    assert response.error_code == StatusCode.UPDATE_NOT_APPLIED
+    assert response.position == 0
+    context.set_code.assert_called_once_with(grpc.StatusCode.ABORTED)
+    assert follower_service.state['replica_progress'].applied_position == 0
 
 def test_assign_new_leader_updates_state():
     """Tests that assign_new_leader updates follower state and launches follower leader server."""
@@ -193,7 +270,8 @@ def test_request_update_syncs_db():
 
         stub = stub_cls.return_value
         stub.RegisterFollower.return_value = MagicMock(
-            pickled_db=b'data', other_followers=[]
+            pickled_db=b'data', other_followers=[], position=0, term=0, incremental=False,
+            compression="", snapshot_file=False, log_id="", membership=spec_pb2.MembershipView()
         )
 
         follower_server.request_update(state)
@@ -231,7 +309,8 @@ def test_request_update_merges_users():
          patch("follower_server.spec_pb2_grpc.LeaderServiceStub") as stub_cls, \
          patch("follower_server.pickle.loads", return_value=data):
         stub_cls.return_value.RegisterFollower.return_value = MagicMock(
-            pickled_db=b"blob", other_followers=[]
+            pickled_db=b"blob", other_followers=[], position=0, term=0, incremental=False,
+            compression="", snapshot_file=False, log_id="", membership=spec_pb2.MembershipView()
         )
         follower_server.request_update(follower_state)
         assert "followers" in follower_state
@@ -239,20 +318,14 @@ def test_request_update_merges_users():
 
 def test_process_update_data_handles_missing_attr(follower_service):
     """Tests update_data logic handles missing attribute fallback."""
-    dummy_obj = MagicMock()
-    dummy_obj.__class__.__name__ = "UserModel"
-    dummy_obj.__dict__ = {"id": 1, "username": "a"}  # no password attr
+    user = UserModel(id=1, username="a")  # password never set
     table = "users"
 
-    with patch("follower_server.pickle.loads", return_value=(table, "add", dummy_obj)), \
-         patch("follower_server.inspect") as mock_inspect:
-        mock_inspect.return_value.mapper.column_attrs = [
-            MagicMock(key="id"),
-            MagicMock(key="username"),
-            MagicMock(key="password")  # password missing from __dict__
-        ]
-        response = follower_service.AcceptUpdates(MagicMock(update_data=b"bad"), MagicMock())
+    with patch("follower_server.pickle.loads", return_value=(table, "add", user)):
+        response = follower_service.AcceptUpdates(MagicMock(update_data=b"bad", position=0, leader_position=0, compression=""), MagicMock())
         assert response.error_code == 0
+    added = follower_service.db_session.return_value.add.call_args.args[0]
+    assert (added.id, added.username, added.password) == (1, "a", None)
 
 
 def test_serve_follower_client(mock_follower_state):
@@ -276,4 +349,256 @@ def test_server_follower_leader(mock_follower_state):
     """
     server = server_follower_leader(mock_follower_state)
     assert server is not None
-    server.stop(None)
\ No newline at end of file
+    server.stop(None)
+
+def test_client_service_follower_redirects_without_opt_in():
+    """Tests that reads are redirected unless the client allows follower reads."""
+    state = {"replica_progress": ReplicaProgress(), "db_session": MagicMock()}
+    state["replica_progress"].observe_leader(0)
+    service = ClientServiceFollower("localhost:50051", state=state)
+    context = MagicMock()
+
+    response = service.ListUsers(spec_pb2.ListUsersRequest(wildcard="*"), context)
+
+    context.set_code.assert_called_once_with(grpc.StatusCode.FAILED_PRECONDITION)
+    assert len(response.user) == 0
+
+
+def test_client_service_follower_serves_fresh_reads():
+    """Tests that a fresh replica answers reads locally."""
+    state = {"replica_progress": ReplicaProgress(), "db_session": MagicMock()}
+    state["replica_progress"].observe_leader(0)
+    service = ClientServiceFollower("localhost:50051", state=state, max_staleness=5)
+    request = spec_pb2.ChatRequest(session_id="abc", username="bob", allow_follower=True)
+
+    with patch("leader_server.ClientService.GetChat", return_value=spec_pb2.Messages()) as get_chat:
+        service.GetChat(request, MagicMock())
+        get_chat.assert_called_once()
+
+
+def test_client_service_follower_redirects_stale_reads():
+    """Tests that a replica lagging past the bound redirects to the leader."""
+    state = {"replica_progress": ReplicaProgress(), "db_session": MagicMock()}
+    service = ClientServiceFollower("localhost:50051", state=state, max_staleness=5)
+    request = spec_pb2.SessionRequest(session_id="abc", allow_follower=True)
+    context = MagicMock()
+
+    with patch("leader_server.ClientService.GetUnreadCounts") as get_counts:
+        service.GetUnreadCounts(request, context)
+        get_counts.assert_not_called()
+    context.set_code.assert_called_once_with(grpc.StatusCode.FAILED_PRECONDITION)
+
+
+def test_accept_updates_records_position(follower_service):
+    """Tests that applied updates advance the replica position."""
+    follower_service.state["replica_progress"] = ReplicaProgress(position=6)
+    with patch.object(follower_service, "process_update_data"):
+        response = follower_service.AcceptUpdates(
+            MagicMock(update_data=b"x", position=7, leader_position=9, compression=""), MagicMock())
+
+    progress = follower_service.state["replica_progress"]
+    assert response.position == 7
+    assert progress.applied_position == 7
+    assert progress.leader_position == 9
+
+
+def test_accept_updates_refuses_gap(follower_service):
+    """Tests that an update after a missing one is refused with the position to resend from."""
+    follower_service.state["replica_progress"] = ReplicaProgress(position=1)
+    context = MagicMock()
+    with patch.object(follower_service, "process_update_data") as process:
+        response = follower_service.AcceptUpdates(
+            MagicMock(update_data=b"x", position=3, leader_position=3, compression=""), context)
+        process.assert_not_called()
+
+    assert response.position == 1
+    context.set_code.assert_called_once_with(grpc.StatusCode.FAILED_PRECONDITION)
+    context.set_trailing_metadata.assert_called_once_with((('applied-position', '1'),))
+    assert follower_service.state["replica_progress"].applied_position == 1
+
+
+def test_client_service_follower_redirects_until_write_is_applied():
+    """Tests that a read asking for an unapplied position is redirected."""
+    state = {"replica_progress": ReplicaProgress(position=3), "db_session": MagicMock()}
+    state["replica_progress"].observe_leader(3)
+    service = ClientServiceFollower("localhost:50051", state=state, read_wait=0.01)
+    request = spec_pb2.ListUsersRequest(wildcard="*", allow_follower=True, min_position=4)
+    context = MagicMock()
+
+    service.ListUsers(request, context)
+    context.set_code.assert_called_once_with(grpc.StatusCode.FAILED_PRECONDITION)
+
+
+def test_accept_updates_skips_already_applied(follower_service):
+    """Tests that updates covered by the snapshot or catch-up are not applied twice."""
+    follower_service.state['replica_progress'] = ReplicaProgress(position=5)
+    with patch.object(follower_service, "process_update_data") as process:
+        follower_service.AcceptUpdates(
+            MagicMock(update_data=b"x", position=4, leader_position=6), MagicMock())
+        process.assert_not_called()
+    assert follower_service.state['replica_progress'].leader_position == 6
+
+
+def test_request_vote_refused_to_less_up_to_date_candidate(follower_service):
+    """Tests that a candidate missing updates this follower applied cannot win."""
+    follower_service.state['replica_progress'] = ReplicaProgress(position=5)
+    response = follower_service.RequestVote(
+        VoteRequest(term=2, candidate_id="2", last_position=4), MagicMock())
+    assert not response.vote_granted
+    assert response.last_position == 5
+
+    response = follower_service.RequestVote(
+        VoteRequest(term=2, candidate_id="2", last_position=5), MagicMock())
+    assert response.vote_granted
+
+
+def test_request_update_catches_up_incrementally():
+    """Tests that a follower holding a prefix of the log only replays the missing updates."""
+    state = {
+        'leader_address': 'localhost:5000',
+        'follower_id': '2',
+        'follower_address': 'localhost:6000',
+        'db_session': MagicMock(),
+        'replica_progress': ReplicaProgress(position=3),
+    }
+    updates = [spec_pb2.AcceptUpdatesRequest(update_data=b"u4", position=4, leader_position=5),
+               spec_pb2.AcceptUpdatesRequest(update_data=b"u5", position=5, leader_position=5)]
+
+    with patch("follower_server.grpc.insecure_channel"), \
+         patch("follower_server.spec_pb2_grpc.LeaderServiceStub") as stub_cls, \
+         patch("follower_server.reset_database") as reset, \
+         patch.object(FollowerService, "process_update_data") as process:
+        stub_cls.return_value.RegisterFollower.return_value = spec_pb2.RegisterFollowerResponse(
+            incremental=True, updates=updates, position=5, term=2)
+        follower_server.request_update(state)
+
+        request = stub_cls.return_value.RegisterFollower.call_args.args[0]
+        assert request.applied_position == 3
+        reset.assert_not_called()
+        assert [c.args[0] for c in process.call_args_list] == [b"u4", b"u5"]
+
+    assert state['replica_progress'].applied_position == 5
+
+
+def test_accept_updates_decompresses_payload(follower_service):
+    """Tests that compressed updates are applied and retained uncompressed."""
+    update_data = b"update " * 100
+    payload, codec = compress(update_data, ZLIB)
+    with patch.object(follower_service, "process_update_data") as process:
+        follower_service.AcceptUpdates(spec_pb2.AcceptUpdatesRequest(
+            update_data=payload, position=1, leader_position=1, compression=codec), MagicMock())
+        process.assert_called_once_with(update_data)
+    assert list(follower_service.state['replica_progress'].history) == [(1, update_data)]
+
+
+def test_request_update_offers_codecs_and_decompresses_snapshot():
+    """Tests that a follower advertises its codecs and unpacks a compressed snapshot."""
+    state = {
+        'leader_address': 'localhost:5000',
+        'follower_id': '2',
+        'follower_address': 'localhost:6000',
+        'db_session': MagicMock(),
+    }
+    snapshot = b"snapshot " * 100
+    payload, codec = compress(snapshot, ZLIB)
+
+    with patch("follower_server.grpc.insecure_channel"), \
+         patch("follower_server.spec_pb2_grpc.LeaderServiceStub") as stub_cls, \
+         patch("follower_server.load_snapshot") as load:
+        stub_cls.return_value.RegisterFollower.return_value = spec_pb2.RegisterFollowerResponse(
+            pickled_db=payload, position=1, term=1, compression=codec)
+        follower_server.request_update(state)
+
+        request = stub_cls.return_value.RegisterFollower.call_args.args[0]
+        assert ZLIB in request.compression
+        load.assert_called_once_with(state['db_session'], snapshot, None)
+
+
+def test_request_update_file_bootstrap(tmp_path):
+    """Tests that a follower installs the leader's file and registers again from its position."""
+    database = tmp_path / "chat_2.db"
+    database.write_bytes(b"empty")
+    state = {
+        'leader_address': 'localhost:5000',
+        'follower_id': '2',
+        'follower_address': 'localhost:6000',
+        'db_session': MagicMock(),
+        'db_engine': MagicMock(),
+        'database_url': f"sqlite:///{database}",
+    }
+    payload, codec = compress(b"leader file " * 100, ZLIB)
+
+    with patch("follower_server.grpc.insecure_channel"), \
+         patch("follower_server.spec_pb2_grpc.LeaderServiceStub") as stub_cls:
+        stub = stub_cls.return_value
+        stub.RegisterFollower.side_effect = [
+            spec_pb2.RegisterFollowerResponse(snapshot_file=True, position=7, term=2, log_id="log"),
+            spec_pb2.RegisterFollowerResponse(incremental=True, position=7, term=2, log_id="log"),
+        ]
+        stub.StreamSnapshot.return_value = iter([
+            spec_pb2.SnapshotChunk(data=payload, compression=codec, position=7, term=2, log_id="log")])
+        follower_server.request_update(state)
+
+        first, second = [c.args[0] for c in stub.RegisterFollower.call_args_list]
+        assert first.snapshot_file and first.applied_position == 0
+        assert second.applied_position == 7 and second.log_id == "log"
+
+    assert database.read_bytes() == b"leader file " * 100
+    assert state['replica_progress'].applied_position == 7
+    assert state['log_id'] == "log"
+    assert state['db_engine'].dispose.call_count == 2
+
+
+def test_request_update_snapshot_replaces_synced_replica():
+    """Tests that a replica which was synced before is reset before loading a snapshot."""
+    progress = ReplicaProgress(position=3)
+    progress.observe_leader(3)
+    state = {
+        'leader_address': 'localhost:5000',
+        'follower_id': '2',
+        'follower_address': 'localhost:6000',
+        'db_session': MagicMock(),
+        'replica_progress': progress,
+    }
+
+    with patch("follower_server.grpc.insecure_channel"), \
+         patch("follower_server.spec_pb2_grpc.LeaderServiceStub") as stub_cls, \
+         patch("follower_server.reset_database") as reset, \
+         patch("follower_server.load_snapshot") as load:
+        stub_cls.return_value.RegisterFollower.return_value = spec_pb2.RegisterFollowerResponse(
+            pickled_db=b"db", position=9, term=2)
+        follower_server.request_update(state)
+        reset.assert_called_once_with(state)
+        load.assert_called_once()
+
+    assert state['replica_progress'].applied_position == 9
+
+
+def test_accept_updates_adds_revocations(follower_service):
+    """Tests that replicated token revocations reach the in-memory list."""
+    tokens = SessionTokens("secret")
+    follower_service.state['session_tokens'] = tokens
+    token = tokens.issue(7, "alice")
+    user = tokens.verify(token)
+    record = RevokedTokenModel(id=1, token_id=user.token_id, revoked_at=1.0, expires_at=user.expires_at)
+
+    follower_service.AcceptUpdates(spec_pb2.AcceptUpdatesRequest(
+        update_data=pickle.dumps(('revoked_tokens', 'add', record)), position=1), MagicMock())
+
+    assert tokens.verify(token) is None
+
+
+def test_follower_reads_verify_tokens_locally():
+    """Tests that replica reads authenticate tokens the replica never stored."""
+    tokens = SessionTokens("secret")
+    state = {"replica_progress": ReplicaProgress(position=1), "db_session": MagicMock(),
+             "session_tokens": tokens}
+    state["replica_progress"].observe_leader(1)
+    service = ClientServiceFollower("localhost:50051", state=state)
+
+    reader = service.local_reader()
+    session = MagicMock()
+    user = reader.authenticate(session, tokens.issue(7, "alice"))
+
+    assert (user.id, user.username) == (7, "alice")
+    session.query.assert_not_called()
@@ -2,10 +2,24 @@ import pytest
 import leader_server as leader_server
 from unittest.mock import MagicMock, patch
 from leader_server import ClientService
-from models import UserModel
+from models import UserModel, MessageModel
 from google.protobuf.timestamp_pb2 import Timestamp
 from datetime import datetime
-from spec_pb2 import Ack
+from spec_pb2 import Ack, HeartbeatPing, RegisterFollowerRequest, SendRequest
+from spec_pb2 import WRITE_CONCERN_LEADER, WRITE_CONCERN_ONE, WRITE_CONCERN_MAJORITY
+from utils import StatusCode
+import queue
+import threading
+import time
+import grpc
+from replication import ReplicationLog, ReplicationTracker
+from election import election_state
+from compression import ZLIB, decompress
+from tokens import SessionTokens
+from credentials import hash_password, verify_password
+import hashlib
+import spec_pb2
+import pickle
 from leader_server import (
     serve_leader_client,
     serve_leader_follower,
@@ -14,6 +28,13 @@ from leader_server import (
     LeaderService
 )
 
+@pytest.fixture(autouse=True)
+def single_partition():
+    """Sends new messages to ``MessageModel`` instead of a monthly partition."""
+    with patch("leader_server.current_partition", return_value=(MessageModel, None)):
+        yield
+
+
 @pytest.fixture
 def mock_session():
     """Provides a mocked SQLAlchemy session."""
@@ -23,7 +44,7 @@ def mock_session():
 @pytest.fixture
 def client_service(mock_session):
     """Creates the ClientService instance with mocked DB and update queue."""
-    return ClientService(db_session=MagicMock(return_value=mock_session), update_queue=MagicMock())
+    return ClientService(db_session=MagicMock(return_value=mock_session), update_queue=ReplicationLog())
 
 
 @pytest.fixture
@@ -43,7 +64,7 @@ def mock_leader_state(tmp_path):
         'followers': [],
         'db_engine': MagicMock(),
         'db_session': MagicMock(),
-        'update_queue': MagicMock(),
+        'update_queue': ReplicationLog(),
         'client_address': 'localhost:60051'
     }
 
@@ -83,7 +104,8 @@ def test_login_success(client_service):
     mock_session = client_service.db_session.return_value
     mock_session.query().filter_by().first.return_value = user
 
-    with patch("leader_server.hash_password", return_value=hashed), \
+    with patch.object(client_service.hasher, "verify", return_value=True), \
+         patch.object(client_service.hasher, "hash", return_value=hashed), \
          patch("leader_server.fully_load"), \
          patch("leader_server.pickle.dumps"), \
          patch.object(ClientService, "GenerateSessionID", return_value="mock-session"):
@@ -102,7 +124,7 @@ def test_login_wrong_password(client_service):
     mock_session = client_service.db_session.return_value
     mock_session.query().filter_by().first.return_value = user
 
-    with patch("leader_server.hash_password", return_value="wrong"):
+    with patch.object(client_service.hasher, "verify", return_value=False):
         request = MagicMock(username="bob", password="wrong")
         context = MagicMock()
         response = client_service.Login(request, context)
@@ -191,17 +213,21 @@ def test_logout_success(client_service):
     assert "logout" in response.error_message.lower()
 
 def test_get_messages_success(client_service):
-    """Tests retrieval of unread messages."""
+    """Tests retrieval of unread messages, which stay unread until acknowledged."""
     user = UserModel(id=1, username="alice", session_id="abc")
-    message = MagicMock(sender=MagicMock(username="bob"), content="hello", id=1, is_received=False)
+    message = MagicMock(sender_id=2, content="hello", id=1)
 
     session = client_service.db_session.return_value
     session.query().filter_by().first.return_value = user
-    session.query().filter().all.return_value = [message]
+    session.query().outerjoin().filter().filter().order_by().limit().all.return_value = [message]
 
-    response = client_service.GetMessages(MagicMock(session_id="abc"), MagicMock())
+    with patch("leader_server.usernames", return_value={2: "bob"}), \
+            patch("leader_server.mark_read") as mark_read:
+        response = client_service.GetMessages(spec_pb2.ReceiveRequest(session_id="abc"), MagicMock())
     assert response.error_code == 0
     assert response.message[0].from_ == "bob"
+    assert response.cursor == ""
+    mark_read.assert_not_called()
 
 
 def test_get_chat_success(client_service):
@@ -213,7 +239,7 @@ def test_get_chat_success(client_service):
     real_time = datetime.utcnow()
 
     # Mock message with datetime, not Timestamp
-    message = MagicMock(sender=receiver, content="hi", id=1)
+    message = MagicMock(sender_id=2, content="hi", id=1)
     message.time_stamp = real_time
 
     session = client_service.db_session.return_value
@@ -223,7 +249,7 @@ def test_get_chat_success(client_service):
     session.query.return_value.filter_by.return_value = mock_user_q
     session.query.return_value.filter.return_value.order_by.return_value.all.return_value = [message]
 
-    response = client_service.GetChat(MagicMock(session_id="abc", username="bob"), MagicMock())
+    response = client_service.GetChat(MagicMock(session_id="abc", username="bob", cursor=""), MagicMock())
     assert response.error_code == 0
     assert response.message[0].message == "hi"
 
@@ -233,9 +259,10 @@ def test_get_unread_counts(client_service):
     user = UserModel(id=1, username="alice", session_id="abc")
     session = client_service.db_session.return_value
     session.query().filter_by.return_value.first.return_value = user
-    session.query().join().filter().group_by().all.return_value = [("bob", 3)]
+    session.query().outerjoin().filter().filter().group_by().all.return_value = [(2, 3)]
 
-    response = client_service.GetUnreadCounts(MagicMock(session_id="abc"), MagicMock())
+    with patch("leader_server.usernames", return_value={2: "bob"}):
+        response = client_service.GetUnreadCounts(MagicMock(session_id="abc"), MagicMock())
     assert response.error_code == 0
     assert getattr(response.counts[0], "from") == "bob"
     assert response.counts[0].count == 3
@@ -267,7 +294,7 @@ def test_delete_account(client_service):
     session.query().filter_by.return_value.first.return_value = user
     session.query().filter().all.return_value = []
 
-    response = client_service.DeleteAccount(MagicMock(session_id="abc"), MagicMock())
+    response = client_service.DeleteAccount(spec_pb2.DeleteAccountRequest(session_id="abc"), MagicMock())
     assert response.error_code == 0
     assert "deleted" in response.error_message.lower()
 
@@ -307,7 +334,7 @@ def test_get_chat_no_messages(client_service):
     session.query.return_value.filter_by.return_value = mock_query
     session.query.return_value.filter.return_value.order_by.return_value.all.return_value = []
 
-    response = client_service.GetChat(MagicMock(session_id="abc", username="bob"), MagicMock())
+    response = client_service.GetChat(MagicMock(session_id="abc", username="bob", cursor=""), MagicMock())
     assert response.error_code != 0
     assert "no messages" in response.error_message.lower()
 
@@ -356,7 +383,7 @@ def test_register_follower_adds_if_new(client_service):
          patch("leader_server.grpc.insecure_channel"), \
          patch("leader_server.spec_pb2_grpc.FollowerServiceStub"):
 
-        req = MagicMock(follower_id="5", follower_address="localhost:9999")
+        req = MagicMock(follower_id="5", follower_address="localhost:9999", applied_position=0)
         resp = service.RegisterFollower(req, MagicMock())
         assert resp.error_code == 0
 
@@ -397,9 +424,9 @@ def test_get_messages_no_messages(client_service):
     user = UserModel(id=1, session_id="abc")
     session = client_service.db_session.return_value
     session.query().filter_by.return_value.first.return_value = user
-    session.query().filter.return_value.all.return_value = []
+    session.query().filter.return_value.order_by.return_value.limit.return_value.all.return_value = []
 
-    request = MagicMock(session_id="abc")
+    request = spec_pb2.ReceiveRequest(session_id="abc")
     response = client_service.GetMessages(request, MagicMock())
     assert response.error_code != 0
     assert "no messages" in response.error_message.lower()
@@ -410,15 +437,14 @@ def test_register_follower_skips_existing():
     state = {
         "followers": [("3", "localhost:5003")]
     }
-    req = MagicMock(follower_id="3", follower_address="localhost:5003")
+    req = MagicMock(follower_id="3", follower_address="localhost:5003", applied_position=0,
+                    snapshot_file=False)
 
-    with patch("leader_server.pickle.dumps", return_value=b"x"), \
-         patch("leader_server.grpc.insecure_channel"), \
-         patch("leader_server.spec_pb2_grpc.FollowerServiceStub") as stub:
-        stub.return_value.UpdateFollowers.return_value = MagicMock()
+    with patch("leader_server.pickle.dumps", return_value=b"x"):
         service = leader_server.LeaderService(state, db_engine=MagicMock())
         resp = service.RegisterFollower(req, MagicMock())
         assert resp.error_code == 0
+    assert state["followers"] == [("3", "localhost:5003")]
 
 
 def test_delete_messages_skips_missing(client_service):
@@ -486,6 +512,8 @@ def test_register_follower(mock_dumps, mock_fetch, mock_leader_state):
     request = MagicMock()
     request.follower_id = "f2"
     request.follower_address = "localhost:70051"
+    request.applied_position = 0
+    request.snapshot_file = False
 
     context = MagicMock()
     response = service.RegisterFollower(request, context)
@@ -493,6 +521,62 @@ def test_register_follower(mock_dumps, mock_fetch, mock_leader_state):
     assert ("f2", "localhost:70051") in mock_leader_state["followers"]
 
 
+def test_register_follower_compresses_snapshot(mock_leader_state):
+    """Tests that the snapshot is compressed with the codec the follower offered."""
+    service = LeaderService(mock_leader_state, mock_leader_state['db_engine'])
+    request = RegisterFollowerRequest(follower_id="f2", follower_address="localhost:70051",
+                                      compression=["brotli", ZLIB])
+    snapshot = {"users": [UserModel(username="user%d" % i, password="x") for i in range(50)]}
+
+    with patch("leader_server.fetch_all_data_from_orm", return_value=snapshot):
+        response = service.RegisterFollower(request, MagicMock())
+
+    assert response.compression == ZLIB
+    assert len(pickle.loads(decompress(response.pickled_db, ZLIB))["users"]) == 50
+    assert leader_server.follower_codecs(mock_leader_state)["f2"] == ZLIB
+
+
+def test_register_follower_defers_file_bootstrap(mock_leader_state):
+    """Tests that a follower asking for a file copy is not registered before it has one."""
+    mock_leader_state['update_queue'].put(b"u1")
+    service = LeaderService(mock_leader_state, mock_leader_state['db_engine'])
+    request = RegisterFollowerRequest(follower_id="f2", follower_address="localhost:70051",
+                                      snapshot_file=True)
+
+    response = service.RegisterFollower(request, MagicMock())
+
+    assert response.snapshot_file
+    assert response.log_id == mock_leader_state['update_queue'].log_id
+    assert mock_leader_state['followers'] == []
+    mock_leader_state['db_engine'].begin.assert_not_called()
+
+    # registering again from the copied position catches up incrementally
+    request = RegisterFollowerRequest(follower_id="f2", follower_address="localhost:70051",
+                                      snapshot_file=True, applied_position=1, log_id=response.log_id)
+    response = service.RegisterFollower(request, MagicMock())
+    assert response.incremental and not response.snapshot_file
+    assert ("f2", "localhost:70051") in mock_leader_state['followers']
+
+
+def test_stream_snapshot_sends_database_file(mock_leader_state):
+    """Tests that the database file copy is streamed in compressed chunks."""
+    mock_leader_state['update_queue'].put(b"u1")
+    service = LeaderService(mock_leader_state, mock_leader_state['db_engine'])
+
+    def backup(engine, path):
+        with open(path, "wb") as f:
+            f.write(b"page " * 1000)
+
+    with patch("leader_server.backup_database", side_effect=backup):
+        chunks = list(service.StreamSnapshot(
+            spec_pb2.SnapshotRequest(follower_id="f2", compression=[ZLIB]), MagicMock()))
+
+    assert len(chunks) == 1
+    assert chunks[0].position == 1
+    assert chunks[0].log_id == mock_leader_state['update_queue'].log_id
+    assert decompress(chunks[0].data, chunks[0].compression) == b"page " * 1000
+
+
 def test_leader_service_heartbeat_check():
     """
     Tests that HeartBeat and CheckLeader methods respond with success.
@@ -518,4 +602,445 @@ def test_fetch_all_data_from_orm():
     """
     mock_connection = MagicMock()
     fetch_all_data_from_orm(mock_connection)
-    mock_connection.begin.assert_not_called()
\ No newline at end of file
+    mock_connection.begin.assert_not_called()
+
+def test_heartbeat_reports_latest_position(mock_leader_state):
+    """Tests that HeartBeat carries the leader's latest replication position."""
+    mock_leader_state['update_queue'].put(b"update")
+    service = LeaderService(mock_leader_state, mock_leader_state['db_engine'])
+    response = service.HeartBeat(MagicMock(), MagicMock())
+    assert response.position == 1
+
+
+def test_heartbeat_stream_acks_every_ping(mock_leader_state):
+    """Tests that HeartBeatStream answers each ping with the latest position."""
+    mock_leader_state['update_queue'].put(b"update")
+    service = LeaderService(mock_leader_state, mock_leader_state['db_engine'])
+    pings = [HeartbeatPing(follower_id="2")] * 3
+    acks = list(service.HeartBeatStream(iter(pings), MagicMock()))
+    assert len(acks) == 3
+    assert all(ack.position == 1 for ack in acks)
+    assert all(ack.term == election_state(mock_leader_state).term for ack in acks)
+
+
+def test_heartbeat_stream_records_follower_progress(mock_leader_state):
+    """Tests that the applied position carried by pings feeds the progress table."""
+    tracker = leader_server.replication_tracker(mock_leader_state)
+    tracker.add("2")
+    service = LeaderService(mock_leader_state, mock_leader_state['db_engine'])
+    list(service.HeartBeatStream(iter([HeartbeatPing(follower_id="2", applied_position=3)]),
+                                 MagicMock()))
+    assert tracker.acked["2"] == 3
+
+
+def test_get_replication_status(mock_leader_state):
+    """Tests that the replication status lists every follower's lag."""
+    mock_leader_state['update_queue'].put(b"u1")
+    mock_leader_state['update_queue'].put(b"u2")
+    tracker = leader_server.replication_tracker(mock_leader_state)
+    tracker.add("2")
+    tracker.appended(1, 4)
+    tracker.appended(2, 6)
+    tracker.ack("2", 1)
+    service = LeaderService(mock_leader_state, mock_leader_state['db_engine'])
+
+    status = service.GetReplicationStatus(MagicMock(), MagicMock())
+
+    assert status.leader_position == 2
+    assert len(status.followers) == 1
+    assert status.followers[0].follower_id == "2"
+    assert status.followers[0].positions_behind == 1
+    assert status.followers[0].bytes_behind == 6
+
+
+def test_register_follower_catches_up_from_history(mock_leader_state):
+    """Tests that a follower holding a prefix of the log gets only the missing updates."""
+    mock_leader_state['update_queue'] = ReplicationLog(start=2, history=[(1, b"u1"), (2, b"u2")])
+    mock_leader_state['update_queue'].put(b"u3")
+    service = LeaderService(mock_leader_state, mock_leader_state['db_engine'])
+    request = RegisterFollowerRequest(follower_id="f2", follower_address="localhost:70051",
+                                      applied_position=1)
+
+    response = service.RegisterFollower(request, MagicMock())
+
+    assert response.incremental
+    assert response.pickled_db == b""
+    assert [(u.position, u.update_data) for u in response.updates] == [(2, b"u2"), (3, b"u3")]
+    mock_leader_state['db_engine'].begin.assert_not_called()
+
+
+def test_get_chat_read_only_keeps_unread(mock_session):
+    """Tests that a read-only service does not mark messages as received."""
+    service = ClientService(db_session=MagicMock(return_value=mock_session),
+                            update_queue=None, read_only=True)
+    user = UserModel(id=1, username="alice", session_id="abc")
+    receiver = UserModel(id=2, username="bob")
+    message = MagicMock(sender_id=2, content="hi", id=1, receiver_id=1)
+    message.time_stamp = datetime.utcnow()
+
+    mock_user_q = MagicMock()
+    mock_user_q.first.side_effect = [user, receiver]
+    mock_session.query.return_value.filter_by.return_value = mock_user_q
+    mock_session.query.return_value.filter.return_value.order_by.return_value.all.return_value = [message]
+
+    with patch("leader_server.mark_read") as mark_read:
+        response = service.GetChat(MagicMock(session_id="abc", username="bob", cursor=""), MagicMock())
+    assert response.error_code == 0
+    mark_read.assert_not_called()
+
+
+def test_send_returns_replication_position(client_service):
+    """Tests that a successful Send reports the position of its update."""
+    sender = UserModel(id=1, username="alice", session_id="abc")
+    receiver = UserModel(id=2, username="bob")
+
+    session = client_service.db_session.return_value
+    session.query.return_value.filter_by.return_value.first.side_effect = [
+        sender, receiver, MagicMock(id=5)]
+
+    with patch("leader_server.fully_load"), patch("leader_server.pickle.dumps", return_value=b"x"):
+        response = client_service.Send(MagicMock(session_id="abc", to="bob", message="hi"), MagicMock())
+
+    assert response.error_code == 0
+    assert response.position == client_service.update_queue.position == 1
+
+
+def send_with_concern(service, write_concern):
+    """Sends a message through ``service`` with the given write concern."""
+    sender = UserModel(id=1, username="alice", session_id="abc")
+    receiver = UserModel(id=2, username="bob")
+    session = service.db_session.return_value
+    session.query.return_value.filter_by.return_value.first.side_effect = [
+        sender, receiver, MagicMock(id=5)]
+
+    with patch("leader_server.fully_load"), patch("leader_server.pickle.dumps", return_value=b"x"):
+        return service.Send(SendRequest(session_id="abc", to="bob", message="hi",
+                                        write_concern=write_concern), MagicMock())
+
+
+def test_send_waits_for_follower_ack(mock_session):
+    """Tests that Send with WRITE_CONCERN_ONE returns once a follower applied the message."""
+    tracker = ReplicationTracker()
+    tracker.add("2")
+    service = ClientService(db_session=MagicMock(return_value=mock_session),
+                            update_queue=ReplicationLog(), replication=tracker)
+    threading.Timer(0.05, tracker.ack, args=("2", 1)).start()
+
+    response = send_with_concern(service, WRITE_CONCERN_ONE)
+
+    assert response.error_code == StatusCode.SUCCESS
+    assert response.position == 1
+
+
+def test_send_reports_replication_timeout(mock_session):
+    """Tests that a write concern not met in time is reported to the client."""
+    tracker = ReplicationTracker()
+    for follower_id in ("2", "3", "4"):
+        tracker.add(follower_id)
+    service = ClientService(db_session=MagicMock(return_value=mock_session),
+                            update_queue=ReplicationLog(), replication=tracker, write_timeout=0.05)
+    tracker.ack("2", 1)
+
+    response = send_with_concern(service, WRITE_CONCERN_MAJORITY)
+
+    assert response.error_code == StatusCode.REPLICATION_TIMEOUT
+    assert response.position == 1
+
+
+def test_send_without_followers(mock_session):
+    """Tests that without followers a majority is the leader alone, and one follower fails at once."""
+    service = ClientService(db_session=MagicMock(return_value=mock_session),
+                            update_queue=ReplicationLog(), replication=ReplicationTracker(), write_timeout=5)
+
+    assert send_with_concern(service, WRITE_CONCERN_MAJORITY).error_code == StatusCode.SUCCESS
+    started = time.monotonic()
+    response = send_with_concern(service, WRITE_CONCERN_ONE)
+    assert response.error_code == StatusCode.NO_FOLLOWERS
+    assert time.monotonic() - started < 1
+
+
+def test_send_uses_server_default_write_concern(mock_session):
+    """Tests that requests without a write concern use the server's setting."""
+    tracker = ReplicationTracker()
+    tracker.add("2")
+    service = ClientService(db_session=MagicMock(return_value=mock_session),
+                            update_queue=ReplicationLog(), replication=tracker,
+                            write_concern=WRITE_CONCERN_ONE, write_timeout=0.05)
+    assert send_with_concern(service, 0).error_code == StatusCode.REPLICATION_TIMEOUT
+
+    service.update_queue = ReplicationLog()
+    assert send_with_concern(service, WRITE_CONCERN_LEADER).error_code == StatusCode.SUCCESS
+
+
+def test_send_updates_records_acks(mock_leader_state):
+    """Tests that a follower's sender acknowledges every applied update."""
+    backlog, stop_event = queue.Queue(), threading.Event()
+    backlog.put((1, b"a"))
+    backlog.put((2, b"b"))
+    tracker = leader_server.replication_tracker(mock_leader_state)
+    tracker.add("f2")
+
+    def accept(request, timeout):
+        if request.position == 2:
+            stop_event.set()
+        return MagicMock(error_code=0, position=request.position)
+
+    with patch("leader_server.grpc.insecure_channel"), \
+         patch("leader_server.spec_pb2_grpc.FollowerServiceStub") as stub_class:
+        stub_class.return_value.AcceptUpdates.side_effect = accept
+        leader_server.send_updates(mock_leader_state, ("f2", "localhost:6002"), backlog, stop_event)
+
+    assert tracker.acked["f2"] == 2
+
+
+class RefusedUpdate(grpc.RpcError):
+    def __init__(self, code, applied=None):
+        self._code, self.applied = code, applied
+
+    def code(self):
+        return self._code
+
+    def trailing_metadata(self):
+        return () if self.applied is None else (('applied-position', str(self.applied)),)
+
+
+def test_send_updates_retries_in_order(mock_leader_state):
+    """Tests that failed updates are sent again and a follower missing one gets it from the log."""
+    log = mock_leader_state['update_queue']
+    for update_data in (b"a", b"b", b"c"):
+        log.put(update_data)
+    backlog, stop_event = queue.Queue(), threading.Event()
+    backlog.put(log.history[0])
+    backlog.put(log.history[2])  # the entry of position 2 is lost on the way
+    tracker = leader_server.replication_tracker(mock_leader_state)
+    tracker.add("f2")
+    sent, applied = [], [0]
+
+    def accept(request, timeout):
+        sent.append(request.position)
+        if len(sent) == 1:
+            raise RefusedUpdate(grpc.StatusCode.DEADLINE_EXCEEDED)
+        if request.position != applied[0] + 1:
+            raise RefusedUpdate(grpc.StatusCode.FAILED_PRECONDITION, applied[0])
+        applied[0] = request.position
+        if applied[0] == 3:
+            stop_event.set()
+        return spec_pb2.ServerResponse(position=applied[0])
+
+    with patch("leader_server.grpc.insecure_channel"), \
+         patch("leader_server.spec_pb2_grpc.FollowerServiceStub") as stub_class, \
+         patch("leader_server.FOLLOWER_RETRY_DELAY", 0):
+        stub_class.return_value.AcceptUpdates.side_effect = accept
+        leader_server.send_updates(mock_leader_state, ("f2", "localhost:6002"), backlog, stop_event)
+
+    assert sent == [1, 1, 3, 2, 3]
+    assert tracker.acked["f2"] == 3
+
+
+def test_replication_status_reports_gap_free_position(mock_leader_state):
+    """Tests that a follower still missing updates is not shown as caught up."""
+    log = mock_leader_state['update_queue']
+    backlog, stop_event = queue.Queue(), threading.Event()
+    for update_data in (b"a", b"b", b"c"):
+        log.put(update_data)
+    backlog.put(log.history[0])
+    backlog.put(log.history[2])
+    leader_server.replication_tracker(mock_leader_state).add("f2")
+    leader_server.replication_tracker(mock_leader_state).appended(3, 1)
+
+    def accept(request, timeout):
+        # position 1 is applied, position 3 arrives before 2 and is refused
+        stop_event.set()
+        if request.position == 1:
+            stop_event.clear()
+            return spec_pb2.ServerResponse(position=1)
+        raise RefusedUpdate(grpc.StatusCode.FAILED_PRECONDITION, 1)
+
+    with patch("leader_server.grpc.insecure_channel"), \
+         patch("leader_server.spec_pb2_grpc.FollowerServiceStub") as stub_class:
+        stub_class.return_value.AcceptUpdates.side_effect = accept
+        leader_server.send_updates(mock_leader_state, ("f2", "localhost:6002"), backlog, stop_event)
+
+    service = LeaderService(mock_leader_state, mock_leader_state['db_engine'])
+    status = service.GetReplicationStatus(spec_pb2.Empty(), MagicMock())
+    assert (status.followers[0].applied_position, status.followers[0].positions_behind) == (1, 2)
+
+
+def test_send_updates_uses_negotiated_codec(mock_leader_state):
+    """Tests that updates are compressed with the follower's codec."""
+    backlog, stop_event = queue.Queue(), threading.Event()
+    update_data = pickle.dumps(("messages", "add", "hello " * 100))
+    backlog.put((1, update_data))
+    leader_server.follower_codecs(mock_leader_state)["f2"] = ZLIB
+    sent = []
+
+    def accept(request, timeout):
+        sent.append(request)
+        stop_event.set()
+        return MagicMock(error_code=0, position=request.position)
+
+    with patch("leader_server.grpc.insecure_channel"), \
+         patch("leader_server.spec_pb2_grpc.FollowerServiceStub") as stub_class:
+        stub_class.return_value.AcceptUpdates.side_effect = accept
+        leader_server.send_updates(mock_leader_state, ("f2", "localhost:6002"), backlog, stop_event)
+
+    assert sent[0].compression == ZLIB
+    assert len(sent[0].update_data) < len(update_data)
+    assert decompress(sent[0].update_data, ZLIB) == update_data
+
+
+def test_send_updates_pushes_membership_changes(mock_leader_state):
+    """Tests that each membership version is pushed to a follower once."""
+    backlog, stop_event = queue.Queue(), threading.Event()
+    view = leader_server.membership(mock_leader_state)
+    view.add(("f2", "localhost:6002"), term=1)
+    pushed = []
+
+    def update_membership(request, timeout):
+        pushed.append((request.version, [m.id for m in request.members]))
+        if len(pushed) == 1:
+            view.add(("f3", "localhost:6003"), term=1)
+        else:
+            stop_event.set()
+        return spec_pb2.Ack(error_code=0)
+
+    with patch("leader_server.grpc.insecure_channel"), \
+         patch("leader_server.spec_pb2_grpc.FollowerServiceStub") as stub_class:
+        stub_class.return_value.UpdateMembership.side_effect = update_membership
+        leader_server.send_updates(mock_leader_state, ("f2", "localhost:6002"), backlog, stop_event)
+
+    assert pushed == [(1, ["f2"]), (2, ["f2", "f3"])]
+
+
+def test_register_follower_does_not_call_other_followers(mock_leader_state):
+    """Tests that registration returns the membership view without fanning out."""
+    leader_server.membership(mock_leader_state).add(("f3", "localhost:6003"), term=1)
+    service = LeaderService(mock_leader_state, mock_leader_state['db_engine'])
+    request = RegisterFollowerRequest(follower_id="f2", follower_address="localhost:6002")
+
+    with patch("leader_server.fetch_all_data_from_orm", return_value={}), \
+         patch("leader_server.grpc.insecure_channel") as channel:
+        response = service.RegisterFollower(request, MagicMock())
+        channel.assert_not_called()
+
+    assert response.membership.version == 2
+    assert [m.id for m in response.membership.members] == ["f3", "f2"]
+
+
+def test_send_updates_drops_unreachable_follower(mock_leader_state):
+    """Tests that a follower failing repeatedly is removed from the leader's list."""
+    follower = ("f2", "localhost:6002")
+    mock_leader_state['followers'] = [follower]
+    backlog = queue.Queue()
+    for position in range(1, 4):
+        backlog.put((position, b"x"))
+
+    error = grpc.RpcError()
+    error.code = lambda: grpc.StatusCode.UNAVAILABLE
+    with patch("leader_server.grpc.insecure_channel"), \
+         patch("leader_server.spec_pb2_grpc.FollowerServiceStub") as stub_class:
+        stub_class.return_value.AcceptUpdates.side_effect = error
+        leader_server.send_updates(mock_leader_state, follower, backlog, threading.Event())
+
+    assert mock_leader_state['followers'] == []
+
+
+def test_throttle_writes_waits_for_lagging_followers(mock_session):
+    """Tests that Send is held back while a majority of followers lags."""
+    tracker = MagicMock()
+    tracker.wait_for_lag.return_value = True
+    service = ClientService(db_session=MagicMock(return_value=mock_session),
+                            update_queue=ReplicationLog(), replication=tracker,
+                            write_timeout=1.5, max_replication_lag=3.0)
+    service.throttle_writes()
+    tracker.wait_for_lag.assert_called_once_with(3.0, 1.5)
+
+
+def test_throttle_writes_disabled(mock_session):
+    """Tests that a zero lag bound turns flow control off."""
+    tracker = MagicMock()
+    service = ClientService(db_session=MagicMock(return_value=mock_session),
+                            update_queue=ReplicationLog(), replication=tracker,
+                            max_replication_lag=0)
+    service.throttle_writes()
+    tracker.wait_for_lag.assert_not_called()
+
+
+@pytest.fixture
+def token_service(mock_session):
+    """Creates a ClientService that issues signed session tokens."""
+    return ClientService(db_session=MagicMock(return_value=mock_session), update_queue=ReplicationLog(),
+                         tokens=SessionTokens("secret"))
+
+
+def test_login_issues_token(token_service):
+    """Tests that login hands out a token naming the user."""
+    user = UserModel(id=3, username="bob", password=leader_server.hash_password("pw"))
+    token_service.db_session.return_value.query().filter_by().first.return_value = user
+
+    with patch("leader_server.fully_load"), patch("leader_server.pickle.dumps"):
+        response = token_service.Login(MagicMock(username="bob", password="pw"), MagicMock())
+
+    verified = token_service.tokens.verify(response.session_id)
+    assert (verified.id, verified.username) == (3, "bob")
+    assert user.session_id == response.session_id
+
+
+def test_token_authenticates_without_lookup(token_service):
+    """Tests that a valid token resolves the user without querying the users table."""
+    session = MagicMock()
+    user = token_service.authenticate(session, token_service.tokens.issue(3, "bob"))
+    assert user.id == 3
+    session.query.assert_not_called()
+
+
+def test_logout_revokes_token(token_service):
+    """Tests that a token stops working after logout and the revocation is replicated."""
+    token = token_service.tokens.issue(3, "bob")
+    session = token_service.db_session.return_value
+    session.get.return_value = UserModel(id=3, username="bob", session_id=token, logged_in=True)
+
+    with patch("leader_server.fully_load"):
+        response = token_service.Logout(MagicMock(session_id=token), MagicMock())
+
+    assert response.error_code == 0
+    assert token_service.authenticate(session, token) is None
+    table, action, record = pickle.loads(token_service.update_queue.get()[1])
+    assert (table, action) == ('revoked_tokens', 'add')
+    assert record.token_id
+
+
+def test_revoked_token_does_not_fall_back_to_lookup(token_service):
+    """Tests that a revoked token is rejected even though the users table still holds it."""
+    token = token_service.tokens.issue(3, "bob")
+    token_service.tokens.revocations.add(user_id=3, revoked_at=float('inf'), expires_at=float('inf'))
+    session = MagicMock()
+    session.query().filter_by().first.return_value = UserModel(id=3, session_id=token)
+
+    assert token_service.authenticate(session, token) is None
+
+
+def test_login_upgrades_legacy_hash(client_service):
+    """Tests that an unsalted SHA-256 hash is replaced by scrypt on login."""
+    user = UserModel(id=1, username="bob", password=hashlib.sha256(b"pw").hexdigest())
+    client_service.db_session.return_value.query().filter_by().first.return_value = user
+
+    with patch("leader_server.fully_load"), patch("leader_server.pickle.dumps"):
+        response = client_service.Login(MagicMock(username="bob", password="pw"), MagicMock())
+
+    assert response.error_code == 0
+    assert user.password.startswith("scrypt$")
+    assert verify_password("pw", user.password)
+
+
+def test_delete_account_checks_password(client_service):
+    """Tests that DeleteAccount refuses a wrong confirmation password."""
+    user = UserModel(id=1, session_id="abc", password=hash_password("pw", n=2))
+    session = client_service.db_session.return_value
+    session.query().filter_by.return_value.first.return_value = user
+
+    response = client_service.DeleteAccount(
+        spec_pb2.DeleteAccountRequest(session_id="abc", password="nope"), MagicMock())
+
+    assert response.error_code == StatusCode.INCORRECT_PASSWORD
+    session.delete.assert_not_called()
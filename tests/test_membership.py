@@ -0,0 +1,39 @@
+import pytest
+from membership import Membership, membership
+
+
+def test_changes_bump_version():
+    """Tests that only actual changes produce a new version."""
+    view = Membership()
+    assert view.add(("2", "localhost:2"), term=1)
+    assert not view.add(("2", "localhost:2"), term=1)
+    assert view.add(("3", "localhost:3"), term=1)
+    assert view.remove(("2", "localhost:2"), term=1)
+    assert not view.remove(("2", "localhost:2"), term=1)
+    assert view.view() == (1, 3, [("3", "localhost:3")])
+
+
+def test_new_term_restarts_versions():
+    """Tests that the first view of a new leader supersedes older terms."""
+    view = Membership(term=1, version=7)
+    view.bump(2)
+    assert view.view()[:2] == (2, 1)
+
+
+def test_apply_only_newer_views():
+    """Tests that stale or repeated views are ignored."""
+    view = Membership()
+    assert view.apply(1, 2, [("2", "a"), ("3", "b")])
+    assert not view.apply(1, 2, [("2", "a"), ("3", "b")])
+    assert not view.apply(1, 1, [("2", "a")])
+    assert view.apply(2, 1, [("4", "c")])
+    assert view.view() == (2, 1, [("4", "c")])
+
+
+def test_membership_shares_follower_list():
+    """Tests that the view updates ``state['followers']`` in place."""
+    state = {"followers": [("2", "a")]}
+    view = membership(state)
+    assert membership(state) is view
+    view.apply(1, 1, [("3", "b")])
+    assert state["followers"] == [("3", "b")]
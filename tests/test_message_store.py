@@ -0,0 +1,129 @@
+import pickle
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy.orm import scoped_session
+import spec_pb2
+from follower_server import FollowerService, load_snapshot
+from leader_server import ClientService, fetch_all_data_from_orm
+from message_store import MessageStore, message_file_url, open_message_store, parse_cursor
+from models import UserModel, init_db, get_session_factory
+from partitions import message_models
+from replication import ReplicationLog
+
+
+def make_node(path, files=2):
+    """Returns the main session factory and message store of a node with users a, b and c."""
+    url = f"sqlite:///{path}"
+    factory = get_session_factory(init_db(url))
+    session = scoped_session(factory)
+    session.add_all([UserModel(id=i, username=name, password="x", session_id=f"s{name}", logged_in=True)
+                     for i, name in enumerate("abc", start=1)])
+    session.commit()
+    session.remove()
+    return factory, open_message_store(url, files)
+
+
+def contents(store, index):
+    with store.session(index) as session:
+        return [row.content for model in message_models(session) for row in session.query(model).all()]
+
+
+@pytest.fixture
+def node(tmp_path):
+    factory, store = make_node(tmp_path / "chat.db")
+    yield ClientService(db_session=factory, update_queue=ReplicationLog(), store=store)
+    store.dispose()
+
+
+def send(service, sender, to, message):
+    response = service.Send(spec_pb2.SendRequest(session_id=f"s{sender}", to=to, message=message), MagicMock())
+    assert response.error_code == 0
+
+
+def test_ids_encode_their_file():
+    """Tests that client-facing IDs map back to the file and local ID."""
+    store = MessageStore([MagicMock(), MagicMock(), MagicMock()])
+    assert store.file_of(7) == 1
+    assert store.global_id(1, 5) == 16
+    assert store.group_ids([16, 3, 4]) == {1: [5, 1], 0: [1]}
+    assert message_file_url("sqlite:///chat_1.db", 2) == "sqlite:///chat_1.messages2.db"
+
+
+def test_messages_are_stored_in_receiver_file(node):
+    """Tests that Send writes to the receiver's file and reads return global IDs."""
+    send(node, "a", "b", "to b")  # b has ID 2, file 0
+    send(node, "b", "a", "to a")  # a has ID 1, file 1
+
+    assert contents(node.store, 0) == ["to b"]
+    assert contents(node.store, 1) == ["to a"]
+
+    messages = node.GetMessages(spec_pb2.ReceiveRequest(session_id="sa"), MagicMock())
+    assert [(m.from_, m.message) for m in messages.message] == [("b", "to a")]
+    assert messages.message[0].message_id % 2 == 1
+
+    response = node.DeleteMessages(spec_pb2.DeleteMessagesRequest(
+        session_id="sa", message_ids=[messages.message[0].message_id]), MagicMock())
+    assert response.error_code == 0
+    assert contents(node.store, 1) == []
+
+
+def test_get_chat_merges_files_in_time_order(node):
+    """Tests that a chat stored in two files comes back as one ordered history."""
+    for i in range(3):
+        send(node, "a", "b", f"ab{i}")
+        send(node, "b", "a", f"ba{i}")
+
+    chat = node.GetChat(spec_pb2.ChatRequest(session_id="sa", username="b"), MagicMock())
+
+    assert [m.message for m in chat.message] == ["ab0", "ba0", "ab1", "ba1", "ab2", "ba2"]
+    assert len({m.message_id for m in chat.message}) == 6
+
+
+def test_follower_applies_updates_to_the_same_file(node, tmp_path):
+    """Tests that replicated partitions and messages land in the follower's matching file."""
+    send(node, "a", "b", "to b")
+    send(node, "b", "a", "to a")
+
+    factory, store = make_node(tmp_path / "replica.db")
+    follower = FollowerService(db_session=factory, leader_address="leader", state={'message_store': store})
+    for position in range(1, node.update_queue.position + 1):
+        follower.process_update_data(node.update_queue.get(position)[1])
+
+    assert contents(store, 0) == ["to b"]
+    assert contents(store, 1) == ["to a"]
+    store.dispose()
+
+
+def test_snapshot_covers_every_file(node, tmp_path):
+    """Tests that pickled snapshots carry and restore the messages of each file."""
+    send(node, "a", "b", "to b")
+    send(node, "c", "a", "to a")
+    session = scoped_session(node.db_session)
+    snapshot = pickle.dumps(fetch_all_data_from_orm(session.get_bind(), node.store))
+    session.remove()
+
+    factory, store = make_node(tmp_path / "replica.db")
+    session = scoped_session(factory)
+    session.query(UserModel).delete()
+    session.commit()
+    session.remove()
+    load_snapshot(factory, snapshot, store)
+
+    assert contents(store, 0) == ["to b"]
+    assert contents(store, 1) == ["to a"]
+    store.dispose()
+
+
+def test_chat_cursor_tracks_each_file(node):
+    """Tests that a cursor returns new messages of both files of a chat."""
+    send(node, "a", "b", "ab0")
+    send(node, "b", "a", "ba0")
+    first = node.GetChat(spec_pb2.ChatRequest(session_id="sa", username="b"), MagicMock())
+    assert parse_cursor(first.cursor) == {0: 10001, 1: 10001}
+
+    send(node, "b", "a", "ba1")
+    send(node, "a", "b", "ab1")
+    delta = node.GetChat(spec_pb2.ChatRequest(session_id="sa", username="b", cursor=first.cursor), MagicMock())
+
+    assert [m.message for m in delta.message] == ["ba1", "ab1"]
+    assert len(delta.message_ids) == 4
@@ -47,7 +47,6 @@ def test_message_model_creation(db_session):
         sender_id=sender.id,
         receiver_id=receiver.id,
         content="Hello Carol!",
-        is_received=False,
         sender_deleted=False,
         receiver_deleted=False,
     )
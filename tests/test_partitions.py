@@ -0,0 +1,206 @@
+import os
+import pickle
+import sqlite3
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import scoped_session
+import spec_pb2
+from follower_server import FollowerService, load_snapshot
+from leader_server import ClientService, fetch_all_data_from_orm
+from models import MessageModel, MessagePartitionModel, UserModel, init_db, get_session_factory
+from partitions import (PARTITION_ID_GAP, archive_partitions, as_message, current_partition,
+                        message_model, message_models, models_for_ids)
+from replication import ReplicationLog
+
+JANUARY = datetime(2026, 1, 15)
+FEBRUARY = datetime(2026, 2, 3)
+
+
+def make_db(path):
+    """Returns a session factory for a database with two logged in users."""
+    factory = get_session_factory(init_db(f"sqlite:///{path}"))
+    session = scoped_session(factory)
+    session.add_all([UserModel(id=1, username="a", password="x", session_id="sa", logged_in=True),
+                     UserModel(id=2, username="b", password="y", session_id="sb", logged_in=True)])
+    session.commit()
+    session.remove()
+    return factory
+
+
+@pytest.fixture
+def db_session(tmp_path):
+    return make_db(tmp_path / "chat.db")
+
+
+def add_message(session, model, content, when):
+    message = model(sender_id=1, receiver_id=2, content=content, time_stamp=when)
+    session.add(message)
+    session.commit()
+    return message.id
+
+
+def test_new_month_starts_partition_after_gap(db_session):
+    """Tests that each month gets its own table whose IDs follow the previous ones."""
+    session = scoped_session(db_session)
+    legacy = add_message(session, MessageModel, "old", JANUARY)
+
+    january, created = current_partition(session, now=JANUARY)
+    assert january is message_model(202601)
+    assert created.first_id == legacy + PARTITION_ID_GAP
+    assert current_partition(session, now=JANUARY) == (january, None)
+
+    first = add_message(session, january, "jan", JANUARY)
+    february, created = current_partition(session, now=FEBRUARY)
+    assert first == legacy + PARTITION_ID_GAP + 1
+    assert created.first_id == first + PARTITION_ID_GAP
+    assert message_models(session) == [MessageModel, january, february]
+
+    second = add_message(session, february, "feb", FEBRUARY)
+    assert models_for_ids(session, [legacy, first, second]) == {
+        MessageModel: [legacy], january: [first], february: [second]}
+    session.remove()
+
+
+def test_get_chat_reads_every_partition_in_order(db_session):
+    """Tests that the chat history spans partitions, oldest first."""
+    session = scoped_session(db_session)
+    add_message(session, MessageModel, "old", datetime(2025, 12, 30))
+    january, _ = current_partition(session, now=JANUARY)
+    add_message(session, january, "jan", JANUARY)
+    february, _ = current_partition(session, now=FEBRUARY)
+    add_message(session, february, "feb", FEBRUARY)
+    session.remove()
+
+    service = ClientService(db_session=db_session, update_queue=ReplicationLog())
+    messages = service.GetChat(spec_pb2.ChatRequest(session_id="sb", username="a"), MagicMock())
+
+    assert [message.message for message in messages.message] == ["old", "jan", "feb"]
+
+
+def test_get_chat_queries_do_not_grow_with_messages(db_session):
+    """Tests that GetChat runs as many statements for many messages as for one, and marks all received."""
+    service = ClientService(db_session=db_session, update_queue=ReplicationLog())
+    statements = []
+    event.listen(db_session.kw['bind'], 'before_cursor_execute', lambda *args: statements.append(1))
+
+    def count_statements():
+        statements.clear()
+        service.GetChat(spec_pb2.ChatRequest(session_id="sb", username="a"), MagicMock())
+        return len(statements)
+
+    session = scoped_session(db_session)
+    add_message(session, MessageModel, "first", JANUARY)
+    session.remove()
+    single = count_statements()
+    session = scoped_session(db_session)
+    for i in range(20):
+        add_message(session, MessageModel, f"message {i}", JANUARY)
+    session.remove()
+    assert count_statements() == single
+
+    unread = service.GetUnreadCounts(spec_pb2.SessionRequest(session_id="sb"), MagicMock())
+    assert list(unread.counts) == []
+
+
+def test_get_messages_pages_across_partitions(db_session):
+    """Tests that unread messages come in pages, oldest first, until acknowledged."""
+    session = scoped_session(db_session)
+    add_message(session, MessageModel, "old", datetime(2025, 12, 30))
+    january, _ = current_partition(session, now=JANUARY)
+    add_message(session, january, "jan", JANUARY)
+    february, _ = current_partition(session, now=FEBRUARY)
+    add_message(session, february, "feb", FEBRUARY)
+    session.remove()
+    service = ClientService(db_session=db_session, update_queue=ReplicationLog())
+
+    first = service.GetMessages(spec_pb2.ReceiveRequest(session_id="sb", limit=2), MagicMock())
+    assert [message.message for message in first.message] == ["old", "jan"] and first.cursor
+    second = service.GetMessages(spec_pb2.ReceiveRequest(
+        session_id="sb", limit=2, cursor=first.cursor), MagicMock())
+    assert [message.message for message in second.message] == ["feb"] and not second.cursor
+
+    # nothing was acknowledged, so everything is still unread
+    again = service.GetMessages(spec_pb2.ReceiveRequest(session_id="sb"), MagicMock())
+    assert len(again.message) == 3
+    service.AcknowledgeReceivedMessages(spec_pb2.AcknowledgeReceivedMessagesRequest(
+        session_id="sb", message_ids=[message.message_id for message in first.message]), MagicMock())
+    rest = service.GetMessages(spec_pb2.ReceiveRequest(session_id="sb"), MagicMock())
+    assert [message.message for message in rest.message] == ["feb"]
+
+
+def test_send_replicates_new_partition_before_message(db_session):
+    """Tests that the first Send of a month ships the catalog entry first."""
+    log = ReplicationLog()
+    service = ClientService(db_session=db_session, update_queue=log)
+
+    response = service.Send(spec_pb2.SendRequest(session_id="sa", to="b", message="hi"), MagicMock())
+
+    assert response.error_code == 0
+    table, action, entry, index = pickle.loads(log.get(1)[1])
+    assert (table, action, index) == ('message_partitions', 'add', 0)
+    table, action, message = pickle.loads(log.get(2)[1])
+    assert (table, action, type(message), message.content) == ('messages', 'add', MessageModel, "hi")
+    assert message.id == entry.first_id + 1
+
+
+def test_follower_applies_partitioned_updates(db_session, tmp_path):
+    """Tests that a follower creates the partition and stores the message in it."""
+    session = scoped_session(db_session)
+    january, entry = current_partition(session, now=JANUARY)
+    message_id = add_message(session, january, "jan", JANUARY)
+    message = as_message(session.get(january, message_id))
+    session.refresh(entry)
+    session.expunge(entry)
+    session.remove()
+
+    replica = make_db(tmp_path / "replica.db")
+    follower = FollowerService(db_session=replica, leader_address="leader", state={})
+    follower.process_update_data(pickle.dumps(('message_partitions', 'add', entry)))
+    follower.process_update_data(pickle.dumps(('messages', 'add', message)))
+
+    session = scoped_session(replica)
+    assert [row.content for row in session.query(january).all()] == ["jan"]
+    assert session.query(MessageModel).count() == 0
+    session.remove()
+
+
+def test_snapshot_restores_partitions(db_session, tmp_path):
+    """Tests that pickled snapshots put messages back into their partitions."""
+    session = scoped_session(db_session)
+    add_message(session, MessageModel, "old", JANUARY)
+    january, _ = current_partition(session, now=JANUARY)
+    add_message(session, january, "jan", JANUARY)
+    snapshot = pickle.dumps(fetch_all_data_from_orm(session.get_bind()))
+    session.remove()
+
+    replica = make_db(tmp_path / "replica.db")
+    session = scoped_session(replica)
+    session.query(UserModel).delete()
+    session.commit()
+    load_snapshot(replica, snapshot)
+
+    assert [row.content for row in session.query(MessageModel).all()] == ["old"]
+    assert [row.content for row in session.query(january).all()] == ["jan"]
+    session.remove()
+
+
+def test_archive_partitions_drops_old_tables(db_session, tmp_path):
+    """Tests that old partitions move to their own file and stop resolving."""
+    session = scoped_session(db_session)
+    january, _ = current_partition(session, now=JANUARY)
+    old = add_message(session, january, "jan", JANUARY)
+    february, _ = current_partition(session, now=FEBRUARY)
+    add_message(session, february, "feb", FEBRUARY)
+    archive_dir = str(tmp_path / "archive")
+
+    assert archive_partitions(session, archive_dir, keep_months=1, now=FEBRUARY) == [202601]
+
+    assert "messages_202601" not in inspect(session.get_bind()).get_table_names()
+    assert message_models(session) == [MessageModel, february]
+    assert models_for_ids(session, [old]) == {}
+    with sqlite3.connect(os.path.join(archive_dir, "messages_202601.db")) as archived:
+        assert archived.execute("SELECT content FROM messages_202601").fetchall() == [("jan",)]
+    assert session.query(MessagePartitionModel).get(202601).archived
+    session.remove()
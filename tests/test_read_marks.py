@@ -0,0 +1,136 @@
+import pickle
+import sqlite3
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock
+from sqlalchemy.orm import scoped_session
+import spec_pb2
+from follower_server import FollowerService
+from leader_server import ClientService
+from models import MessageModel, ReadMarkModel, UserModel, init_db, get_session_factory
+from partitions import current_partition
+from read_marks import forget_reader, mark_read, read_marks, unread
+from replication import ReplicationLog
+
+
+def make_db(path):
+    """Returns a session factory for a database with three logged in users."""
+    factory = get_session_factory(init_db(f"sqlite:///{path}"))
+    session = scoped_session(factory)
+    session.add_all([UserModel(id=i, username=name, password="x", session_id=f"s{name}", logged_in=True)
+                     for i, name in enumerate("abc", start=1)])
+    session.commit()
+    session.remove()
+    return factory
+
+
+@pytest.fixture
+def db_session(tmp_path):
+    return make_db(tmp_path / "chat.db")
+
+
+def add_messages(factory, *senders):
+    """Stores a message to ``c`` from each sender ID, returning their IDs."""
+    session = scoped_session(factory)
+    messages = [MessageModel(sender_id=sender, receiver_id=3, content=f"from {sender}") for sender in senders]
+    session.add_all(messages)
+    session.commit()
+    ids = [message.id for message in messages]
+    session.remove()
+    return ids
+
+
+def unread_counts(service):
+    counts = service.GetUnreadCounts(spec_pb2.SessionRequest(session_id="sc"), MagicMock()).counts
+    return {getattr(count, "from"): count.count for count in counts}
+
+
+def test_marks_only_move_forward(db_session):
+    """Tests that a mark is upserted, never lowered, and bounds the unread range of its sender."""
+    first, second, third = add_messages(db_session, 1, 1, 2)
+    session = scoped_session(db_session)
+
+    assert mark_read(session, 3, 1, second).last_read_id == second
+    assert mark_read(session, 3, 1, first) is None
+    assert mark_read(session, 3, 1, second) is None
+    session.commit()
+
+    assert read_marks(session, [3]) == {(3, 1): second}
+    assert [row.id for row in unread(session.query(MessageModel), MessageModel, 3).all()] == [third]
+    assert [mark.peer_id for mark in forget_reader(session, 3)] == [1]
+    session.commit()
+    assert session.query(ReadMarkModel).count() == 0
+    session.remove()
+
+
+def test_acknowledge_and_chat_advance_marks(db_session):
+    """Tests that acknowledging and reading a chat mark each conversation read up to its newest message."""
+    log = ReplicationLog()
+    service = ClientService(db_session=db_session, update_queue=log)
+    first, _, _ = add_messages(db_session, 1, 1, 2)
+    assert unread_counts(service) == {"a": 2, "b": 1}
+
+    response = service.AcknowledgeReceivedMessages(spec_pb2.AcknowledgeReceivedMessagesRequest(
+        session_id="sc", message_ids=[first]), MagicMock())
+    assert response.position == 1
+    assert unread_counts(service) == {"a": 1, "b": 1}
+
+    service.GetChat(spec_pb2.ChatRequest(session_id="sc", username="a"), MagicMock())
+    assert unread_counts(service) == {"b": 1}
+    page = service.GetMessages(spec_pb2.ReceiveRequest(session_id="sc"), MagicMock())
+    assert [message.from_ for message in page.message] == ["b"]
+
+    # one small record per conversation, not one per message
+    table, action, mark, index = pickle.loads(log.get(2)[1])
+    assert (table, action, mark.reader_id, mark.peer_id, index) == ('read_marks', 'update', 3, 1, 0)
+
+
+def test_follower_keeps_read_state_after_failover(db_session, tmp_path):
+    """Tests that a replica applying the leader's marks reports the same unread messages."""
+    log = ReplicationLog()
+    service = ClientService(db_session=db_session, update_queue=log)
+    replica = make_db(tmp_path / "replica.db")
+    follower = FollowerService(db_session=replica, leader_address="leader", state={})
+    add_messages(db_session, 1, 2)
+    add_messages(replica, 1, 2)
+
+    service.GetChat(spec_pb2.ChatRequest(session_id="sc", username="a"), MagicMock())
+    for position in range(1, log.position + 1):
+        follower.process_update_data(log.get(position)[1])
+
+    promoted = ClientService(db_session=replica, update_queue=ReplicationLog())
+    assert unread_counts(promoted) == unread_counts(service) == {"b": 1}
+
+
+def test_upgrade_seeds_marks_from_received_flags(tmp_path):
+    """Tests that a database from before read marks gets marks up to its newest received messages."""
+    path = tmp_path / "chat.db"
+    factory = make_db(path)
+    session = scoped_session(factory)
+    january, _ = current_partition(session, now=datetime(2026, 1, 15))
+    first, _, third = add_messages(factory, 1, 1, 2)
+    newest = january(sender_id=1, receiver_id=3, content="jan", time_stamp=datetime(2026, 1, 15))
+    session.add(newest)
+    session.commit()
+    newest = newest.id
+    session.remove()
+    # the schema before read marks, with a flag per message
+    with sqlite3.connect(path) as legacy:
+        legacy.execute("DROP TABLE read_marks")
+        for table in ("messages", january.__tablename__):
+            legacy.execute(f"ALTER TABLE {table} ADD COLUMN is_received BOOLEAN DEFAULT 0")
+        legacy.execute("UPDATE messages SET is_received = 1 WHERE id IN (?, ?)", (first, third))
+        legacy.execute(f"UPDATE {january.__tablename__} SET is_received = 1")
+
+    session = scoped_session(get_session_factory(init_db(f"sqlite:///{path}")))
+    assert read_marks(session, [3]) == {(3, 1): newest, (3, 2): third}
+    session.remove()
+
+    # only once, marks written afterwards are not overwritten
+    session = scoped_session(get_session_factory(init_db(f"sqlite:///{path}")))
+    session.query(ReadMarkModel).delete()
+    session.commit()
+    session.remove()
+    session = scoped_session(get_session_factory(init_db(f"sqlite:///{path}")))
+    assert read_marks(session, [3]) == {}
+    session.remove()
@@ -0,0 +1,229 @@
+import pytest
+from unittest.mock import patch
+import threading
+from replication import ReplicationLog, ReplicaProgress, ReplicationTracker
+
+
+def test_replication_log_assigns_increasing_positions():
+    """Tests that every update gets the next position."""
+    log = ReplicationLog()
+    assert log.put(b"a") == 1
+    assert log.put(b"b") == 2
+    assert log.get() == (1, b"a")
+    assert log.get() == (2, b"b")
+    assert log.position == 2
+
+
+def test_replication_log_continues_from_start():
+    """Tests that a promoted follower continues numbering."""
+    log = ReplicationLog(start=41)
+    assert log.put(b"x") == 42
+
+
+def test_replication_log_catch_up_within_history():
+    """Tests that followers holding a prefix of the log get the missing entries."""
+    log = ReplicationLog(start=3, history=[(2, b"b"), (3, b"c")])
+    log.put(b"d")
+    assert log.entries_since(2) == [(3, b"c"), (4, b"d")]
+    assert log.entries_since(3) == [(4, b"d")]
+
+
+def test_replication_log_catch_up_needs_snapshot():
+    """Tests the cases where only a snapshot can bring a follower up to date."""
+    log = ReplicationLog(start=3, history=[(3, b"c")])
+    log.put(b"d")
+    assert log.entries_since(0) is None   # empty replica
+    assert log.entries_since(1) is None   # older than the retained history
+    assert log.entries_since(4) is None   # applied entries this leader never saw
+
+
+def test_replication_log_catch_up_from_own_log():
+    """Tests that positions numbered by this log can catch up, e.g. after a file copy."""
+    log = ReplicationLog(start=3, history=[(3, b"c")])
+    log.put(b"d")
+    log.put(b"e")
+    assert log.entries_since(4, log.log_id) == [(5, b"e")]
+    assert log.entries_since(4, "other log") is None
+    assert log.entries_since(6, log.log_id) is None
+
+    fresh = ReplicationLog()
+    assert fresh.entries_since(0, fresh.log_id) == []
+    fresh.put(b"a")
+    assert fresh.entries_since(0, fresh.log_id) == [(1, b"a")]
+
+
+def test_replication_log_history_is_bounded():
+    """Tests that only the most recent entries are retained."""
+    log = ReplicationLog(history_size=2)
+    for item in (b"a", b"b", b"c"):
+        log.put(item)
+    assert list(log.history) == [(2, b"b"), (3, b"c")]
+
+
+def test_replica_progress_only_advances_without_gaps():
+    """Tests that an update after a missed one is neither recorded nor counted as applied."""
+    progress = ReplicaProgress(position=1)
+    assert progress.applied(2, update_data=b"b")
+    assert progress.applied(3, update_data=b"c")
+    assert not progress.applied(5, update_data=b"e")
+    assert list(progress.history) == [(2, b"b"), (3, b"c")]
+    assert progress.applied_position == 3
+    assert not progress.wait_for(5, timeout=0)
+
+
+def test_replica_progress_never_synced_is_infinitely_stale():
+    """Tests that a fresh tracker refuses to claim freshness."""
+    progress = ReplicaProgress()
+    assert progress.staleness() == float('inf')
+
+
+def test_replica_progress_in_sync_after_applying_head():
+    """Tests that applying the leader's latest position marks the replica in sync."""
+    progress = ReplicaProgress(position=2)
+    with patch("replication.time.time", return_value=100.0):
+        progress.applied(3, leader_position=3)
+    with patch("replication.time.time", return_value=101.5):
+        assert progress.staleness() == pytest.approx(1.5)
+
+
+def test_replica_progress_behind_leader_keeps_aging():
+    """Tests that a known backlog does not refresh the sync time."""
+    progress = ReplicaProgress(position=2)
+    with patch("replication.time.time", return_value=100.0):
+        progress.applied(3, leader_position=3)
+    with patch("replication.time.time", return_value=110.0):
+        progress.observe_leader(5)
+        assert progress.staleness() == pytest.approx(10.0)
+        assert progress.leader_position == 5
+
+
+def test_replica_progress_wait_for_applied_position():
+    """Tests that waiting for an already applied position returns at once."""
+    progress = ReplicaProgress(position=5)
+    assert progress.wait_for(5, timeout=0)
+    assert not progress.wait_for(6, timeout=0.01)
+
+
+def test_replica_progress_wait_for_wakes_on_apply():
+    """Tests that a waiting reader is woken when the position is applied."""
+    import threading
+    progress = ReplicaProgress(position=1)
+    threading.Timer(0.05, progress.applied, args=(2,)).start()
+    assert progress.wait_for(2, timeout=2)
+
+
+def test_replication_tracker_counts_acks():
+    """Tests waiting for a fixed number of follower acknowledgements."""
+    tracker = ReplicationTracker()
+    tracker.add("2")
+    tracker.add("3")
+    tracker.ack("2", 4)
+    assert tracker.wait_for(4, acks=1, timeout=0)
+    assert not tracker.wait_for(4, acks=2, timeout=0.01)
+    assert not tracker.wait_for(5, acks=1, timeout=0.01)
+
+
+def test_replication_tracker_majority_follows_membership():
+    """Tests that the default majority is computed from the tracked followers."""
+    tracker = ReplicationTracker()
+    for follower_id in ("2", "3", "4"):
+        tracker.add(follower_id)
+    tracker.ack("2", 1)
+    assert not tracker.wait_for(1, timeout=0.01)
+    tracker.remove("4")
+    tracker.remove("3")
+    assert tracker.wait_for(1, timeout=0)
+
+
+def test_replication_tracker_majority_counts_leader():
+    """Tests that the leader counts towards the majority, with zero and two followers."""
+    tracker = ReplicationTracker()
+    assert tracker.followers() == 0
+    assert tracker.wait_for(1, timeout=0)
+
+    tracker.add("2")
+    tracker.add("3")
+    assert not tracker.wait_for(1, timeout=0)
+    tracker.ack("2", 1)
+    # the leader and one of two followers are a majority of three
+    assert tracker.wait_for(1, timeout=0)
+    assert not tracker.wait_for(1, acks=2, timeout=0)
+
+
+def test_replication_tracker_wakes_waiters():
+    """Tests that an acknowledgement wakes a waiting writer."""
+    tracker = ReplicationTracker()
+    tracker.add("2")
+    threading.Timer(0.05, tracker.ack, args=("2", 1)).start()
+    assert tracker.wait_for(1, acks=1, timeout=2)
+
+
+def test_replication_tracker_ignores_unknown_followers():
+    """Tests that acks from followers that were removed are not counted."""
+    tracker = ReplicationTracker()
+    tracker.ack("9", 3)
+    assert not tracker.wait_for(3, acks=1, timeout=0)
+
+
+def test_replication_tracker_progress_table():
+    """Tests that the progress table reports positions, bytes and seconds behind."""
+    tracker = ReplicationTracker()
+    tracker.add("2")
+    tracker.add("3")
+    with patch("replication.time.time", return_value=100.0):
+        tracker.appended(1, 10)
+    with patch("replication.time.time", return_value=102.0):
+        tracker.appended(2, 20)
+    with patch("replication.time.time", return_value=103.0):
+        tracker.ack("2", 1)
+    with patch("replication.time.time", return_value=105.0):
+        rows = {row['follower_id']: row for row in tracker.progress()}
+
+    assert rows["2"]['applied_position'] == 1
+    assert rows["2"]['positions_behind'] == 1
+    assert rows["2"]['bytes_behind'] == 20
+    assert rows["2"]['seconds_behind'] == pytest.approx(3.0)
+    assert rows["2"]['last_contact'] == 103.0
+    assert rows["3"]['positions_behind'] == 2
+    assert rows["3"]['bytes_behind'] == 30
+    assert rows["3"]['seconds_behind'] == pytest.approx(5.0)
+
+
+def test_replication_tracker_prunes_fully_acknowledged_updates():
+    """Tests that updates applied by every follower are no longer retained."""
+    tracker = ReplicationTracker()
+    tracker.add("2")
+    tracker.add("3")
+    tracker.appended(1, 10)
+    tracker.appended(2, 10)
+    tracker.ack("2", 2)
+    tracker.ack("3", 1)
+    assert [entry[0] for entry in tracker.pending] == [2]
+    tracker.remove("3")
+    assert not tracker.pending
+
+
+def test_replication_tracker_majority_lag():
+    """Tests that the lag of a single slow follower does not count as majority lag."""
+    tracker = ReplicationTracker()
+    for follower_id in ("2", "3", "4"):
+        tracker.add(follower_id)
+    with patch("replication.time.time", return_value=100.0):
+        tracker.appended(1, 10)
+        tracker.ack("2", 1)
+        tracker.ack("3", 1)
+    with patch("replication.time.time", return_value=110.0):
+        assert tracker.majority_lag() == 0.0
+        tracker.remove("3")
+        assert tracker.majority_lag() == pytest.approx(10.0)
+
+
+def test_replication_tracker_wait_for_lag():
+    """Tests that writers are held back until lagging followers catch up."""
+    tracker = ReplicationTracker()
+    tracker.add("2")
+    with patch("replication.time.time", return_value=0.0):
+        tracker.appended(1, 10)
+    assert not tracker.wait_for_lag(1.0, timeout=0.05)
+    threading.Timer(0.05, tracker.ack, args=("2", 1)).start()
+    assert tracker.wait_for_lag(1.0, timeout=2)
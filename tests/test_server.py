@@ -1,6 +1,10 @@
+import threading
+import grpc
 import pytest
 from unittest.mock import patch, MagicMock
 import server
+from replication import ReplicaProgress
+import spec_pb2
 from server import leader_routine, follower_routine, claim_leadery, upgrade_follower
 
 @pytest.fixture
@@ -33,37 +37,11 @@ def follower_state():
     }
 
 
-def test_check_new_leader_valid_response(follower_state):
-    """Tests check_new_leader accepts live leader."""
-    min_follower = ("2", "localhost:6002")
-
-    with patch("server.grpc.insecure_channel"), \
-         patch("server.spec_pb2_grpc.LeaderServiceStub") as stub_class:
-        stub = stub_class.return_value
-        stub.CheckLeader.return_value = MagicMock(error_code=0)
-
-        server.check_new_leader(min_follower, follower_state)
-
-        assert follower_state['leader_address'] == "localhost:6002"
-
-
-def test_check_new_leader_removes_dead(follower_state):
-    """Tests removal of dead follower if CheckLeader fails."""
-    min_follower = ("2", "localhost:6002")
-
-    with patch("server.grpc.insecure_channel"), \
-         patch("server.spec_pb2_grpc.LeaderServiceStub") as stub_class:
-        stub = stub_class.return_value
-        stub.CheckLeader.side_effect = Exception("no response")
-
-        server.check_new_leader(min_follower, follower_state)
-
-        assert ("2", "localhost:6002") not in follower_state['followers']
-
-
 def test_leader_routine_starts_servers():
     """Tests leader_routine starts and blocks on gRPC servers."""
     with patch("server.init_db"), \
+         patch("server.PasswordHasher"), \
+         patch("server.start_compactor"), \
          patch("server.get_session_factory"), \
          patch("server.serve_leader_follower") as f_stub, \
          patch("server.serve_leader_client") as c_stub, \
@@ -79,6 +57,8 @@ def test_leader_routine_starts_servers():
 def test_follower_routine_starts_servers():
     """Tests follower_routine starts heartbeat and registers with leader."""
     with patch("server.init_db"), \
+         patch("server.PasswordHasher"), \
+         patch("server.start_compactor"), \
          patch("server.get_session_factory"), \
          patch("server.server_follower_leader") as leader_stub, \
          patch("server.request_update"), \
@@ -108,6 +88,8 @@ def follower_state():
 def test_leader_routine_starts_servers_and_threads():
     """Covers leader_routine threading and server waiting paths."""
     with patch("server.init_db"), \
+         patch("server.PasswordHasher"), \
+         patch("server.start_compactor"), \
          patch("server.get_session_factory"), \
          patch("server.serve_leader_follower") as mock_follower, \
          patch("server.serve_leader_client") as mock_client, \
@@ -127,6 +109,8 @@ def test_leader_routine_starts_servers_and_threads():
 def test_follower_routine_thread_and_servers():
     """Covers follower_routine including registration and heartbeat."""
     with patch("server.init_db"), \
+         patch("server.PasswordHasher"), \
+         patch("server.start_compactor"), \
          patch("server.get_session_factory"), \
          patch("server.server_follower_leader") as mock_internal, \
          patch("server.request_update"), \
@@ -151,15 +135,47 @@ def test_follower_promotes_itself(follower_state):
         patch("server.upgrade_follower") as upgrade_mock
     ):
         stub = stub_class.return_value
-        stub.HeartBeat.side_effect = Exception("down")
+        stub.HeartBeatStream.side_effect = grpc.RpcError()
 
         follower_state["follower_id"] = "1"
         follower_state["followers"] = []
+        follower_state["heartbeat_interval"] = 0.05
+        follower_state["election_timeout"] = 0.01
 
         server.follower_heart_beat_checker(follower_state)
         upgrade_mock.assert_called_once()
 
 
+def test_stream_heartbeats_feeds_detector(follower_state):
+    """Tests that every ack on the stream counts as a heartbeat and updates progress."""
+    detector = MagicMock()
+    stop_event = threading.Event()
+
+    def acks(pings, **kwargs):
+        yield spec_pb2.Ack(position=3)
+        yield spec_pb2.Ack(position=5)
+        stop_event.set()
+
+    with patch("server.spec_pb2_grpc.LeaderServiceStub") as stub_class:
+        stub_class.return_value.HeartBeatStream.side_effect = acks
+        server.stream_heartbeats(follower_state, MagicMock(), detector, stop_event, 0.01)
+
+    assert detector.heartbeat.call_count == 2
+    assert server.replica_progress(follower_state).leader_position == 5
+
+
+def test_heartbeat_pings_carry_applied_position(follower_state):
+    """Tests that pings report the follower's applied position until stopped."""
+    follower_state["replica_progress"] = ReplicaProgress(position=7)
+    stop_event = threading.Event()
+    pings = server.heartbeat_pings(follower_state, stop_event, 0)
+    ping = next(pings)
+    assert ping.follower_id == str(follower_state["follower_id"])
+    assert ping.applied_position == 7
+    stop_event.set()
+    assert list(pings) == []
+
+
 def test_claim_leadery_sends_update():
     """Tests claim_leadery notifies all followers."""
     state = {
@@ -176,23 +192,6 @@ def test_claim_leadery_sends_update():
         stub.UpdateLeader.assert_called_once()
 
 
-def test_check_new_leader_handles_exceptions(follower_state):
-    """Tests check_new_leader removes dead follower if CheckLeader fails."""
-    min_follower = ("3", "localhost:5003")
-
-    with patch("server.grpc.insecure_channel"), \
-         patch("server.spec_pb2_grpc.LeaderServiceStub") as stub_class:
-        stub = stub_class.return_value
-        stub.CheckLeader.side_effect = Exception("timeout")
-
-        server.check_new_leader(min_follower, follower_state)
-        assert min_follower not in follower_state["followers"]
-    
-    with patch("builtins.print") as mock_print:
-        server.check_new_leader(min_follower, follower_state)
-        mock_print.assert_any_call("New leader is dead")
-
-
 def test_leader_routine():
     """
     Tests leader_routine to ensure it initializes the leader's DB, starts servers, and blocks on termination.
@@ -204,3 +203,121 @@ def test_leader_routine():
         leader_routine("server_id", "localhost:70051", "localhost:80051")
         mock_lf.assert_called_once()
         mock_lc.assert_called_once()
+
+
+def vote_stub(granted):
+    """Returns a patched FollowerServiceStub answering every vote with ``granted``."""
+    def vote(request, timeout):
+        # voters move into the candidate's term only for real votes
+        term = 0 if request.pre_vote else request.term
+        return spec_pb2.VoteResponse(term=term, vote_granted=granted)
+
+    stub_class = MagicMock()
+    stub_class.return_value.RequestVote.side_effect = vote
+    return stub_class
+
+
+def test_run_election_wins_with_majority(follower_state):
+    """Tests that a candidate with a majority enters the next term and wins."""
+    follower_state["followers"] = [("2", "localhost:6002"), ("3", "localhost:6003")]
+    with patch("server.grpc.insecure_channel"), \
+         patch("server.spec_pb2_grpc.FollowerServiceStub", vote_stub(True)) as stub_class:
+        assert server.run_election(follower_state, 0.1)
+
+    election = server.election_state(follower_state)
+    assert election.term == 1
+    assert election.voted_for == str(follower_state["follower_id"])
+    requests = [c.args[0] for c in stub_class.return_value.RequestVote.call_args_list]
+    assert [r.pre_vote for r in requests] == [True, True, False, False]
+
+
+def test_run_election_stops_after_failed_pre_vote(follower_state):
+    """Tests that a failed pre-vote does not increment the term."""
+    follower_state["followers"] = [("2", "localhost:6002"), ("3", "localhost:6003")]
+    with patch("server.grpc.insecure_channel"), \
+         patch("server.spec_pb2_grpc.FollowerServiceStub", vote_stub(False)) as stub_class:
+        assert not server.run_election(follower_state, 0.1)
+
+    assert server.election_state(follower_state).term == 0
+    assert stub_class.return_value.RequestVote.call_count == 2
+
+
+def test_run_election_adopts_higher_term(follower_state):
+    """Tests that a candidate learning a newer term from a voter gives up."""
+    follower_state["followers"] = [("2", "localhost:6002")]
+    stub_class = MagicMock()
+    stub_class.return_value.RequestVote.side_effect = [
+        spec_pb2.VoteResponse(term=0, vote_granted=True),
+        spec_pb2.VoteResponse(term=7, vote_granted=False),
+    ]
+    with patch("server.grpc.insecure_channel"), \
+         patch("server.spec_pb2_grpc.FollowerServiceStub", stub_class):
+        assert not server.run_election(follower_state, 0.1)
+
+    assert server.election_state(follower_state).term == 7
+
+
+def test_run_election_yields_to_more_up_to_date_follower(follower_state):
+    """Tests that a candidate does not run when a voter applied more updates."""
+    follower_state["followers"] = [("2", "localhost:6002"), ("3", "localhost:6003")]
+    stub_class = MagicMock()
+    stub_class.return_value.RequestVote.side_effect = [
+        spec_pb2.VoteResponse(term=0, vote_granted=True, last_position=0),
+        spec_pb2.VoteResponse(term=0, vote_granted=False, last_position=4),
+    ]
+    with patch("server.grpc.insecure_channel"), \
+         patch("server.spec_pb2_grpc.FollowerServiceStub", stub_class):
+        assert not server.run_election(follower_state, 0.1)
+
+    assert server.election_state(follower_state).term == 0
+
+
+def test_elect_leader_stops_when_leader_announced(follower_state):
+    """Tests that a follower stops campaigning once a new leader claims the term."""
+    follower_state["election_timeout"] = 0.01
+
+    def new_leader(*args):
+        follower_state["leader_address"] = "localhost:6002"
+        return False
+
+    with patch("server.run_election", side_effect=new_leader) as run_mock:
+        assert not server.elect_leader(follower_state)
+        run_mock.assert_called_once()
+
+
+def test_claim_leadery_sends_term():
+    """Tests that the new leader announces the term it was elected in."""
+    state = {
+        "leader_id": "2",
+        "leader_address": "localhost:5002",
+        "followers": [("3", "localhost:5003")],
+        "election": server.ElectionState(term=4),
+    }
+    with patch("server.grpc.insecure_channel"), \
+         patch("server.spec_pb2_grpc.FollowerServiceStub") as stub_class:
+        stub_class.return_value.UpdateLeader.return_value = spec_pb2.Ack(error_code=0)
+        server.claim_leadery(state)
+        request = stub_class.return_value.UpdateLeader.call_args.args[0]
+        assert request.term == 4
+
+
+def test_claim_leadery_sends_one_message_per_follower():
+    """Tests that the follower list travels with UpdateLeader instead of separate calls."""
+    followers = [("3", "localhost:5003"), ("4", "localhost:5004"), ("5", "localhost:5005")]
+    state = {
+        "leader_id": "2",
+        "leader_address": "localhost:5002",
+        "followers": list(followers),
+        "election": server.ElectionState(term=4),
+    }
+    with patch("server.grpc.insecure_channel"), \
+         patch("server.spec_pb2_grpc.FollowerServiceStub") as stub_class:
+        stub = stub_class.return_value
+        stub.UpdateLeader.return_value = spec_pb2.Ack(error_code=0)
+        server.claim_leadery(state)
+
+        assert stub.UpdateLeader.call_count == 3
+        stub.UpdateFollowers.assert_not_called()
+        view = stub.UpdateLeader.call_args.args[0].membership
+        assert (view.term, view.version) == (4, 1)
+        assert [(m.id, m.address) for m in view.members] == followers
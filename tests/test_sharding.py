@@ -0,0 +1,206 @@
+import grpc
+import pytest
+from unittest.mock import MagicMock, patch
+from sqlalchemy.orm import scoped_session
+import spec_pb2
+from leader_server import ClientService
+from models import MessageModel, UserModel, init_db, get_session_factory
+from replication import ReplicationLog
+from sharding import ShardGroup, ShardMap, ShardRouter, parse_groups, shard_for
+from utils import StatusCode
+
+
+class FakeRpcError(grpc.RpcError):
+    def __init__(self, code):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+
+def names_on(shard, count, n=2):
+    """Returns ``n`` usernames that hash to ``shard``."""
+    names = (f"user{i}" for i in range(1000))
+    return [name for name in names if shard_for(name, count) == shard][:n]
+
+
+def test_shard_for_is_stable_and_spread():
+    """Tests that users map to the same shard every time and cover all shards."""
+    assert shard_for("alice", 2) == shard_for("alice", 2)
+    assert {shard_for(f"user{i}", 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def test_parse_groups():
+    """Tests parsing the addresses of every shard."""
+    assert parse_groups("a:1, a:2;b:1") == [["a:1", "a:2"], ["b:1"]]
+
+
+def test_group_moves_on_to_leader():
+    """Tests that a group skips followers and starts with the last leader next time."""
+    follower, leader = MagicMock(), MagicMock()
+    follower.Send.side_effect = FakeRpcError(grpc.StatusCode.FAILED_PRECONDITION)
+    leader.Send.return_value = "ok"
+    stubs = {"f": follower, "l": leader}
+    group = ShardGroup(["f", "l"], stub_class=MagicMock())
+    with patch.object(group, "stub", side_effect=lambda address: stubs[address]):
+        assert group.call("Send", "request") == "ok"
+        assert group.call("Send", "request") == "ok"
+    assert follower.Send.call_count == 1
+    assert leader.Send.call_count == 2
+
+
+def test_group_raises_when_no_leader():
+    """Tests that a shard without a reachable leader raises the last error."""
+    down = MagicMock()
+    down.Send.side_effect = FakeRpcError(grpc.StatusCode.UNAVAILABLE)
+    group = ShardGroup(["a"], stub_class=MagicMock())
+    with patch.object(group, "stub", return_value=down), pytest.raises(grpc.RpcError) as raised:
+        group.call("Send", "request")
+    assert raised.value.code() == grpc.StatusCode.UNAVAILABLE
+
+
+def test_group_needs_an_address():
+    """Tests that a shard listed without servers is refused up front."""
+    with pytest.raises(ValueError):
+        ShardGroup([], stub_class=MagicMock())
+    with pytest.raises(ValueError):
+        ShardRouter(parse_groups("localhost:50051;"))
+
+
+@pytest.fixture
+def router():
+    """Provides a router over two shards with mocked groups."""
+    router = ShardRouter([["a"], ["b"]])
+    router.groups = [MagicMock(), MagicMock()]
+    return router
+
+
+def test_router_tags_login_with_shard(router):
+    """Tests that logins go to the user's shard and the session ID names it."""
+    name = names_on(1, 2)[0]
+    router.groups[1].call.return_value = spec_pb2.ServerResponse(session_id="abc")
+
+    response = router.Login(spec_pb2.LoginRequest(username=name, password="x"), MagicMock())
+
+    assert response.session_id == "1:abc"
+    router.groups[0].call.assert_not_called()
+
+
+def test_router_forwards_by_session(router):
+    """Tests that session calls reach the shard in the session ID without the prefix."""
+    router.groups[1].call.return_value = spec_pb2.ServerResponse()
+
+    router.Send(spec_pb2.SendRequest(session_id="1:abc", to="bob", message="hi"), MagicMock())
+
+    method, request = router.groups[1].call.call_args[0]
+    assert (method, request.session_id) == ("Send", "abc")
+
+
+def test_router_rejects_unknown_session(router):
+    """Tests that a session ID without a valid shard is not logged in."""
+    response = router.GetMessages(spec_pb2.ReceiveRequest(session_id="7:abc"), MagicMock())
+    assert response.error_code == StatusCode.USER_NOT_LOGGED_IN
+
+
+def test_router_reports_unavailable_shard(router):
+    """Tests that an unreachable shard fails the call with UNAVAILABLE so clients retry."""
+    router.groups[0].call.side_effect = FakeRpcError(grpc.StatusCode.UNAVAILABLE)
+    context = MagicMock()
+    router.GetChat(spec_pb2.ChatRequest(session_id="0:abc", username="bob"), context)
+    assert context.abort.call_args[0][0] == grpc.StatusCode.UNAVAILABLE
+
+
+def test_router_lists_users_of_every_shard(router):
+    """Tests that ListUsers merges the users of all shards."""
+    router.groups[0].call.return_value = spec_pb2.Users(user=[spec_pb2.User(username="a")])
+    router.groups[1].call.return_value = spec_pb2.Users(user=[spec_pb2.User(username="b")])
+    users = router.ListUsers(spec_pb2.ListUsersRequest(wildcard="*"), MagicMock())
+    assert [user.username for user in users.user] == ["a", "b"]
+
+
+def test_router_syncs_users_of_every_shard(router):
+    """Tests that SyncState leaves the user list to the router, which lists every shard."""
+    def call(method, request):
+        if method == "SyncState":
+            return spec_pb2.SyncStateResponse(error_code=StatusCode.NOT_MODIFIED)
+        return spec_pb2.Users(user=[spec_pb2.User(username=method)])
+    router.groups[0].call.side_effect = call
+    router.groups[1].call.side_effect = call
+
+    response = router.SyncState(spec_pb2.SyncStateRequest(session_id="1:abc"), MagicMock())
+    method, request = router.groups[1].call.call_args_list[0][0]
+    assert method == "SyncState" and request.skip_users
+    assert response.error_code == StatusCode.SUCCESS and len(response.users.user) == 2
+
+    again = router.SyncState(spec_pb2.SyncStateRequest(
+        session_id="1:abc", users_version=response.users_version), MagicMock())
+    assert again.error_code == StatusCode.NOT_MODIFIED and not again.HasField("users")
+
+
+@pytest.fixture
+def shard(tmp_path):
+    """Provides the client service of shard 0 of 2 with one logged in local user."""
+    local, = names_on(0, 2, 1)
+    factory = get_session_factory(init_db(f"sqlite:///{tmp_path / 'chat.db'}"))
+    session = scoped_session(factory)
+    session.add(UserModel(username=local, password="x", session_id="s0", logged_in=True))
+    session.commit()
+    session.remove()
+    shards = ShardMap(0, [["a"], ["b"]])
+    shards.deliver = MagicMock(return_value=spec_pb2.ServerResponse(error_code=StatusCode.SUCCESS))
+    service = ClientService(db_session=factory, update_queue=ReplicationLog(), shards=shards)
+    with patch("leader_server.current_partition", return_value=(MessageModel, None)):
+        yield service, local, names_on(1, 2, 1)[0]
+
+
+def stored(service):
+    session = scoped_session(service.db_session)
+    rows = [(m.sender.username, m.receiver.username, m.content)
+            for m in session.query(MessageModel).all()]
+    session.remove()
+    return rows
+
+
+def test_send_to_other_shard_keeps_sent_copy(shard):
+    """Tests that a cross-shard Send delivers first and keeps the sender's copy."""
+    service, local, remote = shard
+
+    response = service.Send(spec_pb2.SendRequest(session_id="s0", to=remote, message="hi"), MagicMock())
+
+    assert response.error_code == StatusCode.SUCCESS
+    assert service.shards.deliver.call_args[0][:3] == (local, remote, "hi")
+    assert stored(service) == [(local, remote, "hi")]
+
+
+def test_send_to_unreachable_shard_stores_nothing(shard):
+    """Tests that a failed delivery is reported and not kept as sent."""
+    service, _, remote = shard
+    service.shards.deliver.side_effect = FakeRpcError(grpc.StatusCode.UNAVAILABLE)
+
+    response = service.Send(spec_pb2.SendRequest(session_id="s0", to=remote, message="hi"), MagicMock())
+
+    assert response.error_code == StatusCode.SHARD_UNAVAILABLE
+    assert stored(service) == []
+
+
+def test_deliver_creates_stand_in_sender(shard):
+    """Tests that a delivered message is stored unread from a stand-in that is not listed."""
+    service, local, remote = shard
+
+    response = service.Deliver(spec_pb2.DeliverRequest(sender=remote, receiver=local, message="yo"), MagicMock())
+
+    assert response.error_code == StatusCode.SUCCESS
+    assert stored(service) == [(remote, local, "yo")]
+    unread = service.GetUnreadCounts(spec_pb2.SessionRequest(session_id="s0"), MagicMock())
+    assert [(getattr(count, "from"), count.count) for count in unread.counts] == [(remote, 1)]
+    users = service.ListUsers(spec_pb2.ListUsersRequest(wildcard="*"), MagicMock())
+    assert [user.username for user in users.user] == [local]
+    login = service.Login(spec_pb2.LoginRequest(username=remote, password=""), MagicMock())
+    assert login.error_code == StatusCode.WRONG_SHARD
+
+
+def test_accounts_of_other_shards_are_refused(shard):
+    """Tests that a shard only creates accounts of its own users."""
+    service, _, remote = shard
+    response = service.CreateAccount(spec_pb2.CreateAccountRequest(username=remote, password="x"), MagicMock())
+    assert response.error_code == StatusCode.WRONG_SHARD
@@ -0,0 +1,62 @@
+import os
+import pytest
+import sqlite3
+from models import UserModel, get_session_factory, init_db
+from snapshot import backup_database, database_path, install_database, read_chunks
+
+
+@pytest.fixture
+def leader_engine(tmp_path):
+    """Provides an engine on a SQLite file holding a few users."""
+    engine = init_db(f"sqlite:///{tmp_path / 'leader.db'}")
+    session = get_session_factory(engine)()
+    session.add_all([UserModel(username=f"user{i}", password="x") for i in range(20)])
+    session.commit()
+    session.close()
+    yield engine
+    engine.dispose()
+
+
+def count_users(path):
+    """Returns the number of users stored in a SQLite file."""
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_database_path():
+    """Tests that the file name is taken from the database URL."""
+    assert database_path("sqlite:///chat_2.db") == "chat_2.db"
+
+
+def test_backup_and_install_round_trip(leader_engine, tmp_path):
+    """Tests that a streamed copy replaces the follower's file with the leader's data."""
+    backup = str(tmp_path / "backup.db")
+    backup_database(leader_engine, backup)
+    chunks = list(read_chunks(backup, chunk_size=1024))
+    assert len(chunks) > 1
+
+    target = str(tmp_path / "chat_2.db")
+    init_db(f"sqlite:///{target}").dispose()
+    assert count_users(target) == 0
+
+    assert install_database(iter(chunks), target) == os.path.getsize(backup)
+    assert count_users(target) == 20
+    assert not os.path.exists(target + ".download")
+
+
+def test_failed_transfer_keeps_old_file(tmp_path):
+    """Tests that an interrupted transfer leaves the existing database untouched."""
+    target = tmp_path / "chat_2.db"
+    target.write_bytes(b"old")
+
+    def broken_stream():
+        yield b"new"
+        raise ConnectionError("leader went away")
+
+    with pytest.raises(ConnectionError):
+        install_database(broken_stream(), str(target))
+    assert target.read_bytes() == b"old"
+    assert not os.path.exists(str(target) + ".download")
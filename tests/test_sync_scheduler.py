@@ -0,0 +1,105 @@
+from unittest.mock import MagicMock
+from sync_scheduler import FRAME_MS, SyncScheduler
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_scheduler(clock, **kwargs):
+    scheduled = []
+    scheduler = SyncScheduler(lambda delay, callback: scheduled.append((delay, callback)),
+                              clock=clock, **kwargs)
+    return scheduler, scheduled
+
+
+def test_new_results_are_applied_in_one_callback():
+    """Tests that results of one round reach the UI together and unchanged ones are dropped."""
+    clock = Clock()
+    scheduler, scheduled = make_scheduler(clock)
+    chat, users = MagicMock(), MagicMock()
+    scheduler.add("chat", lambda: ["m1"], chat, interval=1)
+    scheduler.add("users", lambda: ["a"], users, interval=3)
+
+    assert scheduler.run_due() == 1
+    chat.assert_not_called()
+    scheduler.flush()
+    chat.assert_called_once_with(["m1"])
+    users.assert_called_once_with(["a"])
+
+    clock.now = 1
+    scheduler.run_due()
+    scheduler.flush()
+    assert chat.call_count == 1
+    # the background thread never touches Tk
+    assert scheduled == []
+
+
+def test_ui_loop_polls_until_stopped():
+    """Tests that the UI thread drains the queue every frame and stops rescheduling once stopped."""
+    clock = Clock()
+    scheduler, scheduled = make_scheduler(clock)
+    chat = MagicMock()
+    scheduler.add("chat", lambda: clock.now, chat, interval=1)
+
+    scheduler.poll()
+    assert [delay for delay, _ in scheduled] == [FRAME_MS]
+    scheduler.run_due()
+    clock.now = 1
+    scheduler.run_due()
+    scheduled.pop()[1]()
+    chat.assert_called_once_with(1)
+
+    scheduler.stop()
+    scheduled.pop()[1]()
+    assert scheduled == []
+
+
+def test_intervals_back_off_when_idle_or_hidden():
+    """Tests that polling slows down without input or while minimized, and input wakes it."""
+    clock = Clock()
+    scheduler, _ = make_scheduler(clock, idle_after=60, idle_factor=5, hidden_factor=30)
+    fetch = MagicMock(return_value=None)
+    scheduler.add("chat", fetch, MagicMock(), interval=1)
+
+    scheduler.run_due()
+    clock.now = 61
+    assert scheduler.backoff() == 5
+    scheduler.run_due()
+    clock.now = 62
+    assert scheduler.run_due() == 4
+    assert fetch.call_count == 2
+
+    scheduler.set_visible(False)
+    assert scheduler.backoff() == 30
+    scheduler.set_visible(True)
+    scheduler.touch()
+    assert scheduler.wake.is_set()
+    assert scheduler.backoff() == 1
+    scheduler.run_due()
+    assert fetch.call_count == 3
+
+
+def test_trigger_runs_at_once_and_when_skips():
+    """Tests that disabled tasks make no calls and triggered tasks run before their interval."""
+    clock = Clock()
+    scheduler, scheduled = make_scheduler(clock)
+    logged_in = []
+    fetch, apply = MagicMock(return_value="x"), MagicMock()
+    scheduler.add("unread", fetch, apply, interval=3, when=lambda: bool(logged_in))
+
+    scheduler.run_due()
+    fetch.assert_not_called()
+
+    logged_in.append(True)
+    scheduler.trigger("unread")
+    scheduler.run_due()
+    scheduler.trigger()
+    scheduler.run_due()
+    assert fetch.call_count == 2
+    scheduler.flush()
+    assert apply.call_count == 1
@@ -0,0 +1,72 @@
+import pytest
+from types import SimpleNamespace
+from tokens import RevocationList, SessionTokens, TOKEN_PREFIX, is_token
+
+
+@pytest.fixture
+def tokens():
+    """Provides a token service with a one hour lifetime."""
+    return SessionTokens("secret", ttl=3600)
+
+
+def test_issue_and_verify(tokens):
+    """Tests that a token carries the user it was issued to."""
+    token = tokens.issue(7, "alice", now=1000)
+    assert is_token(token)
+    user = tokens.verify(token, now=1001)
+    assert (user.id, user.username, user.expires_at) == (7, "alice", 4600)
+
+
+def test_plain_session_ids_are_not_tokens():
+    """Tests that UUID session IDs are told apart from tokens."""
+    assert not is_token("6f1c8a4e-0000-4000-8000-000000000000")
+    assert not is_token("")
+    assert not is_token(None)
+
+
+def test_expired_token_rejected(tokens):
+    """Tests that a token is rejected once its lifetime is over."""
+    token = tokens.issue(7, "alice", now=1000)
+    assert tokens.verify(token, now=4600) is None
+
+
+def test_tampered_token_rejected(tokens):
+    """Tests that changed claims or a foreign key invalidate the signature."""
+    token = tokens.issue(7, "alice")
+    other = tokens.issue(8, "mallory")
+    forged = token.split('.')[0] + '.' + other.split('.')[1] + '.' + token.split('.')[2]
+    assert tokens.verify(forged) is None
+    assert SessionTokens("other-secret").verify(token) is None
+    assert tokens.verify(TOKEN_PREFIX + "garbage") is None
+
+
+def test_revoked_token_rejected(tokens):
+    """Tests that revoking one token leaves the user's other tokens valid."""
+    first = tokens.issue(7, "alice")
+    second = tokens.issue(7, "alice")
+    user = tokens.verify(first)
+    tokens.revocations.add(token_id=user.token_id, expires_at=user.expires_at)
+    assert tokens.verify(first) is None
+    assert tokens.verify(second) is not None
+
+
+def test_user_revocation_covers_earlier_tokens(tokens):
+    """Tests that deleting an account revokes tokens issued before, not after."""
+    old = tokens.issue(7, "alice", now=1000)
+    tokens.revocations.add(user_id=7, revoked_at=1500, expires_at=5100)
+    new = tokens.issue(7, "alice", now=2000)
+    assert tokens.verify(old, now=2001) is None
+    assert tokens.verify(new, now=2001) is not None
+
+
+def test_load_skips_expired_and_prune_drops_them():
+    """Tests that the revocation list only keeps entries of live tokens."""
+    revocations = RevocationList()
+    revocations.load([
+        SimpleNamespace(token_id="a", user_id=None, revoked_at=10, expires_at=50),
+        SimpleNamespace(token_id="b", user_id=None, revoked_at=10, expires_at=200),
+        SimpleNamespace(token_id=None, user_id=3, revoked_at=10, expires_at=150),
+    ], now=100)
+    assert len(revocations) == 2
+    revocations.prune(now=160)
+    assert len(revocations) == 1